@@ -2,6 +2,15 @@ import numpy as np
 import pandas as pd
 from .Polar import Polar as Pol
 
+# The time loops of the discrete models are compiled with numba when it is available.
+try:
+    from numba import njit as _njit
+    _jit = _njit(cache=True, nogil=True)
+    HAS_NUMBA = True
+except ImportError:
+    _jit = lambda f: f
+    HAS_NUMBA = False
+
 
 # --------------------------------------------------------------------------------}
 # --- Wagner function 
@@ -52,89 +61,283 @@ def dynstall_mhh_sim(time, u, p, x0=None, prefix='', method='continuous'):
      - p: dictionary of parameters
      - x0: initial conditions for the 4 states of the model. If None, the steady steady values are used
      - method: 'continuous' or 'discrete' to chose a formulation
+               The discrete formulation is faster, see also `dynstall_mhh_sim_batch`
      - prefix: prefix used for channel names of the dataframe. Use 'AB1N001' to match OpenFAST.
     OUTPUTS:
      - df: dataframe with outputs similar to UA module of OpenFAST
     """
     from scipy.integrate import solve_ivp
+    time = np.asarray(time)
 
     # --- Initial conditions for states
     if x0 is None:
         # x0 = [0,0,0,0]
         x0 = dynstall_mhh_steady(0,u,p)
 
+    # --- Inputs on the time grid
+    U        = _inputOnGrid(u['U']       , time)
+    omega    = _inputOnGrid(u['omega']   , time)
+    alpha_34 = _inputOnGrid(u['alpha_34'], time)
+
     # --- Time Integration of states
     if method=='continuous':
         sol = solve_ivp(lambda t,x: dynstall_mhh_dxdt(t,x,u,p), t_span=[time[0],time[-1]], y0=x0, t_eval=time)
         y = sol.y
     elif method=='discrete':
-        y  = np.zeros((8,len(time)))
-        xd = np.zeros(8)
-        xd[:4] = x0
-        xd[4]  = u['alpha_34'](time[0])
-        xd[5]  = 0    # Cl_p
-        xd[6]  = 1.0  # fp
-        xd[7]  = u['U'](time[0])  # U
-        y[:,0] = xd
-        for it,t in enumerate(time[1:]):
-            dt = t - time[it] # Note: time[it] is in fact t-dt
-            xd = dynstall_mhh_update_discr(t, dt, xd, u, p)
-            y[:,it+1] = xd
+        y = _dynstall_mhh_discrete(time, U[:,None], omega[:,None], alpha_34[:,None], [p], [x0])[:,:,0]
     else:
         raise NotImplementedError('Method: {}'.format(method))
 
     # --- Compute outputs
-    df=pd.DataFrame()
-    #print('>>> HACK time 0.002')
-    df['Time_[s]'] = time
-    df[prefix + 'Vrel_[m/s]']     = np.zeros(len(time))
-    df[prefix + 'alpha_34_[deg]'] = np.zeros(len(time))
-    df[prefix + 'Cl_[-]']         = np.zeros(len(time))
-    df[prefix + 'Cd_[-]']         = np.zeros(len(time))
-    df[prefix + 'Cm_[-]']         = np.zeros(len(time))
-    df[prefix + 'Tu_[-]']         = np.zeros(len(time))
-    df[prefix + 'alphaE_[deg]']   = np.zeros(len(time))
-    df[prefix + 'alphaF_[deg]']   = np.zeros(len(time))
-    df[prefix + 'Clp_[-]']   = np.zeros(len(time))
-    df[prefix + 'fs_aE_[-]']   = np.zeros(len(time))
-    df[prefix + 'fs_aF_[-]']   = np.zeros(len(time))
-    df['torsrate']  = np.zeros(len(time))
-    df['alpha_34']  = np.zeros(len(time))
-    df['U']  = np.zeros(len(time))
-    df['T_0']  = np.zeros(len(time))
-    df['x1'] = y[0,:]
-    df['x2'] = y[1,:]
-    df['x3'] = y[2,:]
-    df['x4'] = y[3,:]
-    df['alphaE']   = np.zeros(len(time))
-    df['alphaF']   = np.zeros(len(time))
-    df['ClP']   = np.zeros(len(time))
-    for it,t in enumerate(time):
-        Cl, Cd, Cm, alphaE, Tu, fs_aE, Cl_fs, alpha_34, omega, U, alphaF, Clp, fs_aF = dynstall_mhh_outputs(t, y[:,it], u, p, calcOutput=True)
-        df.loc[it,prefix + 'Vrel_[m/s]']     = U
-        df.loc[it,prefix + 'alpha_34_[deg]'] = alpha_34*180/np.pi
-        df.loc[it,prefix + 'Cl_[-]']         = Cl
-        df.loc[it,prefix + 'Cd_[-]']         = Cd
-        df.loc[it,prefix + 'Cm_[-]']         = Cm
-        df.loc[it,prefix + 'Tu_[-]']         = Tu
-        df.loc[it,prefix + 'alphaE_[deg]']   = alphaE*180/np.pi
-        df.loc[it,prefix + 'alphaF_[deg]']   = alphaF*180/np.pi
-        df.loc[it,prefix + 'omega_[deg/s]']  = omega*180/np.pi
-        df.loc[it,prefix + 'Clp_[-]']   = Clp
-        df.loc[it,prefix + 'fs_aF_[-]'] = fs_aF
-        df.loc[it,prefix + 'fs_aE_[-]'] = fs_aE
-        df.loc[it,'U']        = U
-        df.loc[it,'alpha_34'] = alpha_34 
-        df.loc[it,'T_0']      = Tu
-        df.loc[it,'torsrate'] = omega
-        df.loc[it,'alphaE']   = alphaE
-        df.loc[it,'ClP']      = Clp
-        df.loc[it,'alphaF']   = alphaF
-    df[prefix + 'x1_[rad]'] = y[0,:]
-    df[prefix + 'x2_[rad]'] = y[1,:]
-    df[prefix + 'x3_[-]']   = y[2,:]
-    df[prefix + 'x4_[-]']   = y[3,:]
-    return df
+    return pd.DataFrame(_dynstall_mhh_outputs_dict(time, y, U, omega, alpha_34, p, prefix=prefix, legacy=True))
+
+
+def dynstall_mhh_sim_batch(time, u, p, x0=None, prefix=None):
+    """ Simulate several nodes/airfoils at once using the discrete MHH/HGM dynamic stall model
+    The inputs are evaluated on the time grid once, the time loop is vectorized over the nodes
+    (and compiled with numba if available) and the dataframe is created once at the end.
+
+    INPUTS:
+     - time: time vector (nt)
+     - u: dictionary of inputs 'U', 'omega', 'alpha_34'. Each input is either a function of time
+          (as for `dynstall_mhh_sim`), or an array of shape (nt) or (nt x n), where n is the number of nodes
+     - p: dictionary of parameters (see `dynstall_mhh_param_from_polar`), or list of n dictionaries
+     - x0: initial conditions for the 4 states (4 or 4 x n). If None, the steady values are used
+     - prefix: list of n prefixes used for the channel names. Default: '' for one node, 'N001', 'N002', etc. otherwise
+               Use 'AB1N001' to match OpenFAST.
+    OUTPUTS:
+     - df: dataframe with time and the outputs of all the nodes (see `dynstall_mhh_sim`)
+    """
+    time = np.asarray(time)
+    nt = len(time)
+    # --- Inputs on the time grid, shape nt x n
+    U        = _inputOnGrid(u['U']       , time)
+    omega    = _inputOnGrid(u['omega']   , time)
+    alpha_34 = _inputOnGrid(u['alpha_34'], time)
+    n = max([1] + [len(p) if isinstance(p, (list,tuple)) else 1] + [v.shape[1] for v in (U, omega, alpha_34) if v.ndim==2])
+    U, omega, alpha_34 = [np.broadcast_to(v.reshape(nt,-1), (nt,n)) for v in (U, omega, alpha_34)]
+    P = list(p) if isinstance(p, (list,tuple)) else [p]*n
+    if len(P)!=n:
+        raise Exception('Number of parameter dictionaries ({}) inconsistent with number of nodes ({})'.format(len(P), n))
+    prefix = _prefixes(prefix, n)
+    # --- Initial conditions
+    if x0 is None:
+        X0 = [dynstall_mhh_steady_simple(U[0,k], alpha_34[0,k], P[k]) for k in range(n)]
+    else:
+        x0 = np.asarray(x0, dtype=float)
+        X0 = [x0[:,k] if x0.ndim==2 else x0 for k in range(n)]
+    # --- Time integration
+    y = _dynstall_mhh_discrete(time, U, omega, alpha_34, P, X0)
+    # --- Outputs
+    d = {'Time_[s]': time}
+    for k in range(n):
+        d.update(_dynstall_mhh_outputs_dict(time, y[:,:,k], U[:,k], omega[:,k], alpha_34[:,k], P[k], prefix=prefix[k], legacy=False))
+    return pd.DataFrame(d)
+
+
+def _inputOnGrid(f, time):
+    """ Evaluate an input on the time grid, if it's a function. Returns an array of float (nt or nt x n) """
+    if not callable(f):
+        return np.asarray(f, dtype=float)
+    try:
+        v = np.asarray(f(time), dtype=float)
+        if v.shape[0]==len(time):
+            return v
+    except:
+        pass
+    # Functions that only accept scalars
+    return np.array([f(t) for t in time], dtype=float)
+
+
+def _dynstall_mhh_outputs_dict(time, y, U, omega, alpha_34, p, prefix='', legacy=False):
+    """ Outputs of the MHH model for all time steps, returned as a dictionary of channels
+    INPUTS:
+     - y: states (at least 4 x nt)
+     - U, omega, alpha_34: inputs on the time grid (nt)
+     - legacy: if True, add the channels without units and prefix (e.g. 'U', 'x1') as done by `dynstall_mhh_sim`
+    """
+    Cl, Cd, Cm, alphaE, Tu, fs_aE, Cl_fs, alpha_34, omega, U, alphaF, Clp, fs_aF = dynstall_mhh_outputs_simple(time, y, U, 0, omega, alpha_34, p, calcOutput=True)
+    d = dict()
+    if legacy:
+        d['Time_[s]'] = time
+    d[prefix + 'Vrel_[m/s]']     = U
+    d[prefix + 'alpha_34_[deg]'] = alpha_34*180/np.pi
+    d[prefix + 'Cl_[-]']         = Cl
+    d[prefix + 'Cd_[-]']         = Cd
+    d[prefix + 'Cm_[-]']         = Cm
+    d[prefix + 'Tu_[-]']         = Tu
+    d[prefix + 'alphaE_[deg]']   = alphaE*180/np.pi
+    d[prefix + 'alphaF_[deg]']   = alphaF*180/np.pi
+    d[prefix + 'Clp_[-]']        = Clp
+    d[prefix + 'fs_aE_[-]']      = fs_aE
+    d[prefix + 'fs_aF_[-]']      = fs_aF
+    if legacy:
+        d['torsrate'] = omega
+        d['alpha_34'] = alpha_34
+        d['U']        = U
+        d['T_0']      = Tu
+        d['x1']       = y[0,:]
+        d['x2']       = y[1,:]
+        d['x3']       = y[2,:]
+        d['x4']       = y[3,:]
+        d['alphaE']   = alphaE
+        d['alphaF']   = alphaF
+        d['ClP']      = Clp
+    d[prefix + 'omega_[deg/s]'] = omega*180/np.pi
+    d[prefix + 'x1_[rad]'] = y[0,:]
+    d[prefix + 'x2_[rad]'] = y[1,:]
+    d[prefix + 'x3_[-]']   = y[2,:]
+    d[prefix + 'x4_[-]']   = y[3,:]
+    # Scalar outputs (e.g. constant Cm) are expanded to the time grid
+    for k,v in d.items():
+        d[k] = np.broadcast_to(v, time.shape)
+    return d
+
+
+def _dynstall_mhh_discrete(time, U, omega, alpha_34, P, X0):
+    """ Time integration of the discrete MHH model for n nodes, see `dynstall_mhh_update_discr`
+    INPUTS:
+     - U, omega, alpha_34: inputs on the time grid (nt x n)
+     - P: list of n parameter dictionaries. The formulation flags must be the same for all nodes.
+     - X0: list of n initial states (4)
+    OUTPUTS:
+     - x: states (4 x nt x n)
+    """
+    nt, n = U.shape
+    pp = lambda key: np.array([pk[key] for pk in P], dtype=float)
+    alpha0, Cla, c = pp('alpha0'), pp('Cla'), pp('chord')
+    A1, A2, b1, b2 = pp('A1'), pp('A2'), pp('b1'), pp('b2')
+    Tp0, Tf0       = pp('Tp0'), pp('Tf0')
+    flags = {}
+    for k in ['scale_x1_x2', 'U_in_x1x2', 'alpha0_in_x1x2']:
+        v = [bool(pk[k]) for pk in P]
+        if any([vk!=v[0] for vk in v]):
+            raise Exception('Flag `{}` must be the same for all nodes, got: {}'.format(k, v))
+        flags[k] = v[0]
+    scale_x1_x2, U_in_x1x2, alpha0_in_x1x2 = flags['scale_x1_x2'], flags['U_in_x1x2'], flags['alpha0_in_x1x2']
+    # Variables derived from inputs, for all time steps
+    U  = np.maximum(U, 0.01)
+    Tu = np.maximum(c/(2*U), 1e-4)                                     # Eq. 23
+    dt = np.diff(time)[:,None]
+    eps = 1e-4
+    expClip = lambda T: np.exp(np.clip(-dt/T[1:], np.log(eps), 0))  # (nt-1 x n)
+    e1, e2, e3, e4 = expClip(Tu/b1), expClip(Tu/b2), expClip(Tp0*Tu), expClip(Tf0*Tu)
+    x = np.zeros((4, nt, n))
+    x[:,0,:] = np.asarray(X0, dtype=float).T
+
+    if scale_x1_x2:
+        # x1 and x2 depend on x4, all states are integrated together
+        alphaTab, FstTab = _tabulate([pk['F_st'] for pk in P])
+        _mhh_scaled_loop(x, U, np.ascontiguousarray(omega, dtype=float), np.ascontiguousarray(alpha_34, dtype=float), Tu, dt[:,0],
+                         e1, e2, e3, e4, alpha0, Cla, A1, A2, b1, b2, alphaTab, FstTab.ravel())
+        return x
+
+    # Otherwise, each state only depends on the previous ones: four linear recurrences
+    alphaQS = alpha_34 if alpha0_in_x1x2 else alpha_34 - alpha0
+    alphaQS_mid = 0.5*(alphaQS[:-1]+alphaQS[1:])
+    if U_in_x1x2:
+        alphaQS_mid = alphaQS_mid*U[1:]
+    _linear_recurrence(x[0], e1, alphaQS_mid*A1*(1-e1))
+    _linear_recurrence(x[1], e2, alphaQS_mid*A2*(1-e2))
+    # Effective angle of attack
+    if U_in_x1x2:
+        alphaE = alphaQS*(1-A1-A2) + (x[0]+x[1])/U
+    else:
+        alphaE = alphaQS*(1-A1-A2) + (x[0]+x[1])
+    if not alpha0_in_x1x2:
+        alphaE += alpha0
+    Cl_p    = Cla*(alphaE-alpha0) + np.pi*Tu*omega
+    Cl_p[0] = 0 # Initial value of the discrete state Cl_p
+    _linear_recurrence(x[2], e3, 0.5*(Cl_p[:-1]+Cl_p[1:])*(1-e3))
+    alphaF  = x[2]/Cla + alpha0
+    fs_aF   = np.column_stack([np.asarray(P[k]['F_st'](alphaF[:,k]), dtype=float)*np.ones(nt) for k in range(n)]) # p. 13
+    fs_aF[0]= 1 # Initial value of the discrete state fp
+    _linear_recurrence(x[3], e4, 0.5*(fs_aF[:-1]+fs_aF[1:])*(1-e4))
+    return x
+
+
+def _linear_recurrence(y, a, b):
+    """ y[i] = a[i-1] y[i-1] + b[i-1], for i=1..nt-1, for each column
+    y: (nt x n) with y[0] initialized, filled on exit; a, b: (nt-1 x n)
+    """
+    a = np.ascontiguousarray(a, dtype=float)
+    b = np.ascontiguousarray(b, dtype=float)
+    if HAS_NUMBA or y.shape[1]>8:
+        _linear_recurrence_loop(y, a, b)
+    else:
+        # Few columns, without numba: loops on python floats are faster than on small arrays
+        for k in range(y.shape[1]):
+            yk, ak, bk = [y[0,k]], a[:,k].tolist(), b[:,k].tolist()
+            yi = yk[0]
+            for ai, bi in zip(ak, bk):
+                yi = ai*yi + bi
+                yk.append(yi)
+            y[:,k] = yk
+
+
+@_jit
+def _linear_recurrence_loop(y, a, b):
+    """ y[i] = a[i-1] y[i-1] + b[i-1], vectorized over the columns """
+    for i in range(1, y.shape[0]):
+        y[i] = a[i-1]*y[i-1] + b[i-1]
+
+
+@_jit
+def _mhh_scaled_loop(x, U, omega, alpha_34, Tu, dt, e1, e2, e3, e4, alpha0, Cla, A1, A2, b1, b2, alphaTab, FstTab):
+    """ Time loop of the discrete MHH model with `scale_x1_x2`, vectorized over the n nodes. See `dynstall_mhh_update_discr`.
+    x: states (4 x nt x n), initialized at the first time step, filled on exit
+    U, omega, alpha_34, Tu: (nt x n);  e1..e4: (nt-1 x n); dt: (nt-1); alpha0..b2: (n) 
+    FstTab: flattened table (n x len(alphaTab)) of steady separation function
+    """
+    Cl_p_old  = np.zeros(x.shape[2])  # Cl_p
+    fs_aF_old = np.ones(x.shape[2])   # fp
+    for it in range(1, x.shape[1]):
+        x4_old = x[3,it-1]
+        dAU    = alpha_34[it]*U[it] - alpha_34[it-1]*U[it-1]
+        x1     = x[0,it-1]*e1[it-1] + dAU * A1/b1*Tu[it]/dt[it-1]*(1-e1[it-1]) * x4_old
+        x2     = x[1,it-1]*e2[it-1] + dAU * A2/b2*Tu[it]/dt[it-1]*(1-e2[it-1]) * x4_old
+        alphaE = alpha_34[it] - (x1+x2)/U[it]
+        Cl_p   = Cla*(alphaE-alpha0) + np.pi*Tu[it]*omega[it]
+        x3     = x[2,it-1]*e3[it-1] + 0.5*(Cl_p_old+Cl_p)*(1-e3[it-1])
+        fs_aF  = _interpTab(x3/Cla + alpha0, alphaTab, FstTab)        # p. 13
+        x[0,it] = x1
+        x[1,it] = x2
+        x[2,it] = x3
+        x[3,it] = x4_old*e4[it-1] + 0.5*(fs_aF_old + fs_aF)*(1-e4[it-1])
+        Cl_p_old  = Cl_p
+        fs_aF_old = fs_aF
+
+
+@_jit
+def _interpTab(x, xTab, yTab):
+    """ Linear interpolation of each x[k] in the table yTab[k,:] (flattened), with a common abscissa xTab.
+    Values outside of the table are clamped, as done by np.interp """
+    nTab = len(xTab)
+    x  = np.minimum(np.maximum(x, xTab[0]), xTab[-1])
+    i  = np.minimum(np.maximum(np.searchsorted(xTab, x), 1), nTab-1)
+    w  = (x - xTab[i-1])/(xTab[i]-xTab[i-1])
+    i0 = np.arange(len(x))*nTab + i
+    return yTab[i0-1]*(1-w) + yTab[i0]*w
+
+
+def _tabulate(funcs, nDefault=3601):
+    """ Tabulate functions of the angle of attack on a common abscissa
+    If the functions are methods of a Polar, the union of the polar angles of attack is used, 
+    which makes the table exact for the linear interpolants of the polar. 
+    Otherwise a regular grid over [-pi, pi] is used.
+    OUTPUTS:
+      - alphaTab: common abscissa (nTab)
+      - tab: values (n x nTab)
+    """
+    alphas = [getattr(getattr(f, '__self__', None), 'alpha', None) for f in funcs]
+    if all([a is not None for a in alphas]):
+        alphaTab = np.unique(np.concatenate([np.asarray(a, dtype=float) for a in alphas]))
+    else:
+        alphaTab = np.linspace(-np.pi, np.pi, nDefault)
+    if len(alphaTab)==1:
+        alphaTab = np.array([alphaTab[0], alphaTab[0]+1])
+    tab = np.array([np.asarray(f(alphaTab), dtype=float)*np.ones(len(alphaTab)) for f in funcs])
+    return alphaTab, tab
 
 
 def dynstall_mhh_param_from_polar(P, chord, Tf0=6.0, Tp0=1.5, A1=A1_Jones, A2=A2_Jones, b1=b1_Jones, b2=b2_Jones, constants='Jones', p=None):
@@ -291,7 +494,7 @@ def dynstall_mhh_update_discr(t, dt, xd_old, u, p):
     exp_val2=np.exp( np.clip(-dt/T2, np.log(eps), 0 ))
     exp_val3=np.exp( np.clip(-dt/Tp, np.log(eps), 0 ))
     exp_val4=np.exp( np.clip(-dt/Tf, np.log(eps), 0 ))
-    if ['scale_x1_x2']:
+    if p['scale_x1_x2']:
         xd[0] = x1_old*exp_val1 + (alpha_34*U-alpha_34_old*U_old) * A1/b1*Tu/dt*(1-exp_val1) * x4_old
         xd[1] = x2_old*exp_val2 + (alpha_34*U-alpha_34_old*U_old) * A2/b2*Tu/dt*(1-exp_val2) * x4_old
         # x1_ = x1_old*exp      + (alpha*U   -alpha_old*U_old  )   *A1/b1*Tu/dt*(1-exp)*x4
@@ -304,7 +507,7 @@ def dynstall_mhh_update_discr(t, dt, xd_old, u, p):
             xd[0] = x1_old*exp_val1 + 0.5*(alphaQS_old+alphaQS) * A1*(1-exp_val1)
             xd[1] = x2_old*exp_val2 + 0.5*(alphaQS_old+alphaQS) * A2*(1-exp_val2)
     # Effective angle of attack
-    if ['scale_x1_x2']:
+    if p['scale_x1_x2']:
         alphaE = alpha_34 - (xd[0]+xd[1])/U
     else:
         if p['U_in_x1x2']:
@@ -396,9 +599,9 @@ def dynstall_mhh_outputs_simple(t, x, U, U_dot, omega, alpha_34, p, calcOutput=F
 
     #Cd0 = fCd(alpha0)
     #a_st = ??
-    # Variables derived from inputs
-    U  = max(U, 0.01)
-    Tu = max(c/(2*U), 1e-4)                                     # Eq. 23
+    # Variables derived from inputs (scalars, or arrays of time steps)
+    U  = np.maximum(U, 0.01)
+    Tu = np.maximum(c/(2*U), 1e-4)                                     # Eq. 23
 
     # Variables derived from states
     if p['scale_x1_x2']:
@@ -428,7 +631,7 @@ def dynstall_mhh_outputs_simple(t, x, U, U_dot, omega, alpha_34, p, calcOutput=F
     #ast_faE = (fCm(fs_aE) - fCm(alpha0))/Cl(fs_aE)
     #DeltaCmfpp = (fa_st(x4) - fa_st(fs_aE))
     DeltaCmfpp = 0 # <<<<<<<<<TODO
-    Cl_att_e = max(min(Cla * (alphaE-alpha0),5), -5) # Clip between -5 and 5
+    Cl_att_e = np.clip(Cla * (alphaE-alpha0), -5, 5) # Clip between -5 and 5
     if p['old_ClCd_dyn']:
         #Cd_ind  = (alpha_34-alphaE)*Cl_dyn  # <<< TODO alpha_34 or alpha_ac
         #Cd_tors =  0                        # Old
@@ -478,6 +681,8 @@ def dynstall_oye_param_from_polar(P,tau=None,tau_chord=None, p=None):
     p['F_st']  = P.fs_interp
     p['Clinv'] = P.cl_inv_interp
     p['Clfs']  = P.cl_fs_interp
+    p['Cd']    = P.cd_interp
+    p['Cm']    = P.cm_interp
     return p
 
 def dynstall_oye_dxdt(t,fs,u,p):
@@ -504,3 +709,53 @@ def dynstall_oye_output(t,fs,u,p):
 def dynstall_oye_output_simple(fs, Clfs, Clinv, Cl_qs, Cd_qs, Cm_qs):
     Cl      = fs*Clinv+(1-fs)*Clfs               
     return Cl, Cd_qs, Cm_qs
+
+def dynstall_oye_sim(time, u, p, fs0=None, prefix=None):
+    """ Simulate one or several nodes/airfoils using Oye's dynamic stall model, 
+    d(fs)/dt = 1/tau (fs_st(alpha) - fs), integrated exactly with fs_st taken as its mean over each time step.
+
+    INPUTS:
+     - time: time vector (nt)
+     - u: dictionary with the input 'alpha': function of time, or array of shape (nt) or (nt x n), where n is the number of nodes
+     - p: dictionary of parameters (see `dynstall_oye_param_from_polar`), or list of n dictionaries
+     - fs0: initial separation function (scalar or n). If None, the steady value is used
+     - prefix: list of n prefixes used for the channel names. Default: '' for one node, 'N001', 'N002', etc. otherwise
+    OUTPUTS:
+     - df: dataframe with time, and for each node: alpha, fs, Cl (and Cd, Cm if present in p)
+    """
+    time = np.asarray(time)
+    nt = len(time)
+    alpha = _inputOnGrid(u['alpha'], time)
+    n = max(len(p) if isinstance(p, (list,tuple)) else 1, alpha.shape[1] if alpha.ndim==2 else 1)
+    alpha = np.broadcast_to(alpha.reshape(nt,-1), (nt,n))
+    P = list(p) if isinstance(p, (list,tuple)) else [p]*n
+    prefix = _prefixes(prefix, n)
+    # Steady separation function on the time grid
+    fs_st = np.column_stack([np.asarray(P[k]['F_st'](alpha[:,k]), dtype=float)*np.ones(nt) for k in range(n)])
+    # fs(t+dt) = fs(t) e + (1-e) * (fs_st(t)+fs_st(t+dt))/2, with e=exp(-dt/tau)
+    tau = np.array([pk['tau'] for pk in P], dtype=float)
+    e   = np.exp(-np.diff(time)[:,None]/tau)
+    fs  = np.zeros((nt, n))
+    fs[0] = fs_st[0] if fs0 is None else fs0
+    _linear_recurrence(fs, e, 0.5*(fs_st[:-1]+fs_st[1:])*(1-e))
+    # Outputs
+    d = {'Time_[s]': time}
+    for k in range(n):
+        a = alpha[:,k]
+        d[prefix[k] + 'alpha_[deg]'] = a*180/np.pi
+        d[prefix[k] + 'fs_[-]']      = fs[:,k]
+        d[prefix[k] + 'Cl_[-]']      = fs[:,k]*P[k]['Clinv'](a) + (1-fs[:,k])*P[k]['Clfs'](a)
+        if 'Cd' in P[k]:
+            d[prefix[k] + 'Cd_[-]']  = P[k]['Cd'](a)
+        if 'Cm' in P[k]:
+            d[prefix[k] + 'Cm_[-]']  = P[k]['Cm'](a)
+    return pd.DataFrame(d)
+
+
+def _prefixes(prefix, n):
+    """ Channel prefixes for n nodes """
+    if prefix is None:
+        return [''] if n==1 else ['N{:03d}'.format(k+1) for k in range(n)]
+    elif isinstance(prefix, str):
+        return [prefix] if n==1 else [prefix+'{:03d}'.format(k+1) for k in range(n)]
+    return list(prefix)
@@ -0,0 +1,82 @@
+import unittest
+import numpy as np
+import os
+MyDir=os.path.dirname(__file__)
+from openfast_toolbox.airfoils.Polar import Polar
+from openfast_toolbox.airfoils.DynamicStall import *
+
+# --------------------------------------------------------------------------------}
+# ---
+# --------------------------------------------------------------------------------{
+class TestDynamicStall(unittest.TestCase):
+    def setUp(self):
+        self.P = Polar(os.path.join(MyDir,'../data/FFA-W3-241-Re12M.dat'), radians=True, compute_params=True)
+        alpha = lambda t: 10*np.pi/180 + 8*np.pi/180*np.sin(2*np.pi*t)
+        self.u = {'U': lambda t: 10+t/10, 'U_dot': lambda t: 0*t+0.1, 'alpha_34': alpha, 'alpha': alpha,
+                  'omega': lambda t: 8*np.pi/180*2*np.pi*np.cos(2*np.pi*t)}
+        self.time = np.linspace(0, 5, 1001)
+
+    def mhh_discrete_reference(self, p):
+        """ Step by step integration using dynstall_mhh_update_discr """
+        time, u = self.time, self.u
+        y  = np.zeros((8,len(time)))
+        xd = np.zeros(8)
+        xd[:4] = dynstall_mhh_steady(0,u,p)
+        xd[4]  = u['alpha_34'](time[0])
+        xd[6]  = 1.0
+        xd[7]  = u['U'](time[0])
+        y[:,0] = xd
+        for it,t in enumerate(time[1:]):
+            xd = dynstall_mhh_update_discr(t, t-time[it], xd, u, p)
+            y[:,it+1] = xd
+        return y
+
+    def test_mhh_discrete(self):
+        p = dynstall_mhh_param_from_polar(self.P, 0.5, constants='OpenFAST')
+        for flags in [{}, {'scale_x1_x2':True}, {'U_in_x1x2':True}, {'alpha0_in_x1x2':False}]:
+            q = dict(p)
+            q.update(flags)
+            y  = self.mhh_discrete_reference(q)
+            df = dynstall_mhh_sim(self.time, self.u, q, method='discrete')
+            np.testing.assert_allclose(df[['x1','x2','x3','x4']].values.T, y[:4], rtol=1e-10, atol=1e-12)
+        # Outputs are consistent with the continuous formulation
+        dfc = dynstall_mhh_sim(self.time, self.u, p, method='continuous')
+        np.testing.assert_allclose(df['Cl_[-]'], dfc['Cl_[-]'], atol=2e-2)
+        self.assertEqual(list(df.columns[:4]), ['Time_[s]', 'Vrel_[m/s]', 'alpha_34_[deg]', 'Cl_[-]'])
+
+    def test_mhh_batch(self):
+        p1 = dynstall_mhh_param_from_polar(self.P, 0.5, constants='OpenFAST')
+        p2 = dynstall_mhh_param_from_polar(self.P, 1.5, constants='OpenFAST')
+        t  = self.time
+        # Inputs as arrays, one column per node
+        u = {'U': self.u['U'](t), 'omega': np.column_stack((self.u['omega'](t), 0*t)), 'alpha_34': self.u['alpha_34'](t)}
+        df = dynstall_mhh_sim_batch(t, u, [p1, p2], prefix=['AB1N001', 'AB1N002'])
+        self.assertEqual(df.shape[0], len(t))
+        ref1 = dynstall_mhh_sim(t, self.u, p1, method='discrete')
+        np.testing.assert_allclose(df['AB1N001Cl_[-]'], ref1['Cl_[-]'], rtol=1e-12)
+        np.testing.assert_allclose(df['AB1N001x4_[-]'], ref1['x4'], rtol=1e-12)
+        u2 = dict(self.u)
+        u2['omega'] = lambda t: 0*t
+        ref2 = dynstall_mhh_sim_batch(t, u2, p2)
+        np.testing.assert_allclose(df['AB1N002Cd_[-]'], ref2['Cd_[-]'], rtol=1e-12)
+        # Formulation flags differing between nodes
+        p3 = dict(p2)
+        p3['U_in_x1x2'] = not p2['U_in_x1x2']
+        with self.assertRaises(Exception):
+            dynstall_mhh_sim_batch(t, u, [p1, p3])
+
+    def test_oye(self):
+        from scipy.integrate import solve_ivp
+        p = dynstall_oye_param_from_polar(self.P, tau_chord=0.5/10)
+        df = dynstall_oye_sim(self.time, self.u, p)
+        fs0 = dynstall_oye_steady(self.u['alpha'](0), p)
+        sol = solve_ivp(lambda t,x: dynstall_oye_dxdt(t,x,self.u,p), [0, self.time[-1]], [fs0], t_eval=self.time, rtol=1e-8, atol=1e-10, max_step=0.005)
+        np.testing.assert_allclose(df['fs_[-]'], sol.y[0], atol=1e-4)
+        np.testing.assert_allclose(df['Cl_[-]'], [dynstall_oye_output(t, fs, self.u, p) for t, fs in zip(self.time, df['fs_[-]'])], rtol=1e-12)
+        # Batch of two time constants
+        df2 = dynstall_oye_sim(self.time, self.u, [p, dynstall_oye_param_from_polar(self.P, tau=1)])
+        np.testing.assert_allclose(df2['N001fs_[-]'], df['fs_[-]'], rtol=1e-12)
+        self.assertTrue(np.std(df2['N002fs_[-]'])<np.std(df2['N001fs_[-]']))
+
+if __name__ == '__main__':
+    unittest.main()
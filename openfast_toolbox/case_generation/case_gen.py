@@ -79,7 +79,12 @@ def copyTree(src, dst):
                 forceMergeFlatDir(s, d)
 
 
-def templateReplaceGeneral(PARAMS, templateDir=None, outputDir=None, main_file=None, removeAllowed=False, removeRefSubFiles=False, oneSimPerDir=False, dryRun=False):
+def _writeInputFiles(Files):
+    """ Write a list of input files, see templateReplaceGeneral """
+    for f in Files:
+        f.write()
+
+def templateReplaceGeneral(PARAMS, templateDir=None, outputDir=None, main_file=None, removeAllowed=False, removeRefSubFiles=False, oneSimPerDir=False, dryRun=False, nWorkers=1, returnPlan=False):
 
     """ Generate inputs files by replacing different parameters from a template file.
     The generated files are placed in the output directory `outputDir` 
@@ -89,6 +94,9 @@ def templateReplaceGeneral(PARAMS, templateDir=None, outputDir=None, main_file=N
     in the template file to generate one input file.
 
     For "FAST" input files, parameters can be changed recursively.
+
+    Each template file is parsed only once. The files of each parameter set are clones 
+    of the parsed templates (see FASTInputFile.clone), which are then written to disk.
     
 
     INPUTS:
@@ -101,6 +109,22 @@ def templateReplaceGeneral(PARAMS, templateDir=None, outputDir=None, main_file=N
                       before doing the parametric substitution
 
       outputDir  : directory where files will be generated. 
+
+      dryRun     : if True, nothing is copied or written, the template files are only read.
+                   The list of main files that would be written is returned.
+
+      returnPlan : if True, the "file plan" is returned instead of the list of main files: 
+                   a list with, for each parameter set, a dictionary with keys:
+                     'name'    : the `__name__` of the parameter set
+                     'workDir' : the directory of the simulation
+                     'main'    : the main file written (or that would be written if `dryRun`)
+                     'files'   : list of (template file, new file) written
+
+      nWorkers   : number of processes used to write the files (ProcessPoolExecutor).
+                   Default: 1 (files are written sequentially in the current process)
+
+    OUTPUTS:
+      files: list of main files generated (or the file plan if `returnPlan` is True)
     """
     # --- Helper functions
     def rebase_rel(wd,s,sid):
@@ -126,6 +150,20 @@ def templateReplaceGeneral(PARAMS, templateDir=None, outputDir=None, main_file=N
             new_filename      = os.path.relpath(new_filename_full,workDir).replace('\\','/')
             return new_filename, new_filename_full
 
+    Templates = {} # Parsed template files
+    def getTemplate(templatefilename_full, wd):
+        """ Return the parsed template file, read only once.
+        Templates within the simulation directory `wd` are read from `templateDir`, 
+        since the content of `wd` is a copy of `templateDir` (and does not exist for a dry run)"""
+        rel = os.path.relpath(templatefilename_full, wd)
+        if templateDir is not None and not rel.startswith('..'):
+            srcfilename = os.path.normpath(os.path.join(templateDir, rel))
+        else:
+            srcfilename = os.path.normpath(templatefilename_full)
+        if srcfilename not in Templates:
+            Templates[srcfilename] = fi.FASTInputFile(srcfilename)
+        return Templates[srcfilename]
+
     def replaceRecurse(templatename_or_newname, FileKey, ParamKey, ParamValue, Files, strID, workDir, TemplateFiles):
         """ 
         FileKey: a single key defining which file we are currently modifying e.g. :'AeroFile', 'EDFile','FVWInputFileName'
@@ -154,20 +192,11 @@ def templateReplaceGeneral(PARAMS, templateDir=None, outputDir=None, main_file=N
                 ext = os.path.splitext(templatefilename)[-1]
                 newfilename_full = os.path.join(wd,strID+ext)
                 newfilename      = strID+ext
-                if dryRun:
-                    newfilename = os.path.join(workDir, newfilename)
-                    obj=type('DummyClass', (object,), {'filename':newfilename})
-                    return newfilename, {'Root':obj}
             else:
                 newfilename, newfilename_full = rebaseFileName(templatefilename, workDir, strID)
-            #print('--------------------------------------------------------------')
-            #print('TemplateFile    :', templatefilename)
-            #print('TemplateFileFull:', templatefilename_full)
-            #print('NewFile         :', newfilename)
-            #print('NewFileFull     :', newfilename_full)
-            shutil.copyfile(templatefilename_full, newfilename_full)
-            f= fi.FASTInputFile(newfilename_full) # open the template file for that filekey 
+            f = getTemplate(templatefilename_full, wd).clone(newfilename_full) # copy of the template file for that filekey 
             Files[FileKey]=f # store it
+            Plan.append((templatefilename_full, newfilename_full))
 
         # --- Changing parameters in that file
         NewFileKey_or_Key, ChildrenKeys = splitAddress(ParamKey)
@@ -180,7 +209,7 @@ def templateReplaceGeneral(PARAMS, templateDir=None, outputDir=None, main_file=N
                     if len(ParamValue[0])==0:
                         f[Key] = ParamValue # We replace
                     else:
-                        OutList=f[Key]
+                        OutList=list(f[Key]) # NOTE: copy, the list is shared with the template
                         f[Key] = addToOutlist(OutList, ParamValue) # we insert
             else:
                 f[Key] = ParamValue
@@ -233,6 +262,8 @@ def templateReplaceGeneral(PARAMS, templateDir=None, outputDir=None, main_file=N
     # --- Creating outputDir - Copying template folder to outputDir if necessary
     # Copying template folder to workDir
     for wd in list(set(workDirS)):
+        if dryRun:
+            break
         if removeAllowed:
             removeFASTOuputs(wd)
         if os.path.exists(wd) and removeAllowed:
@@ -248,30 +279,51 @@ def templateReplaceGeneral(PARAMS, templateDir=None, outputDir=None, main_file=N
 
     TemplateFiles=[]
     files=[]
+    plans=[]
     nTot=len(PARAMS)
-    for ip,(wd,p) in enumerate(zip(workDirS,PARAMS)):
-        if np.mod(ip+1,1000)==0:
-            print('File {:d}/{:d}'.format(ip,nTot))
-        if '__index__' not in p.keys():
-            p['__index__']=ip
-
-        main_file_base = os.path.basename(main_file)
-        strID          = get_strID(p)
-        # --- Setting up files for this simulation
-        Files=dict()
-        for k,v in p.items():
-            if k =='__index__' or k=='__name__':
-                continue
-            new_mainFile, Files = replaceRecurse(main_file_base, '', k, v, Files, strID, wd, TemplateFiles)
+    pool = None
+    if nWorkers>1 and not dryRun:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=nWorkers)
+    futures = []
+    try:
+        for ip,(wd,p) in enumerate(zip(workDirS,PARAMS)):
+            if np.mod(ip+1,1000)==0:
+                print('File {:d}/{:d}'.format(ip,nTot))
+            if '__index__' not in p.keys():
+                p['__index__']=ip
+
+            main_file_base = os.path.basename(main_file)
+            strID          = get_strID(p)
+            # --- Setting up files for this simulation
+            Files=dict()
+            Plan=[]
+            for k,v in p.items():
+                if k =='__index__' or k=='__name__':
+                    continue
+                new_mainFile, Files = replaceRecurse(main_file_base, '', k, v, Files, strID, wd, TemplateFiles)
+            if 'Root' in Files.keys():
+                files.append(Files['Root'].filename)
+            plans.append({'name':strID, 'workDir':wd, 'main':files[-1] if 'Root' in Files.keys() else None, 'files':Plan})
+
+            # --- Writting files
             if dryRun:
-                break
-
-        # --- Writting files
-        for k,f in Files.items():
-            if k=='Root':
-                files.append(f.filename)
-            if not dryRun:
-                f.write()
+                continue
+            if pool is None:
+                _writeInputFiles(list(Files.values()))
+            else:
+                futures.append(pool.submit(_writeInputFiles, list(Files.values())))
+                if len(futures)>=4*nWorkers:
+                    # Limiting the number of cases held in memory
+                    futures.pop(0).result()
+        for fut in futures:
+            fut.result()
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    if dryRun:
+        return plans if returnPlan else files
 
     # --- Remove extra files at the end
     if removeRefSubFiles:
@@ -285,11 +337,11 @@ def templateReplaceGeneral(PARAMS, templateDir=None, outputDir=None, main_file=N
             except:
                 print('[FAIL] Removing '+tf)
                 pass
-    return files
+    return plans if returnPlan else files
 
 # def templateReplace(PARAMS, *args, **kwargs):
 
-def templateReplace(PARAMS, templateDir, outputDir=None, main_file=None, removeAllowed=False, removeRefSubFiles=False, oneSimPerDir=False, dryRun=False):
+def templateReplace(PARAMS, templateDir, outputDir=None, main_file=None, removeAllowed=False, removeRefSubFiles=False, oneSimPerDir=False, dryRun=False, nWorkers=1, returnPlan=False):
 
     """ 
 
@@ -311,7 +363,7 @@ def templateReplace(PARAMS, templateDir, outputDir=None, main_file=None, removeA
 #     return templateReplaceGeneral(PARAMS, *args, **kwargs)
 
     return templateReplaceGeneral(PARAMS, templateDir, outputDir=outputDir, main_file=main_file, 
-            removeAllowed=removeAllowed, removeRefSubFiles=removeRefSubFiles, oneSimPerDir=oneSimPerDir, dryRun=dryRun)
+            removeAllowed=removeAllowed, removeRefSubFiles=removeRefSubFiles, oneSimPerDir=oneSimPerDir, dryRun=dryRun, nWorkers=nWorkers, returnPlan=returnPlan)
 
 
 def addToOutlist(OutList, Signals):
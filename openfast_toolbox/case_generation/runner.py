@@ -3,6 +3,7 @@ import os
 import sys
 import subprocess
 import multiprocessing
+import time
 
 import collections
 from contextlib import contextmanager
@@ -33,11 +34,29 @@ def safe_cd(newdir):
 # --- Tools for executing FAST
 # --------------------------------------------------------------------------------{
 # --- START cmd.py
-def run_cmds(inputfiles, exe, parallel=True, showOutputs=True, nCores=None, showCommand=True, flags=[], verbose=True): 
+def run_cmds(inputfiles, exe, parallel=True, showOutputs=True, nCores=None, showCommand=True, flags=[], verbose=True,
+        timeout=None, nRetries=0, cost=None, logFile=None, progress=False, pollInterval=0.05): 
     """ Run a set of simple commands of the form `exe input_file`
-    By default, the commands are run in "parallel" (though the method needs to be improved)
+    By default, the commands are run in parallel, using a rolling queue: a new command is
+    started as soon as one of the `nCores` slots is free.
     The stdout and stderr may be displayed on screen (`showOutputs`) or hidden. 
-    A better handling is yet required.
+
+    INPUTS:
+     - inputfiles: list of input files (or list of argument lists)
+     - exe: executable
+     - parallel: if False, the commands are run one after the other
+     - nCores: number of commands run simultaneously. Default: number of cpus. If <0: all at once
+     - flags: list of flags inserted between the executable and the input file
+     - timeout: maximum wall time (in seconds) of one command. Commands exceeding it are killed.
+     - nRetries: number of times a failed (or timed out) command is run again
+     - cost: list of expected costs (e.g. run times) of the commands, same length as inputfiles.
+             If provided, the most expensive commands are started first.
+     - logFile: if provided, a csv file where one line is appended every time a command ends
+                (see `readRunLog`)
+     - progress: if True, a progress line is printed every time a command ends
+    OUTPUTS:
+     - success: True if all commands succeeded
+     - Failed: list of failed processes (with attributes `input_file`, `cmd`, `returncode`, `status`)
     """
     Failed=[]
     def _report(p):
@@ -47,40 +66,70 @@ def run_cmds(inputfiles, exe, parallel=True, showOutputs=True, nCores=None, show
         else:
             Failed.append(p)
             if verbose:
-                print('[FAIL] Input    : ',p.input_file)
+                print('[{}] Input    : '.format('TIME' if p.status=='TIMEOUT' else 'FAIL'),p.input_file)
                 print('       Directory: '+os.getcwd())
                 print('       Command  : '+p.cmd)
                 print('       Use `showOutputs=True` to debug, or run the command above.')
-            #out, err = p.communicate()
-            #print('StdOut:\n'+out)
-            #print('StdErr:\n'+err)
-    ps=[]
-    iProcess=0
     if nCores is None:
         nCores=multiprocessing.cpu_count()
     if nCores<0:
         nCores=len(inputfiles)+1
-    for i,f in enumerate(inputfiles):
-        if len(flags)>0:
-            f=flags + [f]
-        #print('Process {}/{}: {}'.format(i+1,len(inputfiles),f))
-        ps.append(run_cmd(f, exe, wait=(not parallel), showOutputs=showOutputs, showCommand=showCommand))
-        iProcess += 1
-        # waiting once we've filled the number of cores
-        # TODO: smarter method with proper queue, here processes are run by chunks
-        if parallel:
-            if iProcess==nCores:
-                for p in ps:
+    if not parallel:
+        nCores=1
+    # --- Queue of jobs, longest expected first
+    order = list(range(len(inputfiles)))
+    if cost is not None:
+        if len(cost)!=len(inputfiles):
+            raise Exception('Length of `cost` ({}) should match the number of input files ({})'.format(len(cost), len(inputfiles)))
+        order = sorted(order, key=lambda i: -cost[i]) # stable sort
+    queue = collections.deque([(i,1) for i in order]) # (index, attempt)
+    nTot     = len(inputfiles)
+    nDone    = 0
+    running  = []
+    tStart   = time.time()
+    while len(queue)>0 or len(running)>0:
+        # --- Filling the free slots
+        while len(queue)>0 and len(running)<nCores:
+            i, attempt = queue.popleft()
+            f = inputfiles[i]
+            if len(flags)>0:
+                f=flags + [f]
+            p = run_cmd(f, exe, wait=False, showOutputs=showOutputs, showCommand=showCommand)
+            p.index    = i
+            p.attempt  = attempt
+            p.tStart   = time.time()
+            p.status   = 'RUNNING'
+            running.append(p)
+        # --- Polling the running processes
+        stillRunning=[]
+        for p in running:
+            if p.poll() is None:
+                if timeout is not None and time.time()-p.tStart>timeout:
+                    p.kill()
                     p.wait()
-                for p in ps:
-                    _report(p)
-                ps=[]
-                iProcess=0
-    # Extra process if not multiptle of nCores (TODO, smarter method)
-    for p in ps:
-        p.wait()
-    for p in ps:
-        _report(p)
+                    p.status = 'TIMEOUT'
+                else:
+                    stillRunning.append(p)
+                    continue
+            elif p.returncode==0:
+                p.status = 'OK'
+            else:
+                p.status = 'FAIL'
+            p.wallTime = time.time()-p.tStart
+            if logFile is not None:
+                _appendRunLog(logFile, p.input_file, p.status, p.returncode, p.attempt, p.tStart, p.wallTime)
+            if p.status!='OK' and p.attempt<=nRetries:
+                if verbose:
+                    print('[WARN] Input {} ({}), retrying ({}/{})'.format(p.input_file, p.status, p.attempt, nRetries))
+                queue.append((p.index, p.attempt+1))
+            else:
+                nDone+=1
+                _report(p)
+        running, nFinished = stillRunning, len(running)-len(stillRunning)
+        if nFinished==0:
+            time.sleep(pollInterval)
+        elif progress:
+            print('[INFO] Progress: {}/{} done, {} running, {} queued, {} failed, elapsed {:.1f}s'.format(nDone, nTot, len(running), len(queue), len(Failed), time.time()-tStart))
     # --- Giving a summary
     if len(Failed)==0:
         if verbose:
@@ -92,6 +141,20 @@ def run_cmds(inputfiles, exe, parallel=True, showOutputs=True, nCores=None, show
             print('      ',p.input_file)
         return False, Failed
 
+_RUNLOG_COLS=['input_file','status','returncode','attempt','tStart','wallTime']
+
+def _appendRunLog(logFile, input_file, status, returncode=None, attempt=0, tStart=np.nan, wallTime=np.nan):
+    """ Append one line to a csv run log, the header is written if the file does not exist """
+    newFile = not os.path.exists(logFile)
+    with open(logFile, 'a') as fid:
+        if newFile:
+            fid.write(','.join(_RUNLOG_COLS)+'\n')
+        fid.write('"{}",{},{},{},{:.3f},{:.3f}\n'.format(input_file, status, '' if returncode is None else returncode, attempt, tStart, wallTime))
+
+def readRunLog(logFile):
+    """ Read a run log written by `run_cmds`, returns a dataframe with one line per attempt. """
+    return pd.read_csv(logFile)
+
 def run_cmd(input_file_or_arglist, exe, wait=True, showOutputs=False, showCommand=True):
     """ Run a simple command of the form `exe input_file` or `exe arg1 arg2`  """
     # TODO Better capture STDOUT
@@ -108,7 +171,7 @@ def run_cmd(input_file_or_arglist, exe, wait=True, showOutputs=False, showComman
     if showOutputs:
         STDOut= None
     else:
-        STDOut= open(os.devnull, 'w') 
+        STDOut= subprocess.DEVNULL
     if showCommand:
         print('Running: '+' '.join(args))
     if wait:
@@ -330,7 +393,13 @@ def runBatch(batchfiles, showOutputs=True, showCommand=True, verbose=True, newWi
 
 # --- END cmd.py
 
-def run_fastfiles(fastfiles, fastExe=None, parallel=True, showOutputs=True, nCores=None, showCommand=True, reRun=True, verbose=True):
+def run_fastfiles(fastfiles, fastExe=None, parallel=True, showOutputs=True, nCores=None, showCommand=True, reRun=True, verbose=True,
+        timeout=None, nRetries=0, longestFirst=False, logFile=None, progress=False):
+    """ Run a set of OpenFAST input files, see `run_cmds` for the scheduling options.
+    INPUTS:
+     - reRun: if False, the simulations for which an output file (.out or .outb) exists are skipped
+     - longestFirst: if True, the simulations are started by decreasing number of time steps (TMax/DT)
+    """
     if fastExe is None:
         fastExe=FAST_EXE
     if not reRun:
@@ -340,12 +409,26 @@ def run_fastfiles(fastfiles, fastExe=None, parallel=True, showOutputs=True, nCor
             base=os.path.splitext(f)[0]
             if os.path.exists(base+'.outb') or os.path.exists(base+'.out'):
                 print('>>> Skipping existing simulation for: ',f)
-                pass
+                if logFile is not None:
+                    _appendRunLog(logFile, f, 'SKIPPED')
             else:
                 newfiles.append(f)
         fastfiles=newfiles
+    cost = None
+    if longestFirst:
+        cost = [fastfileCost(f) for f in fastfiles]
 
-    return run_cmds(fastfiles, fastExe, parallel=parallel, showOutputs=showOutputs, nCores=nCores, showCommand=showCommand, verbose=verbose)
+    return run_cmds(fastfiles, fastExe, parallel=parallel, showOutputs=showOutputs, nCores=nCores, showCommand=showCommand, verbose=verbose,
+            timeout=timeout, nRetries=nRetries, cost=cost, logFile=logFile, progress=progress)
+
+def fastfileCost(fastfile):
+    """ Expected cost of an OpenFAST simulation: number of time steps TMax/DT (0 if unknown) """
+    try:
+        fst = FASTInputFile(fastfile)
+        return float(fst['TMax'])/float(fst['DT'])
+    except Exception as e:
+        print('[WARN] Could not estimate the cost of simulation {}: {}'.format(fastfile, e))
+        return 0
 
 def run_fast(input_file, fastExe=None, wait=True, showOutputs=False, showCommand=True):
     if fastExe is None:
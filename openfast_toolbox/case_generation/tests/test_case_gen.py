@@ -0,0 +1,94 @@
+import unittest
+import os
+import shutil
+import tempfile
+from openfast_toolbox.io.fast_input_file import FASTInputFile
+from openfast_toolbox.case_generation.case_gen import templateReplace
+
+MAIN_FILE="""------- OpenFAST INPUT FILE -------------------------------------------
+Template file
+---------------------- SIMULATION CONTROL --------------------------------------
+False                  Echo        - Echo input data to <RootName>.ech (flag)
+"FATAL"                AbortLevel  - Error level when simulation should abort (string)
+10.0                   TMax        - Total run time (s)
+0.01                   DT          - Recommended module time step (s)
+2                      InterpOrder - Interpolation order for input/output time history (-)
+0                      NumCrctn    - Number correction iterations (-)
+"ED.dat"               EDFile      - Name of file containing ElastoDyn input parameters (quoted string)
+"""
+ED_FILE="""------- ELASTODYN INPUT FILE -------------------------------------------
+Template file
+---------------------- INITIAL CONDITIONS --------------------------------------
+5.0                    RotSpeed    - Initial or fixed rotor speed (rpm)
+0.0                    BlPitch(1)  - Blade 1 initial pitch (degrees)
+0.0                    BlPitch(2)  - Blade 2 initial pitch (degrees)
+0.0                    BlPitch(3)  - Blade 3 initial pitch (degrees)
+0.0                    TeetDefl    - Initial or fixed teeter angle (degrees)
+0.0                    Azimuth     - Initial azimuth angle for blade 1 (degrees)
+0.0                    NcIMUxn     - Downwind distance from the tower-top to the nacelle IMU (meters)
+0.0                    NcIMUyn     - Lateral distance from the tower-top to the nacelle IMU (meters)
+0.0                    NcIMUzn     - Vertical distance from the tower-top to the nacelle IMU (meters)
+0.0                    OoPDefl     - Initial out-of-plane blade-tip displacement (meters)
+0.0                    IPDefl      - Initial in-plane blade-tip deflection (meters)
+---------------------- OUTPUT --------------------------------------------------
+True                   SumPrint    - Print summary data to "<RootName>.sum" (flag)
+                       OutList     - The next line(s) contains a list of output parameters. See OutListParameters.xlsx for a listing of available output channels, (-)
+"RotSpeed"
+END of input file (the word "END" must appear in the first 3 columns of this last OutList line)
+---------------------------------------------------------------------------------------
+"""
+
+class TestCaseGen(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.templateDir = os.path.join(self.tmpDir, 'Template')
+        os.makedirs(self.templateDir)
+        with open(os.path.join(self.templateDir, 'Main.fst'), 'w') as f:
+            f.write(MAIN_FILE)
+        with open(os.path.join(self.templateDir, 'ED.dat'), 'w') as f:
+            f.write(ED_FILE)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir, ignore_errors=True)
+
+    def params(self):
+        return [{'__name__':'case{}'.format(i), 'TMax':20+i, 'EDFile|RotSpeed':6+i, 'EDFile|OutList':['GenPwr']} for i in range(3)]
+
+    def test_templateReplace(self):
+        outDir = os.path.join(self.tmpDir, 'Out')
+        files = templateReplace(self.params(), self.templateDir, outputDir=outDir, main_file='Main.fst')
+        self.assertEqual([os.path.basename(f) for f in files], ['case0.fst', 'case1.fst', 'case2.fst'])
+        for i, fst in enumerate(files):
+            main = FASTInputFile(fst)
+            self.assertEqual(main['TMax'], 20+i)
+            self.assertEqual(main['EDFile'], '"ED_case{}.dat"'.format(i))
+            ed = FASTInputFile(os.path.join(outDir, 'ED_case{}.dat'.format(i)))
+            self.assertEqual(ed['RotSpeed'], 6+i)
+            self.assertEqual(len(ed['OutList']), 3)
+        # Templates are left untouched
+        ed = FASTInputFile(os.path.join(outDir, 'ED.dat'))
+        self.assertEqual(ed['RotSpeed'], 5.0)
+        self.assertEqual(len(ed['OutList']), 2)
+
+    def test_templateReplace_dryRun_workers(self):
+        # Dry run: main files or file plan, nothing written
+        outDir = os.path.join(self.tmpDir, 'Out')
+        files = templateReplace(self.params(), self.templateDir, outputDir=outDir, main_file='Main.fst', dryRun=True)
+        self.assertEqual(files, [os.path.join(outDir, 'case{}.fst'.format(i)) for i in range(3)])
+        plan = templateReplace(self.params(), self.templateDir, outputDir=outDir, main_file='Main.fst', dryRun=True, returnPlan=True)
+        self.assertFalse(os.path.exists(outDir))
+        self.assertEqual(len(plan), 3)
+        self.assertEqual(plan[1]['main'], os.path.join(outDir, 'case1.fst'))
+        self.assertEqual([os.path.basename(new) for tpl, new in plan[1]['files']], ['case1.fst', 'ED_case1.dat'])
+        # Files written by several processes are the same as the sequential ones
+        outDir2 = os.path.join(self.tmpDir, 'Out2')
+        templateReplace(self.params(), self.templateDir, outputDir=outDir, main_file='Main.fst')
+        templateReplace(self.params(), self.templateDir, outputDir=outDir2, main_file='Main.fst', nWorkers=2)
+        for tpl, new in plan[1]['files']:
+            with open(new) as f1, open(new.replace(outDir, outDir2)) as f2:
+                self.assertEqual(f1.read(), f2.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
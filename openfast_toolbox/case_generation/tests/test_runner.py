@@ -0,0 +1,66 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import numpy as np
+from openfast_toolbox.case_generation.runner import run_cmds, readRunLog
+
+SCRIPT="""import sys, time, os
+args = os.path.basename(sys.argv[1]).split('_')
+time.sleep(float(args[1]))
+if args[2]=='retry':
+    marker = sys.argv[1]+'.marker'
+    if not os.path.exists(marker):
+        open(marker, 'w').close()
+        sys.exit(1)
+sys.exit(0 if args[2] in ['ok', 'retry'] else 1)
+"""
+
+class TestRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.script = os.path.join(self.tmpDir, 'job.py')
+        with open(self.script, 'w') as f:
+            f.write(SCRIPT)
+        self.log = os.path.join(self.tmpDir, 'run.csv')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpDir, ignore_errors=True)
+
+    def job(self, name, duration, status='ok'):
+        return os.path.join(self.tmpDir, '{}_{}_{}'.format(name, duration, status))
+
+    def test_rolling_queue(self):
+        # One long job and several short ones on two slots: the short ones do not wait for the long one
+        jobs = [self.job('long', 1.5)] + [self.job('short{}'.format(i), 0.05) for i in range(4)]
+        success, failed = run_cmds(jobs, sys.executable, flags=[self.script], nCores=2, showOutputs=False, showCommand=False, verbose=False, logFile=self.log)
+        self.assertTrue(success)
+        df = readRunLog(self.log)
+        self.assertEqual(len(df), 5)
+        self.assertTrue(np.all(df['status']=='OK'))
+        tEndLong = (df['tStart']+df['wallTime'])[df['input_file'].str.contains('long')].values[0]
+        tStartLast = df['tStart'][df['input_file'].str.contains('short3')].values[0]
+        self.assertLess(tStartLast, tEndLong)
+
+    def test_failures(self):
+        jobs = [self.job('a', 0, 'fail'), self.job('b', 0, 'retry'), self.job('c', 5), self.job('d', 0)]
+        success, failed = run_cmds(jobs, sys.executable, flags=[self.script], nCores=2, showOutputs=False, showCommand=False, verbose=False,
+                logFile=self.log, timeout=1, nRetries=1, cost=[0, 0, 1, 0])
+        self.assertFalse(success)
+        self.assertEqual(sorted([os.path.basename(p.input_file.split()[-1]) for p in failed]), ['a_0_fail', 'c_5_ok'])
+        df = readRunLog(self.log)
+        status = {(os.path.basename(f.split()[-1]), a):s for f, a, s in zip(df['input_file'], df['attempt'], df['status'])}
+        self.assertEqual(status[('a_0_fail', 1)], 'FAIL')
+        self.assertEqual(status[('a_0_fail', 2)], 'FAIL')
+        self.assertEqual(status[('b_0_retry', 1)], 'FAIL')
+        self.assertEqual(status[('b_0_retry', 2)], 'OK')
+        self.assertEqual(status[('c_5_ok', 2)], 'TIMEOUT')
+        self.assertEqual(status[('d_0_ok', 1)], 'OK')
+        # Most expensive job started first
+        self.assertTrue(df['input_file'].values[np.argmin(df['tStart'].values)].endswith('c_5_ok'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2331,7 +2331,8 @@ class FFCaseCreation:
                 condSeedPath = self.getCondSeedPath(cond, seed)
         
                 # Read output .bts for current seed
-                bts = TurbSimFile(os.path.join(condSeedPath, 'Low.bts'))
+                # Memory-mapped: only the time series at the points of interest are read (double precision, as a full read)
+                bts = TurbSimFile(os.path.join(condSeedPath, 'Low.bts'), mmap=True, dtype=np.float64)
                 bts['t']  = np.round(bts['t'],  6) # rounding single precision read as double precision
                 bts['dt'] = np.round(bts['dt'], 6)
         
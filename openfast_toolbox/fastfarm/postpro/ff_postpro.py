@@ -2,10 +2,13 @@ import numpy as np
 import pandas as pd
 import xarray as xr
 import os, sys
+import json
 from multiprocessing import Pool
 from itertools import repeat
 
 from openfast_toolbox.io import TurbSimFile, FASTOutputFile, VTKFile, FASTInputFile
+from openfast_toolbox.io.vtk_file import WrongFormatError, read_structured_points, read_structured_points_lines, read_structured_points_header, read_structured_points_data
+from openfast_toolbox.tools.fatigue import equivalent_load_batch
 
 def _get_fstf_filename(caseobj):
     if hasattr(caseobj, 'outputFFfilename'):
@@ -263,6 +266,28 @@ def readTurbineOutput(caseobj, dt_openfast, dt_processing=1, saveOutput=True, ou
 
 
 def readFFPlanesPar(caseobj, sliceToRead, verbose=False, saveOutput=True, iCondition=0, fCondition=-1, iCase=0, fCase=-1, iSeed=0, fSeed=-1, itime=0, ftime=-1, skiptime=1, nCores=36, outputformat='zarr'):
+    '''
+    Read and process FAST.Farm planes normal to `sliceToRead` in parallel.
+
+    Each (condition, case, seed) is a region of the output, processed by one worker.
+    If saveOutput is True and outputformat is 'zarr', the zarr store is created first with its final size
+    (empty chunks are not written), then each worker writes its region directly in the store and records it 
+    in a manifest (directory `<store>.manifest`). The parent process does not hold the data, and if the 
+    processing is interrupted, a new call only processes the regions that are missing.
+    Otherwise, the regions are returned to the parent process and combined in memory, and, if saveOutput
+    is True and outputformat is 'nc', written to a netcdf file at the end (no resume).
+    If a region fails, an exception is raised (chained to the exception of the first failed region), 
+    except when some regions were written to the zarr store: the failures are then reported, and a new 
+    call processes them.
+
+    INPUTS
+    ======
+    See readFFPlanes. 
+    nCores: int
+        Number of processes
+    outputformat: str
+        Either 'zarr' or 'nc'. Determines the output format
+    '''
 
     if fCondition==-1:
         fCondition = caseobj.nConditions
@@ -279,110 +304,143 @@ def readFFPlanesPar(caseobj, sliceToRead, verbose=False, saveOutput=True, iCondi
     if fSeed-iSeed <= 0:
         raise ValueError (f'Final seed to read needs to be larger than initial.')
 
+    if skiptime<1:
+        raise ValueError (f'Skiptime should be 1 or greater. If 1, no slices will be skipped.')
 
-    zarrstore = f'ds_{sliceToRead}Slices_temp_cond{iCondition}_{fCondition}_case{iCase}_{fCase}_seed{iSeed}_{fSeed}.zarr'
-    outputzarr = os.path.join(caseobj.path, zarrstore)
-
-    if os.path.isdir(outputzarr) and saveOutput:
-       print(f'Output file {zarrstore} exists. Attempting to read it..')
-       comb_ds = xr.open_zarr(outputzarr)
-       return comb_ds
+    if sliceToRead not in ['x', 'y', 'z']:
+        raise ValueError(f'Only slices x, y, z are available. Slice {sliceToRead} was requested. Stopping.')
 
+    if outputformat not in ['zarr', 'nc']:
+        raise ValueError(f"Output format should be 'zarr' or 'nc'. Format {outputformat} was requested. Stopping.")
 
-    # We will loop in the variable that we have more entries. E.g. if we have several condition, and only one case,
-    # then we will loop on the conditions. Analogous, if we have single conditions with many cases, we will loop on
-    # cases. Here we figure out where the loop will take place and set the appropriate number of cores to be used.
-    if fCondition-iCondition > fCase-iCase:
-        loopOn = 'cond'
-        print(f'Looping on conditions.')
-        if fCondition-iCondition < nCores:
-            print(f'Total number of condtions requested ({fCondition-iCondition}) is lower than number of cores {nCores}.')
-            print(f'Changing the number of cores to {fCondition-iCondition}.')
-            nCores = fCondition-iCondition
+    storefile  = f'ds_{sliceToRead}Slices_temp_cond{iCondition}_{fCondition}_case{iCase}_{fCase}_seed{iSeed}_{fSeed}'
+    zarrstore  = f'{storefile}.zarr'
+    outputzarr = os.path.join(caseobj.path, zarrstore)
+    outputnc   = os.path.join(caseobj.path, f'{storefile}.nc')
+    toZarr     = saveOutput and outputformat == 'zarr'
+    manifest   = outputzarr + '.manifest'
+    layoutFile = os.path.join(manifest, 'layout.json')
+
+    conds = np.arange(iCondition, fCondition, 1)
+    cases = np.arange(iCase, fCase, 1)
+    seeds = np.arange(iSeed, fSeed, 1)
+    regions = [(ic, jc, ks) for ic in range(len(conds)) for jc in range(len(cases)) for ks in range(len(seeds))]
+    regionName = lambda r: 'cond{}_case{}_seed{}.json'.format(conds[r[0]], cases[r[1]], seeds[r[2]])
+
+    if saveOutput and outputformat == 'nc' and os.path.isfile(outputnc):
+        print(f'Output file {outputnc} exists. Loading it.')
+        return xr.open_dataset(outputnc)
+
+    if toZarr:
+        if os.path.isdir(outputzarr) and not os.path.isdir(manifest):
+            # Store written in one go (e.g. by readFFPlanes)
+            print(f'Output file {zarrstore} exists. Attempting to read it..')
+            return xr.open_zarr(outputzarr)
+
+        options = {'slice':sliceToRead, 'itime':int(itime), 'ftime':int(ftime), 'skiptime':int(skiptime)}
+        if os.path.isfile(layoutFile):
+            with open(layoutFile, 'r') as f:
+                if json.load(f) != options:
+                    raise ValueError(f'The store {zarrstore} was created with different options. Delete it and its manifest to start over.')
+        else:
+            # --- Creating the store with its final size, the data is written by the workers
+            print(f'Creating store {zarrstore}')
+            os.makedirs(manifest, exist_ok=True)
+            layout = _FFPlanesLayout(caseobj, sliceToRead, conds, cases, seeds, itime=itime, ftime=ftime, skiptime=skiptime)
+            template = _FFPlanesDataset(caseobj, layout, np.broadcast_to(np.float32(np.nan), layout['shape']))
+            # One chunk per region (cond, case, seed), and blocks of time steps of about 32MB
+            nPlanes, nt, _, n1, n2 = layout['shape'][3:]
+            tChunk = int(max(1, min(nt, 2**25/(4*nPlanes*n1*n2))))
+            encoding = {v: {'chunks': tuple(tChunk if d=='time' else 1 if d in ['cond','case','seed'] else template.sizes[d] for d in template[v].dims)} 
+                        for v in template.data_vars}
+            template.to_zarr(outputzarr, mode='w', encoding=encoding, write_empty_chunks=False)
+            with open(layoutFile, 'w') as f:
+                json.dump(options, f)
+
+        done = set(os.listdir(manifest))
+        todo = [r for r in regions if regionName(r) not in done]
+        if len(todo)==0:
+            print(f'Output file {zarrstore} is complete. Reading it.')
+            return xr.open_zarr(outputzarr)
+        print(f'{len(regions)-len(todo)}/{len(regions)} regions already processed.')
     else:
-        loopOn = 'case'
-        print(f'Looping on cases.')
-        if fCase-iCase < nCores:
-            print(f'Total number of cases requested ({fCase-iCase}) is lower than number of cores {nCores}.')
-            print(f'Changing the number of cores to {fCase-iCase}.')
-            nCores = fCase-iCase
-
-
-    print(f'Running readFFPlanes in parallel using {nCores} workers')
-
-    if loopOn == 'cond':
-
-        # Split all the cases in arrays of roughly the same size
-        chunks =  np.array_split(range(iCondition,fCondition), nCores)
-        # Now, get the beginning and end of each separate chunk
-        iCond_list = [i[0]    for i in chunks]
-        fCond_list = [i[-1]+1 for i in chunks] 
-        print(f'iCond_list is {iCond_list}')
-        print(f'fCond_list is {fCond_list}')
-
-        # For generality, we create the list of cases as a repeat
-        iCase_list = repeat(iCase)
-        fCase_list = repeat(fCase)
-
-    elif loopOn == 'case':
-
-        # Split all the cases in arrays of roughly the same size
-        chunks =  np.array_split(range(iCase,fCase), nCores)
-        # Now, get the beginning and end of each separate chunk
-        iCase_list = [i[0]    for i in chunks]
-        fCase_list = [i[-1]+1 for i in chunks] 
-        print(f'iCase_list is {iCase_list}')
-        print(f'fCase_list is {fCase_list}')
-
-        # For generality, we create the list of cond as a repeat
-        iCond_list = repeat(iCondition)
-        fCond_list = repeat(fCondition)
-
+        todo = regions
+
+    tasks = [(caseobj, sliceToRead, conds[ic], cases[jc], seeds[ks], itime, ftime, skiptime, verbose,
+              outputzarr if toZarr else None, 
+              {'cond':slice(ic,ic+1), 'case':slice(jc,jc+1), 'seed':slice(ks,ks+1)},
+              os.path.join(manifest, regionName((ic,jc,ks))))
+             for ic, jc, ks in todo]
+
+    nCores = min(nCores, len(tasks))
+    print(f'Running readFFPlanes in parallel using {nCores} workers on {len(tasks)} regions')
+    ds_ = []
+    failures = []
+    def collect(res):
+        key, ds, err = res
+        if err is not None:
+            failures.append((key, err))
+            print(f'[WARN] readFFPlanesPar: failed for condition {key[0]}, case {key[1]}, seed {key[2]}: {err}')
+        elif ds is not None:
+            ds_.append(ds)
+    if nCores>1:
+        with Pool(nCores) as p:
+            for res in p.imap_unordered(_readFFPlanesRegion, tasks):
+                collect(res)
     else:
-        raise ValueError (f"This shouldn't occur. Not sure what went wrong.")
+        for task in tasks:
+            collect(_readFFPlanesRegion(task))
 
+    if len(failures)>0:
+        # Only the zarr store can be resumed, and only if some regions were written
+        if not toZarr or len(failures)==len(tasks):
+            key, err = failures[0]
+            raise Exception(f'readFFPlanesPar: {len(failures)}/{len(tasks)} regions failed, first failure for condition {key[0]}, case {key[1]}, seed {key[2]}: {err}') from err
+        print(f'[WARN] readFFPlanesPar: {len(failures)} regions failed. Call the function again to process them.')
 
-    p = Pool()
-    ds_ = p.starmap(readFFPlanes, zip(repeat(caseobj),          # caseobj
-                                      repeat(sliceToRead),      # slicesToRead
-                                      repeat(verbose),          # verbose
-                                      repeat(False),            # saveOutput
-                                      iCond_list,               # iCondition
-                                      fCond_list,               # fCondition
-                                      iCase_list,               # iCase
-                                      fCase_list,               # fCase
-                                      repeat(iSeed),            # iSeed
-                                      repeat(fSeed),            # fSeed
-                                      repeat(itime),            # itime
-                                      repeat(ftime),            # ftime
-                                      repeat(skiptime),         # skiptime
-                                      repeat(outputformat)      # outputformat
-                                     )
-                                  )
+    if toZarr:
+        print('Finished.')
+        return xr.open_zarr(outputzarr)
 
     print(f'Done reading all output. Concatenating the arrays')
     comb_ds = xr.combine_by_coords(ds_)
-
     if saveOutput:
-        pass
-        print('Done concatenating. Saving zarr file.')
-        comb_ds.to_zarr(outputzarr)
-
+        print(f'Saving output {outputnc}...')
+        comb_ds.to_netcdf(outputnc)
     print('Finished.')
-
     return comb_ds
 
 
-
-
-
-
+def _readFFPlanesRegion(args):
+    """ 
+    Reads the planes of one (cond, case, seed), see readFFPlanesPar.
+    If `outputzarr` is provided, the data is written to its region of the store, and the region is 
+    recorded in the manifest. Returns ((cond, case, seed), ds or None, exception or None)
+    """
+    caseobj, sliceToRead, cond, case, seed, itime, ftime, skiptime, verbose, outputzarr, region, markerFile = args
+    key = (cond, case, seed)
+    try:
+        ds = _readFFPlanesData(caseobj, sliceToRead, np.array([cond]), np.array([case]), np.array([seed]), itime=itime, ftime=ftime, skiptime=skiptime, verbose=verbose)
+        if outputzarr is None:
+            return key, ds, None
+        # Coordinates are already in the store, only the data variables are written
+        ds.drop_vars(list(ds.coords)).to_zarr(outputzarr, region=region)
+        # Region recorded once written
+        tmp = markerFile + '.tmp{}'.format(os.getpid())
+        with open(tmp, 'w') as f:
+            json.dump({'cond':int(cond), 'case':int(case), 'seed':int(seed)}, f)
+        os.replace(tmp, markerFile)
+        return key, None, None
+    except Exception as e:
+        return key, None, e
 
 
 
 def readFFPlanes(caseobj, slicesToRead=['x','y','z'], verbose=False, saveOutput=True, iCondition=0, fCondition=-1, iCase=0, fCase=-1, iSeed=0, fSeed=-1, itime=0, ftime=-1, skiptime=1, outformat='zarr'):
     '''
     Read and process FAST.Farm planes into xarrays.
+    The snapshots of all planes, seeds, cases and conditions are read into a single preallocated
+    float32 array (see `readFFPlaneSeries`), the Dataset is created at the end.
 
     INPUTS
     ======
@@ -474,111 +532,11 @@ def readFFPlanes(caseobj, slicesToRead=['x','y','z'], verbose=False, saveOutput=
             
         else:
             
-            # This for-loop is due to memory allocation requirements
-            #print(f'Processing slices normal in the {slices} direction...')
-            Slices_cond = []
-            for cond in np.arange(iCondition, fCondition, 1):
-                Slices_case = []
-                for case in np.arange(iCase, fCase, 1):
-                    Slices_seed = []
-                    for seed in np.arange(iSeed, fSeed, 1):
-                        seedPath = _getCaseSeedPath(caseobj, cond, case, seed)
-
-                        # Read FAST.Farm input to determine outputs
-                        ff_file = FASTInputFile(os.path.join(seedPath,f'{_get_fstf_filename(caseobj)}.fstf'))
-
-                        tmax          = ff_file['TMax']
-                        NOutDisWindXY = ff_file['NOutDisWindXY']
-                        OutDisWindZ   = ff_file['OutDisWindZ']
-                        NOutDisWindYZ = ff_file['NOutDisWindYZ']
-                        OutDisWindX   = ff_file['OutDisWindX']
-                        NOutDisWindXZ = ff_file['NOutDisWindXZ']
-                        WrDisDT       = ff_file['WrDisDT']
-
-                        # Determine number of output VTKs
-                        nOutputTimes = int(np.floor(tmax/WrDisDT))
-
-                        # Determine number of output digits for reading
-                        ndigitsplane = max(len(str(max(NOutDisWindXY,NOutDisWindXZ,NOutDisWindYZ))), 3)
-                        ndigitstime = len(str(nOutputTimes)) + 1  # this +1 is experimental. I had 1800 planes and got 5 digits.
-                        # If this breaks again and I need to come here to fix, I need to ask Andy how the amount of digits is determined.
-
-
-                        # Determine how many snapshots to read depending on input
-                        if ftime==-1:
-                            ftime=nOutputTimes
-                        elif ftime>nOutputTimes:
-                            raise ValueError (f'Final time step requested ({ftime}) is greater than the total available ({nOutputTimes})')
-
-
-                        # Print info
-                        print(f'Processing {slices} slice: Condition {cond}, Case {case}, Seed {seed}, snapshot {itime} to {ftime} ({nOutputTimes} available)')
-
-                        if slices == 'z':
-                            # Read Low-res z-planes
-                            Slices=[]
-                            for zplane in range(NOutDisWindXY):
-                                Slices_t=[]
-                                #for t in range(nOutputTimes):
-                                for t in np.arange(itime,ftime,skiptime):
-                                    file = f'{_get_fstf_filename(caseobj)}.Low.DisXY{zplane+1:0{ndigitsplane}d}.{t:0{ndigitstime}d}.vtk'
-                                    if verbose: print(f'Reading z plane {zplane} for time step {t}: \t {file}')
-
-                                    vtk = VTKFile(os.path.join(seedPath, 'vtk_ff', file))
-                                    ds = readAndCreateDataset(vtk, caseobj, cond=cond, case=case, seed=seed, t=t, WrDisDT=WrDisDT)
-
-                                    Slices_t.append(ds)
-                                Slices_t = xr.concat(Slices_t,dim='time')
-                                Slices.append(Slices_t)
-                            Slices = xr.concat(Slices,dim='z')
-
-                        elif slices == 'y':
-                            # Read Low-res y-planes
-                            Slices=[]
-                            for yplane in range(NOutDisWindXZ):
-                                Slices_t=[]
-                                #for t in range(nOutputTimes):
-                                for t in np.arange(itime,ftime,skiptime):
-                                    file = f'{_get_fstf_filename(caseobj)}.Low.DisXZ{yplane+1:0{ndigitsplane}d}.{t:0{ndigitstime}d}.vtk'
-                                    if verbose: print(f'Reading y plane {yplane} for time step {t}: \t {file}')
-
-                                    vtk = VTKFile(os.path.join(seedPath, 'vtk_ff', file))
-                                    ds = readAndCreateDataset(vtk, caseobj, cond=cond, case=case, seed=seed, t=t, WrDisDT=WrDisDT)
-
-                                    Slices_t.append(ds)
-                                Slices_t = xr.concat(Slices_t,dim='time')
-                                Slices.append(Slices_t)
-                            Slices = xr.concat(Slices,dim='y')
-
-                        elif slices == 'x':
-                            # Read Low-res x-planes
-                            Slices=[]
-                            for xplane in range(NOutDisWindYZ):
-                                Slices_t=[]
-                                print(f'Processing {slices} slice: Condition {cond}, Case {case}, Seed {seed}, x plane {xplane}')
-                                #for t in range(nOutputTimes):
-                                for t in np.arange(itime,ftime,skiptime):
-                                    file = f'{_get_fstf_filename(caseobj)}.Low.DisYZ{xplane+1:0{ndigitsplane}d}.{t:0{ndigitstime}d}.vtk'
-                                    if verbose: print(f'Reading x plane {xplane} for time step {t}: \t {file}')
-
-                                    vtk = VTKFile(os.path.join(seedPath, 'vtk_ff', file))
-                                    ds = readAndCreateDataset(vtk, caseobj, cond=cond, case=case, seed=seed, t=t, WrDisDT=WrDisDT)
-
-                                    Slices_t.append(ds)
-                                Slices_t = xr.concat(Slices_t,dim='time')
-                                Slices.append(Slices_t)
-                            Slices = xr.concat(Slices,dim='x')
-
-                        else:
-                            raise ValueError(f'Only slices x, y, z are available. Slice {slices} was requested. Stopping.')
-
-                        Slices_seed.append(Slices)
-                    Slices_seed = xr.concat(Slices_seed, dim='seed')
-                    Slices_case.append(Slices_seed)
-                Slices_case = xr.concat(Slices_case, dim='case')
-                Slices_cond.append(Slices_case)
-
-            Slices = xr.concat(Slices_cond, dim='cond')
+            if slices not in ['x', 'y', 'z']:
+                raise ValueError(f'Only slices x, y, z are available. Slice {slices} was requested. Stopping.')
+
+            Slices = _readFFPlanesData(caseobj, slices, np.arange(iCondition, fCondition, 1), np.arange(iCase, fCase, 1), np.arange(iSeed, fSeed, 1),
+                                       itime=itime, ftime=ftime, skiptime=skiptime, verbose=verbose)
 
             if saveOutput:
                 print(f'Saving {slices} slice file {outputfile}...')
@@ -593,6 +551,154 @@ def readFFPlanes(caseobj, slicesToRead=['x','y','z'], verbose=False, saveOutput=
                 return Slices
 
 
+def _FFPlanesLayout(caseobj, slices, conds, cases, seeds, itime=0, ftime=-1, skiptime=1):
+    """
+    Returns the layout of the FAST.Farm planes normal to `slices` for the given conditions, cases and seeds:
+    a dictionary with the list of VTK snapshots for each (cond, case, seed, plane), the header of each plane,
+    the time indices, and the shape of the data array (cond, case, seed, plane, time, comp, n1, n2),
+    where (n1, n2) are the in-plane dimensions.
+    """
+    # Number of planes and their file label for each slice direction
+    nPlanesKey, label = {'z':('NOutDisWindXY','XY'), 'y':('NOutDisWindXZ','XZ'), 'x':('NOutDisWindYZ','YZ')}[slices]
+
+    # --- First pass: FAST.Farm inputs of each seed, to determine the list of snapshots
+    files = {}
+    nPlanes = None
+    WrDisDT = None
+    for cond in conds:
+        for case in cases:
+            for seed in seeds:
+                seedPath = _getCaseSeedPath(caseobj, cond, case, seed)
+
+                # Read FAST.Farm input to determine outputs
+                ff_file = FASTInputFile(os.path.join(seedPath,f'{_get_fstf_filename(caseobj)}.fstf'))
+
+                tmax          = ff_file['TMax']
+                NOutDisWindXY = ff_file['NOutDisWindXY']
+                NOutDisWindYZ = ff_file['NOutDisWindYZ']
+                NOutDisWindXZ = ff_file['NOutDisWindXZ']
+
+                # Determine number of output VTKs
+                nOutputTimes = int(np.floor(tmax/ff_file['WrDisDT']))
+
+                # Determine number of output digits for reading
+                ndigitsplane = max(len(str(max(NOutDisWindXY,NOutDisWindXZ,NOutDisWindYZ))), 3)
+                ndigitstime = len(str(nOutputTimes)) + 1  # this +1 is experimental. I had 1800 planes and got 5 digits.
+                # If this breaks again and I need to come here to fix, I need to ask Andy how the amount of digits is determined.
+
+                # Determine how many snapshots to read depending on input
+                if ftime==-1:
+                    ftime=nOutputTimes
+                elif ftime>nOutputTimes:
+                    raise ValueError (f'Final time step requested ({ftime}) is greater than the total available ({nOutputTimes})')
+
+                # All seeds are stored in one array, they need to have the same planes and times
+                if nPlanes is None:
+                    nPlanes, WrDisDT = ff_file[nPlanesKey], ff_file['WrDisDT']
+                elif nPlanes != ff_file[nPlanesKey] or WrDisDT != ff_file['WrDisDT']:
+                    raise ValueError(f'Number of {slices} planes or WrDisDT differs for condition {cond}, case {case}, seed {seed}.')
+
+                for p in range(nPlanes):
+                    files[(cond,case,seed,p)] = [os.path.join(seedPath, 'vtk_ff', f'{_get_fstf_filename(caseobj)}.Low.Dis{label}{p+1:0{ndigitsplane}d}.{t:0{ndigitstime}d}.vtk')
+                                                 for t in np.arange(itime,ftime,skiptime)]
+    times = np.arange(itime,ftime,skiptime)
+
+    # --- Header of each plane family, parsed once, and validated for all snapshots
+    headers = [None]*nPlanes
+    for p in range(nPlanes):
+        with open(files[(conds[0],cases[0],seeds[0],p)][0], 'rb') as f:
+            headers[p] = read_structured_points_header(f)
+    h0 = headers[0]
+    nComp = h0['nComp']
+    # In-plane dimensions, and normal dimension
+    iNormal = {'x':0, 'y':1, 'z':2}[slices]
+    inPlane = [i for i in range(3) if i!=iNormal]
+    n1, n2 = h0['dims'][inPlane[0]], h0['dims'][inPlane[1]]
+
+    return {'slices':slices, 'conds':conds, 'cases':cases, 'seeds':seeds, 'files':files, 'headers':headers,
+            'times':times, 'WrDisDT':WrDisDT, 'iNormal':iNormal, 'itime':itime, 'ftime':ftime,
+            'shape':(len(conds), len(cases), len(seeds), nPlanes, len(times), nComp, n1, n2)}
+
+
+def _FFPlanesDataset(caseobj, layout, data):
+    """
+    Returns the Dataset of FAST.Farm planes, with the same dimensions as when concatenating
+    individual snapshots: (time, seed, case, cond, x, y, z).
+    `data` is an array (or a view) of shape layout['shape'].
+    """
+    conds, cases, seeds, headers = layout['conds'], layout['cases'], layout['seeds'], layout['headers']
+    iNormal = layout['iNormal']
+    nComp = layout['shape'][5]
+    h0 = headers[0]
+    grid = [h0['xp_grid'], h0['yp_grid'], h0['zp_grid']]
+    grid[iNormal] = np.array([h['origin'][iNormal] for h in headers])
+    axes = [4, 2, 1, 0] + [[3,5,6], [5,3,6], [5,6,3]][iNormal]
+    Slices = xr.Dataset({c: (['time', 'seed', 'case', 'cond', 'x', 'y', 'z'], data[:,:,:,:,:,i].transpose(axes)) for i, c in enumerate(['u','v','w'][:nComp])},
+                        coords={'x': grid[0],
+                                'y': grid[1],
+                                'z': grid[2],
+                                'time': layout['times']*layout['WrDisDT'],
+                                'seed': seeds,
+                                'case': [caseobj.caseDirList[case] for case in cases],
+                                'cond': [caseobj.condDirList[cond] for cond in conds]}
+                       )
+    return Slices
+
+
+def _readFFPlanesData(caseobj, slices, conds, cases, seeds, itime=0, ftime=-1, skiptime=1, verbose=False):
+    """
+    Reads the FAST.Farm planes normal to `slices` for the given conditions, cases and seeds (arrays of indices).
+    All snapshots are read into one preallocated float32 array, the Dataset is created at the end.
+    """
+    layout = _FFPlanesLayout(caseobj, slices, conds, cases, seeds, itime=itime, ftime=ftime, skiptime=skiptime)
+    files, headers, ftime = layout['files'], layout['headers'], layout['ftime']
+    nPlanes = layout['shape'][3]
+
+    # --- Second pass: all payloads read into one preallocated array
+    data = np.empty(layout['shape'], dtype=np.float32)
+    for ic, cond in enumerate(conds):
+        for jc, case in enumerate(cases):
+            for ks, seed in enumerate(seeds):
+                print(f'Processing {slices} slice: Condition {cond}, Case {case}, Seed {seed}, snapshot {itime} to {ftime}, {nPlanes} planes')
+                for p in range(nPlanes):
+                    readFFPlaneSeries(files[(cond,case,seed,p)], out=data[ic,jc,ks,p], header=headers[p], verbose=verbose)
+
+    return _FFPlanesDataset(caseobj, layout, data)
+
+
+def readFFPlaneSeries(files, out=None, header=None, verbose=False):
+    """
+    Reads a series of VTK structured points files (e.g. the snapshots of a FAST.Farm plane) 
+    that share the same header, except for the title line. 
+    The header is parsed once, and only compared for the subsequent files.
+    Binary and ASCII legacy VTK files are supported.
+
+    INPUTS:
+      - files: list of VTK files
+      - out: preallocated array of shape (nFiles, nComp, n1, n2) where (n1, n2) are the 
+             in-plane dimensions, or of shape (nFiles, nComp, nx, ny, nz).
+             If None, an array of shape (nFiles, nComp, nx, ny, nz) is allocated.
+      - header: header of the first file (see `read_structured_points_header`), if already parsed
+    OUTPUTS:
+      - out: array containing the data of all files
+      - header: header of the files
+    """
+    if header is None:
+        with open(files[0], 'rb') as f:
+            header = read_structured_points_header(f)
+    if out is None:
+        out = np.empty((len(files), header['nComp']) + tuple(header['dims']), dtype=np.float32)
+    refLines = [header['lines'][0]] + header['lines'][2:]
+    for i, filename in enumerate(files):
+        if verbose: print(f'Reading {filename}')
+        with open(filename, 'rb') as f:
+            lines = read_structured_points_lines(f)
+            if [lines[0]] + lines[2:] != refLines:
+                raise ValueError(f'The header of {filename} differs from the header of the first file of the series.')
+            read_structured_points_data(f, header, out=out[i])
+    return out, header
+
+
 def readAndCreateDataset(vtk, caseobj, cond=None, case=None, seed=None, t=None, WrDisDT=None):
     
     # Get info from VTK
@@ -628,39 +734,53 @@ def readAndCreateDataset(vtk, caseobj, cond=None, case=None, seed=None, t=None,
 def readVTK_structuredPoints (vtkpath):
     '''
     Function to read the VTK written by utilities/postprocess_amr_boxes2vtk.py
+    The `vtk` package is used if available, otherwise the legacy file is read
+    directly (see io.vtk_file.read_structured_points).
     Input
     -----
     vtkpath: str
         Full path of the vtk, including its extension
     '''
+    try:
+        import vtk
+    except ImportError:
+        vtk = None
 
-    import vtk
-
-    reader = vtk.vtkStructuredPointsReader()
-    reader.SetFileName(vtkpath)
-    reader.Update()
+    if vtk is not None:
+        from vtk.util.numpy_support import vtk_to_numpy
 
-    output = reader.GetOutput()
+        reader = vtk.vtkStructuredPointsReader()
+        reader.SetFileName(vtkpath)
+        reader.Update()
 
-    dims = output.GetDimensions()
-    spacing = output.GetSpacing()
-    origin = output.GetOrigin()
-    nx, ny, nz = dims
+        output = reader.GetOutput()
 
-    data_type = output.GetScalarTypeAsString()
-    point_data = output.GetPointData()
-    vector_array = point_data.GetArray(0)
-    num_components = vector_array.GetNumberOfComponents()
+        dims = output.GetDimensions()
+        spacing = output.GetSpacing()
+        origin = output.GetOrigin()
+        nx, ny, nz = dims
 
+        point_data = output.GetPointData()
+        vector_array = point_data.GetArray(0)
+        num_components = vector_array.GetNumberOfComponents()
 
-    # Convert vector array to a NumPy array
-    vector_data = np.zeros((nx, ny, nz, num_components), dtype=np.float32)
-    for i in range(nx):
-        for j in range(ny):
-            for k in range(nz):
-                index = i + nx * (j + ny * k)
-                vector = vector_array.GetTuple(index)
-                vector_data[i, j, k, :] = vector
+        # Convert vector array to a NumPy array, points are sorted in Fortran order (x fastest)
+        vector_data = vtk_to_numpy(vector_array).astype(np.float32, copy=False)
+        vector_data = vector_data.reshape((nx, ny, nz, num_components), order='F')
+    else:
+        try:
+            header, data = read_structured_points(vtkpath, dtype=np.float32)
+            nx, ny, nz = header['dims']
+            spacing = header['spacing']
+            origin  = header['origin']
+            vector_data = np.moveaxis(data, 0, -1) # (nx, ny, nz, num_components)
+        except WrongFormatError:
+            # File with more than a single point data field, using the generic reader
+            vtkf = VTKFile(vtkpath)
+            nx, ny, nz = vtkf.dataset['DIMENSIONS']
+            spacing = vtkf.dataset['SPACING'] if 'SPACING' in vtkf.dataset else vtkf.dataset['ASPECT_RATIO']
+            origin  = vtkf.dataset['ORIGIN']
+            vector_data = list(vtkf.point_data_grid.values())[0].astype(np.float32, copy=False)
 
     # Create coordinates along x, y, and z dimensions
     x_coords = origin[0] + spacing[0] * np.arange(nx)
@@ -801,7 +921,11 @@ def compute_del(ts, elapsed, lifetime, load2stress, slope, Sult, Sc=0.0, rainflo
 
 
 
-def calcDEL_theta (ds, var):
+def calcDEL_theta (ds, var, method='fatpack', nCores=1):
+    """
+    Compute the DEL (with and without Goodman correction) and the damage of the variable `var` of the
+    dataset `ds`, for all theta, seed, turbine, wdir and yawCase, see `_calcDEL`.
+    """
     
     # Set constants
     lifetime = 25        #  Design lifetime of the component / material in years
@@ -842,43 +966,17 @@ def calcDEL_theta (ds, var):
     else:
         raise ValueError('Variable not recognized')
 
-    # Initialize variable
-    full_del_withgoodman = np.zeros((len(ds.theta), len(ds.seed), len(ds.turbine), len(ds.wdir), len(ds.yawCase)))
-    full_del_woutgoodman = np.zeros((len(ds.theta), len(ds.seed), len(ds.turbine), len(ds.wdir), len(ds.yawCase)))
-    full_damage          = np.zeros((len(ds.theta), len(ds.seed), len(ds.turbine), len(ds.wdir), len(ds.yawCase)))
-    full_fatpack         = np.zeros((len(ds.theta), len(ds.seed), len(ds.turbine), len(ds.wdir), len(ds.yawCase)))
-
-    # Loop through everything and compute DEL
-    for i, theta in enumerate(ds.theta):
-        for j, seed in enumerate(ds.seed):
-            for k, turb in enumerate(ds.turbine):
-                #print(f'Processing theta {i+1}/{len(ds.theta)}, seed {j+1}/{len(ds.seed)}, turb {k+1}/{len(ds.turbine)}, all {len(ds.wdir)} wdir, all {len(ds.yawCase)} yawCases.    ', end='\r',flush=True)
-                for l, wdir in enumerate(ds.wdir):
-                    print(f'Processing theta {i+1}/{len(ds.theta)}, seed {j+1}/{len(ds.seed)}, turb {k+1}/{len(ds.turbine)}, wdir {l+1}/{len(ds.wdir)}, all {len(ds.yawCase)} yawCases.    ', end='\r', flush=True)
-                    for m, yaw in enumerate(ds.yawCase):
-                        ts = ds.sel(wdir=wdir, yawCase=yaw, seed=seed, turbine=turb, theta=theta).squeeze()[var]*1e3  # convert kNm to Nm
-                        elapsed = (ts.time[-1]-ts.time[0]).values
-                        
-                        DEL_withgoodman, damage, fatpack_rainflow_successful = compute_del(ts, elapsed, lifetime, load2stress, slope, Sult, Sc=Sc, rainflow_bins=rainflow_bins, return_damage=True, goodman_correction=True)
-                        DEL_woutgoodman                                      = compute_del(ts, elapsed, lifetime, load2stress, slope, Sult, Sc=Sc, rainflow_bins=rainflow_bins, return_damage=False, goodman_correction=False)
-                        
-                        full_del_withgoodman[i,j,k,l,m] = DEL_withgoodman
-                        full_del_woutgoodman[i,j,k,l,m] = DEL_woutgoodman
-                        full_damage[i,j,k,l,m] = damage
-                        full_fatpack[i,j,k,l,m] = fatpack_rainflow_successful
-                        
-
-    ds[f'DEL_withgoodman_[Nm]_{var}']       = (('theta', 'seed', 'turbine', 'wdir', 'yawCase'), full_del_withgoodman)
-    ds[f'DEL_woutgoodman_[Nm]_{var}']       = (('theta', 'seed', 'turbine', 'wdir', 'yawCase'), full_del_woutgoodman)
-    ds[f'damage_{var}']          = (('theta', 'seed', 'turbine', 'wdir', 'yawCase'), full_damage)
-    ds[f'fatpack_success_{var}'] = (('theta', 'seed', 'turbine', 'wdir', 'yawCase'), full_fatpack)
-    
-    return ds
+    return _calcDEL(ds, var, ['theta', 'seed', 'turbine', 'wdir', 'yawCase'], lifetime=lifetime, load2stress=load2stress, slope=slope,
+                    Sult=Sult, Sc=Sc, rainflow_bins=rainflow_bins, method=method, nCores=nCores)
 
 
 
 
-def calcDEL_nontheta (ds, var):
+def calcDEL_nontheta (ds, var, method='fatpack', nCores=1):
+    """
+    Compute the DEL (with and without Goodman correction) and the damage of the variable `var` of the
+    dataset `ds`, for all seed, turbine, wdir and yawCase, see `_calcDEL`.
+    """
     
     # Set constants
     lifetime = 25       #  Design lifetime of the component / material in years
@@ -898,34 +996,32 @@ def calcDEL_nontheta (ds, var):
     else:
         raise ValueError('Variable not recognized')
 
-    # Initialize variable
-    full_del_withgoodman = np.zeros((len(ds.seed), len(ds.turbine), len(ds.wdir), len(ds.yawCase)))
-    full_del_woutgoodman = np.zeros((len(ds.seed), len(ds.turbine), len(ds.wdir), len(ds.yawCase)))
-    full_damage  = np.zeros((len(ds.seed), len(ds.turbine), len(ds.wdir), len(ds.yawCase)))
-    full_fatpack = np.zeros((len(ds.seed), len(ds.turbine), len(ds.wdir), len(ds.yawCase)))
-
-    # Loop through everything and compute DEL
-    for i, seed in enumerate(ds.seed):
-        for j, turb in enumerate(ds.turbine):
-            for k, wdir in enumerate(ds.wdir):
-                print(f'Processing seed {i+1}/{len(ds.seed)}, turb {j+1}/{len(ds.turbine)}, wdir {k+1}/{len(ds.wdir)}, all {len(ds.yawCase)} yawCases.    ', end='\r', flush=True)
-                for l, yaw in enumerate(ds.yawCase):
-                    ts = ds.sel(wdir=wdir, yawCase=yaw, seed=seed, turbine=turb).squeeze()[var]*1e3  # convert kNm to Nm
-                    elapsed = (ts.time[-1]-ts.time[0]).values
-                    
-                    DEL_withgoodman, damage, fatpack_rainflow_successful = compute_del(ts, elapsed, lifetime, load2stress, slope, Sult, Sc=Sc, rainflow_bins=rainflow_bins, return_damage=True, goodman_correction=True)
-                    DEL_woutgoodman                                      = compute_del(ts, elapsed, lifetime, load2stress, slope, Sult, Sc=Sc, rainflow_bins=rainflow_bins, return_damage=False, goodman_correction=False)
-
-                    full_del_withgoodman[i,j,k,l] = DEL_withgoodman
-                    full_del_woutgoodman[i,j,k,l] = DEL_woutgoodman
-                    full_damage[i,j,k,l] = damage
-                    full_fatpack[i,j,k,l] = fatpack_rainflow_successful
-                    
-
-    ds[f'DEL_withgoodman_[Nm]_{var}'] = (('seed', 'turbine', 'wdir', 'yawCase'), full_del_withgoodman)
-    ds[f'DEL_woutgoodman_[Nm]_{var}'] = (('seed', 'turbine', 'wdir', 'yawCase'), full_del_woutgoodman)
-    ds[f'damage_{var}']          = (('seed', 'turbine', 'wdir', 'yawCase'), full_damage)
-    ds[f'fatpack_success_{var}'] = (('seed', 'turbine', 'wdir', 'yawCase'), full_fatpack)
+    return _calcDEL(ds, var, ['seed', 'turbine', 'wdir', 'yawCase'], lifetime=lifetime, load2stress=load2stress, slope=slope,
+                    Sult=Sult, Sc=Sc, rainflow_bins=rainflow_bins, method=method, nCores=nCores)
+
+
+def _calcDEL(ds, var, dims, lifetime, load2stress, slope, Sult, Sc=0, rainflow_bins=100, method='fatpack', nCores=1):
+    """
+    Compute the DEL (with and without Goodman correction) and the damage of the variable `var` of the
+    dataset `ds`, for all the combinations of `dims`. 
+    Each time series is rainflow counted once, using `equivalent_load_batch`. With method='fatpack', 
+    the results are the same as `compute_del`.
+    The variables `DEL_withgoodman_[Nm]_{var}`, `DEL_woutgoodman_[Nm]_{var}`, `damage_{var}` and
+    `fatpack_success_{var}` are added to `ds`.
+    As in `compute_del`, a time series whose rainflow counting fails does not stop the processing:
+    a warning is printed, its DELs and damage are set to 0, and `fatpack_success_{var}` to 0.
+    """
+    ts = ds[var].transpose(*dims, 'time')*1e3  # convert kNm to Nm
+    res = equivalent_load_batch(ts.to_dataset(name=var), m=slope, bins=rainflow_bins, method=method, dim='time',
+                                meanBin=False, binStartAt0=False, Sult=Sult, load2stress=load2stress,
+                                Sc=Sc if Sc>0 else Sult, lifetime=lifetime, nCores=nCores)
+    res = res.isel(m=0, drop=True).transpose(*dims)
+    success = np.isfinite(res[f'DEL_{var}'])
+    # Failed rainflow counts are set to 0, as in `compute_del`
+    ds[f'DEL_withgoodman_[Nm]_{var}'] = (tuple(dims), res[f'DEL_goodman_{var}'].fillna(0).values)
+    ds[f'DEL_woutgoodman_[Nm]_{var}'] = (tuple(dims), res[f'DEL_{var}'].fillna(0).values)
+    ds[f'damage_{var}']               = (tuple(dims), res[f'damage_goodman_{var}'].fillna(0).values)
+    ds[f'fatpack_success_{var}']      = (tuple(dims), success.values.astype(float))
     
     return ds
 
@@ -0,0 +1,239 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+try:
+    import zarr
+except ImportError:
+    zarr = None
+try:
+    import fatpack
+except ImportError:
+    fatpack = None
+
+from openfast_toolbox.fastfarm.postpro.ff_postpro import readVTK_structuredPoints, readFFPlaneSeries, readFFPlanesPar, _calcDEL, compute_del
+
+MyDir=os.path.dirname(__file__)
+
+def writeBox(filename, u, dims, title='box', origin=(0, -10, 20)):
+    """ Write a binary structured points file """
+    with open(filename, 'wb') as f:
+        f.write('# vtk DataFile Version 3.0\n{}\nBINARY\nDATASET STRUCTURED_POINTS\n'.format(title).encode())
+        f.write('DIMENSIONS {} {} {}\nORIGIN {} {} {}\nSPACING 2 5 10\nPOINT_DATA {}\nVECTORS Velocity float\n'.format(*dims, *origin, u.shape[0]).encode())
+        f.write(u.astype('>f4').tobytes())
+
+FSTF="""------- FAST.Farm for OpenFAST INPUT FILE -------------------------------------------------
+Test case for readFFPlanesPar
+--- SIMULATION CONTROL ---
+False         Echo               - Echo input data to <RootName>.ech? (flag)
+FATAL         AbortLevel         - Error level when simulation should abort (string)
+          1.5 TMax               - Total run time (s) [>=0.0]
+False         UseSC              - Use a super controller? (flag)
+            1 Mod_AmbWind        - Ambient wind model (-) (switch)
+--- VISUALIZATION ---
+False         WrDisWind          - Write low- and high-resolution disturbed wind data? (flag)
+            0 NOutDisWindXY      - Number of XY planes for output of disturbed wind data across the low-resolution domain
+            0 NOutDisWindYZ      - Number of YZ planes for output of disturbed wind data across the low-resolution domain
+            2 NOutDisWindXZ      - Number of XZ planes for output of disturbed wind data across the low-resolution domain
+          0.5 WrDisDT            - Time step for disturbed wind visualization output (s)
+"""
+
+class FFCase(object):
+    """ Minimal FAST.Farm case tree: 1 condition, 2 cases, 1 seed, 2 XZ planes, 3 snapshots """
+    def __init__(self, path):
+        self.path = path
+        self.nConditions, self.nCases, self.nSeeds = 1, 2, 1
+        self.condDirList = ['Cond00']
+        self.caseDirList = ['Case0', 'Case1']
+        self.outputFFfilename = 'FFarm_mod.fstf'
+        for case in range(self.nCases):
+            vtkDir = os.path.join(self.getCaseSeedPath(0, case, 0), 'vtk_ff')
+            os.makedirs(vtkDir)
+            with open(os.path.join(self.getCaseSeedPath(0, case, 0), 'FFarm_mod.fstf'), 'w') as f:
+                f.write(FSTF)
+            for p in range(2):
+                for it in range(3):
+                    self.writePlane(case, p, it)
+
+    def getCaseSeedPath(self, cond, case, seed):
+        return os.path.join(self.path, self.condDirList[cond], self.caseDirList[case], f'Seed_{seed}')
+
+    def planeFile(self, case, p, it):
+        return os.path.join(self.getCaseSeedPath(0, case, 0), 'vtk_ff', f'FFarm_mod.Low.DisXZ{p+1:03d}.{it:02d}.vtk')
+
+    def writePlane(self, case, p, it, offset=0):
+        u = (100*case + 10*p + it + offset + np.arange(4*3*3).reshape(12, 3)).astype(np.float32)
+        writeBox(self.planeFile(case, p, it), u, (4, 1, 3), title=f'Plane at time = {it*0.5} seconds.', origin=(0, 5*p, 20))
+
+class Test(unittest.TestCase):
+
+    def test_readVTK_structuredPoints(self):
+        dims = (4, 3, 2)
+        u = np.random.normal(8, 1, (np.prod(dims), 3)).astype(np.float32)
+        filename = os.path.join(MyDir, '_box_TMP.vtk')
+        writeBox(filename, u, dims)
+        try:
+            ds = readVTK_structuredPoints(filename)
+        finally:
+            os.remove(filename)
+        # Points are sorted in Fortran order
+        ref = u.reshape(dims+(3,), order='F')
+        np.testing.assert_equal(ds['u'].values, ref[:,:,:,0])
+        np.testing.assert_equal(ds['w'].values, ref[:,:,:,2])
+        np.testing.assert_almost_equal(ds['y'].values, [-10, -5, 0])
+        np.testing.assert_almost_equal(ds['z'].values, [20, 30])
+
+    def test_readFFPlaneSeries(self):
+        dims = (4, 3, 1)
+        U = np.random.normal(8, 1, (3, np.prod(dims), 3)).astype(np.float32)
+        files = [os.path.join(MyDir, '_plane{}_TMP.vtk'.format(it)) for it in range(3)]
+        for it, f in enumerate(files):
+            writeBox(f, U[it], dims, title='Plane at time = {} seconds.'.format(it*0.5))
+        try:
+            out = np.empty((3, 3, 4, 3), dtype=np.float32)
+            out, header = readFFPlaneSeries(files, out=out)
+            self.assertEqual(header['dims'], [4,3,1])
+            np.testing.assert_equal(out[2,1], U[2][:,1].reshape(4,3, order='F'))
+            # Different header
+            writeBox(files[1], U[1], (3, 4, 1))
+            with self.assertRaises(ValueError):
+                readFFPlaneSeries(files)
+        finally:
+            for f in files:
+                os.remove(f)
+
+    def test_readFFPlanesPar_nc(self):
+        path = tempfile.mkdtemp()
+        try:
+            case = FFCase(path)
+            ref = readFFPlanesPar(case, 'y', saveOutput=False, nCores=1)
+            self.assertEqual(dict(ref['u'].sizes), {'time':3, 'seed':1, 'case':2, 'cond':1, 'x':4, 'y':2, 'z':3})
+            np.testing.assert_equal(ref['y'].values, [0, 5])
+            np.testing.assert_equal(ref['v'].sel(case='Case1', y=5, time=1.0, x=0, z=20).values, [[113]])
+            ds = readFFPlanesPar(case, 'y', saveOutput=True, nCores=1, outputformat='nc')
+            self.assertTrue(os.path.isfile(os.path.join(path, 'ds_ySlices_temp_cond0_1_case0_2_seed0_1.nc')))
+            np.testing.assert_equal(ds['u'].values, ref['u'].values)
+            ds.close()
+            with self.assertRaises(ValueError):
+                readFFPlanesPar(case, 'y', nCores=1, outputformat='h5')
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def corruptPlane(self, case, caseIndex):
+        filename = case.planeFile(caseIndex, 1, 1)
+        with open(filename, 'rb') as f:
+            b = f.read()
+        with open(filename, 'wb') as f:
+            f.write(b[:len(b)-20])
+
+    def test_readFFPlanesPar_failure(self):
+        path = tempfile.mkdtemp()
+        try:
+            case = FFCase(path)
+            self.corruptPlane(case, 1)
+            # Nothing can be resumed, the exception of the region is raised
+            with self.assertRaises(Exception) as cm:
+                readFFPlanesPar(case, 'y', saveOutput=False, nCores=1)
+            self.assertIn('1/2 regions failed', str(cm.exception))
+            self.assertIsNotNone(cm.exception.__cause__)
+            with self.assertRaises(Exception):
+                readFFPlanesPar(case, 'y', saveOutput=True, nCores=1, outputformat='nc')
+            self.assertFalse(os.path.isfile(os.path.join(path, 'ds_ySlices_temp_cond0_1_case0_2_seed0_1.nc')))
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+    @unittest.skipIf(zarr is None, 'zarr not installed')
+    def test_readFFPlanesPar_failure_zarr(self):
+        path = tempfile.mkdtemp()
+        try:
+            case = FFCase(path)
+            store = os.path.join(path, 'ds_ySlices_temp_cond0_1_case0_2_seed0_1.zarr')
+            # All regions failed
+            self.corruptPlane(case, 0)
+            self.corruptPlane(case, 1)
+            with self.assertRaises(Exception) as cm:
+                readFFPlanesPar(case, 'y', saveOutput=True, nCores=1)
+            self.assertIn('2/2 regions failed', str(cm.exception))
+            self.assertEqual(os.listdir(store+'.manifest'), ['layout.json'])
+            # Partial failure: the regions written are kept, the call can be resumed
+            case.writePlane(0, 1, 1)
+            ds = readFFPlanesPar(case, 'y', saveOutput=True, nCores=1)
+            self.assertEqual(sorted(os.listdir(store+'.manifest')), ['cond0_case0_seed0.json', 'layout.json'])
+            self.assertTrue(np.all(np.isnan(ds['u'].sel(case='Case1').values)))
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+    @unittest.skipIf(zarr is None, 'zarr not installed')
+    def test_readFFPlanesPar_resume(self):
+        path = tempfile.mkdtemp()
+        try:
+            case = FFCase(path)
+            ref = readFFPlanesPar(case, 'y', saveOutput=False, nCores=1).load()
+            store = os.path.join(path, 'ds_ySlices_temp_cond0_1_case0_2_seed0_1.zarr')
+            # First run interrupted: one snapshot of Case1 is missing, only Case0 is written
+            os.rename(case.planeFile(1, 1, 2), case.planeFile(1, 1, 2)+'.bak')
+            readFFPlanesPar(case, 'y', saveOutput=True, nCores=1)
+            self.assertEqual(sorted(os.listdir(store+'.manifest')), ['cond0_case0_seed0.json', 'layout.json'])
+            # Second run: only Case1 is processed. Case0 is modified on disk to check that it is not read again
+            os.rename(case.planeFile(1, 1, 2)+'.bak', case.planeFile(1, 1, 2))
+            case.writePlane(0, 0, 0, offset=1000)
+            ds = readFFPlanesPar(case, 'y', saveOutput=True, nCores=1)
+            self.assertEqual(len(os.listdir(store+'.manifest')), 3)
+            for v in ['u', 'v', 'w']:
+                np.testing.assert_equal(ds[v].values, ref[v].values)
+            np.testing.assert_equal(ds['case'].values, ref['case'].values)
+            # Complete store: read directly
+            ds = readFFPlanesPar(case, 'y', saveOutput=True, nCores=1)
+            np.testing.assert_equal(ds['w'].values, ref['w'].values)
+            # Different options on an existing store
+            with self.assertRaises(ValueError):
+                readFFPlanesPar(case, 'y', saveOutput=True, nCores=1, skiptime=2)
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def DELDataset(self):
+        import xarray as xr
+        rng = np.random.default_rng(2)
+        t = np.arange(0, 600, 0.5)
+        x = 1e3*np.sin(0.3*t)[None,None,None,None,:] + 200*rng.standard_normal((2, 2, 1, 1, len(t)))
+        x[1,1,0,0,:] = 50. # constant signal, no cycles
+        return xr.Dataset({'TwrBsMt_[kNm]': (['seed', 'turbine', 'wdir', 'yawCase', 'time'], x)},
+                          coords={'seed':[0,1], 'turbine':[1,2], 'wdir':[0], 'yawCase':[0], 'time':t})
+
+    def test_calcDEL_failures(self):
+        # Failed rainflow counts are stored as 0, and flagged, without stopping the processing
+        from unittest import mock
+        from openfast_toolbox.tools.fatigue import rainflow_func_dict, rainflow_astm
+        ds = self.DELDataset()
+        var = 'TwrBsMt_[kNm]'
+        def failing(signal):
+            if signal[0]<-5e6:
+                raise RuntimeError('failing method')
+            return rainflow_astm(signal)
+        ds['TwrBsMt_[kNm]'][0,1,0,0,0] = -1e4
+        with mock.patch.dict(rainflow_func_dict, {'failing':failing}):
+            ds = _calcDEL(ds, var, ['seed', 'turbine', 'wdir', 'yawCase'], lifetime=25, load2stress=0.3, slope=4, Sult=450e6, method='failing')
+        success = ds[f'fatpack_success_{var}'].values[:,:,0,0]
+        np.testing.assert_equal(success, [[1, 0], [1, 0]])
+        for k in [f'DEL_withgoodman_[Nm]_{var}', f'DEL_woutgoodman_[Nm]_{var}', f'damage_{var}']:
+            np.testing.assert_equal(ds[k].values[:,:,0,0][success==0], 0)
+            self.assertTrue(np.all(ds[k].values[:,:,0,0][success==1]>0))
+
+    @unittest.skipIf(fatpack is None, 'fatpack not installed')
+    def test_calcDEL_fatpack(self):
+        # Same results as compute_del
+        ds = self.DELDataset()
+        var = 'TwrBsMt_[kNm]'
+        ds = _calcDEL(ds, var, ['seed', 'turbine', 'wdir', 'yawCase'], lifetime=25, load2stress=0.3, slope=4, Sult=450e6, method='fatpack')
+        ts = ds[var].values[0,1,0,0]*1e3
+        elapsed = ds['time'].values[-1]-ds['time'].values[0]
+        DELg, D, _ = compute_del(ts, elapsed, 25, 0.3, 4, 450e6, return_damage=True, goodman_correction=True)
+        DEL        = compute_del(ts, elapsed, 25, 0.3, 4, 450e6, return_damage=False, goodman_correction=False)
+        np.testing.assert_allclose(ds[f'DEL_withgoodman_[Nm]_{var}'].values[0,1,0,0], DELg, rtol=1e-10)
+        np.testing.assert_allclose(ds[f'DEL_woutgoodman_[Nm]_{var}'].values[0,1,0,0], DEL, rtol=1e-10)
+        np.testing.assert_allclose(ds[f'damage_{var}'].values[0,1,0,0], D, rtol=1e-10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -255,43 +255,77 @@ def defaultUserDataDir():
 
 
 
-def detectFormat(filename, **kwargs):
+_DETECTED = {} # Detected formats, key: absolute path, value: (file stamp, fileformat)
+_HEAD_SIZE = 4096 # Number of bytes read for the format probes
+
+def _fileStamp(filename):
+    st = os.stat(filename)
+    return (st.st_mtime_ns, st.st_size)
+
+def _extensionMatch(myformat, ext):
+    """ True if the extension matches the format extensions (or the extension patterns)"""
+    import re
+    if ext in myformat.extensions:
+        return True
+    # Try patterns if present
+    extPatterns = [ef.replace('.',r'\.').replace('$',r'\$').replace('*','[.]*') for ef in myformat.extensions if '*' in ef]
+    if len(extPatterns)>0:
+        extPatMatch = [re.match(pat, ext) is not None for pat in extPatterns]
+        return any(extPatMatch)
+    return False
+
+def _probe(myformat, head, filename):
+    """ Returns the result of the format probe: True, False or None (unknown)"""
+    if myformat.probe is None:
+        return None
+    try:
+        return myformat.probe(head, filename)
+    except Exception as e:
+        return None
+
+def detectFormat(filename, detectCache=True, **kwargs):
     """ Detect the file formats by looping through the known list. 
+        The formats matching the file extension are first probed with the first bytes of
+        the file (see `File.probe`): formats with a positive probe are tried first, formats
+        with a negative probe are discarded, the others are tried in order of priority.
         The method may simply try to open the file, if that's the case
-        the read file is returned. """
+        the read file is returned. 
+        If `detectCache` is True, the detected format is stored for this file (path and
+        modification time), and used directly the next time the file is read. """
     import os
-    import re
     global _FORMATS
     if _FORMATS is None:
         formats=fileFormats()
     else:
         formats=_FORMATS
-    ext = os.path.splitext(filename.lower())[1]
-    detected = False
-    i = 0 
-    while not detected and i<len(formats):
-        myformat = formats[i]
-        if ext in myformat.extensions:
-            extMatch = True
-        else:
-            # Try patterns if present
-            extPatterns = [ef.replace('.',r'\.').replace('$',r'\$').replace('*','[.]*') for ef in myformat.extensions if '*' in ef]
-            if len(extPatterns)>0:
-                extPatMatch = [re.match(pat, ext) is not None for pat in extPatterns]
-                extMatch = any(extPatMatch)
-            else:
-                extMatch = False
-        if extMatch: # we have a match on the extension
+    # --- Format previously detected for this file
+    key = os.path.abspath(filename)
+    if detectCache:
+        stamp = _fileStamp(filename)
+        if key in _DETECTED and _DETECTED[key][0]==stamp:
+            myformat = _DETECTED[key][1]
             valid, F = isRightFormat(myformat, filename, **kwargs)
             if valid:
-                #print('File detected as :',myformat)
-                detected=True
-                return myformat,F
-
-        i += 1
+                return myformat, F
+            del _DETECTED[key]
+    # --- Candidates based on extensions, sorted based on probes
+    ext = os.path.splitext(filename.lower())[1]
+    candidates = [myformat for myformat in formats if _extensionMatch(myformat, ext)]
+    head = b''
+    if len(candidates)>0:
+        with open(filename, 'rb') as fid:
+            head = fid.read(_HEAD_SIZE)
+    probes = [_probe(myformat, head, filename) for myformat in candidates]
+    candidates = [f for f,p in zip(candidates, probes) if p is True] + [f for f,p in zip(candidates, probes) if p is None]
+    for myformat in candidates:
+        valid, F = isRightFormat(myformat, filename, **kwargs)
+        if valid:
+            #print('File detected as :',myformat)
+            if detectCache:
+                _DETECTED[key] = (stamp, myformat)
+            return myformat,F
 
-    if not detected:
-        raise FormatNotDetectedError('The file format could not be detected for the file: '+filename)
+    raise FormatNotDetectedError('The file format could not be detected for the file: '+filename)
 
 def read(filename, fileformat=None, **kwargs):
     F = None
@@ -39,6 +39,14 @@ class BModesOutFile(File):
         """ Short string (~100 char) identifying the file format"""
         return 'BModes output file'
 
+    @staticmethod
+    def probe(head, filename=None):
+        """ "BModes" is found on the first line """
+        lines = head.split(b'\n')
+        if len(lines)>1:
+            return lines[0].find(b'BModes')>=0
+        return None
+
     def __init__(self, filename=None, **kwargs):
         """ Class constructor. If a `filename` is given, the file is read. """
         self.filename = filename
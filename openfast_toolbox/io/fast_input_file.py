@@ -2,6 +2,7 @@ import numpy as np
 import os
 import pandas as pd
 import re
+import copy
 try:
     from .file import File, WrongFormatError, BrokenFormatError
 except:
@@ -50,6 +51,19 @@ class FASTInputFile(File):
     def formatName():
         return 'FAST input file'
 
+    @staticmethod
+    def probe(head, filename=None):
+        """ Text files, usually starting with a line of dashes """
+        if head.find(b'\x00')>=0:
+            return False
+        lines = head.lstrip().split(b'\n')
+        if len(lines)>1:
+            if lines[0].lower().find(b'time series input file')>=0:
+                return False # TurbSim time series
+            if lines[0].startswith(b'--') or lines[0].startswith(b'=='):
+                return True
+        return None
+
     def __init__(self, filename=None, **kwargs):
         self._fixedfile = None
         self.basefile = FASTInputFileBase(filename, **kwargs) # Generic fileformat
@@ -111,6 +125,27 @@ class FASTInputFile(File):
     def write(self, filename=None):
         return self.fixedfile.write(filename)
 
+    def clone(self, filename=None):
+        """ 
+        Return a copy of this file that can be modified and written independently, without parsing again.
+        The lines are copied, but their values are shared until they are replaced (e.g. `f[key]=value`). 
+        NOTE: values modified in place (e.g. `f['OutList'].append(s)`) are modified in both objects.
+        """
+        fixedfile = self.fixedfile # Detecting the file format once, for all the clones
+        new = copy.copy(self)
+        new.basefile = self.basefile.clone(filename)
+        if fixedfile is self.basefile:
+            new._fixedfile = new.basefile
+        else:
+            # The fixed file format shares the lines of the base file
+            new._fixedfile = copy.copy(fixedfile)
+            new._fixedfile.data        = new.basefile.data
+            new._fixedfile._index      = {k:list(I) for k,I in new.basefile._index.items()}
+            new._fixedfile._indexStamp = new.basefile._indexStamp
+            if filename is not None:
+                new._fixedfile.filename = filename
+        return new
+
     def toDataFrame(self):
         return self.fixedfile.toDataFrame()
 
@@ -163,6 +198,7 @@ class FASTInputFile(File):
         if i>=0:
             d = self.data[i]
             del self.data[i]
+            self.fixedfile._indexRemove(i, d)
             return d
         else:
             if error:
@@ -179,9 +215,13 @@ class FASTInputFile(File):
         d['isComment'] = True
         try:
             self.data.insert(i, d)
+            self.fixedfile._indexInsert(i, d)
         except:
             import pdb; pdb.set_trace()
 
+    def renameKey(self, key, newKey):
+        self.fixedfile.renameKey(key, newKey)
+
     def insertKeyVal(self, i, key, value, description='', error=False):
         d = getDict()
         d['value']     = value
@@ -189,6 +229,7 @@ class FASTInputFile(File):
         d['descr']     = description
         d['isComment'] = False
         self.data.insert(i, d)
+        self.fixedfile._indexInsert(i, d)
 
     def insertKeyValAfter(self, key_prev, key, value, description, error=False):
         i = self.fixedfile.getIDSafe(key_prev)
@@ -253,11 +294,23 @@ class FASTInputFileBase(File):
         self.hasNodal = hasNodal
         self.module   = module
         self.filename = filename
+        self._invalidateIndex()
 
     def keys(self):
         self.labels = [ d['label'] for i,d in enumerate(self.data) if (not d['isComment']) and (i not in self._IComment)]
         return self.labels
 
+    def clone(self, filename=None):
+        """ Return a copy of this file, with copied lines and shared values, see FASTInputFile.clone"""
+        index = self._labelIndex()
+        new = copy.copy(self)
+        new.data = [dict(d) for d in self.data]
+        new._index      = {k:list(I) for k,I in index.items()}
+        new._indexStamp = (id(new.data), len(new.data))
+        if filename is not None:
+            new.filename = filename
+        return new
+
     def getID(self,label):
         i=self.getIDSafe(label)
         if i<0:
@@ -265,24 +318,88 @@ class FASTInputFileBase(File):
         else:
             return i
     def getIDs(self,label):
-        I=[]
-        # brute force search
-        for i in range(len(self.data)):
-            d = self.data[i]
-            if d['label'].lower()==label.lower():
-                I.append(i)
+        I = self._lookup(label)
         if len(I)==0:
             raise KeyError('Variable `'+ label+'` not found in FAST file:'+self.filename)
         else:
-            return I
+            return list(I)
 
     def getIDSafe(self,label):
-        # brute force search
-        for i in range(len(self.data)):
-            d = self.data[i]
-            if d['label'].lower()==label.lower():
-                return i
-        return -1
+        I = self._lookup(label)
+        return I[0] if len(I)>0 else -1
+
+    # --------------------------------------------------------------------------------}
+    # --- Label index: lower case label -> indices in self.data 
+    # --------------------------------------------------------------------------------{
+    def _buildIndex(self):
+        index = {}
+        for i, d in enumerate(self.data):
+            index.setdefault(d['label'].lower(), []).append(i)
+        self._index      = index
+        self._indexStamp = (id(self.data), len(self.data))
+        return index
+
+    def _invalidateIndex(self):
+        """ To be called when labels of self.data are modified in place (see also `renameKey`)"""
+        self._index = None
+
+    def _indexRename(self, i, oldLabel):
+        """ Update the index after the label of line `i` was changed from `oldLabel` """
+        if getattr(self, '_index', None) is None or self._indexStamp != (id(self.data), len(self.data)):
+            self._invalidateIndex()
+            return
+        key = oldLabel.lower()
+        if i in self._index.get(key, []):
+            self._index[key].remove(i)
+            if len(self._index[key])==0:
+                del self._index[key]
+        I = self._index.setdefault(self.data[i]['label'].lower(), [])
+        I.append(i)
+        I.sort()
+
+    def _labelIndex(self):
+        """ Return the index, rebuilt if self.data was replaced or resized outside of the methods of this class"""
+        if getattr(self, '_index', None) is None or self._indexStamp != (id(self.data), len(self.data)):
+            return self._buildIndex()
+        return self._index
+
+    def _lookup(self, label):
+        """ Return the indices of a label (case insensitive) in self.data """
+        key = label.lower()
+        I = self._labelIndex().get(key, [])
+        for i in I:
+            if self.data[i]['label'].lower()!=key:
+                # A label was changed in place, rebuilding
+                return self._buildIndex().get(key, [])
+        return I
+
+    def _indexInsert(self, i, d):
+        """ Update the index after `d` was inserted at position `i` of self.data """
+        if getattr(self, '_index', None) is None or self._indexStamp != (id(self.data), len(self.data)-1):
+            self._invalidateIndex()
+            return
+        if i<0:
+            i += len(self.data)-1
+        if i<len(self.data)-1:
+            for I in self._index.values():
+                I[:] = [j+1 if j>=i else j for j in I]
+        I = self._index.setdefault(d['label'].lower(), [])
+        I.append(i)
+        I.sort()
+        self._indexStamp = (id(self.data), len(self.data))
+
+    def _indexRemove(self, i, d):
+        """ Update the index after `d` was removed from position `i` of self.data """
+        if getattr(self, '_index', None) is None or self._indexStamp != (id(self.data), len(self.data)+1):
+            self._invalidateIndex()
+            return
+        key = d['label'].lower()
+        self._index[key].remove(i)
+        if len(self._index[key])==0:
+            del self._index[key]
+        for I in self._index.values():
+            I[:] = [j-1 if j>i else j for j in I]
+        self._indexStamp = (id(self.data), len(self.data))
 
     # Making object an iterator
     def __iter__(self):
@@ -334,6 +451,16 @@ class FASTInputFileBase(File):
             d['descr']=descr
         if i<0:
             self.data.append(d)
+            self._indexInsert(len(self.data)-1, d)
+
+    def renameKey(self, key, newKey):
+        """ Change the label of a line (index or label), keeping the label index up to date.
+        NOTE: labels modified directly in self.data are not detected, call `_invalidateIndex` after.
+        """
+        i = key if isinstance(key, int) else self.getID(key)
+        oldLabel = self.data[i]['label']
+        self.data[i]['label'] = newKey
+        self._indexRename(i, oldLabel)
 
     def addValKey(self,val,key,descr=None):
         self.addKeyVal(key, val, descr)
@@ -343,6 +470,7 @@ class FASTInputFileBase(File):
         d['isComment'] = True
         d['value']     = comment
         self.data.append(d)
+        self._indexInsert(len(self.data)-1, d)
 
     def addTable(self, label, tab, cols=None, units=None, tabType=1, tabDimVar=None):
         d=getDict()
@@ -353,6 +481,7 @@ class FASTInputFileBase(File):
         d['tabColumnNames'] = cols
         d['tabUnits']       = units
         self.data.append(d)
+        self._indexInsert(len(self.data)-1, d)
 
     @property
     def comment(self):
@@ -366,6 +495,7 @@ class FASTInputFileBase(File):
             self.data[i]['label'] = ''
             self.data[i]['descr'] = ''
             self.data[i]['isComment'] = True
+        self._invalidateIndex()
 
     @property
     def _IComment(self):
@@ -1592,8 +1722,8 @@ class BDFile(FASTInputFileBase):
             i  = self.getID('kp_total')
             listval = [int(v) for v in str(self.data[i+1]['value']).split()]
             self.data[i+1]['value']=listval
-            self.data[i+1]['label']='kp_per_member'
             self.data[i+1]['isComment']=False
+            self.renameKey(i+1, 'kp_per_member')
         self.module='BD'
 
     def _writeSanityChecks(self):
@@ -1601,7 +1731,7 @@ class BDFile(FASTInputFileBase):
         self['kp_total']=self['MemberGeom'].shape[0]
         i  = self.getID('kp_total')
         self.data[i+1]['value']=[1, self['MemberGeom'].shape[0]] # kp_per_member
-        self.data[i+1]['label']='kp_per_member'
+        self.renameKey(i+1, 'kp_per_member')
         # Could check length of OutNd
 
     def _toDataFrame(self):
@@ -1977,12 +2107,14 @@ class ADPolarFile(FASTInputFileBase):
                     i = self.getIDSafe(labRaw+labOffset)
                     if i>0:
                         self.data[i]['label'] = labRaw
+            self._invalidateIndex()
             # Write
             with open(self.filename,'w') as f:
                 f.write(self.toString())
             # Restore labels 
             for i,labFull in enumerate(AllLabels):
                 self.data[i]['label'] = labFull
+            self._invalidateIndex()
 
     def _toDataFrame(self):
         dfs = FASTInputFileBase._toDataFrame(self)
@@ -2231,6 +2363,59 @@ class ExtPtfmFile(FASTInputFileBase):
 
 
 
+# --------------------------------------------------------------------------------}
+# --- Benchmark 
+# --------------------------------------------------------------------------------{
+def benchmark_key_access(filename, nRepeat=10, verbose=True):
+    """ 
+    Measure the time needed to get and set all the keys of an input file `nRepeat` times,
+    using the label index of FASTInputFileBase, and using a linear search over the lines (legacy).
+    The time needed to look up keys that are not in the file (misses, e.g. optional keys
+    probed with getIDSafe) is also measured.
+    Returns a dictionary of timings in seconds.
+
+    Example:
+        benchmark_key_access('5MW_ElastoDyn.dat')
+    """
+    import time
+    f = FASTInputFile(filename).fixedfile
+    keys = [k for k in f.keys() if len(k)>0]
+    def getIDLinear(label):
+        for i in range(len(f.data)):
+            if f.data[i]['label'].lower()==label.lower():
+                return i
+        return -1
+    timings = {}
+    t0 = time.perf_counter()
+    for r in range(nRepeat):
+        for k in keys:
+            f[k] = f[k]
+    timings['index'] = time.perf_counter()-t0
+    t0 = time.perf_counter()
+    for r in range(nRepeat):
+        for k in keys:
+            i = getIDLinear(k)
+            f.data[getIDLinear(k)]['value'] = f.data[i]['value']
+    timings['linear'] = time.perf_counter()-t0
+    missing = [k+'_missing' for k in keys]
+    t0 = time.perf_counter()
+    for r in range(nRepeat):
+        for k in missing:
+            f.getIDSafe(k)
+    timings['index-miss'] = time.perf_counter()-t0
+    t0 = time.perf_counter()
+    for r in range(nRepeat):
+        for k in missing:
+            getIDLinear(k)
+    timings['linear-miss'] = time.perf_counter()-t0
+    if verbose:
+        print('{} keys, {} lines, {} repetitions'.format(len(keys), len(f.data), nRepeat))
+        for k, t in timings.items():
+            nAccess = nRepeat*len(keys) if k.endswith('miss') else 2*nRepeat*len(keys)
+            print('{:11s}: {:8.4f}s  ({:.2f}us per access)'.format(k, t, t/nAccess*1e6))
+    return timings
+
+
 if __name__ == "__main__":
     f = FASTInputFile('tests/example_files/FASTIn_HD_SeaState.dat')
     print(f)
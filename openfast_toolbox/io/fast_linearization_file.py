@@ -1,19 +1,21 @@
 import os
 import numpy as np
 import re
+import warnings
 try:
     from .file import File, WrongFormatError, BrokenFormatError
 except:
     File = dict
     class BrokenFormatError(Exception): pass
 
-class SlowReaderNeededError(Exception):
-    pass
-
 
 _lin_vec = ['x','xd','xdot','u','y','z','header']
 _lin_mat = ['A','B','C','D','dUdu','dUdy', 'StateRotation', 'M']
 _lin_dict = ['x_info','xdot_info','u_info','y_info']
+_lin_list = ['header', 'EDDOF']
+_starPattern = re.compile(r"[\*]+") # Overflow values `*****` in Fortran outputs
+_starSubStr = ' inf '
+_CACHE_VERSION = 1
 
 class FASTLinearizationFile(File):
     """ 
@@ -55,7 +57,7 @@ class FASTLinearizationFile(File):
         if filename:
             self.read(**kwargs)
 
-    def read(self, filename=None, starSub=None, removeStatesPattern=None):
+    def read(self, filename=None, starSub=None, removeStatesPattern=None, cache=False, skipMatrices=None):
         """ Reads the file self.filename, or `filename` if provided
 
         - starSub: if None, raise an error if `****` are present
@@ -64,6 +66,13 @@ class FASTLinearizationFile(File):
                            otherwise search for states matching a pattern and remove them
                            e.g:  'tower|Drivetrain'  or '^AD'
                            see removeStates in this file.
+        - cache: if True, the parsed file is stored in a binary sidecar file `<filename>.npz`, 
+                           which is read instead of the ASCII file as long as the modification
+                           time and size of the lin file are unchanged. 
+                           The cache is independent of `starSub` and `removeStatesPattern`, 
+                           which are applied after reading.
+        - skipMatrices: list of matrices that are not needed (e.g. ['dUdu', 'dUdy']). 
+                           Their lines are skipped without being parsed, and they are not stored.
         """
         
         # --- Standard tests and exceptions (generic code)
@@ -76,16 +85,29 @@ class FASTLinearizationFile(File):
         if os.stat(self.filename).st_size == 0:
             raise EmptyFileError('File is empty:',self.filename)
 
+        skipMatrices = [] if skipMatrices is None else list(skipMatrices)
+
+        # --- Cached data
+        if cache:
+            if self._readCache():
+                self._starSubstitute(starSub)
+                self._removeMatrices(skipMatrices)
+                if removeStatesPattern is not None:
+                    self.removeStates(pattern=removeStatesPattern)
+                return
+            # The cache stores the raw values, `****` are substituted after
+            starSubUser, starSub = starSub, np.inf
+            # The cache stores all matrices
+            skipMatricesUser, skipMatrices = skipMatrices, []
+
         # --- Main Data
         self['header']=[]
 
         # --- StarValues replacement `*****` -> inf
-        starPattern = re.compile(r"[\*]+")
-        starSubStr = ' inf '
-        starSubFn  = lambda si: starPattern.sub(starSubStr, si)
+        starSubFn  = lambda si: _starPattern.sub(_starSubStr, si)
 
-        # Reading function, with slow or fast reader. See sub functions at end of this file
-        def doRead(slowReader=False):
+        # Reading function. See sub functions at end of this file
+        def doRead():
             with open(self.filename, 'r', errors="surrogateescape") as f:
                 # --- Reader header
                 self['header'], lastLine=readToMarker(f, 'Jacobians included', 30)
@@ -115,32 +137,120 @@ class FASTLinearizationFile(File):
                     elif line.find('Order of constraint states:')>=0:
                         self['z'], self['z_info'] = readOP(f, nz, 'z', defaultDerivOrder=0, starSubFn=starSubFn, starSub=starSub)
                     elif line.find('A:')>=0:
-                        self['A'] = readMat(f, nx, nx, 'A', slowReader=slowReader, filename=self.filename, starSubFn=starSubFn, starSub=starSub)
+                        self['A'] = readMat(f, nx, nx, 'A', filename=self.filename, starSub=starSub, skip='A' in skipMatrices)
                     elif line.find('B:')>=0:
-                        self['B'] = readMat(f, nx, nu, 'B', slowReader=slowReader, filename=self.filename, starSubFn=starSubFn, starSub=starSub)
+                        self['B'] = readMat(f, nx, nu, 'B', filename=self.filename, starSub=starSub, skip='B' in skipMatrices)
                     elif line.find('C:')>=0:
-                        self['C'] = readMat(f, ny, nx, 'C', slowReader=slowReader, filename=self.filename, starSubFn=starSubFn, starSub=starSub)
+                        self['C'] = readMat(f, ny, nx, 'C', filename=self.filename, starSub=starSub, skip='C' in skipMatrices)
                     elif line.find('D:')>=0:
-                        self['D'] = readMat(f, ny, nu, 'D', slowReader=slowReader, filename=self.filename, starSubFn=starSubFn, starSub=starSub)
+                        self['D'] = readMat(f, ny, nu, 'D', filename=self.filename, starSub=starSub, skip='D' in skipMatrices)
                     elif line.find('dUdu:')>=0:
-                        self['dUdu'] = readMat(f, nu, nu,'dUdu', slowReader=slowReader, filename=self.filename, starSubFn=starSubFn, starSub=starSub)
+                        self['dUdu'] = readMat(f, nu, nu, 'dUdu', filename=self.filename, starSub=starSub, skip='dUdu' in skipMatrices)
                     elif line.find('dUdy:')>=0:
-                        self['dUdy'] = readMat(f, nu, ny,'dUdy', slowReader=slowReader, filename=self.filename, starSubFn=starSubFn, starSub=starSub)
+                        self['dUdy'] = readMat(f, nu, ny, 'dUdy', filename=self.filename, starSub=starSub, skip='dUdy' in skipMatrices)
                     elif line.find('StateRotation:')>=0:
                         pass
                         # TODO
                         #StateRotation:
                     elif line.find('ED M:')>=0:
                         self['EDDOF'] = line[5:].split()
-                        self['M']     = readMat(f, 24, 24,'M', slowReader=slowReader, filename=self.filename, starSubFn=starSubFn, starSub=starSub)
-        try:
-            doRead(slowReader=False)
-        except SlowReaderNeededError:
-            doRead(slowReader=True)
+                        self['M']     = readMat(f, 24, 24, 'M', filename=self.filename, starSub=starSub, skip='M' in skipMatrices)
+        doRead()
+        self._removeMatrices(skipMatrices)
+
+        if cache:
+            self._writeCache()
+            self._starSubstitute(starSubUser)
+            self._removeMatrices(skipMatricesUser)
 
         if removeStatesPattern is not None:
             self.removeStates(pattern=removeStatesPattern)
 
+    # --------------------------------------------------------------------------------}
+    # --- Binary cache 
+    # --------------------------------------------------------------------------------{
+    @property
+    def cacheFile(self):
+        return self.filename+'.npz'
+
+    def _fileStamp(self):
+        st = os.stat(self.filename)
+        return np.array([st.st_mtime_ns, st.st_size, _CACHE_VERSION], dtype=np.int64)
+
+    def _readCache(self):
+        """ Read the binary sidecar file if it exists and is up to date. Returns True on success """
+        if not os.path.isfile(self.cacheFile):
+            return False
+        try:
+            with np.load(self.cacheFile, allow_pickle=False) as data:
+                if not np.array_equal(data['__stamp'], self._fileStamp()):
+                    return False
+                for k in data['__none']:
+                    self[str(k)] = None
+                for key in data.files:
+                    if key.startswith('__'):
+                        continue
+                    v = data[key]
+                    if key.find('/')>0:
+                        k, sub = key.split('/')
+                        if k not in self.keys():
+                            self[k] = {}
+                        self[k][sub] = v
+                    elif key in _lin_list:
+                        self[key] = list(v)
+                    elif v.ndim==0:
+                        self[key] = v.item()
+                    else:
+                        self[key] = v
+        except Exception as e:
+            print('[WARN] Failed to read cache file {}: {}'.format(self.cacheFile, e))
+            for k in list(self.keys()):
+                del self[k]
+            return False
+        return True
+
+    def _writeCache(self):
+        """ Write the parsed data to the binary sidecar file (atomically) """
+        data = {'__stamp': self._fileStamp(), '__none': np.array([k for k,v in self.items() if v is None], dtype=str)}
+        for k,v in self.items():
+            if v is None:
+                continue
+            if isinstance(v, dict):
+                for sub, vsub in v.items():
+                    data[k+'/'+sub] = np.asarray(vsub)
+            elif k in _lin_list:
+                data[k] = np.array(v, dtype=str)
+            else:
+                data[k] = np.asarray(v)
+        tmpFile = self.cacheFile + '.tmp{}'.format(os.getpid())
+        try:
+            with open(tmpFile, 'wb') as f:
+                np.savez(f, **data)
+            os.replace(tmpFile, self.cacheFile)
+        except OSError as e:
+            print('[WARN] Failed to write cache file {}: {}'.format(self.cacheFile, e))
+            if os.path.exists(tmpFile):
+                os.remove(tmpFile)
+
+    def _removeMatrices(self, names):
+        for k in names:
+            if k in self.keys():
+                del self[k]
+
+    def _starSubstitute(self, starSub):
+        """ Replace infinite values (`****` in the file) by starSub, or raise an exception if starSub is None"""
+        for k in _lin_vec+_lin_mat:
+            if k not in self.keys() or not isinstance(self[k], np.ndarray) or self[k].dtype.kind!='f':
+                continue
+            bInf = np.isinf(self[k])
+            if np.any(bInf):
+                sKind = 'matrix' if k in _lin_mat else 'vector'
+                sErr = 'Some ill-formated/infinite values (e.g. `*******`) were found in the {} `{}`\n\tin linflile: {}'.format(sKind, k, self.filename)
+                if starSub is None:
+                    raise Exception(sErr)
+                print('[WARN] '+sErr)
+                self[k][bInf] = starSub
+
     def toString(self):
         s=''
         return s
@@ -567,38 +677,47 @@ def readOP(fid, n, name='', defaultDerivOrder=1, filename='', starSubFn=None, st
 
 
 
-def readMat(fid, n, m, name='', slowReader=False, filename='', starSubFn=None, starSub=None):
-    if not slowReader:
-        try:
-            return np.array([fid.readline().strip().split() for i in np.arange(n)],dtype=float)
-        except:
-            print('[INFO] Failed to read some value in matrix {}, trying slower reader'.format(name))
-            raise SlowReaderNeededError()
-    else:
-        #vals = vals.ravel()
-        #vals = np.array(list(map(starSubFn, vals))).reshape(n,m)
-        vals=np.array([starSubFn( fid.readline().strip() ).split() for i in np.arange(n)], dtype=str)
-        try:
-            vals = vals.astype(float) # This could potentially fail
-        except:
-            raise Exception('Failed to convert into an array of float the matrix `{}`\n\tin linfile: {}'.format(name, filename))
-        if vals.shape[0]!=n or vals.shape[1]!=m:
-            shape1 = vals.shape
-            shape2 = (n,m)
-            raise Exception('Shape of matrix `{}` has wrong dimension ({} instead of {})\n\tin linfile: {}'.format(name, shape1, shape2, name, filename))
-
-        nNaN = np.sum(np.isnan(vals.ravel()))
-        nInf = np.sum(np.isinf(vals.ravel()))
-        if nInf>0:
+def readMat(fid, n, m, name='', filename='', starSub=None, skip=False):
+    """ 
+    Read a matrix of `n` lines and `m` columns from the current position of `fid`.
+    The block of lines is parsed at once, overflow values `****` are substituted in bulk
+    by `inf`, and then by `starSub` (an exception is raised if `starSub` is None).
+    If `skip` is True, the lines are consumed but not parsed, and None is returned.
+    """
+    block = ''.join([fid.readline() for i in range(n)])
+    if skip:
+        return None
+    bStar = block.find('*')>=0
+    if bStar:
+        block = _starPattern.sub(_starSubStr, block)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning) # Stops silently at invalid data with old numpy versions
+            vals = np.fromstring(block, sep=' ')
+    except ValueError:
+        vals = None
+    if vals is None or vals.size!=n*m:
+        # Finding the faulty line for the error message
+        lines = block.splitlines()
+        for i, line in enumerate(lines):
+            try:
+                row = np.array(line.split(), dtype=float)
+            except:
+                raise Exception('Failed to convert into an array of float the matrix `{}` (line {})\n\tin linfile: {}'.format(name, i+1, filename))
+            if len(row)!=m:
+                raise Exception('Shape of matrix `{}` has wrong dimension (line {} has {} values instead of {})\n\tin linfile: {}'.format(name, i+1, len(row), m, filename))
+        raise Exception('Shape of matrix `{}` has wrong dimension ({} lines instead of {})\n\tin linfile: {}'.format(name, len(lines), n, filename))
+    vals = vals.reshape(n, m)
+    if bStar:
+        bInf = np.isinf(vals)
+        if np.any(bInf):
             sErr = 'Some ill-formated/infinite values (e.g. `*******`) were found in the matrix `{}`\n\tin linflile: {}'.format(name, filename)
             if starSub is None:
                 raise Exception(sErr)
             else:
                 print('[WARN] '+sErr)
-                vals[np.isinf(vals)] = starSub
-        if nNaN>0:
-            raise Exception('Some NaN values were found in the matrix `{}`\n\tin linfile: `{}`.'.format(name, filename))
-        return vals
+                vals[bInf] = starSub
+    return vals
 
 if __name__ == '__main__':
     f = FASTLinearizationFile('../../data/example_files/StandstillSemi_ForID_EDHD.1.lin')
@@ -0,0 +1,205 @@
+"""
+Persistent cache of OpenFAST output files (.out, .outb) converted to a columnar format.
+
+Each output file is stored in a sub-directory of the cache directory, with one `.npy` file
+per channel and a `info.json` file (channel names, units, description).
+The sub-directory name is a hash of the absolute path, size, modification time and header
+of the output file, so that a modified output file is never read from the cache, and of the data
+type of the stored channels, so that a file read in single precision is not returned for a
+double precision read.
+Channels are loaded lazily, as memory-mapped arrays, using a `LazyChannelTable`.
+The least recently used entries are removed when the total size of the cache exceeds `maxSize`.
+
+Main content:
+
+- class FASTOutputCache()
+
+Examples
+--------
+
+    # Directly through FASTOutputFile
+    f = FASTOutputFile('5MW.outb', cache_dir='_cache') # first read: converts and stores the file
+    f = FASTOutputFile('5MW.outb', cache_dir='_cache') # second read: loads from the cache
+    Omega = f.data['RotSpeed_[rpm]']                   # only this channel is loaded
+
+    # Using the cache object
+    cache = FASTOutputCache('_cache', maxSize=5*1024**3)
+    print(cache.size, len(cache.entries()))
+    cache.clear()
+
+"""
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+from .fast_output_file import LazyChannelTable, selectChannels, timeWindow
+
+
+class FASTOutputCache(object):
+    """
+    Persistent cache of converted OpenFAST output files, see module documentation.
+    """
+    def __init__(self, cache_dir, maxSize=10*1024**3, nHeaderBytes=4096):
+        """
+        INPUTS:
+          - cache_dir: directory where the converted files are stored (created if needed)
+          - maxSize: maximum size of the cache in bytes. Default: 10GB. None: no limit
+          - nHeaderBytes: number of bytes at the beginning of the file used in the key
+        """
+        self.cache_dir    = cache_dir
+        self.maxSize      = maxSize
+        self.nHeaderBytes = nHeaderBytes
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, filename, dtype=None):
+        """ Returns the key of an output file, based on its path, size, modification time and header,
+        and on the data type of the channels (default: float64)"""
+        st = os.stat(filename)
+        with open(filename, 'rb') as f:
+            header = f.read(self.nHeaderBytes)
+        dtype = np.dtype('float64' if dtype is None else dtype)
+        h = hashlib.sha1('{}|{}|{}|{}|'.format(os.path.abspath(filename), st.st_size, st.st_mtime_ns, dtype.str).encode('utf-8'))
+        h.update(header)
+        return h.hexdigest()
+
+    def _entryDir(self, filename, dtype=None):
+        return os.path.join(self.cache_dir, self.key(filename, dtype=dtype))
+
+    def contains(self, filename, dtype=None):
+        """ Returns True if a valid cache entry exists for `filename` and the data type `dtype`"""
+        return os.path.isfile(os.path.join(self._entryDir(filename, dtype=dtype), 'info.json'))
+
+    def load(self, filename, channels=None, tmin=None, tmax=None, dtype=None):
+        """
+        Returns (data, info) for `filename` if it is in the cache, otherwise None.
+        `data` is a LazyChannelTable, channels are memory-mapped when accessed.
+        See `FASTOutputFile.read` for the selection of `channels`, `tmin` and `tmax`.
+        Only an entry stored with the same data type `dtype` (default: float64) is returned.
+        """
+        entryDir = self._entryDir(filename, dtype=dtype)
+        infoFile = os.path.join(entryDir, 'info.json')
+        if not os.path.isfile(infoFile):
+            return None
+        with open(infoFile, 'r') as f:
+            info = json.load(f)
+        os.utime(infoFile) # Last access, used for the LRU eviction
+        names = info['attribute_names']
+        units = info['attribute_units']
+        nRows = info['nRows']
+
+        def channel(iCol):
+            return np.load(os.path.join(entryDir, 'c{:05d}.npy'.format(iCol)), mmap_mode='r')
+
+        # Selection of rows and columns
+        iCols = selectChannels(names, channels, units)
+        IRows = slice(0, nRows)
+        if tmin is not None or tmax is not None:
+            IRows = timeWindow(channel(0), tmin, tmax)
+        info['attribute_names'] = [names[i] for i in iCols]
+        if units is not None and len(units)==len(names):
+            info['attribute_units'] = [units[i] for i in iCols]
+        nRows = len(range(nRows)[IRows])
+
+        def loader(j):
+            return channel(iCols[j])[IRows]
+
+        dtype = info['dtype'] if dtype is None else dtype
+        data = LazyChannelTable(info['attribute_names'], loader, nRows, dtype=dtype)
+        return data, info
+
+    def store(self, filename, data, info, dtype=None):
+        """
+        Stores the `data` (array, DataFrame or LazyChannelTable) and `info` of `filename`.
+        `dtype` is the data type that was requested when reading the file (default: float64), it is part of the key.
+        Returns True if the data was stored.
+        """
+        entryDir = self._entryDir(filename, dtype=dtype)
+        if os.path.isfile(os.path.join(entryDir, 'info.json')):
+            return True
+        tmpDir = entryDir + '.tmp{}'.format(os.getpid())
+        try:
+            os.makedirs(tmpDir, exist_ok=True)
+            nRows, nCols = data.shape
+            for iCol in range(nCols):
+                if isinstance(data, LazyChannelTable):
+                    col = data.column(iCol, cache=False)
+                elif isinstance(data, pd.DataFrame):
+                    col = data.iloc[:,iCol].values
+                else:
+                    col = data[:,iCol]
+                np.save(os.path.join(tmpDir, 'c{:05d}.npy'.format(iCol)), np.ascontiguousarray(col))
+            dtype = data.dtype if isinstance(data, LazyChannelTable) else np.asarray(col).dtype
+            description = info.get('description', '')
+            meta = {'filename'       : os.path.abspath(filename),
+                    'nRows'          : int(nRows),
+                    'dtype'          : str(dtype),
+                    'binary'         : bool(info.get('binary', False)),
+                    'description'    : description if isinstance(description, (str, list)) else str(description),
+                    'attribute_names': [str(n) for n in info['attribute_names']],
+                    'attribute_units': None if info.get('attribute_units') is None else [str(u) for u in info['attribute_units']],
+                    }
+            # info file written last: an entry is valid only if it exists
+            with open(os.path.join(tmpDir, 'info.json'), 'w') as f:
+                json.dump(meta, f)
+            os.replace(tmpDir, entryDir)
+        except Exception as e:
+            shutil.rmtree(tmpDir, ignore_errors=True)
+            if os.path.isfile(os.path.join(entryDir, 'info.json')):
+                return True # Stored by another process
+            print('[WARN] FASTOutputCache: failed to store {}: {}'.format(filename, e))
+            return False
+        self.evict(keep=[os.path.basename(entryDir)])
+        return True
+
+    def entries(self):
+        """ Returns a list of (key, size in bytes, last access time) for all valid entries"""
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            entryDir = os.path.join(self.cache_dir, key)
+            infoFile = os.path.join(entryDir, 'info.json')
+            if not os.path.isfile(infoFile):
+                continue
+            size = sum(e.stat().st_size for e in os.scandir(entryDir) if e.is_file())
+            entries.append((key, size, os.stat(infoFile).st_mtime))
+        return entries
+
+    @property
+    def size(self):
+        """ Total size of the cache in bytes"""
+        return sum(e[1] for e in self.entries())
+
+    def evict(self, keep=None):
+        """ Removes least recently used entries until the cache size is below `maxSize`"""
+        if self.maxSize is None:
+            return
+        keep = [] if keep is None else keep
+        entries = sorted(self.entries(), key=lambda e: e[2])
+        size = sum(e[1] for e in entries)
+        for key, s, _ in entries:
+            if size<=self.maxSize:
+                break
+            if key in keep:
+                continue
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            size -= s
+
+    def remove(self, filename, dtype=None):
+        """ Removes the entry of `filename` for the data type `dtype` from the cache"""
+        shutil.rmtree(self._entryDir(filename, dtype=dtype), ignore_errors=True)
+
+    def clear(self):
+        """ Removes all entries from the cache"""
+        for key, _, _ in self.entries():
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+
+    def __repr__(self):
+        entries = self.entries()
+        s='<{} object> with attributes:\n'.format(type(self).__name__)
+        s+=' - cache_dir: {}\n'.format(self.cache_dir)
+        s+=' - maxSize:   {}\n'.format(self.maxSize)
+        s+=' - entries:   {} ({:.1f} MB)\n'.format(len(entries), sum(e[1] for e in entries)/1024**2)
+        return s
@@ -5,8 +5,12 @@ Main content:
 
 - class FASTOutputFile()
 - data, info = def load_output(filename)
-- data, info = def load_ascii_output(filename)
-- data, info = def load_binary_output(filename, use_buffer=True)
+- data, info = def load_ascii_output(filename, method='numpy')
+- def benchmark_ascii_output(filename)
+- data, info = def load_binary_output(filename, use_buffer=True, mmap=False)
+- class LazyChannelTable()
+- class FASTOutputStream()
+- iCols = def selectChannels(names, channels)
 - def writeDataFrame(df, filename, binary=True)
 - def writeBinary(fileName, channels, chanNames, chanUnits, fileID=2, descStr='')
 
@@ -20,6 +24,12 @@ NOTE:
 
 """
 from itertools import takewhile
+from concurrent.futures import ThreadPoolExecutor
+import fnmatch
+import io
+import mmap
+import time
+import warnings
 import numpy as np
 import pandas as pd
 import struct
@@ -69,6 +79,17 @@ class FASTOutputFile(File):
         df['Time_[s]'] -=100
         f.writeDataFrame(df, '5MW_TimeShifted.outb')
 
+        # memory-map a large binary file, channels are decoded when accessed
+        f = FASTOutputFile('5MW.outb', mmap=True, dtype='float32')
+        Omega = f.data['RotSpeed_[rpm]'] 
+
+        # read only some channels (names, glob or regex), after a given time
+        f = FASTOutputFile('5MW.outb', channels=['RotSpeed', 'BldPitch*', r'AB1N\\d+Alpha'], tmin=100)
+
+        # monitor a file that is being written, new rows are returned every 10s
+        for df in FASTOutputFile().follow('5MW.out', interval=10, timeout=600):
+            print(df['Time_[s]'].values[-1])
+
     """
 
     @staticmethod
@@ -79,8 +100,26 @@ class FASTOutputFile(File):
     def formatName():
         return 'FAST output file'
 
+    @staticmethod
+    def probe(head, filename=None):
+        """ Binary files start with a known FileID, ASCII files with a "generated by/on" statement """
+        if filename is not None and os.path.splitext(filename)[1].lower()=='.outb':
+            if len(head)>=2:
+                return int(np.frombuffer(head[:2], dtype=np.int16)[0]) in [FileFmtID_WithTime, FileFmtID_WithoutTime, FileFmtID_NoCompressWithoutTime, FileFmtID_ChanLen_In]
+            return None
+        if head[:1000].lower().find(b'predictions were generated')>=0:
+            return True
+        return None
+
     def __init__(self, filename=None, **kwargs):
-        """ Class constructor. If a `filename` is given, the file is read. """
+        """ Class constructor. If a `filename` is given, the file is read. 
+
+        Optional keyword arguments are passed to the readers, e.g. for binary files:
+          - mmap: if True, the data is memory-mapped and `self.data` is a `LazyChannelTable`,
+                  where each channel is decoded the first time it is accessed.
+          - dtype: data type of the decoded channels (e.g. 'float32'), default is 'float64'
+        See `read` for the other arguments.
+        """
         # Data
         self.filename    = filename
         self.data        = None  # pandas.DataFrame
@@ -88,8 +127,19 @@ class FASTOutputFile(File):
         if filename:
             self.read(**kwargs)
 
-    def read(self, filename=None, **kwargs):
-        """ Reads the file self.filename, or `filename` if provided """
+    def read(self, filename=None, channels=None, tmin=None, tmax=None, cache_dir=None, cache_size=10*1024**3, **kwargs):
+        """ Reads the file self.filename, or `filename` if provided 
+
+        INPUTS:
+          - channels: list of channels to read. Each item is either a channel name (with or without
+                      unit), a glob pattern (e.g. 'BldPitch*') or a regular expression (e.g. r'AB1N\\d+Alpha').
+                      The time column is always read. Default: None, all channels are read.
+          - tmin, tmax: time window to read. Default: None, all the time steps are read.
+          - cache_dir: if provided, the file is stored in this directory in a columnar format the
+                      first time it is read, and later reads are done from there (see FASTOutputCache).
+                      `self.data` is then a `LazyChannelTable`, channels are loaded when accessed.
+          - cache_size: maximum size of the cache directory in bytes, see FASTOutputCache.
+        """
         
         # --- Standard tests and exceptions (generic code)
         if filename:
@@ -113,8 +163,20 @@ class FASTOutputFile(File):
         ext = os.path.splitext(self.filename.lower())[1]
         info={}
         self['binary']=False
+        cache  = None
+        cached = None
+        if cache_dir is not None:
+            # NOTE: the full file is read and stored on a cache miss, the selection is done on the cache
+            from .fast_output_cache import FASTOutputCache
+            cache  = FASTOutputCache(cache_dir, maxSize=cache_size)
+            cached = cache.load(self.filename, channels=channels, tmin=tmin, tmax=tmax, dtype=kwargs.get('dtype', None))
+        elif channels is not None or tmin is not None or tmax is not None:
+            kwargs.update(channels=channels, tmin=tmin, tmax=tmax)
         try:
-            if ext in ['.out','.elev','.dbg','.dbg2']:
+            if cached is not None:
+                self.data, info = cached
+                self['binary'] = info['binary']
+            elif ext in ['.out','.elev','.dbg','.dbg2']:
                 self.data, info = load_ascii_output(self.filename, **kwargs)
             elif ext=='.outb':
                 self.data, info = load_binary_output(self.filename, **kwargs)
@@ -138,22 +200,18 @@ class FASTOutputFile(File):
             raise WrongFormatError('FAST Out File {}: {}'.format(self.filename,e.args))
         if self.data.shape[0]==0:
             raise EmptyFileError('This FAST output file contains no data: {}'.format(self.filename))
-
+        if cache is not None and cached is None:
+            info['binary'] = self['binary']
+            if not cache.store(self.filename, self.data, info, dtype=kwargs.get('dtype', None)):
+                return self.read(channels=channels, tmin=tmin, tmax=tmax, **kwargs)
+            self.data, info = cache.load(self.filename, channels=channels, tmin=tmin, tmax=tmax, dtype=kwargs.get('dtype', None))
 
 
         # --- Convert to DataFrame
-        if info['attribute_units'] is not None:
-            info['attribute_units'] = [re.sub(r'[()\[\]]','',u) for u in info['attribute_units']]
-            if len(info['attribute_names'])!=len(info['attribute_units']):
-                cols=info['attribute_names']
-                print('[WARN] not all columns have units! Skipping units')
-            else:
-                cols=[n+'_['+u.replace('sec','s')+']' for n,u in zip(info['attribute_names'], info['attribute_units'])]
-        else:
-            cols=info['attribute_names']
+        cols = columnLabels(info['attribute_names'], info['attribute_units'])
         self.description = info.get('description', '')
         self.description = ''.join(self.description) if isinstance(self.description,list) else self.description
-        if isinstance(self.data, pd.DataFrame):
+        if isinstance(self.data, (pd.DataFrame, LazyChannelTable)):
             self.data.columns = cols
         else:
             if len(cols)!=self.data.shape[1]:
@@ -180,11 +238,12 @@ class FASTOutputFile(File):
                 f.write('\t'.join(['{:>10s}'.format(c)         for c in self.channels])+'\n')
                 f.write('\t'.join(['{:>10s}'.format('('+u+')') for u in self.units])+'\n')
                 # TODO better..
-                if self.data is not None:
-                    if isinstance(self.data, pd.DataFrame) and not self.data.empty:
-                        f.write('\n'.join(['\t'.join(['{:10.4f}'.format(y.iloc[0])]+['{: .5e}'.format(x) for x in y.iloc[1:]]) for _, y in self.data.iterrows()]))
+                data = self.toDataFrame()
+                if data is not None:
+                    if isinstance(data, pd.DataFrame) and not data.empty:
+                        f.write('\n'.join(['\t'.join(['{:10.4f}'.format(y.iloc[0])]+['{: .5e}'.format(x) for x in y.iloc[1:]]) for _, y in data.iterrows()]))
                     else: # in case data beeing array or list of list.
-                        f.write('\n'.join(['\t'.join(['{:10.4f}'.format(y)]+['{: .5e}'.format(x) for x in y]) for y in self.data]))
+                        f.write('\n'.join(['\t'.join(['{:10.4f}'.format(y)]+['{: .5e}'.format(x) for x in y]) for y in data]))
 
     @property
     def channels(self):
@@ -212,8 +271,30 @@ class FASTOutputFile(File):
         units = [unit(c) for c in self.data.columns]
         return units
 
+    def follow(self, filename=None, interval=1.0, timeout=None, **kwargs):
+        """ 
+        Generator returning DataFrames with the rows appended to the file since the previous iteration,
+        for files that are still being written. See `FASTOutputStream` for the keyword arguments.
+         - interval: time in seconds between two polls of the file
+         - timeout: stop when no new data is found for `timeout` seconds. Default: None, never stop
+        """
+        if filename:
+            self.filename = filename
+        return FASTOutputStream(self.filename, **kwargs).follow(interval=interval, timeout=timeout)
+
+    def iter_chunks(self, filename=None, chunkSize=8*1024**2, **kwargs):
+        """ 
+        Generator returning the rows currently present in the file as DataFrames of about `chunkSize` bytes.
+        See `FASTOutputStream` for the keyword arguments.
+        """
+        if filename:
+            self.filename = filename
+        return FASTOutputStream(self.filename, **kwargs).iter_chunks(chunkSize=chunkSize)
+
     def toDataFrame(self):
         """ Returns object into one DataFrame, or a dictionary of DataFrames"""
+        if isinstance(self.data, LazyChannelTable):
+            return self.data.toDataFrame()
         return self.data
 
     def writeDataFrame(self, df, filename, binary=True):
@@ -337,7 +418,7 @@ class FASTOutputFile(File):
             raise Exception('Not overwritting {}. Specify a filename or an extension.'.format(filename))
         
         # NOTE: fileID=2 will chop the channels name of long channels use fileID4 instead
-        channels = self.data
+        channels = self.toDataFrame()
         chanNames = self.channels
         chanUnits = self.units
         descStr   = self.description
@@ -346,9 +427,323 @@ class FASTOutputFile(File):
         writeBinary(filename, channels, chanNames, chanUnits, fileID=fileID, descStr=descStr)
 
 
+# --------------------------------------------------------------------------------
+# --- Lazy table of channels
+# --------------------------------------------------------------------------------
+class LazyChannelTable(object):
+    """ 
+    Minimal DataFrame-like table where each column is computed the first time it is accessed.
+
+    The values of column `iCol` are returned by `loader(iCol)`, and are then cached.
+    This is used for memory-mapped binary files, where `loader` decodes one channel
+    from the packed data.
+
+    Examples
+    --------
+        f = FASTOutputFile('5MW.outb', mmap=True)
+        Omega = f.data['RotSpeed_[rpm]']               # only this channel is decoded
+        df    = f.data[['Time_[s]', 'RotSpeed_[rpm]']] # DataFrame with a selection of channels
+        df    = f.toDataFrame()                        # DataFrame with all channels
+    """
+    def __init__(self, columns, loader, nRows, dtype='float64'):
+        self._loader = loader
+        self._nRows  = nRows
+        self._cache  = {}
+        self.dtype   = np.dtype(dtype)
+        self._columns = pd.Index([])
+        self.columns  = columns
+
+    @property
+    def columns(self):
+        return self._columns
+
+    @columns.setter
+    def columns(self, cols):
+        cols = pd.Index(cols)
+        if len(self._columns)>0 and len(cols)!=len(self._columns):
+            raise ValueError('Length mismatch: table has {} columns, new labels have {} elements'.format(len(self._columns), len(cols)))
+        self._columns = cols
+        # First occurence is used for duplicated labels
+        self._iCols = {}
+        for iCol, c in enumerate(cols):
+            self._iCols.setdefault(c, iCol)
+
+    @property
+    def shape(self):
+        return (self._nRows, len(self._columns))
+
+    @property
+    def empty(self):
+        return self._nRows==0 or len(self._columns)==0
+
+    @property
+    def values(self):
+        return self._toArray(range(len(self._columns)))
+
+    def __len__(self):
+        return self._nRows
+
+    def __contains__(self, key):
+        return key in self._iCols
+
+    def __array__(self, dtype=None, copy=None):
+        values = self.values
+        return values if dtype is None else values.astype(dtype)
+
+    def keys(self):
+        return self._columns
+
+    def column(self, iCol, cache=True):
+        """ Returns the values of the column at position `iCol`, computing them if needed.
+        If `cache` is False, the values are not stored for later accesses."""
+        if iCol in self._cache:
+            return self._cache[iCol]
+        values = np.asarray(self._loader(iCol), dtype=self.dtype)
+        if cache:
+            self._cache[iCol] = values
+        return values
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self._iCols:
+                raise KeyError(key)
+            return pd.Series(self.column(self._iCols[key]), name=key)
+        return self.toDataFrame(columns=key)
+
+    def _toArray(self, iCols):
+        # NOTE: columns not in cache are not stored in the cache to avoid storing them twice
+        data = np.empty((self._nRows, len(iCols)), dtype=self.dtype)
+        for j, iCol in enumerate(iCols):
+            data[:,j] = self._cache[iCol] if iCol in self._cache else self._loader(iCol)
+        return data
+
+    def toDataFrame(self, columns=None):
+        """ Returns a DataFrame with all the columns, or the selected `columns` """
+        if columns is None:
+            columns = self._columns
+        iCols = []
+        for c in columns:
+            if c not in self._iCols:
+                raise KeyError(c)
+            iCols.append(self._iCols[c])
+        return pd.DataFrame(data=self._toArray(iCols), columns=[self._columns[i] for i in iCols], copy=False)
+
+    def __repr__(self):
+        return '<{} object> with {} rows, {} columns ({} decoded)'.format(type(self).__name__, self._nRows, len(self._columns), len(self._cache))
+
+
+# --------------------------------------------------------------------------------
+# --- Incremental reader
+# --------------------------------------------------------------------------------
+class FASTOutputStream(object):
+    """ 
+    Incremental reader of an OpenFAST output file that is still being written.
+
+    Each call to `poll` returns a DataFrame with the rows appended since the previous call,
+    or None if there are no new rows. 
+    For ASCII files, the byte offset after the last complete line is kept between calls, 
+    so that each poll only reads the new data.
+    OpenFAST writes binary files at the end of the simulation, their rows are returned once the 
+    file is complete.
+
+    Examples
+    --------
+        stream = FASTOutputStream('5MW.out', channels=['RotSpeed', 'GenPwr'])
+        df = stream.poll() # rows written so far
+        ...
+        df = stream.poll() # rows written since the last poll
+
+        # Generator, polls the file every 10s
+        for df in stream.follow(interval=10, timeout=600):
+            print(df['Time_[s]'].values[-1])
+    """
+    def __init__(self, filename, channels=None, dtype='float64', binary=None, maxHeaderLines=35):
+        """ 
+        INPUTS:
+          - channels: list of channel names or patterns to read, see `selectChannels`. Default: all
+          - dtype: data type of the returned data
+          - binary: True for binary files. Default: None, detected from the extension or the content.
+        """
+        self.filename = filename
+        self.channels = channels
+        self.dtype    = dtype
+        self.binary   = binary
+        self.maxHeaderLines = maxHeaderLines
+        self.offset   = 0     # byte offset of the first unread line (ASCII)
+        self.nRows    = 0     # number of rows returned so far
+        self.columns  = None  # column labels, known once the header is read
+        self.finished = False # True when no more data is expected
+        self._iCols   = None
+
+    def _isBinary(self):
+        if self.binary is None:
+            ext = os.path.splitext(self.filename.lower())[1]
+            if ext=='.outb':
+                self.binary = True
+            elif ext in ['.out','.elev','.dbg','.dbg2']:
+                self.binary = False
+            else:
+                self.binary = isBinary(self.filename)
+        return self.binary
+
+    def _readHeader(self, f):
+        """ Reads the header of an ASCII file, sets the columns and the data offset. Returns False if incomplete"""
+        f.seek(0)
+        raw = f.read(65536)
+        lines = raw.split(b'\n')[:-1] # Only complete lines
+        offset = 0
+        for i, l in enumerate(lines[:self.maxHeaderLines]):
+            offset += len(l)+1
+            words = l.decode('ascii', errors='ignore').split()
+            first_word = (words+['dummy'])[0].lower()
+            if first_word in ['time', 'alpha']:
+                if i+1>=len(lines):
+                    return False # units not written yet
+                names = words
+                units = [u[1:-1] for u in lines[i+1].decode('ascii', errors='ignore').split()]
+                self._iCols = selectChannels(names, self.channels, units)
+                names = [names[j] for j in self._iCols]
+                if len(units)>max(self._iCols):
+                    units = [units[j] for j in self._iCols]
+                self.columns = columnLabels(names, units)
+                self.offset = offset + len(lines[i+1]) + 1
+                return True
+        if len(lines)>=self.maxHeaderLines:
+            raise WrongFormatError('Could not find the keyword "Time" or "Alpha" in the first {} lines of the file {}'.format(self.maxHeaderLines, self.filename))
+        return False
+
+    def poll(self, maxBytes=None):
+        """ Returns a DataFrame with the rows appended since the last call, or None.
+        `maxBytes` limits the number of bytes read for ASCII files."""
+        if self.finished or not os.path.isfile(self.filename):
+            return None
+        if self._isBinary():
+            return self._pollBinary()
+        with open(self.filename, 'rb') as f:
+            if self.columns is None:
+                if not self._readHeader(f):
+                    return None
+            f.seek(self.offset)
+            block = f.read(-1 if maxBytes is None else maxBytes)
+            iEnd = block.rfind(b'\n')
+            if iEnd<0 and maxBytes is not None and len(block)==maxBytes:
+                # Line longer than maxBytes
+                block += f.readline()
+                iEnd = block.rfind(b'\n')
+        if iEnd<0:
+            return None
+        block = block[:iEnd+1] # Incomplete last line kept for the next poll
+        self.offset += len(block)
+        # Lines starting with "This" are found at the end of some files
+        iThis = 0 if block.startswith(b'This') else block.find(b'\nThis')+1
+        if iThis>0 or block.startswith(b'This'):
+            block = block[:iThis]
+            self.finished = True
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore') # empty lines
+            data = np.loadtxt(io.BytesIO(block), usecols=self._iCols, dtype=self.dtype, ndmin=2)
+        if data.shape[0]==0:
+            return None
+        self.nRows += data.shape[0]
+        return pd.DataFrame(data=data, columns=self.columns)
+
+    def _pollBinary(self):
+        try:
+            data, info = load_binary_output(self.filename, mmap=True, channels=self.channels, dtype=self.dtype)
+        except Exception:
+            return None # Binary file not complete
+        self.finished = True
+        self.columns = columnLabels(info['attribute_names'], info['attribute_units'])
+        data.columns = self.columns
+        df = data.toDataFrame()
+        self.nRows += df.shape[0]
+        return df
+
+    def iter_chunks(self, chunkSize=8*1024**2):
+        """ Generator returning the new rows present in the file, as DataFrames of about `chunkSize` bytes"""
+        while True:
+            offset = self.offset
+            df = self.poll(maxBytes=chunkSize)
+            if df is not None:
+                yield df
+            elif self.finished or self.offset==offset:
+                return
+
+    def follow(self, interval=1.0, timeout=None):
+        """ 
+        Generator returning the new rows of the file as they are written.
+         - interval: time in seconds between two polls of the file
+         - timeout: stop when no new data is found for `timeout` seconds. Default: None, never stop
+        The generator stops when the end of the file is detected (binary files or "This" line).
+        """
+        tLast = time.time()
+        while True:
+            df = self.poll()
+            if df is not None:
+                tLast = time.time()
+                yield df
+            if self.finished:
+                return
+            if timeout is not None and time.time()-tLast>timeout:
+                return
+            time.sleep(interval)
+
+
 # --------------------------------------------------------------------------------
 # --- Helper low level functions 
 # --------------------------------------------------------------------------------
+def columnLabels(names, units):
+    """ Returns the column labels "name_[unit]" used in the DataFrames """
+    if units is None:
+        return names
+    units = [re.sub(r'[()\[\]]','',u) for u in units]
+    if len(names)!=len(units):
+        print('[WARN] not all columns have units! Skipping units')
+        return names
+    return [n+'_['+u.replace('sec','s')+']' for n,u in zip(names, units)]
+
+def selectChannels(names, channels, units=None):
+    """ 
+    Returns the sorted indices of the channels in `names` that match the list `channels`.
+    The first channel (time) is always selected.
+
+    Each item of `channels` is matched, in this order, as:
+      - a channel name, or a channel name with unit (e.g. 'GenPwr' or 'GenPwr_[kW]'), ignoring case
+      - a glob pattern (e.g. 'BldPitch*')
+      - a regular expression (e.g. r'AB1N\\d+Alpha')
+    """
+    if channels is None:
+        return list(range(len(names)))
+    if isinstance(channels, str):
+        channels = [channels]
+    namesLow = [n.lower() for n in names]
+    if units is not None and len(units)==len(names):
+        namesUnit = [(n+'_['+u+']').lower() for n,u in zip(names, units)]
+    else:
+        namesUnit = namesLow
+    iCols = set([0])
+    for pattern in channels:
+        p = pattern.lower()
+        I = [i for i,(n,nu) in enumerate(zip(namesLow, namesUnit)) if p==n or p==nu]
+        if len(I)==0:
+            I = [i for i,n in enumerate(namesLow) if fnmatch.fnmatchcase(n, p)]
+        if len(I)==0:
+            try:
+                reg = re.compile(pattern, re.IGNORECASE)
+                I = [i for i,n in enumerate(names) if reg.fullmatch(n)]
+            except re.error:
+                pass
+        if len(I)==0:
+            print('[WARN] No channel matching `{}`'.format(pattern))
+        iCols.update(I)
+    return sorted(iCols)
+
+def timeWindow(time, tmin=None, tmax=None):
+    """ Returns the slice of rows such that tmin<=time<=tmax, assuming `time` is increasing"""
+    i0 = 0         if tmin is None else np.searchsorted(time, tmin, side='left')
+    i1 = len(time) if tmax is None else np.searchsorted(time, tmax, side='right')
+    return slice(int(i0), int(max(i0,i1)))
+
 def isBinary(filename):
     with open(filename, 'r') as f:
         try:
@@ -367,10 +762,87 @@ def isBinary(filename):
 
 
 
-def load_ascii_output(filename, method='numpy', encoding='ascii', **kwargs):
+def _asciiDataRange(buf, nSkipLines):
+    """ 
+    Returns the byte range [i0, i1) of the numerical data of an ASCII output file loaded in `buf`.
+    The data starts after `nSkipLines` lines (header, channel names and units), and ends
+    before the first line starting with "This" (found at the end of some Hydro Out files).
+    """
+    i0 = 0
+    for i in range(nSkipLines):
+        i0 = buf.find(b'\n', i0) + 1
+        if i0==0:
+            return len(buf), len(buf)
+    i1 = len(buf)
+    iThis = buf.find(b'\nThis', max(i0-1, len(buf)-65536))
+    if iThis>=0:
+        i1 = iThis + 1
+    return i0, i1
+
+def _splitLines(buf, i0, i1, chunkSize):
+    """ Split the byte range [i0, i1) into chunks of about `chunkSize` bytes, at line boundaries."""
+    bounds = [i0]
+    while bounds[-1]<i1:
+        i = buf.find(b'\n', min(bounds[-1]+chunkSize, i1-1), i1)
+        bounds.append(i1 if i<0 else i+1)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def _loadChunks(buf, chunks, nCols, dtype='float64', nThreads=None):
+    """ 
+    Parses the chunks of lines of `buf` in parallel into a preallocated array.
+    Each chunk is parsed with the C engine of pandas, which releases the GIL while tokenizing
+    and converting, so that the threads run concurrently (np.loadtxt holds the GIL).
+    The number of rows of each chunk is estimated from its number of line feeds. If a chunk 
+    contains empty lines, the estimate is wrong, and the array is concatenated instead.
+    """
+    nRows = [buf[c0:c1].count(b'\n') + (buf[c1-1:c1]!=b'\n') for c0, c1 in chunks]
+    iRow0 = np.concatenate(([0], np.cumsum(nRows))).astype(int)
+    data = np.empty((iRow0[-1], nCols), dtype=dtype)
+
+    def parseChunk(i):
+        c0, c1 = chunks[i]
+        try:
+            d = pd.read_csv(io.BytesIO(buf[c0:c1]), sep=r'\s+', header=None, dtype=dtype, na_filter=False, engine='c').values
+        except pd.errors.EmptyDataError:
+            d = np.empty((0, nCols), dtype=dtype)
+        if d.shape==(nRows[i], nCols):
+            data[iRow0[i]:iRow0[i+1],:] = d
+            return None
+        return d
+
+    if nThreads is None:
+        nThreads = os.cpu_count() or 1
+    nThreads = max(min(nThreads, len(chunks)), 1)
+    if nThreads==1:
+        unmatched = [parseChunk(i) for i in range(len(chunks))]
+    else:
+        with ThreadPoolExecutor(max_workers=nThreads) as ex:
+            unmatched = list(ex.map(parseChunk, range(len(chunks))))
+    if any(d is not None for d in unmatched):
+        data = np.concatenate([data[iRow0[i]:iRow0[i+1],:] if d is None else d for i, d in enumerate(unmatched) if d is None or d.size>0])
+    return data
 
 
-    if method in ['forLoop','pandas']:
+def load_ascii_output(filename, method='numpy', encoding='ascii', channels=None, tmin=None, tmax=None, dtype=None, nThreads=None, chunkSize=8*1024**2, **kwargs):
+    """
+    Reads an ASCII OpenFAST output file.
+
+    INPUTS:
+     - method: 
+        - 'numpy': single threaded, using np.loadtxt (default)
+        - 'parallel': the data is split into chunks of lines, parsed by `nThreads` threads 
+                      (pandas C engine), see `benchmark_ascii_output` for the speedup on a given machine
+        - 'pandas', 'forLoop', 'listCompr': single threaded methods
+     - channels: list of channel names or patterns to read, see `selectChannels`. Default: all
+     - tmin, tmax: time window to read. Default: all time steps
+     - dtype: data type of the returned data, used by the 'numpy' and 'parallel' methods and partial reads. Default: float64
+     - nThreads: number of threads for the 'parallel' method. Default: number of CPUs
+     - chunkSize: size in bytes of the chunks parsed by each thread for the 'parallel' method.
+    """
+    if method=='parallel' and encoding!='ascii':
+        method='numpy'
+
+    if method in ['forLoop']:
         from .file import numberOfLines
         nLines = numberOfLines(filename, method=2)
 
@@ -390,7 +862,7 @@ def load_ascii_output(filename, method='numpy', encoding='ascii', **kwargs):
                 f.close()
                 encoding=''
                 print('[WARN] Attempt to re-read the file with encoding utf-16')
-                return load_ascii_output(filename=filename, method=method, encoding='utf-16')
+                return load_ascii_output(filename=filename, method=method, encoding='utf-16', channels=channels, tmin=tmin, tmax=tmax, dtype=dtype)
             first_word = (l+' dummy').lower().split()[0]
             in_header=  (first_word != 'time') and  (first_word != 'alpha')
             if in_header:
@@ -407,18 +879,48 @@ def load_ascii_output(filename, method='numpy', encoding='ascii', **kwargs):
         nHeader = len(header)+1
         nCols = len(info['attribute_names'])
 
-        if method=='numpy':
+        partial = channels is not None or tmin is not None or tmax is not None
+        if partial:
+            iCols = selectChannels(info['attribute_names'], channels, info['attribute_units'])
+            info['attribute_names'] = [info['attribute_names'][i] for i in iCols]
+            if len(info['attribute_units'])==nCols:
+                info['attribute_units'] = [info['attribute_units'][i] for i in iCols]
+
+        if partial and method in ['numpy', 'parallel']:
+            # Only the lines within the time window are parsed, and only for the selected columns
+            def lines():
+                for l in f:
+                    sp = l.split(None, 1)
+                    if len(sp)==0 or sp[0].startswith('This'):
+                        continue
+                    t = float(sp[0])
+                    if tmin is not None and t<tmin:
+                        continue
+                    if tmax is not None and t>tmax:
+                        break
+                    yield l
+            data = np.loadtxt(lines(), usecols=iCols, ndmin=2, dtype=dtype or 'float64')
+            return data, info
+
+        if method=='parallel':
+            # Chunks of lines are parsed by the pandas C engine in parallel, from a memory map of the file
+            with open(filename, 'rb') as fb, mmap.mmap(fb.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                i0, i1 = _asciiDataRange(buf, nHeader+1)
+                chunks = _splitLines(buf, i0, i1, chunkSize)
+                data = _loadChunks(buf, chunks, nCols, dtype=dtype or 'float64', nThreads=nThreads)
+
+        elif method=='numpy':
             # The most efficient, and will remove empty lines and the lines that starts with "This"
             #  ("This" is found at the end of some Hydro Out files..)
-            data = np.loadtxt(f, comments=('This'))
+            data = np.loadtxt(f, comments=('This'), dtype=dtype or 'float64')
 
         elif method =='pandas':
-            # Could probably be made more efficient, but 
+            # Parse the data range (without header and "This" lines) with the default C engine
             f.close()
-            nRows = nLines-nHeader
-            sep=r'\s+'
-            cols= ['C{}'.format(i) for i in range(nCols)]
-            df = pd.read_csv(filename, sep=sep, header=0, skiprows=nHeader, names=cols, dtype=float, na_filter=False, nrows=nRows, engine='pyarrow'); print(df)
+            with open(filename, 'rb') as fb:
+                buf = fb.read()
+            i0, i1 = _asciiDataRange(buf, nHeader+1)
+            df = pd.read_csv(io.BytesIO(buf[i0:i1]), sep=r'\s+', header=None, dtype=float, na_filter=False)
             data=df.values
 
         elif method == 'forLoop':
@@ -438,15 +940,58 @@ def load_ascii_output(filename, method='numpy', encoding='ascii', **kwargs):
         else:
             raise NotImplementedError()
 
+    if partial:
+        data = data[timeWindow(data[:,0], tmin, tmax)][:, iCols]
     return data, info
 
 
-def load_binary_output(filename, use_buffer=False, method='mix', **kwargs):
+def benchmark_ascii_output(filename, methods=['numpy','pandas','parallel'], nRepeat=1, verbose=True, **kwargs):
+    """ 
+    Measure the throughput (MB/s) of the different methods of `load_ascii_output` on a file.
+    Keyword arguments are passed to `load_ascii_output` (e.g. nThreads, dtype)
+    For the 'parallel' method, the throughput with a single thread is also measured 
+    (key 'parallel-1'), the ratio of the two is the multi-core speedup on this machine.
+
+    Example:
+        python -m openfast_toolbox.io.fast_output_file 5MW.out
+
+    """
+    MB = os.path.getsize(filename)/1024**2
+    runs = []
+    for method in methods:
+        if method=='parallel':
+            runs.append(('parallel-1', method, dict(kwargs, nThreads=1)))
+        runs.append((method, method, kwargs))
+    throughputs = {}
+    for label, method, kw in runs:
+        elapsed = np.inf
+        for i in range(nRepeat):
+            t0 = time.perf_counter()
+            data, info = load_ascii_output(filename, method=method, **kw)
+            elapsed = min(elapsed, time.perf_counter()-t0)
+        throughputs[label] = MB/elapsed
+        if verbose:
+            print('{:10s} {:8.1f} MB in {:7.3f}s  {:8.1f} MB/s  shape: {}'.format(label, MB, elapsed, throughputs[label], data.shape))
+    if verbose and 'parallel' in throughputs:
+        nThreads = kwargs.get('nThreads', None) or os.cpu_count() or 1
+        print('Parallel speedup with {} threads: {:.2f}'.format(nThreads, throughputs['parallel']/throughputs['parallel-1']))
+    return throughputs
+
+
+def load_binary_output(filename, use_buffer=False, method='mix', mmap=False, dtype=None, channels=None, tmin=None, tmax=None, **kwargs):
     """
     03/09/15: Ported from ReadFASTbinary.m by Mads M Pedersen, DTU Wind
     24/10/18: Low memory/buffered version by E. Branlard, NREL
     18/01/19: New file format for extended channels, by E. Branlard, NREL
     20/11/23: Improved performances using np.fromfile, by E. Branlard, NREL
+
+    INPUTS:
+     - mmap: if True, the packed data is memory-mapped, and `data` is returned as a
+             LazyChannelTable, where each channel is scaled the first time it is accessed.
+     - dtype: data type of the returned data. Default is float64.
+     - channels: list of channel names or patterns to read, see `selectChannels`. Default: all
+     - tmin, tmax: time window to read. Default: all time steps
+                  Only the selected rows and columns of the packed data are read and scaled.
     """
     StructDict = {
             'uint8':   ('B', 1, np.uint8), 
@@ -576,7 +1121,10 @@ def load_binary_output(filename, use_buffer=False, method='mix', **kwargs):
             if cnt < NT:
                 raise Exception('Could not read entire %s file: read %d of %d time values' % (filename, cnt, NT))
 
-        if use_buffer:
+        partial = channels is not None or tmin is not None or tmax is not None
+        if mmap or partial:
+            offset = fid.tell()
+        elif use_buffer:
             # Reading data using buffers, and allowing an offset for time column (nOff=1)
             if FileID == FileFmtID_NoCompressWithoutTime:
                 data = freadRowOrderTableBuffered(fid, nPts, 'float64', NumOutChans, nOff=1, type_out='float64')
@@ -600,6 +1148,49 @@ def load_binary_output(filename, use_buffer=False, method='mix', **kwargs):
     else:
         time = TimeOut1 + TimeIncr * np.arange(NT)
 
+    info = {'name': os.path.splitext(os.path.basename(filename))[0],
+            'description': DescStr,
+            'fileID': FileID,
+            'attribute_names': ChanName,
+            'attribute_units': ChanUnit}
+
+    if mmap or partial:
+        # -------------------------
+        #  Memory map the packed data, channels are scaled on access
+        # -------------------------
+        packedType = np.float64 if FileID == FileFmtID_NoCompressWithoutTime else np.int16
+        nBytes = nPts * np.dtype(packedType).itemsize
+        if os.path.getsize(filename) - offset < nBytes:
+            raise Exception('Could not read entire %s file: expected %d bytes of data' % (filename, nBytes))
+        if nPts>0:
+            PackedData = np.memmap(filename, dtype=packedType, mode='r', offset=offset, shape=(NT, NumOutChans))
+        else:
+            PackedData = np.zeros((NT, NumOutChans), dtype=packedType)
+
+        # Selection of rows and columns
+        iCols = selectChannels(ChanName, channels, ChanUnit)
+        IRows = timeWindow(time, tmin, tmax)
+        time  = time[IRows]
+        PackedData = PackedData[IRows]
+        nRows = len(time)
+        info['attribute_names'] = [ChanName[i] for i in iCols]
+        info['attribute_units'] = [ChanUnit[i] for i in iCols]
+
+        def loader(j):
+            iCol = iCols[j]
+            if iCol==0:
+                return time
+            iCol -= 1
+            if np.isnan(ColScl[iCol]) and np.isnan(ColOff[iCol]):
+                return np.zeros(nRows) # probably due to a division by zero in Fortran
+            return (PackedData[:,iCol] - ColOff[iCol]) / ColScl[iCol]
+
+        dtype = 'float64' if dtype is None else dtype
+        data = LazyChannelTable(info['attribute_names'], loader, nRows, dtype=dtype)
+        if not mmap:
+            data = data.values
+        return data, info
+
     # -------------------------
     #  Scale the packed binary to real data
     # -------------------------
@@ -617,11 +1208,8 @@ def load_binary_output(filename, use_buffer=False, method='mix', **kwargs):
         data = (data - ColOff) / ColScl
         data = np.concatenate([time.reshape(NT, 1), data], 1)
 
-    info = {'name': os.path.splitext(os.path.basename(filename))[0],
-            'description': DescStr,
-            'fileID': FileID,
-            'attribute_names': ChanName,
-            'attribute_units': ChanUnit}
+    if dtype is not None:
+        data = data.astype(dtype, copy=False)
     return data, info
 
 
@@ -832,6 +1420,12 @@ def findDriverFile(filename, df=None):
 
 
 if __name__ == "__main__":
+    import sys
+    if len(sys.argv)>1:
+        for filename in sys.argv[1:]:
+            print(filename)
+            benchmark_ascii_output(filename)
+        sys.exit(0)
     scriptDir = os.path.dirname(__file__)
     B=FASTOutputFile(os.path.join(scriptDir, 'tests/example_files/FASTOutBin.outb'))
     B.to2DFields()
@@ -136,6 +136,18 @@ class File(OrderedDict):
     def formatName():
         raise NotImplementedError("Method must be implemented in the subclass")
 
+    @staticmethod
+    def probe(head, filename=None):
+        """ Cheap format check, used by `detectFormat` before attempting a full read.
+        INPUTS:
+          - head: first bytes of the file (a few KB)
+          - filename: path of the file
+        OUTPUTS:
+          - True if the file is likely of this format, False if it is certainly not,
+            None if the head is not conclusive (a full read will be attempted)
+        """
+        return None
+
     def test_write_read(self,bDelete=False):
         """ Test that we can write and then read what we wrote
         NOTE: this does not check that what we read is the same..
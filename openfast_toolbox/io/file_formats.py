@@ -21,9 +21,11 @@ class FileFormat():
         if fileclass is None:
             self.extensions = []
             self.name = ''
+            self.probe = None
         else:
             self.extensions  = fileclass.defaultExtensions()
             self.name        = fileclass.formatName()
+            self.probe       = getattr(fileclass, 'probe', None) # Optional, see File.probe
 
 
     def __repr__(self):
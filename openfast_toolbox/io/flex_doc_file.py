@@ -19,6 +19,11 @@ class FLEXDocFile(File):
     def formatName():
         return 'FLEX WaveKin file'
 
+    @staticmethod
+    def probe(head, filename=None):
+        """ First line starts with "#Program" """
+        return head.lstrip().startswith(b'#Program')
+
     def _read(self):
         with open(self.filename, 'r', errors="surrogateescape") as f:
             line1=f.readline().strip()
@@ -16,6 +16,20 @@ class HAWC2DatFile(File):
     def formatName():
         return 'HAWC2 dat file'
 
+    @staticmethod
+    def probe(head, filename=None):
+        """ HAWC2 and BHAWC outputs come with a `.sel` file, FLEX and GTSDF outputs
+        with a `.int`, `.res` or `.hdf5` file (same siblings as `ReadHawc2`) """
+        if filename is None:
+            return None
+        base, ext = os.path.splitext(filename)
+        if ext.lower()=='.sel':
+            return True
+        siblings = [filename+'.sel', filename+'.int', filename+'.res', filename+'.hdf5']
+        if ext.lower()=='.dat':
+            siblings.append(base+'.sel')
+        return any([os.path.isfile(f) for f in siblings])
+
     def __init__(self, filename=None, **kwargs):
         self.info={}
         self.data=np.array([])
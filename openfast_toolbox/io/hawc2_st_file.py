@@ -19,6 +19,18 @@ class HAWC2StFile(File):
     def formatName():
         return 'HAWC2 st file'
 
+    @staticmethod
+    def probe(head, filename=None):
+        """ Lines starting with `#` and `$` within the first lines (see `_read`) """
+        lines = head.decode('latin-1').splitlines()
+        hasPound  = any([l.startswith('#') for l in lines[:13]])
+        hasDollar = any([l.startswith('$') for l in lines[:13]])
+        if hasPound and hasDollar:
+            return True
+        elif len(lines)>13:
+            return False
+        return None
+
     def __init__(self,filename=None, **kwargs):
         self.filename = None
         if filename:
@@ -155,6 +155,18 @@ class TecplotFile(File):
     def formatName():
         return 'Tecplot ASCII file'
 
+    @staticmethod
+    def probe(head, filename=None):
+        """ The first non-comment line needs to start with a keyword """
+        for line in head.decode('latin-1').splitlines()[:-1]:
+            l = line.lower().strip()
+            if len(l)==0:
+                return False
+            if l[0]=='#':
+                continue
+            return any([l.find(k)==0 for k in Keywords])
+        return None
+
     def __init__(self,filename=None,**kwargs):
         self.filename = None
         if filename:
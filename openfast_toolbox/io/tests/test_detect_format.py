@@ -0,0 +1,63 @@
+import unittest
+import os
+import shutil
+import tempfile
+import openfast_toolbox.io as weio
+from openfast_toolbox.io.tests.helpers_for_test import MyDir
+
+
+class TestDetectFormat(unittest.TestCase):
+
+    def test_probes(self):
+        # Detected formats, with only one full read when a probe is conclusive
+        expected = {'FASTIn_ED.dat':'FAST input file', 'HAWC2_st.dat':'HAWC2 st file', 'HAWC2_out_ascii.dat':'HAWC2 dat file',
+                    'TecplotASCII_1.dat':'Tecplot ASCII file', 'BModesOut.out':'BModes output file', 'FASTOut.out':'FAST output file',
+                    'FASTOutBin.outb':'FAST output file', 'TurbSimTS.txt':'TurbSim time series', 'FLEXDocFile.out':'FLEX WaveKin file'}
+        calls = []
+        isRightFormat = weio.isRightFormat
+        def countingIsRightFormat(fileformat, filename, **kwargs):
+            calls.append(fileformat.name)
+            return isRightFormat(fileformat, filename, **kwargs)
+        weio.isRightFormat = countingIsRightFormat
+        try:
+            for f, name in expected.items():
+                del calls[:]
+                fileformat, F = weio.detectFormat(os.path.join(MyDir, f), detectCache=False)
+                self.assertEqual(fileformat.name, name)
+                self.assertEqual(calls, [name])
+        finally:
+            weio.isRightFormat = isRightFormat
+
+    def test_probe_hawc2_siblings(self):
+        from openfast_toolbox.io.hawc2_dat_file import HAWC2DatFile
+        tmpDir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpDir, 'out.dat')
+            open(filename, 'w').close()
+            self.assertFalse(HAWC2DatFile.probe(b'', filename))
+            # Siblings accepted by ReadHawc2
+            for sibling in [filename+'.int', filename+'.res', filename+'.hdf5', filename+'.sel', os.path.join(tmpDir, 'out.sel')]:
+                open(sibling, 'w').close()
+                self.assertTrue(HAWC2DatFile.probe(b'', filename))
+                os.remove(sibling)
+        finally:
+            shutil.rmtree(tmpDir)
+
+    def test_cache(self):
+        tmpDir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpDir, 'HAWC2_pc.dat')
+            shutil.copy(os.path.join(MyDir, 'HAWC2_pc.dat'), filename)
+            fileformat, F = weio.detectFormat(filename)
+            self.assertEqual(fileformat.name, 'HAWC2 PC file')
+            self.assertIs(weio._DETECTED[os.path.abspath(filename)][1], fileformat)
+            # The file is replaced by a file of another format, the cache is not used
+            shutil.copy(os.path.join(MyDir, 'FASTIn_ED.dat'), filename)
+            fileformat, F = weio.detectFormat(filename)
+            self.assertEqual(fileformat.name, 'FAST input file')
+        finally:
+            shutil.rmtree(tmpDir)
+
+
+if __name__ == '__main__':
+    unittest.main()
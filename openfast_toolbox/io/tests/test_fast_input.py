@@ -187,6 +187,40 @@ class Test(unittest.TestCase):
         self.assertTrue('AFCoeff'    in F.keys())
         self.assertEqual(F['AFCoeff'].shape, (30,4))
 
+    def test_FASTInKeyIndex(self):
+        # Case-insensitive label index, kept in sync when lines are inserted/removed
+        F=FASTInputFile(os.path.join(MyDir,'FASTIn_ED.dat'))
+        iRot = F.fixedfile.getID('RotSpeed')
+        self.assertEqual(F.fixedfile.getID('rotspeed'), iRot)
+        F.insertKeyVal(3, 'NewKey', 12, 'new key')
+        self.assertEqual(F['newkey'], 12)
+        self.assertEqual(F.fixedfile.getID('RotSpeed'), iRot+1)
+        F.insertKeyValAfter('RotSpeed', 'RotSpeed', 0.5, 'duplicate')
+        self.assertEqual(F.fixedfile.getIDs('ROTSPEED'), [iRot+1, iRot+2])
+        F['RotSpeed'] = 0.3 # all duplicates are set
+        self.assertEqual(F.data[iRot+2]['value'], 0.3)
+        F.pop('NewKey')
+        self.assertEqual(F.fixedfile.getIDs('RotSpeed'), [iRot, iRot+1])
+        self.assertEqual(F.fixedfile.getIDSafe('NewKey'), -1)
+        F.fixedfile.addKeyVal('AddedKey', 3.0)
+        self.assertEqual(F['AddedKey'], 3.0)
+        # Renamed labels are found, looking up the new name first
+        F.renameKey(iRot+1, 'RenamedKey')
+        self.assertEqual(F.fixedfile.getIDSafe('RenamedKey'), iRot+1)
+        self.assertEqual(F['renamedkey'], 0.3)
+        self.assertEqual(F.fixedfile.getIDs('RotSpeed'), [iRot])
+        F.renameKey('RotSpeed', 'RenamedKey2')
+        self.assertEqual(F.fixedfile.getIDSafe('RenamedKey2'), iRot)
+        self.assertEqual(F.fixedfile.getIDSafe('RotSpeed'), -1)
+        # Labels changed in place, with the index invalidated
+        F.data[iRot]['label'] = 'RenamedKey3'
+        F.fixedfile._invalidateIndex()
+        self.assertEqual(F.fixedfile.getIDSafe('RenamedKey3'), iRot)
+        # Index matches a brute force search
+        for i, d in enumerate(F.data):
+            I = [j for j, dd in enumerate(F.data) if dd['label'].lower()==d['label'].lower()]
+            self.assertEqual(F.fixedfile.getIDs(d['label']), I)
+
 if __name__ == '__main__':
     #Test().test_FASTEDBld()
     #Test().test_FASTADBld()
@@ -1,5 +1,7 @@
 import unittest
 import os
+import shutil
+import tempfile
 import numpy as np
 from openfast_toolbox.io.tests.helpers_for_test import MyDir, reading_test
 from openfast_toolbox.io import FASTLinearizationFile
@@ -51,6 +53,69 @@ class Test(unittest.TestCase):
         self.assertAlmostEqual(M['7_TwFADOF1']['7_TwFADOF1'],0.436753E+06)
         self.assertAlmostEqual(M['13_GeAz']['13_GeAz']     , 0.437026E+08)
 
+    def test_FASTLin_matrices(self):
+        # Overflow values, wrong shapes and skipped matrices
+        tmpDir = tempfile.mkdtemp()
+        try:
+            ref = FASTLinearizationFile(os.path.join(MyDir,'FASTLin.lin'))
+            with open(os.path.join(MyDir,'FASTLin.lin'), 'r') as f:
+                s = f.read()
+            linFile = os.path.join(tmpDir, 'FASTLin.lin')
+            with open(linFile, 'w') as f:
+                f.write(s.replace('3.91159454E-04', '**************', 1))
+            with self.assertRaises(Exception):
+                FASTLinearizationFile(linFile)
+            F = FASTLinearizationFile(linFile, starSub=-1)
+            self.assertEqual(F['A'][3,1], -1)
+            F['A'][3,1] = ref['A'][3,1]
+            np.testing.assert_array_equal(F['A'], ref['A'])
+            np.testing.assert_array_equal(F['C'], ref['C'])
+            # Skipping matrices
+            F = FASTLinearizationFile(os.path.join(MyDir,'FASTLin.lin'), skipMatrices=['A','C'])
+            self.assertFalse('A' in F.keys())
+            self.assertFalse('C' in F.keys())
+            np.testing.assert_array_equal(F['B'], ref['B'])
+            np.testing.assert_array_equal(F['D'], ref['D'])
+            # Invalid value
+            with open(linFile, 'w') as f:
+                f.write(s.replace('3.91159454E-04', '3.91159454E-04 abc', 1))
+            with self.assertRaises(Exception):
+                FASTLinearizationFile(linFile)
+        finally:
+            shutil.rmtree(tmpDir, ignore_errors=True)
+
+    def test_FASTLin_cache(self):
+        # Binary sidecar cache, independent of starSub and removeStatesPattern
+        tmpDir = tempfile.mkdtemp()
+        try:
+            linFile = os.path.join(tmpDir, 'FASTLin.lin')
+            shutil.copy(os.path.join(MyDir,'FASTLin.lin'), linFile)
+            ref = FASTLinearizationFile(linFile)
+            F1 = FASTLinearizationFile(linFile, cache=True)
+            self.assertTrue(os.path.exists(linFile+'.npz'))
+            F2 = FASTLinearizationFile(linFile, cache=True)
+            self.assertEqual(set(F2.keys()), set(ref.keys()))
+            for k in ['A', 'B', 'C', 'D', 'x', 'u', 'y']:
+                np.testing.assert_array_equal(F2[k], ref[k])
+            np.testing.assert_array_equal(F2['x_info']['Description'], ref['x_info']['Description'])
+            self.assertEqual(F2['header'], ref['header'])
+            self.assertEqual(F2['WindSpeed'], None)
+            self.assertAlmostEqual(F2['Azimuth'], ref['Azimuth'])
+            F3 = FASTLinearizationFile(linFile, cache=True, removeStatesPattern='generator')
+            np.testing.assert_almost_equal(F3.nx, 2)
+            # Modified file with `****`: cache is refreshed and starSub applied after reading
+            with open(linFile, 'r') as f:
+                s = f.read().replace('3.91159454E-04', '***************', 1) # NOTE: size changed
+            with open(linFile, 'w') as f:
+                f.write(s)
+            with self.assertRaises(Exception):
+                FASTLinearizationFile(linFile, cache=True)
+            F4 = FASTLinearizationFile(linFile, cache=True, starSub=0)
+            self.assertEqual(F4['A'][3,1], 0)
+            with self.assertRaises(Exception):
+                FASTLinearizationFile(linFile, cache=True)
+        finally:
+            shutil.rmtree(tmpDir, ignore_errors=True)
 
 
 if __name__ == '__main__':
@@ -39,6 +39,141 @@ class Test(unittest.TestCase):
         except:
             pass
 
+    def test_FASTOutBin_mmap(self):
+        # --- Reference
+        ref = FASTOutputFile(os.path.join(MyDir,'FASTOutBin.outb')).toDataFrame()
+        # --- Memory-mapped, channels are decoded on access
+        F = FASTOutputFile(os.path.join(MyDir,'FASTOutBin.outb'), mmap=True)
+        self.assertEqual(F.data.shape, ref.shape)
+        self.assertEqual(len(F.data._cache), 0)
+        np.testing.assert_array_equal(F.data['GenPwr_[kW]'].values, ref['GenPwr_[kW]'].values)
+        self.assertEqual(len(F.data._cache), 1)
+        self.assertEqual(F.channels[-1], 'GenPwr')
+        self.assertEqual(F.units[-1], 'kW')
+        df = F.toDataFrame()
+        np.testing.assert_array_equal(df.values, ref.values)
+        np.testing.assert_array_equal(df.columns, ref.columns)
+        # --- Single precision
+        F = FASTOutputFile(os.path.join(MyDir,'FASTOutBin_ID4.outb'), mmap=True, dtype='float32')
+        ref = FASTOutputFile(os.path.join(MyDir,'FASTOutBin_ID4.outb')).toDataFrame()
+        df = F.data[['Time_[s]', 'Wind1VelX_[m/s]']]
+        self.assertEqual(df['Wind1VelX_[m/s]'].dtype, np.float32)
+        np.testing.assert_allclose(df['Wind1VelX_[m/s]'].values, ref['Wind1VelX_[m/s]'].values, rtol=1e-6)
+
+    def test_FASTOut_partial(self):
+        # --- Binary, selection by name, name with unit, glob and regex
+        ref = self.DF('FASTOutBin.outb')
+        t = ref['Time_[s]'].values
+        F = FASTOutputFile(os.path.join(MyDir,'FASTOutBin.outb'), channels=['RotSpeed', 'GenPwr_[kW]', 'Wind1Vel*', r'BldPitch\d'], tmin=t[10], tmax=t[20])
+        cols = ['Time_[s]', 'Wind1VelX_[m/s]', 'Wind1VelY_[m/s]', 'Wind1VelZ_[m/s]', 'RotSpeed_[rpm]', 'BldPitch1_[deg]', 'GenPwr_[kW]']
+        df = F.toDataFrame()
+        np.testing.assert_array_equal(df.columns, cols)
+        np.testing.assert_array_equal(df.values, ref[cols].values[10:21,:])
+        # --- ASCII
+        ref = self.DF('FASTOut.out')
+        t = ref['Time_[s]'].values
+        df = FASTOutputFile(os.path.join(MyDir,'FASTOut.out'), channels=['genspeed'], tmin=t[5]).toDataFrame()
+        np.testing.assert_array_equal(df.values, ref.values[5:,:])
+        df = FASTOutputFile(os.path.join(MyDir,'FASTOut.out'), channels=[], tmax=t[2]).toDataFrame()
+        np.testing.assert_array_equal(df.values, ref.values[:3,:1])
+
+    def test_FASTOut_methods(self):
+        from openfast_toolbox.io.fast_output_file import load_ascii_output
+        for filename in ['FASTOut.out', 'FASTOut_Hydro.out']:
+            ref, _ = load_ascii_output(os.path.join(MyDir, filename), method='numpy')
+            # Small chunks to test the split at line boundaries and the trailing "This" line
+            data, info = load_ascii_output(os.path.join(MyDir, filename), method='parallel', chunkSize=64, nThreads=3)
+            np.testing.assert_array_equal(data, ref)
+            data, info = load_ascii_output(os.path.join(MyDir, filename), method='pandas')
+            np.testing.assert_array_equal(data, ref)
+            data, info = load_ascii_output(os.path.join(MyDir, filename), dtype='float32')
+            self.assertEqual(data.dtype, np.float32)
+            np.testing.assert_allclose(data, ref, rtol=1e-6)
+
+    def test_FASTOut_cache(self):
+        import tempfile
+        import shutil
+        from openfast_toolbox.io.fast_output_cache import FASTOutputCache
+        cache_dir = tempfile.mkdtemp()
+        try:
+            ref = self.DF('FASTOutBin.outb')
+            # First read stores the file, second read loads it from the cache
+            F1 = FASTOutputFile(os.path.join(MyDir,'FASTOutBin.outb'), cache_dir=cache_dir)
+            cache = FASTOutputCache(cache_dir)
+            self.assertTrue(cache.contains(os.path.join(MyDir,'FASTOutBin.outb')))
+            F2 = FASTOutputFile(os.path.join(MyDir,'FASTOutBin.outb'), cache_dir=cache_dir)
+            self.assertTrue(F2['binary'])
+            np.testing.assert_array_equal(F2.toDataFrame().values, ref.values)
+            np.testing.assert_array_equal(F2.toDataFrame().columns, ref.columns)
+            # Selection from the cache
+            F3 = FASTOutputFile(os.path.join(MyDir,'FASTOutBin.outb'), cache_dir=cache_dir, channels=['GenPwr'], tmin=ref['Time_[s]'].values[5])
+            np.testing.assert_array_equal(F3.toDataFrame().values, ref[['Time_[s]','GenPwr_[kW]']].values[5:])
+            # LRU eviction
+            FASTOutputFile(os.path.join(MyDir,'FASTOut.out'), cache_dir=cache_dir)
+            self.assertEqual(len(cache.entries()), 2)
+            cache.maxSize = cache.size-1
+            cache.evict()
+            self.assertEqual(len(cache.entries()), 1)
+            self.assertTrue(cache.contains(os.path.join(MyDir,'FASTOut.out')))
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def test_FASTOut_cache_dtype(self):
+        import tempfile
+        import shutil
+        from openfast_toolbox.io.fast_output_cache import FASTOutputCache
+        cache_dir = tempfile.mkdtemp()
+        try:
+            ref = self.DF('FASTOut.out')
+            # A single precision read does not pollute later default (double precision) reads
+            F1 = FASTOutputFile(os.path.join(MyDir,'FASTOut.out'), cache_dir=cache_dir, dtype='float32')
+            self.assertEqual(F1.toDataFrame().values.dtype, np.float32)
+            F2 = FASTOutputFile(os.path.join(MyDir,'FASTOut.out'), cache_dir=cache_dir)
+            self.assertEqual(F2.toDataFrame().values.dtype, np.float64)
+            np.testing.assert_array_equal(F2.toDataFrame().values, ref.values)
+            self.assertEqual(len(FASTOutputCache(cache_dir).entries()), 2)
+            F3 = FASTOutputFile(os.path.join(MyDir,'FASTOut.out'), cache_dir=cache_dir, dtype='float32')
+            np.testing.assert_array_equal(F3.toDataFrame().values, F1.toDataFrame().values)
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def test_FASTOut_stream(self):
+        from openfast_toolbox.io.fast_output_file import FASTOutputStream
+        ref = self.DF('FASTOut_Hydro.out')
+        with open(os.path.join(MyDir,'FASTOut_Hydro.out'), 'rb') as f:
+            lines = f.read().split(b'\n')
+        iData = [i for i,l in enumerate(lines) if l.strip().lower().startswith(b'time')][0]+2
+        tempFilename = '_FASTOut_stream.out'
+        try:
+            # Header and a line that is not complete
+            with open(tempFilename, 'wb') as f:
+                f.write(b'\n'.join(lines[:iData+1]) + b'\n' + lines[iData+1][:5])
+            stream = FASTOutputStream(tempFilename)
+            df = stream.poll()
+            np.testing.assert_array_equal(df.columns, ref.columns)
+            np.testing.assert_array_equal(df.values, ref.values[:1,:])
+            self.assertIsNone(stream.poll())
+            # Remaining lines, and final "This" line
+            with open(tempFilename, 'ab') as f:
+                f.write(lines[iData+1][5:] + b'\n' + b'\n'.join(lines[iData+2:]))
+            df = stream.poll()
+            np.testing.assert_array_equal(df.values, ref.values[1:,:])
+            self.assertTrue(stream.finished)
+            # Chunks and follow
+            dfs = list(FASTOutputFile().iter_chunks(tempFilename, chunkSize=30))
+            self.assertTrue(len(dfs)>1)
+            np.testing.assert_array_equal(np.vstack([df.values for df in dfs]), ref.values)
+            dfs = list(FASTOutputFile().follow(tempFilename, interval=0.01, timeout=0.01))
+            np.testing.assert_array_equal(np.vstack([df.values for df in dfs]), ref.values)
+        finally:
+            try:
+                os.remove(tempFilename)
+            except:
+                pass
+        # Binary files are returned when complete
+        dfs = list(FASTOutputFile().follow(os.path.join(MyDir,'FASTOutBin.outb'), channels=['GenPwr']))
+        np.testing.assert_array_equal(dfs[0].values, self.DF('FASTOutBin.outb')[['Time_[s]','GenPwr_[kW]']].values)
+
 if __name__ == '__main__':
 #     Test().test_000_debug()
     unittest.main()
@@ -29,6 +29,88 @@ class Test(unittest.TestCase):
         np.testing.assert_almost_equal(F['u'][0,:,:,:],F2['u'][0,:,:,:],3)
         np.testing.assert_almost_equal(F['u'][1,:,:,:],F2['u'][1,:,:,:],3)
         np.testing.assert_almost_equal(F['u'][2,:,:,:],F2['u'][2,:,:,:],3)
+    def test_TurbSim_mmap(self):
+        # --- Memory-mapped field, with tower
+        nt, ny, nz, nTwr = 20, 4, 5, 3
+        F = TurbSimFile()
+        F['u']    = np.random.normal(8, 1, (3, nt, ny, nz))
+        F['uTwr'] = np.random.normal(6, 1, (3, nt, nTwr))
+        F['y'] = np.linspace(-10, 10, ny)
+        F['z'] = np.linspace(5, 45, nz)
+        F['t'] = np.arange(nt)*0.5
+        F['zRef'], F['uRef'] = 25, 8
+        filename = os.path.join(MyDir,'TurbSim_MMap_TMP.bts')
+        F.write(filename)
+        F1 = TurbSimFile(filename)
+        # Single precision by default
+        F3 = TurbSimFile(filename, mmap=True)
+        self.assertEqual(F3['u'][0,:,1,2].dtype, np.float32)
+        self.assertEqual(F3['u'].load().dtype, np.float32)
+        np.testing.assert_allclose(F3['u'][:,:,:,:], F1['u'], rtol=1e-6)
+        np.testing.assert_allclose(F3['uTwr'][:,2:5,:], F1['uTwr'][:,2:5,:], rtol=1e-6)
+        # Loading gives the same field as a full read
+        F3.load()
+        np.testing.assert_array_equal(F3['u'], F1['u'])
+        del F3
+        # Double precision
+        F2 = TurbSimFile(filename, mmap=True, dtype=np.float64)
+        self.assertEqual(F2['u'].shape, (3, nt, ny, nz))
+        self.assertEqual(F2['u'][0,:,1,2].dtype, np.float64)
+        # Identical to a full read
+        np.testing.assert_array_equal(F2['u'][:,:,:,:], F1['u'])
+        np.testing.assert_array_equal(F2['uTwr'][:,2:5,:], F1['uTwr'][:,2:5,:])
+        np.testing.assert_array_equal(F2['u'][1,3:6,[0,2],4], F1['u'][1,3:6,[0,2],4])
+        np.testing.assert_array_equal(F2.valuesAt(y=3, z=25)[2], F1.valuesAt(y=3, z=25)[2])
+        np.testing.assert_array_equal(F2.midValues()[1], F1.midValues()[1])
+        self.assertEqual(F2.closestPoint(3, 25), F1.closestPoint(3, 25))
+        with self.assertRaises(TypeError):
+            F2['u'][0,:,:,:] += 1
+        F2.load()
+        self.assertFalse(F2.isLazy)
+        np.testing.assert_array_equal(F2['u'], F1['u'])
+        np.testing.assert_array_equal(F2['uTwr'], F1['uTwr'])
+        del F2
+        os.remove(filename)
+
+    def test_TurbSim_coherence(self):
+        # --- All-pairs coherence, compared to a pair by pair computation
+        import scipy.signal as sig
+        np.random.seed(1)
+        nt, ny, nz = 1000, 4, 3
+        F = TurbSimFile()
+        F['u'] = 8 + np.random.normal(0, 1, (3, nt, 1, 1)) + 0.7*np.random.normal(0, 1, (3, nt, ny, nz))
+        F['y'] = np.linspace(-10, 5, ny)
+        F['z'] = np.linspace(10, 30, nz)
+        F['t'] = np.arange(nt)*0.1
+        ds = F.spatialCoherence()
+        self.assertEqual(ds['coh'].dims, ('component', 'separation', 'frequency'))
+        self.assertEqual(np.sum(ds['nPairs'].values), ny*nz*(ny*nz-1)/2)
+        np.testing.assert_almost_equal(ds['separation'].values[:3], [5, 10, np.sqrt(125)])
+        # Largest separation: the two diagonals of the grid
+        u = F['u'][1]
+        f, csd1 = sig.csd(u[:,0,0], u[:,3,2], fs=10, nperseg=256)
+        f, csd2 = sig.csd(u[:,0,2], u[:,3,0], fs=10, nperseg=256)
+        np.testing.assert_almost_equal(ds['frequency'].values, f)
+        np.testing.assert_almost_equal(ds['csd'].values[1,-1], (csd1+csd2)/2)
+        # Bin with a single pair
+        F1 = TurbSimFile()
+        F1['u'], F1['y'], F1['z'], F1['t'] = F['u'][:,:,:,:1], F['y'], F['z'][:1], F['t']
+        _, coh = sig.coherence(u[:,0,0], u[:,3,0], fs=10, nperseg=256)
+        np.testing.assert_almost_equal(F1.spatialCoherence()['coh'].values[1,-1], coh)
+        # Bin with several pairs: mean of the pair coherences
+        dsy = F.spatialCoherence(direction='y', bins=[4, 6], components=[2])
+        self.assertEqual(dsy['nPairs'].values[0], (ny-1)*nz)
+        G = [sig.csd(F['u'][2,:,iy,iz], F['u'][2,:,iy+1,iz], fs=10)[1]/np.sqrt(
+             sig.welch(F['u'][2,:,iy,iz], fs=10)[1]*sig.welch(F['u'][2,:,iy+1,iz], fs=10)[1]) for iy in range(ny-1) for iz in range(nz)]
+        np.testing.assert_almost_equal(dsy['cocoh'].values[0,0], np.mean(np.real(G), axis=0))
+        # Coherence along lines
+        fc, dy, coh_y, dz, coh_z = F.coherence_longi(iy0=0, iz0=0)
+        np.testing.assert_almost_equal(coh_y[1,3], sig.coherence(u[:,0,0], u[:,3,0], fs=10)[1])
+        np.testing.assert_almost_equal(coh_z[0,0], 1)
+        # Cross correlations
+        y, rho_uu, rho_vv, rho_ww = F.crosscorr_y(iy0=1, iz0=2)
+        self.assertAlmostEqual(rho_vv[1], 1)
+        self.assertAlmostEqual(rho_ww[3], np.corrcoef(F['u'][2,:,1,2], F['u'][2,:,3,2])[0,1])
 
 if __name__ == '__main__':
 #     Test().test_000_debug()
@@ -2,7 +2,7 @@ import unittest
 import os
 import numpy as np
 from openfast_toolbox.io.tests.helpers_for_test import MyDir, reading_test
-from openfast_toolbox.io.vtk_file import VTKFile
+from openfast_toolbox.io.vtk_file import VTKFile, read_structured_points
 
 
 
@@ -18,6 +18,28 @@ class Test(unittest.TestCase):
         np.testing.assert_almost_equal(f.xp_grid,[0,20,40])
         np.testing.assert_almost_equal(f.point_data_grid['DisXY'][:,0,0,0],[0,20,40])
 
+    def test_VTKStruct_dedicated(self):
+        # --- ASCII
+        filename = os.path.join(MyDir, 'VTKStructuredPointsPointData.vtk')
+        f = VTKFile(filename)
+        header, data = read_structured_points(filename)
+        self.assertEqual(header['dims'], [3,2,1])
+        self.assertEqual(header['name'], 'DisXY')
+        np.testing.assert_almost_equal(header['yp_grid'], f.yp_grid)
+        np.testing.assert_almost_equal(np.moveaxis(data, 0, -1), f.point_data_grid['DisXY'])
+        # --- Binary
+        filename = os.path.join(MyDir, 'VTKStructuredPoints_TMP.vtk')
+        u = np.random.normal(0, 1, (6, 3)).astype(np.float32)
+        with open(filename, 'wb') as fid:
+            fid.write(b'# vtk DataFile Version 3.0\nTitle\nBINARY\nDATASET STRUCTURED_POINTS\n')
+            fid.write(b'DIMENSIONS 3 1 2\nORIGIN 0 0 0\nSPACING 1 1 1\nPOINT_DATA 6\nVECTORS Velocity float\n')
+            fid.write(u.astype('>f4').tobytes())
+        header, data = read_structured_points(filename)
+        os.remove(filename)
+        self.assertEqual(data.shape, (3, 3, 1, 2))
+        np.testing.assert_equal(data[:,2,0,1], u[5,:])
+        np.testing.assert_equal(data[1,:,0,0], u[:3,1])
+
 
 if __name__ == '__main__':
 #     Test().test_000_debug()
@@ -29,9 +29,10 @@ class TurbSimFile(File):
 
     Main methods
     ------------
-    - read, write, toDataFrame, keys
+    - read, write, toDataFrame, keys, load
     - valuesAt, vertProfile, horizontalPlane, verticalPlane, closestPoint
     - fitPowerLaw
+    - crosscorr_y, crosscorr_z, csd_longi, coherence_longi, spatialCoherence
     - makePeriodic, checkPeriodic
 
     Examples
@@ -42,6 +43,11 @@ class TurbSimFile(File):
         print(ts['u'].shape)  
         u,v,w = ts.valuesAt(y=10.5, z=90)
 
+        # Memory-mapped, only the data that is accessed is read (float32 by default)
+        ts = TurbSimFile('Turb.bts', mmap=True)
+        u,v,w = ts.valuesAt(y=10.5, z=90)
+        U = ts['u'][:, 0:100, :, :]
+
 
     """
 
@@ -58,10 +64,18 @@ class TurbSimFile(File):
         if filename:
             self.read(filename, **kwargs)
 
-    def read(self, filename=None, header_only=False, tdecimals=8):
+    def read(self, filename=None, header_only=False, tdecimals=8, mmap=False, dtype=np.float32):
         """ read BTS file, with field: 
                      u    (3 x nt x ny x nz)
                      uTwr (3 x nt x nTwr)
+        INPUTS:
+          - header_only: if True, only the header and coordinates are read
+          - tdecimals: number of decimals used to round the time vector
+          - mmap: if True, the int16 data is memory-mapped and 'u' and 'uTwr' are `LazyTurbSimField`. 
+                  The scaling is applied when the field is sliced,
+                  e.g. ts['u'][0,:,iy,iz] only reads one point. 
+          - dtype: data type of the slices of the memory-mapped field (only used if `mmap` is True).
+                  Use np.float64 to obtain the same values as a full read.
         """
         if filename:
             self.filename = filename
@@ -80,22 +94,26 @@ class TurbSimFile(File):
             scl[0],off[0],scl[1],off[1],scl[2],off[2] = struct.unpack('<6f' , f.read(6*4))
             nChar, = struct.unpack('<l',  f.read(4))
             info = (f.read(nChar)).decode()
+            offset = f.tell()
             # Reading turbulence field
-            if not header_only: 
-                u    = np.zeros((3,nt,ny,nz))
-                uTwr = np.zeros((3,nt,nTwr))
-                # For loop on time (acts as buffer reading, and only possible way when nTwr>0)
-                for it in range(nt):
-                    Buffer = np.frombuffer(f.read(2*3*ny*nz), dtype=np.int16).astype(np.float32).reshape([3, ny, nz], order='F')
-                    u[:,it,:,:]=Buffer
-                    Buffer = np.frombuffer(f.read(2*3*nTwr), dtype=np.int16).astype(np.float32).reshape([3, nTwr], order='F')
-                    uTwr[:,it,:]=Buffer
-                u -= off[:, None, None, None]
-                u /= scl[:, None, None, None]
+            if not header_only and not mmap: 
+                # Each time step is a record of (3 x ny x nz) + (3 x nTwr) int16, read at once
+                raw = np.fromfile(f, dtype=np.int16, count=nt*3*(ny*nz+nTwr))
+                u16, uTwr16 = _btsFieldViews(raw, nt, ny, nz, nTwr)
+                u    = np.empty(u16.shape)
+                uTwr = np.empty(uTwr16.shape)
+                for k in range(3):
+                    np.subtract(u16[k]   , off[k], out=u[k]   , dtype=np.float64)
+                    np.subtract(uTwr16[k], off[k], out=uTwr[k], dtype=np.float64)
+                    u[k]    /= scl[k]
+                    uTwr[k] /= scl[k]
                 self['u']    = u
-                uTwr -= off[:, None, None]
-                uTwr /= scl[:, None, None]
                 self['uTwr'] = uTwr
+        if not header_only and mmap:
+            raw = np.memmap(self.filename, dtype=np.int16, mode='r', offset=offset, shape=(nt*3*(ny*nz+nTwr),))
+            u, uTwr = _btsFieldViews(raw, nt, ny, nz, nTwr)
+            self['u']    = LazyTurbSimField(u   , scl, off, dtype=dtype)
+            self['uTwr'] = LazyTurbSimField(uTwr, scl, off, dtype=dtype)
         self['info'] = info
         self['ID']   = ID
         self['dt']   = np.round(dt, tdecimals) # dt is stored in single precision in the TurbSim output
@@ -107,6 +125,17 @@ class TurbSimFile(File):
         self['zRef'] = zHub
         self['uRef'] = uHub
 
+    @property
+    def isLazy(self):
+        """ True if the velocity field is memory-mapped (see `read`)"""
+        return isinstance(self.get('u', None), LazyTurbSimField)
+
+    def load(self):
+        """ Loads the full field in memory (float64) when the file was read with `mmap=True`"""
+        for k in ['u', 'uTwr']:
+            if isinstance(self.get(k, None), LazyTurbSimField):
+                self[k] = self[k].astype(np.float64).load()
+
     def write(self, filename=None):
         """ 
         write a BTS file, using the following keys: 'u','z','y','t','uTwr'
@@ -208,9 +237,7 @@ class TurbSimFile(File):
         """ return wind speed time series at a point """
         if method == 'nearest':
             iy, iz = self.closestPoint(y, z)
-            u = self['u'][0,:,iy,iz]
-            v = self['u'][1,:,iy,iz]
-            w = self['u'][2,:,iy,iz]
+            u, v, w = self['u'][:,:,iy,iz]
         else:
             raise NotImplementedError()
         return u, v, w
@@ -393,16 +420,9 @@ class TurbSimFile(File):
         y = ts['y']
         if iy0 is None:
             iy0,iz0 = ts.iMid
-        u, v, w = ts._longiline(iy0=iy0, iz0=iz0, removeMean=True)
-        rho_uu_y=np.zeros(len(y))
-        rho_vv_y=np.zeros(len(y))
-        rho_ww_y=np.zeros(len(y))
-        for iy,_ in enumerate(y):
-            ud, vd, wd = ts._longiline(iy0=iy, iz0=iz0, removeMean=True)
-            rho_uu_y[iy] = np.mean(u*ud)/(np.std(u)*np.std(ud))
-            rho_vv_y[iy] = np.mean(v*vd)/(np.std(v)*np.std(vd))
-            rho_ww_y[iy] = np.mean(w*wd)/(np.std(w)*np.std(wd))
-        return y, rho_uu_y, rho_vv_y, rho_ww_y
+        U = np.asarray(ts['u'][:,:,:,iz0], dtype=float) # 3 x nt x ny
+        rho = _crosscorr(U, iy0)
+        return y, rho[0], rho[1], rho[2]
 
     def crosscorr_z(ts, iy0=None, iz0=None):
         """ 
@@ -412,97 +432,186 @@ class TurbSimFile(File):
         z = ts['z']
         if iy0 is None:
             iy0,iz0 = ts.iMid
-        u, v, w = ts._longiline(iy0=iy0, iz0=iz0, removeMean=True)
-        rho_uu_z = np.zeros(len(z))
-        rho_vv_z = np.zeros(len(z))
-        rho_ww_z = np.zeros(len(z))
-        for iz,_ in enumerate(z):
-            ud, vd, wd = ts._longiline(iy0=iy0, iz0=iz, removeMean=True)
-            rho_uu_z[iz] = np.mean(u*ud)/(np.std(u)*np.std(ud))
-            rho_vv_z[iz] = np.mean(v*vd)/(np.std(v)*np.std(vd))
-            rho_ww_z[iz] = np.mean(w*wd)/(np.std(w)*np.std(wd))
-        return z, rho_uu_z, rho_vv_z, rho_ww_z
+        U = np.asarray(ts['u'][:,:,iy0,:], dtype=float) # 3 x nt x nz
+        rho = _crosscorr(U, iz0)
+        return z, rho[0], rho[1], rho[2]
 
+    def _csd(ts, u, v, w):
+        """ Auto spectral densities of the three components, computed in one call """
+        try:
+            import scipy.signal as sig
+        except:
+            import pydatview.tools.spectral as sig
+        t       = ts['t']
+        dt      = t[1]-t[0]
+        fs      = 1/dt
+        X = np.vstack((u,v,w))
+        fc, chi = sig.csd(X, X, fs=fs, scaling='density') #nperseg=4096, noverlap=2048, detrend='constant')
+        return fc, chi[0], chi[1], chi[2]
 
     def csd_longi(ts, iy0=None, iz0=None):
         """ Compute cross spectral density
         If no index is provided, computed at mid box 
         """
-        import scipy.signal as sig
         u, v, w = ts._longiline(iy0=iy0, iz0=iz0, removeMean=True)
-        t       = ts['t']
-        dt      = t[1]-t[0]
-        fs      = 1/dt
-        fc, chi_uu = sig.csd(u, u, fs=fs, scaling='density') #nperseg=4096, noverlap=2048, detrend='constant')
-        fc, chi_vv = sig.csd(v, v, fs=fs, scaling='density') #nperseg=4096, noverlap=2048, detrend='constant')
-        fc, chi_ww = sig.csd(w, w, fs=fs, scaling='density') #nperseg=4096, noverlap=2048, detrend='constant')
-        return fc, chi_uu, chi_vv, chi_ww
+        return ts._csd(u, v, w)
 
     def csd_lat(ts, ix0=None, iz0=None):
         """ Compute lateral cross spectral density
         If no index is provided, computed at mid box 
         """
-        try:
-            import scipy.signal as sig
-        except:
-            import pydatview.tools.spectral as sig
         u, v, w = ts._latline(ix0=ix0, iz0=iz0, removeMean=True)
-        t       = ts['t']
-        dt      = t[1]-t[0]
-        fs      = 1/dt
-        fc, chi_uu = sig.csd(u, u, fs=fs, scaling='density') #nperseg=4096, noverlap=2048, detrend='constant')
-        fc, chi_vv = sig.csd(v, v, fs=fs, scaling='density') #nperseg=4096, noverlap=2048, detrend='constant')
-        fc, chi_ww = sig.csd(w, w, fs=fs, scaling='density') #nperseg=4096, noverlap=2048, detrend='constant')
-        return fc, chi_uu, chi_vv, chi_ww
+        return ts._csd(u, v, w)
 
     def csd_vert(ts, ix0=None, iy0=None):
         """ Compute vertical cross spectral density
         If no index is provided, computed at mid box 
         """
-        try:
-            import scipy.signal as sig
-        except:
-            import pydatview.tools.spectral as sig
-        t       = ts['t']
-        dt      = t[1]-t[0]
-        fs      = 1/dt
         u, v, w = ts._vertline(ix0=ix0, iy0=iy0, removeMean=True)
-        u= u-np.mean(u)
-        v= v-np.mean(v)
-        w= w-np.mean(w)
-        fc, chi_uu = sig.csd(u, u, fs=fs, scaling='density') #nperseg=4096, noverlap=2048, detrend='constant')
-        fc, chi_vv = sig.csd(v, v, fs=fs, scaling='density') #nperseg=4096, noverlap=2048, detrend='constant')
-        fc, chi_ww = sig.csd(w, w, fs=fs, scaling='density') #nperseg=4096, noverlap=2048, detrend='constant')
-        return fc, chi_uu, chi_vv, chi_ww
+        return ts._csd(u, v, w)
 
-
-    def coherence_longi(ts, iy0=None, iz0=None):
+    def coherence_longi(ts, iy0=None, iz0=None, nperseg=None, noverlap=None):
         """ Coherence on a longitudinal line for different delta y and delta z
         compared to a given point with index iy0,iz0
+        If no index is provided, computed at mid box 
+
+        OUTPUTS:
+          - fc: frequencies
+          - dy: lateral separations, y-y0 (ny)
+          - coh_y: magnitude squared coherence along y (3 x ny x nf)
+          - dz: vertical separations, z-z0 (nz)
+          - coh_z: magnitude squared coherence along z (3 x nz x nf)
         """
-        try:
-            import scipy.signal as sig
-        except:
-            import pydatview.tools.spectral as sig
         if iy0 is None:
             iy0,iz0 = ts.iMid
-        u, v, w = ts._longiline(iy0=iy0, iz0=iz0, removeMean=True)
-        y = ts['y']
-        z = ts['z']
-        diy=1
-        dy=y[iy]-y[iy0]
-        # TODO
-        iy = iy0+diy
-        ud, vd, wd = ts._longiline(iy0=iy, iz0=iz0, removeMean=True)
-        fc, coh_uu_y1 = sig.coherence(u,ud, fs=fs)
-        _ , coh_vv_y1 = sig.coherence(v,vd, fs=fs)
-        _ , coh_ww_y1 = sig.coherence(w,wd, fs=fs)
+        fs = 1/(ts['t'][1]-ts['t'][0])
+        # Segments FFT of the horizontal and vertical lines, computed once
+        fc, Xy = _welchFFT(np.moveaxis(np.asarray(ts['u'][:,:,:,iz0], dtype=float), 1, -1), fs, nperseg, noverlap) # 3 x ny x nseg x nf
+        fc, Xz = _welchFFT(np.moveaxis(np.asarray(ts['u'][:,:,iy0,:], dtype=float), 1, -1), fs, nperseg, noverlap) # 3 x nz x nseg x nf
+        coh_y = np.abs(_welchCoherence(Xy[:,iy0:iy0+1], Xy))**2
+        coh_z = np.abs(_welchCoherence(Xz[:,iz0:iz0+1], Xz))**2
+        return fc, ts['y']-ts['y'][iy0], coh_y, ts['z']-ts['z'][iz0], coh_z
+
+    def spatialCoherence(ts, nperseg=None, noverlap=None, bins=None, rMax=None, direction=None, components=None, workers=None):
+        """ 
+        Coherence and cross spectral densities between all pairs of points of the grid, binned by separation distance.
 
-        iy = iy+diy
-        ud, vd, wd = ts._longiline(iy0=iy, iz0=iz0, removeMean=False)
-        _ , coh_uu_y2 = sig.coherence(u,ud, fs=fs)
-        _ , coh_vv_y2 = sig.coherence(v,vd, fs=fs)
-        _ , coh_ww_y2 = sig.coherence(w,wd, fs=fs)
+        The Welch segments FFTs of every grid point are computed once. For a given frequency, the sum over 
+        all the pairs of points sharing the same grid offset (diy, diz) is a spatial correlation, 
+        obtained for all offsets at once with zero-padded 2D FFTs along y and z.
+
+        INPUTS:
+          - nperseg, noverlap: length of Welch segments and overlap (default: min(256,nt), nperseg/2)
+          - bins: defines the separation bins:
+                   - None: one bin per distinct separation distance
+                   - int: number of bins of equal width between the smallest and largest separation
+                   - array: bin edges [m]
+          - rMax: maximum separation distance considered [m]
+          - direction: None: all separations, 'y': lateral separations only, 'z': vertical separations only
+          - components: list of component indices to consider (default: [0,1,2])
+          - workers: number of threads used by scipy.fft, see tools.spectral
+        OUTPUTS:
+          - ds: xarray Dataset with variables:
+              - 'gamma': complex coherence Sxy/sqrt(Sxx Syy), averaged over the pairs of a bin (component x separation x frequency)
+              - 'coh'  : magnitude squared coherence of the bin, |gamma|^2 (component x separation x frequency)
+                         For a bin with one pair, this is the same as scipy.signal.coherence
+              - 'cocoh': co-coherence of the bin, Re(gamma) (component x separation x frequency)
+              - 'csd'  : cross spectral density (complex), averaged over the pairs of a bin (component x separation x frequency)
+              - 'psd'  : power spectral density, averaged over the grid points (component x frequency)
+            The 'separation' coordinate is the mean distance of the pairs within a bin, 
+            and 'nPairs' the number of pairs within a bin.
+        """
+        import xarray as xr
+        y, z = np.asarray(ts['y']), np.asarray(ts['z'])
+        ny, nz = len(y), len(z)
+        dy = y[1]-y[0] if ny>1 else 0
+        dz = z[1]-z[0] if nz>1 else 0
+        fs = 1/(ts['t'][1]-ts['t'][0])
+        if components is None:
+            components = [0,1,2]
+        # --- Grid offsets, each unordered pair of points is counted once
+        DIY, DIZ = np.meshgrid(np.arange(0, ny), np.arange(-nz+1, nz), indexing='ij')
+        DIY, DIZ = DIY.ravel(), DIZ.ravel()
+        b = (DIY>0) | (DIZ>0)
+        if direction=='y':
+            b &= DIZ==0
+        elif direction=='z':
+            b &= DIY==0
+        elif direction is not None:
+            raise ValueError('direction should be None, `y` or `z`')
+        r = np.sqrt((DIY*dy)**2+(DIZ*dz)**2)
+        if rMax is not None:
+            b &= r<=rMax
+        DIY, DIZ, r = DIY[b], DIZ[b], r[b]
+        if len(r)==0:
+            raise Exception('No pair of points found with the given separation criteria')
+        # --- Bin index of each offset
+        if bins is None:
+            _, ibin = np.unique(np.round(r, 6), return_inverse=True)
+        else:
+            if np.isscalar(bins):
+                edges = np.linspace(np.min(r), np.max(r), int(bins)+1)
+            else:
+                edges = np.asarray(bins)
+            ibin = np.clip(np.searchsorted(edges, r, side='right')-1, 0, len(edges)-2)
+            b = (r>=edges[0]) & (r<=edges[-1])
+            if not np.any(b):
+                raise Exception('No pair of points found within the bin edges')
+            # Remove out of range offsets and empty bins
+            DIY, DIZ, r = DIY[b], DIZ[b], r[b]
+            _, ibin = np.unique(ibin[b], return_inverse=True)
+        ibin = np.asarray(ibin).ravel()
+        nPairsOff = (ny-DIY)*(nz-np.abs(DIZ))
+        nBins = np.max(ibin)+1
+        # Matrix averaging the pairs of all the offsets of a bin (nBins x nOffsets)
+        W = np.zeros((nBins, len(r)))
+        W[ibin, np.arange(len(r))] = 1
+        nPairs = W.dot(nPairsOff)
+        sep    = W.dot(nPairsOff*r)/nPairs
+        W     /= nPairs[:,None]
+
+        gamma, csd, psd = None, None, None
+        shape2 = (_nextFastLen(2*ny-1), _nextFastLen(2*nz-1)) # zero-padding, no wrapping of the spatial correlation
+        for ic, c in enumerate(components):
+            # Segments FFT of every point, computed once: ny x nz x nseg x nf
+            U = np.moveaxis(np.asarray(ts['u'][c], dtype=float), 0, -1)
+            fc, X = _welchFFT(U, fs, nperseg, noverlap, workers=workers)
+            nseg, nf = X.shape[2], X.shape[3]
+            if gamma is None:
+                gamma = np.zeros((len(components), nBins, nf), dtype=complex)
+                csd   = np.zeros((len(components), nBins, nf), dtype=complex)
+                psd   = np.zeros((len(components), nf))
+            X = np.moveaxis(X, (0,1), (-2,-1))          # nseg x nf x ny x nz
+            S = np.mean(np.abs(X)**2, axis=0)            # nf x ny x nz
+            psd[ic] = np.mean(S, axis=(1,2))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                Xn = X/np.sqrt(S)
+            # Sum over pairs of conj(Xi) Xj for all offsets: ifft2( mean_seg |fft2(X)|^2 )
+            R, Rn = 0, 0
+            for iseg in range(nseg):
+                R  = R  + np.abs(_fft2(X [iseg], shape2, workers))**2
+                Rn = Rn + np.abs(_fft2(Xn[iseg], shape2, workers))**2
+            R  = _ifft2(R /nseg, workers)[:, DIY, DIZ]  # nf x nOffsets, negative diz wrap around
+            Rn = _ifft2(Rn/nseg, workers)[:, DIY, DIZ]
+            csd  [ic] = R .dot(W.T).T
+            gamma[ic] = Rn.dot(W.T).T
+
+        compNames = [['u','v','w'][c] for c in components]
+        coords = {'component':compNames, 'separation':sep, 'frequency':fc}
+        ds = xr.Dataset(
+            data_vars=dict(
+                gamma=(['component','separation','frequency'], gamma),
+                coh  =(['component','separation','frequency'], np.abs(gamma)**2),
+                cocoh=(['component','separation','frequency'], gamma.real),
+                csd  =(['component','separation','frequency'], csd),
+                psd  =(['component','frequency'], psd),
+            ),
+            coords=coords,
+        )
+        ds = ds.assign_coords(nPairs=('separation', nPairs.astype(int)))
+        ds['separation'].attrs = {'description':'mean separation distance of the pairs of points','units':'m'}
+        ds['frequency'].attrs  = {'units':'Hz'}
+        return ds
 
 
     # --------------------------------------------------------------------------------}
@@ -587,11 +696,12 @@ class TurbSimFile(File):
         s+=' - y: [{} ... {}],  dy: {}, n: {} \n'.format(self['y'][0],self['y'][-1],self['y'][1]-self['y'][0],len(self['y']))
         s+=' - t: [{} ... {}],  dt: {}, n: {} \n'.format(self['t'][0],self['t'][-1],self['t'][1]-self['t'][0],len(self['t']))
         if 'u' in self.keys():
-            s+=' - u: ({} x {} x {} x {}) \n'.format(*(self['u'].shape))
-            ux,uy,uz=self['u'][0], self['u'][1], self['u'][2]
-            s+='    ux: min: {}, max: {}, mean: {} \n'.format(np.min(ux), np.max(ux), np.mean(ux))
-            s+='    uy: min: {}, max: {}, mean: {} \n'.format(np.min(uy), np.max(uy), np.mean(uy))
-            s+='    uz: min: {}, max: {}, mean: {} \n'.format(np.min(uz), np.max(uz), np.mean(uz))
+            s+=' - u: ({} x {} x {} x {}) {}\n'.format(*(self['u'].shape), '(memory-mapped)' if self.isLazy else '')
+            if not self.isLazy:
+                ux,uy,uz=self['u'][0], self['u'][1], self['u'][2]
+                s+='    ux: min: {}, max: {}, mean: {} \n'.format(np.min(ux), np.max(ux), np.mean(ux))
+                s+='    uy: min: {}, max: {}, mean: {} \n'.format(np.min(uy), np.max(uy), np.mean(uy))
+                s+='    uz: min: {}, max: {}, mean: {} \n'.format(np.min(uz), np.max(uz), np.mean(uz))
             # Mid of box, nearest neighbor
             iy,iz = self.iMid
             zMid=self['z'][iz]
@@ -605,14 +715,14 @@ class TurbSimFile(File):
         # Tower
         if 'zTwr' in self.keys() and len(self['zTwr'])>0:
             s+=' - zTwr: [{} ... {}],  dz: {}, n: {} \n'.format(self['zTwr'][0],self['zTwr'][-1],self['zTwr'][1]-self['zTwr'][0],len(self['zTwr']))
-        if 'uTwr' in self.keys() and self['uTwr'].shape[2]>0:
+        if 'uTwr' in self.keys() and self['uTwr'].shape[2]>0 and not self.isLazy:
             s+=' - uTwr: ({} x {} x {} ) \n'.format(*(self['uTwr'].shape))
             ux,uy,uz=self['uTwr'][0], self['uTwr'][1], self['uTwr'][2]
             s+='    ux: min: {}, max: {}, mean: {} \n'.format(np.min(ux), np.max(ux), np.mean(ux))
             s+='    uy: min: {}, max: {}, mean: {} \n'.format(np.min(uy), np.max(uy), np.mean(uy))
             s+='    uz: min: {}, max: {}, mean: {} \n'.format(np.min(uz), np.max(uz), np.mean(uz))
         s += ' Useful methods:\n'
-        s += ' - read, write, toDataFrame, keys\n'
+        s += ' - read, write, toDataFrame, keys, load\n'
         s += ' - valuesAt, vertProfile, horizontalPlane, verticalPlane, closestPoint\n'
         s += ' - fitPowerLaw\n'
         s += ' - makePeriodic, checkPeriodic\n'
@@ -1149,6 +1259,193 @@ class TurbSimFile(File):
 
 
 
+# --------------------------------------------------------------------------------}
+# --- Memory-mapped field 
+# --------------------------------------------------------------------------------{
+def _btsFieldViews(raw, nt, ny, nz, nTwr):
+    """ 
+    Returns views (no copy) of the int16 grid and tower data of a bts file.
+    Each time step is a record of 3*ny*nz grid values (Fortran order: component, y, z)
+    followed by 3*nTwr tower values (component, tower point).
+    INPUTS:
+      - raw: 1d int16 array (or memmap) of length nt*3*(ny*nz+nTwr)
+    OUTPUTS:
+      - u   : (3 x nt x ny x nz) strided view of raw
+      - uTwr: (3 x nt x nTwr)    strided view of raw
+    """
+    records = raw.reshape(nt, 3*(ny*nz+nTwr))
+    u    = records[:, :3*ny*nz].reshape(nt, nz, ny, 3).transpose(3, 0, 2, 1)
+    uTwr = records[:, 3*ny*nz:].reshape(nt, nTwr, 3).transpose(2, 0, 1)
+    return u, uTwr
+
+
+class LazyTurbSimField(object):
+    """ 
+    Array-like velocity field of a memory-mapped TurbSim file, (3 x nt x ny x nz) or (3 x nt x nTwr).
+
+    Only the part of the int16 data that is sliced is read from disk, it is then scaled 
+    and returned as an array of type `dtype` (float32 by default). With dtype=np.float64, the values
+    are identical to the ones obtained with a full read. The field is read-only.
+
+    Examples
+    --------
+        ts = TurbSimFile('Low.bts', mmap=True)
+        u  = ts['u'][0, :, iy, iz]                # time series at one point
+        U  = ts['u'][:, 100:200]                  # 100 time steps, (3 x 100 x ny x nz)
+        for it, U in ts['u'].chunks(1000):        # loop on blocks of time steps
+            print(it, U.shape)
+        U  = ts['u'].load()                       # full field, float32 by default
+    """
+    def __init__(self, raw, scl, off, dtype=np.float32):
+        """ 
+        INPUTS:
+          - raw: int16 strided view, first dimension is the velocity component
+          - scl, off: scaling and offset for each component: u = (raw-off)/scl
+          - dtype: data type of the slices, the arithmetic is done in this precision
+        """
+        self._raw  = raw
+        self._sclOff = (scl, off)
+        self.dtype = np.dtype(dtype)
+        shape = (3,) + (1,)*(raw.ndim-1)
+        # NOTE: scl and off are stored in single precision in the file. In double precision, the
+        #       arithmetic is the one of TurbSimFile.read, so that both reads give the same values.
+        self._scl  = np.broadcast_to(np.asarray(scl, dtype=np.float32).astype(self.dtype).reshape(shape), raw.shape)
+        self._off  = np.broadcast_to(np.asarray(off, dtype=np.float32).astype(self.dtype).reshape(shape), raw.shape)
+
+    @property
+    def shape(self): return self._raw.shape
+
+    @property
+    def ndim(self): return self._raw.ndim
+
+    @property
+    def size(self): return self._raw.size
+
+    def __len__(self):
+        return self._raw.shape[0]
+
+    def __getitem__(self, key):
+        # NOTE: scl and off are broadcasted views, indexing them does not allocate for basic slices
+        return (self._raw[key].astype(self.dtype) - self._off[key]) / self._scl[key]
+
+    def __setitem__(self, key, value):
+        raise TypeError('Memory-mapped TurbSim field is read-only, call `load()` on the TurbSimFile first.')
+
+    def __array__(self, dtype=None, copy=None):
+        return self.load(dtype=dtype)
+
+    def astype(self, dtype):
+        """ Returns a memory-mapped field on the same data, with slices of type `dtype`"""
+        return LazyTurbSimField(self._raw, self._sclOff[0], self._sclOff[1], dtype=dtype)
+
+    def chunks(self, nChunk=1000):
+        """ Yields (it, field) for blocks of at most `nChunk` time steps, where `it` is the index of the first time step"""
+        nt = self._raw.shape[1]
+        for it in range(0, nt, nChunk):
+            yield it, self[:, it:it+nChunk]
+
+    def load(self, dtype=None, nChunk=1000):
+        """ Returns the full field as an array, converted by blocks of time steps to limit memory usage"""
+        dtype = self.dtype if dtype is None else dtype
+        out = np.empty(self.shape, dtype=dtype)
+        for it, u in self.chunks(nChunk):
+            out[:, it:it+u.shape[1]] = u
+        return out
+
+    def __repr__(self):
+        return '<{} object> shape: {}, dtype: {}'.format(type(self).__name__, self.shape, self.dtype)
+
+
+# --------------------------------------------------------------------------------}
+# --- Spatial statistics helpers 
+# --------------------------------------------------------------------------------{
+def _crosscorr(U, i0):
+    """ Correlation coefficients between the point i0 and all the points of a line
+    U: velocity components along the line (3 x nt x n)
+    """
+    U  = U - np.mean(U, axis=1, keepdims=True)
+    U0 = U[:,:,i0:i0+1]
+    return np.mean(U0*U, axis=1)/(np.std(U0, axis=1)*np.std(U, axis=1))
+
+def _welchFFT(x, fs, nperseg=None, noverlap=None, workers=None):
+    """ FFT of the Welch segments of the signals x (time along the last axis), using a periodic hann window 
+    and a constant detrend per segment, consistent with scipy.signal.csd.
+    The FFT are scaled such that the mean over segments of conj(X_a)*X_b is the one-sided cross spectral density.
+    OUTPUTS:
+      - f: frequencies
+      - X: segments FFT, shape (... x nseg x nf)
+    """
+    nt = x.shape[-1]
+    if nperseg is None:
+        nperseg = min(256, nt)
+    nperseg = int(min(nperseg, nt))
+    if noverlap is None:
+        noverlap = nperseg//2
+    step = nperseg-int(noverlap)
+    if step<=0:
+        raise ValueError('noverlap must be less than nperseg.')
+    nseg = (nt-nperseg)//step + 1
+    seg = np.arange(nseg)[:,None]*step + np.arange(nperseg)[None,:]
+    xs = x[..., seg]                                   # ... x nseg x nperseg
+    xs = xs - np.mean(xs, axis=-1, keepdims=True)
+    win = 0.5 - 0.5*np.cos(2*np.pi*np.arange(nperseg)/nperseg)
+    if workers is not None:
+        try:
+            import scipy.fft
+            X = scipy.fft.rfft(xs*win, axis=-1, workers=workers)
+        except ImportError:
+            X = np.fft.rfft(xs*win, axis=-1)
+    else:
+        X = np.fft.rfft(xs*win, axis=-1)
+    scale = np.full(X.shape[-1], 2.0)
+    scale[0] = 1
+    if nperseg % 2 == 0:
+        scale[-1] = 1
+    X *= np.sqrt(scale/(fs*np.sum(win**2)))
+    f = np.fft.rfftfreq(nperseg, 1/fs)
+    return f, X
+
+def _nextFastLen(n):
+    """ Smallest 5-smooth integer (2^a 3^b 5^c) larger or equal to n, efficient length for FFTs """
+    m = n
+    while True:
+        k = m
+        for p in (2, 3, 5):
+            while k % p == 0:
+                k //= p
+        if k == 1:
+            return m
+        m += 1
+
+def _fft2(x, shape, workers=None):
+    """ 2D FFT along the last two axes, zero-padded to `shape` """
+    if workers is not None:
+        try:
+            import scipy.fft
+            return scipy.fft.fft2(x, s=shape, workers=workers)
+        except ImportError:
+            pass
+    return np.fft.fft2(x, s=shape)
+
+def _ifft2(x, workers=None):
+    """ Inverse 2D FFT along the last two axes """
+    if workers is not None:
+        try:
+            import scipy.fft
+            return scipy.fft.ifft2(x, workers=workers)
+        except ImportError:
+            pass
+    return np.fft.ifft2(x)
+
+def _welchCoherence(Xa, Xb):
+    """ Complex coherence between segments FFT (see _welchFFT), broadcasted """
+    Pab = np.mean(np.conj(Xa)*Xb, axis=-2)
+    Saa = np.mean(np.abs(Xa)**2, axis=-2)
+    Sbb = np.mean(np.abs(Xb)**2, axis=-2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return Pab/np.sqrt(Saa*Sbb)
+
+
 def fit_powerlaw_u_alpha(x, y, z_ref=100, p0=(10,0.1)):
     """ 
     p[0] : u_ref
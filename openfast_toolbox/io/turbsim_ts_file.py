@@ -19,6 +19,16 @@ class TurbSimTSFile(File):
     def formatName():
         return 'TurbSim time series'
 
+    @staticmethod
+    def probe(head, filename=None):
+        """ `nComp` is found within the header lines """
+        lines = head.decode('latin-1').lower().splitlines()
+        if any([l.find('ncomp')>=0 for l in lines[:11]]):
+            return True
+        elif len(lines)>11:
+            return False
+        return None
+
     def _read(self, *args, **kwargs):
         self['header']=[]
         nHeaderMax=10
@@ -373,6 +373,115 @@ def read_dataset_polydata(file_path):
 
     return header, points, polygons, point_data, cell_data
 
+
+def read_structured_points_lines(f):
+    """
+    Reads the header lines of a legacy STRUCTURED_POINTS file with a single point data field.
+    Returns the list of header lines (bytes), `f` is positioned at the beginning of the data.
+    The second line (title) is the only line that typically differs between snapshots of a same plane.
+    """
+    lines = [f.readline(), f.readline(), f.readline()]
+    while True:
+        line = f.readline()
+        if not line:
+            raise BrokenFormatError('End of file reached before point data in {}'.format(getattr(f, 'name', '')))
+        if len(line.strip())==0:
+            continue
+        lines.append(line)
+        key = line.split()[0].upper()
+        if key == b'SCALARS':
+            lines.append(f.readline()) # LOOKUP_TABLE
+            return lines
+        elif key == b'VECTORS':
+            return lines
+        elif key not in [b'DATASET', b'DIMENSIONS', b'ORIGIN', b'SPACING', b'ASPECT_RATIO', b'POINT_DATA']:
+            raise WrongFormatError('Section `{}` not supported for simple structured points'.format(key.decode()))
+
+
+def read_structured_points_header(f):
+    """
+    Reads and interprets the header of a legacy STRUCTURED_POINTS file with a single point data field.
+    `f` is positioned at the beginning of the data.
+    Returns a dictionary with keys:
+     - lines: raw header lines (see `read_structured_points_lines`)
+     - is_ascii, dims, origin, spacing, name, dtype, nComp, nPoints
+     - xp_grid, yp_grid, zp_grid: point coordinates along each axis
+    """
+    lines = read_structured_points_lines(f)
+    h = {'lines':lines, 'title':lines[1].decode('utf-8').strip()}
+    data_type = lines[2].decode('utf-8').strip().upper()
+    if data_type not in ["ASCII", "BINARY"]:
+        raise WrongFormatError("Unknown VTK data type ",data_type)
+    h['is_ascii'] = data_type == 'ASCII'
+    for line in lines[3:]:
+        sp = line.decode('utf-8').split()
+        key = sp[0].upper()
+        if key=='DATASET' and sp[1].upper()!='STRUCTURED_POINTS':
+            raise WrongFormatError('Dataset type {} is not STRUCTURED_POINTS'.format(sp[1]))
+        elif key=='DIMENSIONS':
+            h['dims'] = list(map(int, sp[1:4]))
+        elif key=='ORIGIN':
+            h['origin'] = list(map(float, sp[1:4]))
+        elif key in ['SPACING', 'ASPECT_RATIO']:
+            h['spacing'] = list(map(float, sp[1:4]))
+        elif key=='POINT_DATA':
+            h['nPoints'] = int(sp[1])
+        elif key in ['SCALARS', 'VECTORS']:
+            h['name']  = sp[1]
+            h['dtype'] = numpy.dtype(vtk_to_numpy_dtype_name[sp[2].lower()])
+            h['nComp'] = 3 if key=='VECTORS' else (int(sp[3]) if len(sp)>3 else 1)
+    for k in ['dims', 'origin', 'spacing', 'nPoints', 'name']:
+        if k not in h:
+            raise BrokenFormatError('Missing {} in structured points header'.format(k))
+    dim, ori, spa = h['dims'], h['origin'], h['spacing']
+    # NOTE: same definition as _check_mesh
+    axis = [numpy.linspace(ori[i], ori[i] + (dim[i] - 1.0) * spa[i], dim[i]) for i in range(3)]
+    h['xp_grid'], h['yp_grid'], h['zp_grid'] = axis
+    return h
+
+
+def read_structured_points_data(f, header, out=None):
+    """
+    Reads the point data of a STRUCTURED_POINTS file, `f` being positioned at the beginning of the data
+    (see `read_structured_points_header`).
+    INPUTS:
+     - header: dictionary returned by `read_structured_points_header`
+     - out: optional array where the data is stored, of shape (nComp, nx, ny, nz) or any shape with
+            the same number of elements (e.g. without the singleton dimensions of a plane)
+    OUTPUTS:
+     - data: array of shape (nComp, nx, ny, nz), or `out`
+    """
+    nx, ny, nz = header['dims']
+    nComp = header['nComp']
+    count = header['nPoints'] * nComp
+    if header['is_ascii']:
+        data = numpy.fromfile(f, count=count, sep=" ", dtype=header['dtype'])
+    else:
+        # Binary data is big endian
+        data = numpy.fromfile(f, count=count, dtype=header['dtype'].newbyteorder(">"))
+    if data.size != count or count != nx*ny*nz*nComp:
+        raise BrokenFormatError('Expected {} values but read {} in {}'.format(count, data.size, getattr(f, 'name', '')))
+    # VTK sorts points in Fortran order (x fastest), components are interleaved
+    data = data.reshape(nz, ny, nx, nComp).transpose(3, 2, 1, 0)
+    if out is None:
+        return numpy.ascontiguousarray(data)
+    out[...] = data.reshape(out.shape)
+    return out
+
+
+def read_structured_points(filename, dtype=None):
+    """
+    Dedicated reader for legacy STRUCTURED_POINTS files with a single point data field
+    (e.g. FAST.Farm planes or boxes). Faster than VTKFile, since no mesh is generated.
+    Returns (header, data), with data of shape (nComp, nx, ny, nz).
+    """
+    with open(filename, 'rb') as f:
+        header = read_structured_points_header(f)
+        data = read_structured_points_data(f, header)
+    if dtype is not None:
+        data = data.astype(dtype, copy=False)
+    return header, data
+
 # --------------------------------------------------------------------------------
 # --- The code below was taken from meshio 
 #     https://github.com/nschloe/meshio
@@ -32,6 +32,7 @@ def postproCampbell(fstFiles, BladeLen=None, TowerLen=None, verbose=True,
         WS_legacy=None, 
         nFreqOut=500, freqRange=None, posDampRange=None,  # Options for TXT output
         removeTwrAzimuth=False, starSub=None, removeStatesPattern=None, # Options for A matrix selection
+        nCores=1, cache=False, # Options for reading of lin files and MBC
         writeModes=None, **kwargs  # Options for .viz files
         ):
     """ 
@@ -54,6 +55,13 @@ def postproCampbell(fstFiles, BladeLen=None, TowerLen=None, verbose=True,
                 e.g:  'tower|Drivetrain'  or '^AD'
                 see FASTLinearizationFile. 
 
+    INPUTS (related to the processing of the lin files):
+     - nCores: number of processes used to treat the operating points (reading of lin files, MBC, eigenvalue analyses)
+               Default: 1 (sequential)
+     - cache: if True, the parsed lin files are stored in binary sidecar files (`<linfile>.npz`), 
+              used instead of the lin files when postprocessing again (e.g. with a different
+              `removeStatesPattern` or `starSub`), as long as the lin files are not modified.
+
     INPUTS (related to Campbell_Summary.txt output):
      - nFreqOut: maximum number of frequencies to write to Campbell_Summary.txt file
      - freqRange:    range in which frequencies are "accepted",  if None: [-np.inf, np.inf]
@@ -86,7 +94,8 @@ def postproCampbell(fstFiles, BladeLen=None, TowerLen=None, verbose=True,
     else:
         # --- Attemps to extract Blade Length and TowerLen from first file...
         CD, MBC = getCampbellDataOPs(fstFiles, writeModes=writeModes, BladeLen=BladeLen, TowerLen=TowerLen, 
-                removeTwrAzimuth=removeTwrAzimuth, starSub=starSub, removeStatesPattern=removeStatesPattern, verbose=verbose, **kwargs)
+                removeTwrAzimuth=removeTwrAzimuth, starSub=starSub, removeStatesPattern=removeStatesPattern, verbose=verbose, 
+                nCores=nCores, cache=cache, **kwargs)
 
     # --- Identify modes
     modeID_table,modesDesc=IdentifyModes(CD)
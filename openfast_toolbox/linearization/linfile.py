@@ -246,7 +246,7 @@ def readFASTMatrix(f):
 
     return name,tmp
     
-def ReadFASTLinear(filename, starSub=None, removeStatesPattern=None):
+def ReadFASTLinear(filename, starSub=None, removeStatesPattern=None, cache=False):
     """ 
     Read one lin file.
 
@@ -258,12 +258,13 @@ def ReadFASTLinear(filename, starSub=None, removeStatesPattern=None):
      - removeStatesPattern: remove states matching a giving description pattern.
                e.g:  'tower|Drivetrain'  or '^AD'
                see FASTLinearizationFile. 
+     - cache: if True, use (or create) a binary cache of the parsed lin file, see FASTLinearizationFile.
     OUTPUTS:
      - data: a dictionary with fields matching the MATLAB implementation. 
     """
 
     # --- Read lin file
-    f = FASTLinearizationFile(filename, starSub=starSub, removeStatesPattern=removeStatesPattern)
+    f = FASTLinearizationFile(filename, starSub=starSub, removeStatesPattern=removeStatesPattern, cache=cache, skipMatrices=['dUdu', 'dUdy'])
 
     # --- Legacy structure. TODO, just use "f"
     data={}
@@ -432,7 +433,7 @@ def ReadFASTLinearLegacy(filename):
             raise
 
 
-def get_Mats(FileNames, verbose=True, removeTwrAzimuth=False, starSub=None, removeStatesPattern=None):
+def get_Mats(FileNames, verbose=True, removeTwrAzimuth=False, starSub=None, removeStatesPattern=None, cache=False):
     """ 
     Extra main data from a list of lin files.
     INPUTS:
@@ -445,6 +446,7 @@ def get_Mats(FileNames, verbose=True, removeTwrAzimuth=False, starSub=None, remo
                 see FASTLinearizationFile. 
      - removeTwrAzimuth: if False do nothing
                 otherwise discard lin files where azimuth in [60, 180, 300]+/-4deg (close to tower). 
+     - cache: if True, use (or create) a binary cache of the parsed lin files, see FASTLinearizationFile.
 
     """
     NAzimStep = len(FileNames)
@@ -452,7 +454,7 @@ def get_Mats(FileNames, verbose=True, removeTwrAzimuth=False, starSub=None, remo
     # --- Read all files
     for iFile, filename in enumerate(FileNames):
         #data[iFile], _ = ReadFASTLinearLegacy(FileNames[iFile]);
-        data[iFile],_= ReadFASTLinear(FileNames[iFile], starSub=starSub, removeStatesPattern=removeStatesPattern);
+        data[iFile],_= ReadFASTLinear(FileNames[iFile], starSub=starSub, removeStatesPattern=removeStatesPattern, cache=cache);
     Azimuth  = np.array([d['Azimuth'] for d in data])*180/np.pi
     # --- Sort by azimuth, not required, but filenames are not sorted, nor are the lin times azimuth
     ISort = np.argsort(Azimuth)
@@ -117,10 +117,132 @@ def eiganalysis(A, ndof2=None, ndof1=None):
     mbc['PhaseModes_deg']  = np.angle(mbc['EigenVects'])*180.0/np.pi;
     return mbc, EigenVects_save[:,:,0]
 
+# --------------------------------------------------------------------------------}
+# --- Batched MBC3 transformation
+# --------------------------------------------------------------------------------{
+def _blockRight(M, nFix, t, fix=1):
+    """ 
+    Returns M @ blockdiag(fix*I_nFix, t, ..., t) for all azimuth steps at once
+     - M: (nAz x n x (nFix+3*nTriplets))
+     - t: (nAz x 3 x 3) block of each azimuth step
+    """
+    nAz, n, m = M.shape
+    nTrip = int((m-nFix)/3)
+    out = np.empty((nAz, n, m))
+    out[:,:,:nFix] = M[:,:,:nFix] if fix==1 else 0
+    out[:,:,nFix:] = np.einsum('ankj,ajl->ankl', M[:,:,nFix:].reshape(nAz,n,nTrip,3), t).reshape(nAz,n,3*nTrip)
+    return out
+
+def _blockLeft(t, M, nFix):
+    """ 
+    Returns blockdiag(I_nFix, t, ..., t) @ M for all azimuth steps at once
+     - t: (nAz x 3 x 3) block of each azimuth step
+     - M: (nAz x (nFix+3*nTriplets) x m)
+    """
+    nAz, n, m = M.shape
+    nTrip = int((n-nFix)/3)
+    out = np.empty((nAz, n, m))
+    out[:,:nFix,:] = M[:,:nFix,:]
+    out[:,nFix:,:] = np.einsum('aij,akjm->akim', t, M[:,nFix:,:].reshape(nAz,nTrip,3,m)).reshape(nAz,3*nTrip,m)
+    return out
+
+def _rightL(M, ndof2, nFix2, nFix1, tt, Omtt2):
+    """ Returns M @ L, with L the matrix of Eq. 29 (block structure of T1, Omega*T2 and T1q) """
+    ML = np.empty(M.shape)
+    ML[:,:,:ndof2]         = _blockRight(M[:,:,:ndof2], nFix2, tt) + _blockRight(M[:,:,ndof2:2*ndof2], nFix2, Omtt2, fix=0)
+    ML[:,:,ndof2:2*ndof2]  = _blockRight(M[:,:,ndof2:2*ndof2], nFix2, tt)
+    ML[:,:,2*ndof2:]       = _blockRight(M[:,:,2*ndof2:], nFix1, tt)
+    return ML
+
+def _leftTv(ttv, M, ndof2, nFix2, nFix1):
+    """ Returns blockdiag(T1v, T1v, T1qv) @ M """
+    TM = np.empty(M.shape)
+    TM[:,:ndof2]        = _blockLeft(ttv, M[:,:ndof2], nFix2)
+    TM[:,ndof2:2*ndof2] = _blockLeft(ttv, M[:,ndof2:2*ndof2], nFix2)
+    TM[:,2*ndof2:]      = _blockLeft(ttv, M[:,2*ndof2:], nFix1)
+    return TM
+
+def mbc3_transform(matData, new_seq_states, new_seq_inp, new_seq_out, nb=3):
+    """ 
+    Multi-blade coordinate transformation of the A, B, C, D matrices for all azimuth steps at once.
+
+    The block diagonal matrices T1, T1v, T2, T3, T1q, T1c and T1ov are not assembled: 
+    the 3x3 blocks of the rotating triplets are applied to all triplets and all azimuth 
+    steps with `einsum`, the non-rotating states are left untouched.
+
+    INPUTS:
+     - matData: dictionary of linearization matrices, see `get_Mats`
+     - new_seq_states, new_seq_inp, new_seq_out: reordering of the states, inputs and outputs
+              (non-rotating first, then rotating triplets), see `get_new_seq`
+     - nb: number of blades
+    OUTPUTS:
+     - MBC: dictionary with the transformed matrices 'A', 'B', 'C', 'D' (n x m x nAzimStep)
+    """
+    ndof2  = matData['ndof2']
+    nFix2  = ndof2                - matData['n_RotTripletStates2']*nb  # fixed-frame second-order dof
+    nFix1  = matData['ndof1']     - matData['n_RotTripletStates1']*nb  # fixed-frame first-order dof
+    nFixI  = matData['NumInputs'] - matData['n_RotTripletInputs']*nb   # fixed-frame control inputs
+    nFixO  = matData['NumOutputs']- matData['n_RotTripletOutputs']*nb  # fixed-frame outputs
+    nAz    = matData['NAzimStep']
+    Omega    = np.asarray(matData['Omega'])[:,None,None]
+    OmegaDot = np.asarray(matData['OmegaDot'])[:,None,None]
+
+    # Azimuth positions of the blades, (nAz x nb), Eq. 1
+    az = np.asarray(matData['Azimuth'])[:,None]*np.pi/180.0 + 2*np.pi/nb*np.arange(nb)[None,:]
+    cos_col = np.cos(az)
+    sin_col = np.sin(az)
+    zero = np.zeros(az.shape)
+    # 3x3 blocks of the transformation matrices, (nAz x 3 x 3)
+    tt  = np.stack((np.ones(az.shape), cos_col, sin_col), axis=-1) # Eq. 9, t_tilde
+    ttv = np.moveaxis(get_tt_inverse(sin_col.T, cos_col.T), -1, 0) # inverse of tt
+    tt2 = np.stack((zero, -sin_col,  cos_col), axis=-1)            # Eq. 16 a, t_tilde_2
+    tt3 = np.stack((zero, -cos_col, -sin_col), axis=-1)            # Eq. 16 b, t_tilde_3
+    Omtt2 = Omega*tt2
+
+    # Permuted matrices, azimuth first
+    perm = lambda M, I, J: np.moveaxis(M[I[:,None],J,:], -1, 0)
+    unperm = lambda M: np.moveaxis(M, 0, -1)
+
+    MBC = {}
+    nLin = matData['A'].shape[-1]
+    MBC['A'] = np.zeros(matData['A'].shape)
+    MBC['B'] = np.zeros((len(new_seq_states),len(new_seq_inp),nAz))
+    MBC['C'] = np.zeros(matData['C'].shape) if 'C' in matData.keys() else np.zeros((0,0,nLin))
+    MBC['D'] = np.zeros(matData['D'].shape) if 'D' in matData.keys() else np.zeros((0,0,nLin))
+
+    if 'A' in matData:
+        # Eq. 29
+        AL = _rightL(perm(matData['A'], new_seq_states, new_seq_states), ndof2, nFix2, nFix1, tt, Omtt2)
+        # Subtracting R, which is nonzero only for the blocks of the rotating triplets
+        for i in nFix2 + 3*np.arange(matData['n_RotTripletStates2']):
+            AL[:, i:i+3, i:i+3]                       -= Omtt2
+            AL[:, ndof2+i:ndof2+i+3, i:i+3]           -= Omega**2*tt3 + OmegaDot*tt2
+            AL[:, ndof2+i:ndof2+i+3, ndof2+i:ndof2+i+3] -= 2*Omtt2
+        for i in 2*ndof2 + nFix1 + 3*np.arange(matData['n_RotTripletStates1']):
+            AL[:, i:i+3, i:i+3] -= Omtt2
+        MBC['A'][new_seq_states[:,None],new_seq_states,:] = unperm(_leftTv(ttv, AL, ndof2, nFix2, nFix1))
+
+    if 'B' in matData:
+        # Eq. 30
+        TB = _leftTv(ttv, perm(matData['B'], new_seq_states, new_seq_inp), ndof2, nFix2, nFix1)
+        MBC['B'][new_seq_states[:,None],new_seq_inp,:] = unperm(_blockRight(TB, nFixI, tt))
+
+    if 'C' in matData:
+        # Eq. 31
+        TC = _blockLeft(ttv, perm(matData['C'], new_seq_out, new_seq_states), nFixO)
+        MBC['C'][new_seq_out[:,None],new_seq_states,:] = unperm(_rightL(TC, ndof2, nFix2, nFix1, tt, Omtt2))
+
+    if 'D' in matData:
+        # Eq. 32
+        TD = _blockLeft(ttv, perm(matData['D'], new_seq_out, new_seq_inp), nFixO)
+        MBC['D'][new_seq_out[:,None],new_seq_inp,:] = unperm(_blockRight(TD, nFixI, tt))
+
+    return MBC
+
 # --------------------------------------------------------------------------------}
 # --- Main function 
 # --------------------------------------------------------------------------------{
-def fx_mbc3(FileNames, verbose=True, starSub=None, removeStatesPattern=None, removeTwrAzimuth=False):
+def fx_mbc3(FileNames, verbose=True, starSub=None, removeStatesPattern=None, removeTwrAzimuth=False, cache=False):
     """ 
     Perform MBC2 funciton based on a list of lin files.
     NOTE: variable names and data structure match MATLAB implementation.
@@ -136,6 +258,8 @@ def fx_mbc3(FileNames, verbose=True, starSub=None, removeStatesPattern=None, rem
                see FASTLinearizationFile. 
      - removeTwrAzimuth: if False do nothing
                 otherwise discard lin files where azimuth in [60, 180, 300]+/-4deg (close to tower). 
+     - cache: if True, use (or create) a binary cache of the parsed lin files (`<linfile>.npz`), 
+              see FASTLinearizationFile.
 
     NOTE: unlike the matlab function, fx_mbc3 does not write the modes for VTK visualization
           Instead use the wrapper function def getCDDOP from openfast_toolbox.linearization.tools
@@ -144,7 +268,7 @@ def fx_mbc3(FileNames, verbose=True, starSub=None, removeStatesPattern=None, rem
     """
 
     MBC={}
-    matData, _ = get_Mats(FileNames, verbose=verbose, starSub=starSub, removeStatesPattern=removeStatesPattern, removeTwrAzimuth=removeTwrAzimuth)
+    matData, _ = get_Mats(FileNames, verbose=verbose, starSub=starSub, removeStatesPattern=removeStatesPattern, removeTwrAzimuth=removeTwrAzimuth, cache=cache)
 
     # print('matData[Omega] ', matData['Omega'])
     # print('matData[OmegaDot] ', matData['OmegaDot'])
@@ -212,150 +336,9 @@ def fx_mbc3(FileNames, verbose=True, starSub=None, removeStatesPattern=None, rem
             print('**ERROR: the size of OmegaDot vector must equal matData.NAzimStep, the num of azimuth steps');
 
 
-        nLin = matData['A'].shape[-1]
-        MBC['A'] = np.zeros(matData['A'].shape)
-        MBC['B'] = np.zeros((len(new_seq_states),len(new_seq_inp),matData['NAzimStep']))
-        if 'C' in matData.keys():
-            MBC['C']=np.zeros(matData['C'].shape)
-        else:
-            MBC['C']=np.zeros((0,0,nLin))
-        if 'D' in matData.keys():
-            MBC['D']=np.zeros(matData['D'].shape)
-        else:
-            MBC['D']=np.zeros((0,0,nLin))
-        
-        # print('new_seq_inp ',new_seq_inp)
-        # print('new_seq_out ',new_seq_out)
-        # print('new_seq_states ', new_seq_states)
-            
-        # begin azimuth loop 
-        for iaz in reversed(range(matData['NAzimStep'])):
-            #(loop backwards so we don't reallocate memory each time [i.e. variables with iaz index aren't getting larger each time])
-
-            temp=np.arange(nb)
-            # compute azimuth positions of blades:
-            az = matData['Azimuth'][iaz]*np.pi/180.0 + 2*np.pi/nb* temp ; # Eq. 1, azimuth in radians
-
-            # get rotor speed squared
-            OmegaSquared = matData['Omega'][iaz]**2;
-
-            #print(OmegaSquared)
-
-            # compute transformation matrices
-            cos_col = np.cos(az);
-            sin_col = np.sin(az);
-
-            tt=np.column_stack((np.ones(3),cos_col,sin_col))  # Eq. 9, t_tilde
-            ttv = get_tt_inverse(sin_col, cos_col);     # inverse of tt (computed analytically in function below)
-            tt2 = np.column_stack((np.zeros(3), -sin_col,  cos_col))     # Eq. 16 a, t_tilde_2
-            tt3 = np.column_stack((np.zeros(3), -cos_col, -sin_col))     # Eq. 16 b, t_tilde_3
-            
-            #---
-            T1 = np.eye(n_FixFrameStates2);                # Eq. 11 for second-order states only
-            #print('B ',T1, n_FixFrameStates2, matData['n_RotTripletStates2'])
-            for ii in range(matData['n_RotTripletStates2']):
-                T1 = scp.block_diag(T1,tt)
-            
-            T1v = np.eye(n_FixFrameStates2);               # inverse of T1
-            for ii in  range(matData['n_RotTripletStates2']):
-                T1v = scp.block_diag(T1v, ttv);
-
-            T2 = np.zeros([n_FixFrameStates2,n_FixFrameStates2]);              # Eq. 14  for second-order states only
-            for ii in range(matData['n_RotTripletStates2']):
-                T2 = scp.block_diag(T2, tt2);
-
-            #print('T1, T1v, T2 ',T1.shape, T1v.shape, T2.shape)
-            #---    
-            T1q = np.eye(n_FixFrameStates1);               # Eq. 11 for first-order states (eq. 8 in MBC3 Update document)
-            for ii in range(matData['n_RotTripletStates1']):
-                T1q = scp.block_diag(T1q, tt);
-
-            T1qv = np.eye(n_FixFrameStates1);              # inverse of T1q
-            for ii in range(matData['n_RotTripletStates1']):
-                T1qv = scp.block_diag(T1qv, ttv);
-
-            T2q = np.zeros([n_FixFrameStates1,n_FixFrameStates1]);             # Eq. 14 for first-order states (eq.  9 in MBC3 Update document)
-            for ii in range(matData['n_RotTripletStates1']):
-                T2q = scp.block_diag(T2q, tt2);
-
-            #print('T1q, T1qv, T2q ',T1q.shape, T1qv.shape, T2q.shape)
-            #     T1qc = np.eye(matData.NumHDInputs);            # inverse of T1q
-
-            #---
-            T3 = np.zeros([n_FixFrameStates2,n_FixFrameStates2]);              # Eq. 15
-            for ii in range(matData['n_RotTripletStates2']):
-                T3 = scp.block_diag(T3, tt3);
-
-            #---
-            T1c = np.eye(n_FixFrameInputs);                # Eq. 21
-            for ii in range(matData['n_RotTripletInputs']):
-                T1c = scp.block_diag(T1c, tt)
-
-            T1ov = np.eye(n_FixFrameOutputs);              # inverse of Tlo (Eq. 23)
-            for ii in range(matData['n_RotTripletOutputs']):
-                T1ov = scp.block_diag(T1ov, ttv);
-
-            #print('T3, T1c, T1ov ',T3.shape, T1c.shape, T1ov.shape, matData['A'].shape)
-            # mbc transformation of first-order matrices
-            #  if ( MBC.EqnsOrder == 1 ) # activate later
-
-            #print('Before ',T1c)
-    
-            if 'A' in matData:
-                #A =  matData['A'][:,:,iaz]
-                #A_reordered =  A[np.ix_(new_seq_states, new_seq_states)]
-                # Eq. 29
-                L1=np.concatenate((T1, np.zeros([matData['ndof2'],matData['ndof2']]), np.zeros([matData['ndof2'], matData['ndof1']])), axis=1)
-                L2=np.concatenate((matData['Omega'][iaz]*T2,T1,np.zeros([matData['ndof2'], matData['ndof1']])), axis=1)
-                L3=np.concatenate((np.zeros([matData['ndof1'], matData['ndof2']]),np.zeros([matData['ndof1'], matData['ndof2']]), T1q), axis=1)            
-                L=np.matmul(matData['A'][new_seq_states[:,None],new_seq_states,iaz], np.concatenate((L1,L2,L3),axis=0))
-
-                R1=np.concatenate((matData['Omega'][iaz]*T2, np.zeros([matData['ndof2'],matData['ndof2']]), np.zeros([matData['ndof2'], matData['ndof1']])), axis=1)
-                R2=np.concatenate((OmegaSquared*T3 + matData['OmegaDot'][iaz]*T2,  2*matData['Omega'][iaz]*T2, np.zeros([matData['ndof2'], matData['ndof1']])),axis=1)
-                R3=np.concatenate((np.zeros([matData['ndof1'], matData['ndof2']]), np.zeros([matData['ndof1'], matData['ndof2']]),  matData['Omega'][iaz]*T2q), axis=1)
-        
-                R=np.concatenate((R1,R2,R3),axis=0)
-
-                MBC['A'][new_seq_states[:,None],new_seq_states,iaz]=np.matmul(scp.block_diag(T1v, T1v, T1qv),(L-R))
-
-                # ffname='AAA'+str(iaz)+'.txt'
-                # with open(ffname, "a") as f:
-                #     np.savetxt(f,MBC['A'][:,:,iaz],fmt='%5.4f')
-                #     f.write('\n')
-
-            if 'B' in matData:
-                # Eq. 30
-                MBC['B'][new_seq_states[:,None],new_seq_inp,iaz]=np.matmul(np.matmul(scp.block_diag(T1v, T1v, T1qv), matData['B'][new_seq_states[:,None],new_seq_inp,iaz]),T1c)
-            
-                # ffname='BBB'+str(iaz)+'.txt'
-                # with open(ffname, "a") as f:
-                #     np.savetxt(f,MBC['B'][:,:,iaz],fmt='%5.4f')
-                #     f.write('\n')
-
-            if 'C' in matData:
-                # Eq. 31
-
-                L1=np.concatenate((T1, np.zeros([matData['ndof2'],matData['ndof2']]), np.zeros([matData['ndof2'], matData['ndof1']])),axis=1)
-                L2=np.concatenate((matData['Omega'][iaz]*T2, T1, np.zeros([matData['ndof2'], matData['ndof1']])), axis=1)
-                L3=np.concatenate((np.zeros([matData['ndof1'], matData['ndof2']]), np.zeros([matData['ndof1'], matData['ndof2']]), T1q), axis=1)
-            
-                MBC['C'][new_seq_out[:,None], new_seq_states,iaz]=np.matmul(np.matmul(T1ov,matData['C'][new_seq_out[:,None],new_seq_states,iaz]),np.concatenate((L1,L2,L3),axis=0))
-
-                # ffname='CCC'+str(iaz)+'.txt'
-                # with open(ffname, "a") as f:
-                #     np.savetxt(f,MBC['C'][:,:,iaz],fmt='%5.4f')
-                #     f.write('\n')
-
-            if 'D' in matData:
-               # Eq. 32
-                MBC['D'][new_seq_out[:,None],new_seq_inp,iaz] = np.matmul(np.matmul(T1ov,matData['D'][new_seq_out[:,None],new_seq_inp,iaz]), T1c)
-
-                # ffname='DDD'+str(iaz)+'.txt'
-                # with open(ffname, "a") as f:
-                #     np.savetxt(f,MBC['D'][:,:,iaz],fmt='%5.4f')
-                #     f.write('\n')
-
-        # end   # end of azimuth loop
+        # Transformation of all azimuth steps at once
+        MBC.update(mbc3_transform(matData, new_seq_states, new_seq_inp, new_seq_out, nb=nb))
+
     else:
         print(' fx_mbc3 WARNING: Number of blades is ', str(nb), ' not 3. MBC transformation was not performed.')
         MBC['performedTransformation'] = False;
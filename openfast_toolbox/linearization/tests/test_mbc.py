@@ -0,0 +1,64 @@
+import unittest
+import numpy as np
+import scipy.linalg as scp
+import openfast_toolbox.linearization.mbc as mbc
+
+
+def synthMatData(nFix2=4, nT2=2, nFix1=2, nT1=1, nFixI=2, nTI=1, nFixO=1, nTO=2, nAz=5, seed=0):
+    """ Random linearization matrices with rotating triplets, as returned by get_Mats """
+    rng = np.random.default_rng(seed)
+    ndof2 = nFix2+3*nT2
+    ndof1 = nFix1+3*nT1
+    n, ni, no = 2*ndof2+ndof1, nFixI+3*nTI, nFixO+3*nTO
+    trip = lambda nT, ntot: rng.permutation(ntot)[:3*nT].reshape(nT,3)
+    return dict(NAzimStep=nAz, ndof2=ndof2, ndof1=ndof1, NumStates2=2*ndof2, NumInputs=ni, NumOutputs=no,
+             Azimuth=np.linspace(0,360,nAz,endpoint=False), Omega=rng.uniform(0.5,1.5,nAz), OmegaDot=rng.normal(size=nAz),
+             A=rng.normal(size=(n,n,nAz)), B=rng.normal(size=(n,ni,nAz)), C=rng.normal(size=(no,n,nAz)), D=rng.normal(size=(no,ni,nAz)),
+             RotTripletIndicesStates2=trip(nT2,ndof2), RotTripletIndicesStates1=trip(nT1,ndof1),
+             RotTripletIndicesCntrlInpt=trip(nTI,ni), RotTripletIndicesOutput=trip(nTO,no),
+             n_RotTripletStates2=nT2, n_RotTripletStates1=nT1, n_RotTripletInputs=nTI, n_RotTripletOutputs=nTO)
+
+
+class TestMBC(unittest.TestCase):
+
+    def test_mbc3_transform(self):
+        # Batched transformation against the dense block diagonal matrices of Eqs. 29-32
+        d = synthMatData()
+        seq2,_,_ = mbc.get_new_seq(d['RotTripletIndicesStates2'], d['ndof2'])
+        seq1,_,_ = mbc.get_new_seq(d['RotTripletIndicesStates1'], d['ndof1'])
+        seqS = np.concatenate((seq2, seq2+d['ndof2'], seq1+d['NumStates2']))
+        seqI,_,_ = mbc.get_new_seq(d['RotTripletIndicesCntrlInpt'], d['NumInputs'])
+        seqO,_,_ = mbc.get_new_seq(d['RotTripletIndicesOutput'], d['NumOutputs'])
+        MBC = mbc.mbc3_transform(d, seqS, seqI, seqO)
+
+        blk = lambda nFix, nT, t, fix=1: scp.block_diag(*([fix*np.eye(nFix)] + [t]*nT))
+        for iaz in range(d['NAzimStep']):
+            az  = (d['Azimuth'][iaz]*np.pi/180.0 + 2*np.pi/3*np.arange(3)).reshape((-1,1))
+            tt  = np.column_stack((np.ones((3,1)), np.cos(az), np.sin(az)))
+            tt2 = np.column_stack((np.zeros((3,1)), -np.sin(az), np.cos(az)))
+            tt3 = np.column_stack((np.zeros((3,1)), -np.cos(az), -np.sin(az)))
+            ttv = np.linalg.inv(tt)
+            nF2, nT2 = d['ndof2']-3*d['n_RotTripletStates2'], d['n_RotTripletStates2']
+            nF1, nT1 = d['ndof1']-3*d['n_RotTripletStates1'], d['n_RotTripletStates1']
+            nFI, nTI = d['NumInputs']-3*d['n_RotTripletInputs'], d['n_RotTripletInputs']
+            nFO, nTO = d['NumOutputs']-3*d['n_RotTripletOutputs'], d['n_RotTripletOutputs']
+            Om, OmD = d['Omega'][iaz], d['OmegaDot'][iaz]
+            T1, T1v, T2, T3 = blk(nF2,nT2,tt), blk(nF2,nT2,ttv), blk(nF2,nT2,tt2,0), blk(nF2,nT2,tt3,0)
+            T1q, T1qv, T2q  = blk(nF1,nT1,tt), blk(nF1,nT1,ttv), blk(nF1,nT1,tt2,0)
+            T1c, T1ov = blk(nFI,nTI,tt), blk(nFO,nTO,ttv)
+            Z2, Z21 = np.zeros(T1.shape), np.zeros((T1.shape[0],T1q.shape[0]))
+            L = np.block([[T1, Z2, Z21], [Om*T2, T1, Z21], [Z21.T, Z21.T, T1q]])
+            R = np.block([[Om*T2, Z2, Z21], [Om**2*T3+OmD*T2, 2*Om*T2, Z21], [Z21.T, Z21.T, Om*T2q]])
+            Tv = scp.block_diag(T1v, T1v, T1qv)
+            A = d['A'][np.ix_(seqS,seqS)][:,:,iaz]
+            B = d['B'][np.ix_(seqS,seqI)][:,:,iaz]
+            C = d['C'][np.ix_(seqO,seqS)][:,:,iaz]
+            D = d['D'][np.ix_(seqO,seqI)][:,:,iaz]
+            np.testing.assert_allclose(MBC['A'][np.ix_(seqS,seqS)][:,:,iaz], Tv @ (A @ L - R), atol=1e-12)
+            np.testing.assert_allclose(MBC['B'][np.ix_(seqS,seqI)][:,:,iaz], Tv @ B @ T1c    , atol=1e-12)
+            np.testing.assert_allclose(MBC['C'][np.ix_(seqO,seqS)][:,:,iaz], T1ov @ C @ L    , atol=1e-12)
+            np.testing.assert_allclose(MBC['D'][np.ix_(seqO,seqI)][:,:,iaz], T1ov @ D @ T1c  , atol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,7 +13,7 @@ from openfast_toolbox.linearization.campbell_data import campbell_diagram_data_o
 
 def getCampbellDataOP(fstFile_or_linFiles, writeModes=None, BladeLen=None, TowerLen=None, 
         removeTwrAzimuth=False, starSub=None, removeStatesPattern=None, verbose=False, 
-        writeViz=False, **kwargs):
+        writeViz=False, cache=False, **kwargs):
     """ 
     Return Campbell Data at one operating point from a .fst file or a list of lin files
     INPUTS:
@@ -41,6 +41,9 @@ def getCampbellDataOP(fstFile_or_linFiles, writeModes=None, BladeLen=None, Tower
      - removeTwrAzimuth: if False do nothing
                 otherwise discard lin files where azimuth in [60, 180, 300]+/-4deg (close to tower). 
      - verbose: if True, more info is written to stdout
+     - cache: if True, the parsed lin files are stored in binary sidecar files (`<linfile>.npz`),
+              which are used instead of the lin files as long as these are not modified.
+              see FASTLinearizationFile.
 
      - **kwargs: list of key/values to be passed to writeVizFile (see function below)
            VTKLinModes=15, VTKLinScale=10, VTKLinTim=1, VTKLinTimes1=True, VTKLinPhase=0, VTKModes=None
@@ -53,7 +56,7 @@ def getCampbellDataOP(fstFile_or_linFiles, writeModes=None, BladeLen=None, Tower
     fstFile, linFiles =  getFST_and_LinFiles(fstFile_or_linFiles, verbose=verbose)
 
     # --- Open lin files for given OP/fst file, perform MBC
-    MBCOP, matData = getMBCOP(fstFile=fstFile, linFiles=linFiles, verbose=verbose, removeTwrAzimuth=removeTwrAzimuth, starSub=starSub, removeStatesPattern=removeStatesPattern)
+    MBCOP, matData = getMBCOP(fstFile=fstFile, linFiles=linFiles, verbose=verbose, removeTwrAzimuth=removeTwrAzimuth, starSub=starSub, removeStatesPattern=removeStatesPattern, cache=cache)
     if MBCOP is None:
         return None, None
 
@@ -88,29 +91,45 @@ def getCampbellDataOP(fstFile_or_linFiles, writeModes=None, BladeLen=None, Tower
     return CDDOP, MBCOP
 
 
-def getCampbellDataOPs(fstFiles, BladeLen=None, TowerLen=None, verbose=False, **kwargs):
+def _campbellDataOP(args):
+    """ Campbell data for one operating point, see getCampbellDataOPs """
+    i, fstFile, kwargs = args
+    CDDOP, MBCOP = getCampbellDataOP(fstFile, **kwargs)
+    return i, CDDOP, MBCOP
+
+def getCampbellDataOPs(fstFiles, BladeLen=None, TowerLen=None, verbose=False, nCores=1, **kwargs):
     """ 
     Return Campbell Data at several operating points from a list of .fst files
         see getCampbellDataOP for input arguments
+
+     - nCores: number of processes used to treat the operating points (reading of the lin files,
+               MBC and eigenvalue analyses). Default: 1 (sequential)
     """
     # --- Estimate blade length and tower length for scaling
     if BladeLen is None and TowerLen is None:
         BladeLen, TowerLen = estimateLengths(fstFiles[0], verbose=verbose)
 
-    # --- Run MBC for all operating points
-    MBC = []
-    CDD = []
-    for i_lin, fstFile in enumerate(fstFiles):
-        CDDOP, MBCOP = getCampbellDataOP(fstFile, BladeLen=BladeLen, TowerLen=TowerLen, verbose=verbose, **kwargs)
-        if MBCOP is not None:
-            CDD.append(CDDOP)
-            MBC.append(MBCOP)
+    # --- Run MBC for all operating points, in parallel if requested
+    kwargs.update(BladeLen=BladeLen, TowerLen=TowerLen, verbose=verbose)
+    tasks = [(i, fstFile, kwargs) for i, fstFile in enumerate(fstFiles)]
+    OPs = [(None, None)]*len(tasks)
+    if nCores>1 and len(tasks)>1:
+        from multiprocessing import Pool
+        with Pool(min(nCores, len(tasks))) as pool:
+            for i, CDDOP, MBCOP in pool.imap_unordered(_campbellDataOP, tasks):
+                OPs[i] = (CDDOP, MBCOP)
+    else:
+        for task in tasks:
+            i, CDDOP, MBCOP = _campbellDataOP(task)
+            OPs[i] = (CDDOP, MBCOP)
+    MBC = [MBCOP for CDDOP, MBCOP in OPs if MBCOP is not None]
+    CDD = [CDDOP for CDDOP, MBCOP in OPs if MBCOP is not None]
     # Remove missing data
     if len(CDD)==0:
         raise Exception('No linearization file found')
     return CDD, MBC
 
-def getMBCOP(fstFile, linFiles=None, verbose=False, removeTwrAzimuth=False, starSub=None, removeStatesPattern=None):
+def getMBCOP(fstFile, linFiles=None, verbose=False, removeTwrAzimuth=False, starSub=None, removeStatesPattern=None, cache=False):
     """ 
     Run necessary MBC for an OpenFAST file (one operating point)
 
@@ -125,6 +144,7 @@ def getMBCOP(fstFile, linFiles=None, verbose=False, removeTwrAzimuth=False, star
                see FASTLinearizationFile. 
      - removeTwrAzimuth: if False do nothing
                 otherwise discard lin files where azimuth in [60, 180, 300]+/-4deg (close to tower). 
+     - cache: if True, use (or create) a binary cache of the parsed lin files, see FASTLinearizationFile.
 
     """
 
@@ -134,23 +154,40 @@ def getMBCOP(fstFile, linFiles=None, verbose=False, removeTwrAzimuth=False, star
 
     # --- run MBC3 and campbell post_pro on lin files, generate postMBC file if needed 
     if len(linFiles)>0:
-        MBC, matData = fx_mbc3(linFiles, verbose=False, removeTwrAzimuth=removeTwrAzimuth, starSub=starSub, removeStatesPattern=removeStatesPattern)
+        MBC, matData = fx_mbc3(linFiles, verbose=False, removeTwrAzimuth=removeTwrAzimuth, starSub=starSub, removeStatesPattern=removeStatesPattern, cache=cache)
     else:
         return None, None
 
     return MBC, matData
 
-def getMBCOPs(fstfiles, verbose=True, removeTwrAzimuth=False):
+def _MBCOP(args):
+    """ MBC for one operating point, see getMBCOPs """
+    i, fstFile, kwargs = args
+    MBCOP, matData = getMBCOP(fstFile, **kwargs)
+    return i, MBCOP
+
+def getMBCOPs(fstfiles, verbose=True, removeTwrAzimuth=False, starSub=None, removeStatesPattern=None, cache=False, nCores=1):
     """
     Run MBC transform on set of openfast linear outputs (multiple operating points)
 
     INPUTS:
       - fstfiles: list of .fst files
+      - nCores: number of processes used to treat the operating points. Default: 1 (sequential)
+      see getMBCOP for the other inputs
     """
+    kwargs = dict(verbose=verbose, removeTwrAzimuth=removeTwrAzimuth, starSub=starSub, removeStatesPattern=removeStatesPattern, cache=cache)
+    tasks = [(i, fstfile, kwargs) for i, fstfile in enumerate(fstfiles)]
     MBC = [None]*len(fstfiles)
-    for i_lin, fstfile in enumerate(fstfiles):
+    if nCores>1 and len(tasks)>1:
+        from multiprocessing import Pool
+        with Pool(min(nCores, len(tasks))) as pool:
+            for i, MBCOP in pool.imap_unordered(_MBCOP, tasks):
+                MBC[i] = MBCOP
+    else:
         # MBC for a given operating point (OP)
-        MBC[i_lin], matData = getMBCOP(fstfile, verbose=verbose, removeTwrAzimuth=removeTwrAzimuth)
+        for task in tasks:
+            i, MBCOP = _MBCOP(task)
+            MBC[i] = MBCOP
     return MBC
 
 
@@ -115,6 +115,34 @@ def RotMat_AxisAngle(u,theta):
     R[2,0]=uz*ux*(1-c)-uy*s ; R[2,1]=uz*uy*(1-c)+ux*s; R[2,2]=uz**2*(1-c)+c;
     return R
 
+def smallRot_OF(theta1, theta2, theta3):
+    """
+    Transformation matrix for small rotations, as implemented in OpenFAST (SmllRotTrans),
+    orthonormalized, see NWTC library.
+    The angles may be arrays of identical (or broadcastable) shapes, in which case the
+    returned array has shape (..., 3, 3).
+    """
+    t1, t2, t3 = np.broadcast_arrays(np.asarray(theta1, dtype=float), np.asarray(theta2, dtype=float), np.asarray(theta3, dtype=float))
+    SqrdSum  = t1**2 + t2**2 + t3**2
+    SQRT1SSS = np.sqrt(1.0 + SqrdSum)
+    zero     = SqrdSum==0
+    ComDenom = np.where(zero, 1.0, SqrdSum*SQRT1SSS)
+    Theta12S = t1*t2*(SQRT1SSS - 1.0)
+    Theta13S = t1*t3*(SQRT1SSS - 1.0)
+    Theta23S = t2*t3*(SQRT1SSS - 1.0)
+    R = np.zeros(t1.shape+(3,3))
+    R[...,0,0] = ( t1**2*SQRT1SSS + t2**2 + t3**2          )/ComDenom
+    R[...,1,1] = ( t1**2 + t2**2*SQRT1SSS + t3**2          )/ComDenom
+    R[...,2,2] = ( t1**2 + t2**2 + t3**2*SQRT1SSS          )/ComDenom
+    R[...,0,1] = (  t3*SqrdSum + Theta12S                  )/ComDenom
+    R[...,1,0] = ( -t3*SqrdSum + Theta12S                  )/ComDenom
+    R[...,0,2] = ( -t2*SqrdSum + Theta13S                  )/ComDenom
+    R[...,2,0] = (  t2*SqrdSum + Theta13S                  )/ComDenom
+    R[...,1,2] = (  t1*SqrdSum + Theta23S                  )/ComDenom
+    R[...,2,1] = ( -t1*SqrdSum + Theta23S                  )/ComDenom
+    R[zero] = np.eye(3)
+    return R
+
 def orth_vect(u):
     """ Given one vector, returns a 3x1 orthonormal vector to it"""
     u=(u/np.linalg.norm(u)).ravel()
@@ -1082,8 +1110,11 @@ def ED_qDict2q(qDict):
     The dictionary is a convenient way to just specify few DOFs
     Example:
        qDict={'Hv':0}
+    Values may also be arrays (e.g. time series), in which case q has shape (..., ED_MaxDOFs):
+       qDict={'Hv':np.zeros(100), 'P':np.linspace(0,0.1,100)}
     """
-    q = np.zeros(ED_MaxDOFs)
+    shape = np.broadcast(*[np.asarray(v) for v in qDict.values()]).shape if len(qDict)>0 else ()
+    q = np.zeros(shape+(ED_MaxDOFs,))
 
     qMAP = {'Sg':DOF_Sg,'Sw':DOF_Sw,'Hv':DOF_Hv, 'R':DOF_R, 'P':DOF_P, 'Y':DOF_Y}
     qMAP.update({'TFA1':DOF_TFA1, 'TSS1':DOF_TSS1, 'TFA2':DOF_TFA2, 'TSS2':DOF_TSS2})
@@ -1093,40 +1124,43 @@ def ED_qDict2q(qDict):
         if k not in qMAP.keys():
             raise Exception('Key {} not supported by qMAP'.format(k))
         if k=='TSS1' or k=='TSS2':
-            q[qMAP[k]] = -v # <<<< NOTE: DOF has a negative convention
+            q[...,qMAP[k]] = -np.asarray(v) # <<<< NOTE: DOF has a negative convention
         else:
-            q[qMAP[k]] = v
+            q[...,qMAP[k]] = v
     return q
 
 
 def EDVec2IEC(v, offset=None):
-    """ Convert a vector/array of coordinates from ElastoDyn coordinate system to IEC"""
+    """ Convert a vector/array of coordinates from ElastoDyn coordinate system to IEC
+    v can be a vector of shape (3,), or an array of vectors of shape (..., 3) (e.g. (nt, nNodes, 3))
+    """
     if offset is None:
         offset = np.array([0,0,0])
     v = np.asarray(v)
-    if len(v.shape)==1:
-        vIEC = np.array([ v[0]+offset[0], -v[2]+offset[1],  v[1]+offset[2]])
-    elif len(v.shape)==2 and v.shape[1]==3:
-        vIEC = np.column_stack( [ v[:,0]+offset[0], -v[:,2]+offset[1],  v[:,1]+offset[2]] )
-    else:
+    if v.ndim==0 or v.shape[-1]!=3:
         raise NotImplementedError()
+    vIEC = np.stack( [ v[...,0]+offset[0], -v[...,2]+offset[1],  v[...,1]+offset[2]], axis=-1)
     return vIEC
 
 def EDSysVectoIECDCM(a1, a2, a3):
-    """ Return DCM from ElastoDyn coordsys vectors (in a different coordinate system)"""
-    R_g2t = np.zeros((3,3))
-    R_g2t[:,0] = [ a1[0], -a3[0],  a2[0]]
-    R_g2t[:,1] = [-a1[2],  a3[2], -a2[2]]
-    R_g2t[:,2] = [ a1[1], -a3[1],  a2[1]]
+    """ Return DCM from ElastoDyn coordsys vectors (in a different coordinate system)
+    The vectors may be arrays of shape (..., 3), in which case the DCMs have shape (..., 3, 3)
+    """
+    a1, a2, a3 = np.asarray(a1), np.asarray(a2), np.asarray(a3)
+    R_g2t = np.zeros(a1.shape[:-1]+(3,3))
+    R_g2t[...,:,0] = np.stack([ a1[...,0], -a3[...,0],  a2[...,0]], axis=-1)
+    R_g2t[...,:,1] = np.stack([-a1[...,2],  a3[...,2], -a2[...,2]], axis=-1)
+    R_g2t[...,:,2] = np.stack([ a1[...,1], -a3[...,1],  a2[...,1]], axis=-1)
     return R_g2t
 
 def EDSysVecRot(R,z1,z2,z3):
     """ 
     Apply transformation matrix to vectors to obtain other vectors
+    R may be an array of shape (..., 3, 3), and z1, z2, z3 arrays of shape (..., 3)
     """
-    a1 = R[0,0]*z1 + R[0,1]*z2 + R[0,2]*z3
-    a2 = R[1,0]*z1 + R[1,1]*z2 + R[1,2]*z3
-    a3 = R[2,0]*z1 + R[2,1]*z2 + R[2,2]*z3
+    a1 = R[...,0,0,None]*z1 + R[...,0,1,None]*z2 + R[...,0,2,None]*z3
+    a2 = R[...,1,0,None]*z1 + R[...,1,1,None]*z2 + R[...,1,2,None]*z3
+    a3 = R[...,2,0,None]*z1 + R[...,2,1,None]*z2 + R[...,2,2,None]*z3
     return a1, a2 ,a3
 
 
@@ -1148,8 +1182,6 @@ def ED_CoordSys(q=None, qDict=None, TwrFASF=None, TwrSSSF=None):
     if qDict is not None:
         q = ED_qDict2q(qDict)
 
-
-    from welib.yams.rotations import smallRot_OF
     # --- Inertial frame coordinate system:
     z1 = np.array([ 1, 0, 0]) # Vector / direction z1 (=  xi from the IEC coord. system).
     z2 = np.array([ 0, 1, 0]) # Vector / direction z2 (=  zi from the IEC coord. system).
@@ -1175,9 +1207,10 @@ def ED_CoordSys(q=None, qDict=None, TwrFASF=None, TwrSSSF=None):
         t3 = np.zeros((TwrNodes,3))
         R_g2Ts = np.zeros((TwrNodes,3,3))# List of transformations from global to tower elements
         for j in range(TwrNodes):
+            jj=j+1
             # Slope V:    Mode 1   V             Mode 2   V 
-            ThetaFA = -TwrFASF[0,j,1]*q[DOF_TFA1] - TwrFASF[1,j,1]*q[DOF_TFA2]
-            ThetaSS =  TwrSSSF[0,j,1]*q[DOF_TSS1] + TwrSSSF[1,j,1]*q[DOF_TSS2]
+            ThetaFA = -TwrFASF[0,jj,1]*q[DOF_TFA1] - TwrFASF[1,jj,1]*q[DOF_TFA2]
+            ThetaSS =  TwrSSSF[0,jj,1]*q[DOF_TSS1] + TwrSSSF[1,jj,1]*q[DOF_TSS2]
             R = smallRot_OF(ThetaSS, 0, ThetaFA)
             t1[j,:], t2[j,:], t3[j,:] = EDSysVecRot(R, a1, a2, a3)
             R_g2Ts[j,:,:] =EDSysVectoIECDCM(t1[j,:], t2[j,:], t3[j,:])
@@ -1455,7 +1488,7 @@ def ED_Positions(q=None, qDict=None, CoordSys=None, p=None, dat=None, IEC=None):
         jj=j+1
         # Calculate the position vector of the current node:
         dat['rT0T'][j,:] = ( p['TwrFASF'][0,jj,0]*QT[DOF_TFA1] + p['TwrFASF'][1,jj,0]*QT[DOF_TFA2] )*CoordSys['a1']# Position vector from base of flexible portion of tower (point T(0)) to current node (point T(j)).
-        dat['rT0T'][j,:] +=                     + ( p['HNodes'][j] - 0.5*(     p['AxRedTFA'][0,0,j]*QT[DOF_TFA1]*QT[DOF_TFA1] \
+        dat['rT0T'][j,:] +=                     + ( p['HNodes'][j] - 0.5*(     p['AxRedTFA'][0,0,jj]*QT[DOF_TFA1]*QT[DOF_TFA1] \
                                                +     p['AxRedTFA'][1,1,jj]*QT[DOF_TFA2]*QT[DOF_TFA2] \
                                                + 2.0*p['AxRedTFA'][0,1,jj]*QT[DOF_TFA1]*QT[DOF_TFA2] \
                                                +     p['AxRedTSS'][0,0,jj]*QT[DOF_TSS1]*QT[DOF_TSS1] \
@@ -2111,6 +2144,299 @@ def ED_CalcOutputs(x, p, noAxRed=False):
     dat, IEC = ED_LinVelPAcc   (qDict=qDict, qdDict=qdDict, CoordSys=CS, p=p, dat=dat, IEC=IEC)
     return CS, dat, IEC
 
+# --------------------------------------------------------------------------------}
+# --- Batched kinematics (time series of states)
+# --------------------------------------------------------------------------------{
+def _ED_qBatch(q=None, qDict=None):
+    """ Return an array of degrees of freedom of shape (nt, ED_MaxDOFs) from either:
+     - q: array of shape (nt, nDOF) with nDOF<=ED_MaxDOFs (missing DOFs are set to zero)
+     - qDict: dictionary of time series, see ED_qDict2q
+    """
+    if qDict is not None:
+        q = ED_qDict2q(qDict)
+    q = np.atleast_2d(np.asarray(q, dtype=float))
+    if q.ndim!=2 or q.shape[1]>ED_MaxDOFs:
+        raise Exception('q should be of shape (nt, nDOF) with nDOF<={}, got {}'.format(ED_MaxDOFs, q.shape))
+    if q.shape[1]<ED_MaxDOFs:
+        q = np.column_stack((q, np.zeros((q.shape[0], ED_MaxDOFs-q.shape[1]))))
+    return q
+
+def _ED_TwrElasticBatch(QT, QDT, a1, a2, a3, AngVelEX, SF_FA, SF_SS, AxRedFA, AxRedSS):
+    """ 
+    Elastic velocity and partial acceleration of tower points due to the tower DOFs, batched over time.
+    See the loops over TFA1, TSS1, TFA2, TSS2 in ED_LinVelPAcc.
+    INPUTS:
+     - QT, QDT: DOFs and DOF velocities, shape (nt, ED_MaxDOFs)
+     - a1, a2, a3, AngVelEX: vectors, shape (nt, 3)
+     - SF_FA, SF_SS: shape function values at the points, shape (2, nJ)
+     - AxRedFA, AxRedSS: axial reduction terms at the points, shape (2, 2, nJ)
+    OUTPUTS:
+     - LinVelXT : sum_i qd_i PLinVelET[i,0], shape (nt, nJ, 3)
+     - LinAccETt: sum_i qd_i PLinVelET[i,1], shape (nt, nJ, 3)
+    """
+    q1, q2, q3, q4 = [QT [:,[i]] for i in (DOF_TFA1, DOF_TFA2, DOF_TSS1, DOF_TSS2)] # (nt,1)
+    v1, v2, v3, v4 = [QDT[:,[i]] for i in (DOF_TFA1, DOF_TFA2, DOF_TSS1, DOF_TSS2)]
+    A1, A2, A3 = a1[:,None,:], a2[:,None,:], a3[:,None,:]
+    # Along a1 and a3: shape functions
+    LinVelXT  = ((v1*SF_FA[0] + v2*SF_FA[1]))[...,None]*A1 + ((v3*SF_SS[0] + v4*SF_SS[1]))[...,None]*A3
+    # Along a2: axial reduction
+    dPos   = v1*(AxRedFA[0,0]*q1 + AxRedFA[0,1]*q2) + v2*(AxRedFA[1,1]*q2 + AxRedFA[0,1]*q1) \
+           + v3*(AxRedSS[0,0]*q3 + AxRedSS[0,1]*q4) + v4*(AxRedSS[1,1]*q4 + AxRedSS[0,1]*q3)
+    dVel   = v1*(AxRedFA[0,0]*v1 + AxRedFA[0,1]*v2) + v2*(AxRedFA[1,1]*v2 + AxRedFA[0,1]*v1) \
+           + v3*(AxRedSS[0,0]*v3 + AxRedSS[0,1]*v4) + v4*(AxRedSS[1,1]*v4 + AxRedSS[0,1]*v3)
+    LinVelXT  = LinVelXT - dPos[...,None]*A2
+    LinAccETt = np.cross(AngVelEX[:,None,:], LinVelXT) - dVel[...,None]*A2
+    return LinVelXT, LinAccETt
+
+
+def ED_CoordSysBatch(q=None, qDict=None, TwrFASF=None, TwrSSSF=None):
+    """ 
+    Batched version of ED_CoordSys, for a time series of degrees of freedom.
+
+    INPUTS:
+     - q: array of shape (nt, nDOF), DOFs ordered like ElastoDyn
+       OR
+     - qDict: dictionary of time series (arrays of length nt), see ED_qDict2q
+     - TwrFASF, TwrSSSF: tower shape functions (optional)
+    OUTPUTS:
+     - CoordSys: dictionary with the same keys as ED_CoordSys, with a leading time dimension:
+          vectors (nt, 3), tower element vectors (nt, TwrNodes, 3), DCMs (nt, 3, 3), (nt, TwrNodes, 3, 3)
+    """
+    q = _ED_qBatch(q, qDict)
+    # --- Inertial frame coordinate system:
+    z1 = np.array([ 1, 0, 0]) 
+    z2 = np.array([ 0, 1, 0]) 
+    z3 = np.array([ 0, 0, 1]) 
+    # --- Tower base / platform coordinate system:
+    R = smallRot_OF(q[:,DOF_R], q[:,DOF_Y], -q[:,DOF_P])       # (nt,3,3)
+    a1, a2, a3 = EDSysVecRot(R, z1, z2, z3)                     # (nt,3)
+    R_g2t = EDSysVectoIECDCM(a1, a2, a3)
+    # --- Tower element-fixed coordinate system:
+    if TwrFASF is not None:
+        # Slope at tower nodes (nt, TwrNodes), followed by tower top
+        ThetaFA = -np.outer(q[:,DOF_TFA1], TwrFASF[0,1:,1]) - np.outer(q[:,DOF_TFA2], TwrFASF[1,1:,1])
+        ThetaSS =  np.outer(q[:,DOF_TSS1], TwrSSSF[0,1:,1]) + np.outer(q[:,DOF_TSS2], TwrSSSF[1,1:,1])
+        R = smallRot_OF(ThetaSS, 0, ThetaFA)                    # (nt, TwrNodes+1, 3, 3)
+        t1, t2, t3 = EDSysVecRot(R, a1[:,None,:], a2[:,None,:], a3[:,None,:])
+        b1, b2, b3 = t1[:,-1,:], t2[:,-1,:], t3[:,-1,:]
+        t1, t2, t3 = t1[:,:-1,:], t2[:,:-1,:], t3[:,:-1,:]
+        R_g2Ts = EDSysVectoIECDCM(t1, t2, t3)
+    else:
+        t1, t2, t3 = None, None, None
+        R_g2Ts = None
+        b1, b2, b3  = a1, a2, a3
+    # --- Nacelle / yaw coordinate system:
+    CNacYaw  = np.cos(q[:,[DOF_Yaw]])
+    SNacYaw  = np.sin(q[:,[DOF_Yaw]])
+    d1 = CNacYaw*b1 - SNacYaw*b3
+    d2 = b2
+    d3 = SNacYaw*b1 + CNacYaw*b3
+    R_g2n = EDSysVectoIECDCM(d1, d2, d3)
+
+    CoordSys = dict()
+    CoordSys['z1'] = z1
+    CoordSys['z2'] = z2
+    CoordSys['z3'] = z3
+    CoordSys['a1'] = a1
+    CoordSys['a2'] = a2
+    CoordSys['a3'] = a3
+    CoordSys['t1'] = t1
+    CoordSys['t2'] = t2
+    CoordSys['t3'] = t3
+    CoordSys['d1'] = d1
+    CoordSys['d2'] = d2
+    CoordSys['d3'] = d3
+    CoordSys['R_g2f']  = R_g2t
+    CoordSys['R_g2t']  = R_g2t
+    CoordSys['R_g2Ts'] = R_g2Ts # To tower elements
+    CoordSys['R_g2n']  = R_g2n  # To nacelle (including nacelle yaw)
+    return CoordSys
+
+
+def ED_PositionsBatch(q=None, qDict=None, CoordSys=None, p=None, dat=None, IEC=None):
+    """ 
+    Batched version of ED_Positions, for a time series of degrees of freedom.
+    INPUTS:
+     - q (nt, nDOF) or qDict, see ED_CoordSysBatch
+     - CoordSys: as returned by ED_CoordSysBatch
+    OUTPUTS:
+     - dat, IEC: same keys as ED_Positions, with a leading time dimension:
+          points (nt, 3), tower nodes (nt, TwrNodes, 3)
+    """
+    QT = _ED_qBatch(q, qDict)
+    if dat is None:
+        dat = dict()
+    a1, a2, a3 = CoordSys['a1'], CoordSys['a2'], CoordSys['a3']
+    Q = lambda i: QT[:,[i]]
+    # Axial reduction terms, for a given node
+    AxRed = lambda J: 0.5*( p['AxRedTFA'][0,0,J]*Q(DOF_TFA1)**2 + p['AxRedTFA'][1,1,J]*Q(DOF_TFA2)**2 + 2.0*p['AxRedTFA'][0,1,J]*Q(DOF_TFA1)*Q(DOF_TFA2) \
+                          + p['AxRedTSS'][0,0,J]*Q(DOF_TSS1)**2 + p['AxRedTSS'][1,1,J]*Q(DOF_TSS2)**2 + 2.0*p['AxRedTSS'][0,1,J]*Q(DOF_TSS1)*Q(DOF_TSS2) )
+    dat['rZ']    = Q(DOF_Sg)* CoordSys['z1'] + Q(DOF_Hv) * CoordSys['z2'] - Q(DOF_Sw)* CoordSys['z3']
+    dat['rZY']   = p['rZYzt']*  a2 + p['PtfmCMxt']*a1 - p['PtfmCMyt']*a3
+    dat['rZT0']  = p['rZT0zt']* a2
+    dat['rZO']   = ( Q(DOF_TFA1) + Q(DOF_TFA2) )*a1 + ( p['RefTwrHt'] - AxRed(-1))*a2 + ( Q(DOF_TSS1) + Q(DOF_TSS2))*a3
+    dat['rOU']   =   p['NacCMxn']*CoordSys['d1']  +  p['NacCMzn']  *CoordSys['d2']  -  p['NacCMyn']  *CoordSys['d3']
+    dat['rT0O']  = dat['rZO'] - dat['rZT0']
+    dat['rO']    = dat['rZ']  + dat['rZO']
+    # --- Tower nodes, all at once (nt, TwrNodes, 3)
+    J = slice(1,-1)
+    cFA = np.outer(QT[:,DOF_TFA1], p['TwrFASF'][0,J,0]) + np.outer(QT[:,DOF_TFA2], p['TwrFASF'][1,J,0])
+    cSS = np.outer(QT[:,DOF_TSS1], p['TwrSSSF'][0,J,0]) + np.outer(QT[:,DOF_TSS2], p['TwrSSSF'][1,J,0])
+    cH  = np.asarray(p['HNodes'])[None,:] - AxRed(J)
+    dat['rT0T'] = cFA[...,None]*a1[:,None,:] + cH[...,None]*a2[:,None,:] + cSS[...,None]*a3[:,None,:]
+    dat['rZT']  = np.concatenate((dat['rZT0'][:,None,:], dat['rZT0'][:,None,:]+dat['rT0T']), axis=1) # (nt, TwrNodes+1, 3)
+    dat['rT']   = dat['rZ'][:,None,:] + dat['rZT'][:,1:,:]
+
+    # --- IEC
+    if IEC is None:
+        IEC = dict()
+    IEC['r_F0'] = np.array([0,0,p['PtfmRefzt']])
+    IEC['r_F']  = EDVec2IEC(dat['rZ']) + IEC['r_F0']
+    IEC['r_FT'] = EDVec2IEC(dat['rZT0'])
+    IEC['r_T']  = IEC['r_F'] + IEC['r_FT']
+    IEC['r_TN'] = EDVec2IEC(dat['rT0O'])
+    IEC['r_N']  = EDVec2IEC(dat['rO'])+ IEC['r_F0']
+    IEC['r_NGn'] = EDVec2IEC(dat['rOU'])
+    IEC['r_Gn'] = IEC['r_N'] + IEC['r_NGn']
+    IEC['r_Ts'] = EDVec2IEC(dat['rT'], IEC['r_F0']  )
+    return dat, IEC
+
+
+def ED_AngPosVelPAccBatch(q=None, qd=None, qDict=None, qdDict=None, CoordSys=None, p=None, dat=None, IEC=None):
+    """ 
+    Batched version of ED_AngPosVelPAcc, for a time series of degrees of freedom and their velocities.
+    Angular positions and velocities have shape (nt, 3), and (nt, TwrNodes+1, 3) for the tower.
+    Partial angular velocities are returned for bodies X, B and N with shape (nt, NDOF, 2, 3).
+    The ones of the tower nodes (PAngVelEF) are not stored, to limit memory usage for long time series.
+    """
+    QT  = _ED_qBatch(q , qDict)
+    QDT = _ED_qBatch(qd, qdDict)
+    if dat is None:
+        dat = dict()
+    NDOF=11 # TODO
+    nt = QT.shape[0]
+    a1, a3 = CoordSys['a1'], CoordSys['a3']
+    Q  = lambda i: QT [:,[i]]
+    QD = lambda i: QDT[:,[i]]
+    # --- Platform (body X)
+    dat['PAngVelEX'] = np.zeros((nt,NDOF,2,3))
+    dat['PAngVelEX'][:,DOF_R   ,0,:] =  CoordSys['z1']
+    dat['PAngVelEX'][:,DOF_P   ,0,:] = -CoordSys['z3']
+    dat['PAngVelEX'][:,DOF_Y   ,0,:] =  CoordSys['z2']
+    dat['AngVelEX'] = QD(DOF_R)*CoordSys['z1'] - QD(DOF_P)*CoordSys['z3'] + QD(DOF_Y)*CoordSys['z2']
+    dat['AngPosEX'] = Q (DOF_R)*CoordSys['z1'] - Q (DOF_P)*CoordSys['z3'] + Q (DOF_Y)*CoordSys['z2']
+    # --- Tower top (body B)
+    dat['PAngVelEB'] = dat['PAngVelEX'].copy()
+    dat['PAngVelEB'][:,DOF_TFA1,0,:] = -p['TwrFASF'][0,-1,1]*a3
+    dat['PAngVelEB'][:,DOF_TSS1,0,:] =  p['TwrSSSF'][0,-1,1]*a1
+    dat['PAngVelEB'][:,DOF_TFA2,0,:] = -p['TwrFASF'][1,-1,1]*a3
+    dat['PAngVelEB'][:,DOF_TSS2,0,:] =  p['TwrSSSF'][1,-1,1]*a1
+    iTwr = [DOF_TFA1, DOF_TSS1, DOF_TFA2, DOF_TSS2]
+    dat['AngPosXB'] = np.einsum('ni,nij->nj', QT [:,iTwr], dat['PAngVelEB'][:,iTwr,0,:])
+    dat['AngVelEB'] = np.einsum('ni,nij->nj', QDT[:,iTwr], dat['PAngVelEB'][:,iTwr,0,:]) + dat['AngVelEX']
+    # --- Nacelle (body N)
+    dat['PAngVelEN'] = dat['PAngVelEB'].copy()
+    dat['PAngVelEN'][:,DOF_Yaw ,0,:] = CoordSys['d2']
+    dat['AngVelEN'] = dat['AngVelEB'] + QD(DOF_Yaw)*CoordSys['d2']
+    # --- Tower nodes (nt, TwrNodes+1, 3)
+    cFA  = np.outer(QT [:,DOF_TFA1], p['TwrFASF'][0,:-1,1]) + np.outer(QT [:,DOF_TFA2], p['TwrFASF'][1,:-1,1])
+    cSS  = np.outer(QT [:,DOF_TSS1], p['TwrSSSF'][0,:-1,1]) + np.outer(QT [:,DOF_TSS2], p['TwrSSSF'][1,:-1,1])
+    cdFA = np.outer(QDT[:,DOF_TFA1], p['TwrFASF'][0,:-1,1]) + np.outer(QDT[:,DOF_TFA2], p['TwrFASF'][1,:-1,1])
+    cdSS = np.outer(QDT[:,DOF_TSS1], p['TwrSSSF'][0,:-1,1]) + np.outer(QDT[:,DOF_TSS2], p['TwrSSSF'][1,:-1,1])
+    dat['AngPosXF'] = -cFA [...,None]*a3[:,None,:] + cSS [...,None]*a1[:,None,:]
+    dat['AngVelEF'] = -cdFA[...,None]*a3[:,None,:] + cdSS[...,None]*a1[:,None,:] + dat['AngVelEX'][:,None,:]
+    dat['AngPosEF'] = dat['AngPosXF'] + dat['AngPosEX'][:,None,:]
+
+    # --- IEC
+    if IEC is None:
+        IEC = dict()
+    IEC['theta_f'] = EDVec2IEC(dat['AngPosEX'])
+    IEC['omega_f'] = EDVec2IEC(dat['AngVelEX'])
+    IEC['omega_t'] = IEC['omega_f'].copy()
+    IEC['theta_fn'] = EDVec2IEC(dat['AngPosXB']) # TODO TODO ADD YAW
+    IEC['theta_n'] = IEC['theta_f'] + IEC['theta_fn']
+    IEC['omega_n'] = EDVec2IEC(dat['AngVelEN'])
+    IEC['omega_Ts'] = EDVec2IEC(dat['AngVelEF']) # Tower nodes ang vel
+    IEC['theta_fTs'] = EDVec2IEC(dat['AngPosXF']) # Tower nodes ang pos from platform
+    IEC['theta_Ts'] = EDVec2IEC(dat['AngPosEF']) # Tower nodes ang pos from platform
+    return dat, IEC
+
+
+def ED_LinVelPAccBatch(q=None, qd=None, qDict=None, qdDict=None, CoordSys=None, p=None, dat=None, IEC=None):
+    """ 
+    Batched version of ED_LinVelPAcc, for a time series of degrees of freedom and their velocities.
+    Requires the outputs of ED_PositionsBatch and ED_AngPosVelPAccBatch in `dat`.
+    Linear velocities and partial accelerations have shape (nt, 3), and (nt, TwrNodes+1, 3) for the tower.
+    The sums over the DOFs of the partial velocities are evaluated directly (e.g. sum_i qd_i omega_i x r = omega x r),
+    and the partial linear velocities are not stored.
+    """
+    QT  = _ED_qBatch(q , qDict)
+    QDT = _ED_qBatch(qd, qdDict)
+    if dat is None:
+        dat = dict()
+    a1, a2, a3 = CoordSys['a1'], CoordSys['a2'], CoordSys['a3']
+    AngVelEX = dat['AngVelEX']
+    # --- Platform reference (point Z)
+    dat['LinVelEZ'] = QDT[:,[DOF_Sg]]*CoordSys['z1'] - QDT[:,[DOF_Sw]]*CoordSys['z3'] + QDT[:,[DOF_Hv]]*CoordSys['z2']
+    # --- Tower top (point O), shape functions equal to 1 at the tower top
+    one = np.ones((2,1))
+    LinVelXO, LinAccEOt = _ED_TwrElasticBatch(QT, QDT, a1, a2, a3, AngVelEX, one, one, p['AxRedTFA'][:,:,[-1]], p['AxRedTSS'][:,:,[-1]])
+    LinVelXO, LinAccEOt = LinVelXO[:,0,:], LinAccEOt[:,0,:]
+    EwXXrZO   = np.cross( AngVelEX, dat['rZO'] )
+    dat['LinVelEO']  = LinVelXO  + dat['LinVelEZ'] + EwXXrZO
+    dat['LinAccEOt'] = LinAccEOt + np.cross( AngVelEX, EwXXrZO + LinVelXO )
+    # --- Nacelle COG (point U)
+    EwNXrOU   = np.cross( dat['AngVelEN'], dat['rOU'] )
+    dat['LinVelEU']  = dat['LinVelEO']  + EwNXrOU
+    dat['LinAccEUt'] = dat['LinAccEOt'] + np.cross( dat['AngVelEN'], EwNXrOU )
+    # --- Tower nodes (nt, TwrNodes+1, 3)
+    LinVelXT, LinAccETt = _ED_TwrElasticBatch(QT, QDT, a1, a2, a3, AngVelEX, p['TwrFASF'][:,:-1,0], p['TwrSSSF'][:,:-1,0], p['AxRedTFA'][:,:,:-1], p['AxRedTSS'][:,:,:-1])
+    W = AngVelEX[:,None,:]
+    EwXXrZT          = np.cross( W, dat['rZT'] )
+    dat['LinVelET']  = LinVelXT  + dat['LinVelEZ'][:,None,:] + EwXXrZT
+    dat['LinAccETt'] = LinAccETt + np.cross( W, EwXXrZT + LinVelXT )
+
+    # --- IEC
+    if IEC is None:
+        IEC = dict()
+    IEC['v_F'] = EDVec2IEC(dat['LinVelEZ'])
+    IEC['v_N'] = EDVec2IEC(dat['LinVelEO'])
+    IEC['ud_N'] = EDVec2IEC(LinVelXO) # Elastic velocity of tower top
+    IEC['v_Gn'] = EDVec2IEC(dat['LinVelEU']) # velocity of nacelle COG
+    IEC['v_Ts'] = EDVec2IEC(dat['LinVelET']) # velocity of tower nodes
+    return dat, IEC
+
+
+def ED_CalcOutputsBatch(x, p, noAxRed=False):
+    """ 
+    Batched version of ED_CalcOutputs, for time series of states.
+    INPUTS: 
+      - x: states, dictionary with either:
+           'q' and 'qd': arrays of shape (nt, nDOF), DOFs ordered like ElastoDyn
+           'qDict' and 'qdDict': dictionaries of time series, see ED_qDict2q
+      - p: parameters, e.g. as returned by p = ED_Parameters(fstSim)
+    OUTPUTS:
+      - CS, dat, IEC: same as ED_CalcOutputs, with a leading time dimension
+    Example:
+        p = ED_Parameters(fstSim)
+        t = np.linspace(0, 10, 1001)
+        x['qDict']   = {'Sg': 10*np.sin(t), 'P':0.1*np.cos(t), 'TFA1':np.sin(3*t)}
+        x['qdDict']  = {'Sg': 10*np.cos(t), 'P':-0.1*np.sin(t), 'TFA1':3*np.cos(3*t)}
+    """
+    if noAxRed:
+        p = p.copy()
+        p['AxRedTFA'] = 0*p['AxRedTFA']
+        p['AxRedTSS'] = 0*p['AxRedTSS']
+    q  = _ED_qBatch(x.get('q' , None), x.get('qDict' , None))
+    qd = _ED_qBatch(x.get('qd', None), x.get('qdDict', None))
+    CS = ED_CoordSysBatch(q, TwrFASF=p['TwrFASF'], TwrSSSF=p['TwrSSSF'])
+    dat, IEC = ED_PositionsBatch(q, CoordSys=CS, p=p)
+    dat, IEC = ED_AngPosVelPAccBatch(q, qd, CoordSys=CS, p=p, dat=dat, IEC=IEC)
+    dat, IEC = ED_LinVelPAccBatch   (q, qd, CoordSys=CS, p=p, dat=dat, IEC=IEC)
+    return CS, dat, IEC
+
+
+
 if __name__ == '__main__':
 #     EDfilename='../yams/_Jens/FEMBeam_NewFASTCoeffs/data/NREL5MW_ED_Onshore.dat'
 #     EDfilename='../../data/NREL5MW/onshore/NREL5MW_ED_Onshore.dat'
@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+from openfast_toolbox.modules.elastodyn import *
+
+def towerParams(nNodes=6):
+    """ Synthetic tower parameters with the shapes used by ElastoDyn """
+    np.random.seed(3)
+    z  = np.linspace(0, 1, nNodes+2)
+    p = dict()
+    p['TwrFASF'] = np.zeros((2, nNodes+2, 3))
+    p['TwrSSSF'] = np.zeros((2, nNodes+2, 3))
+    for i, (a, b) in enumerate([(1.0, 0.0), (-2.0, 3.0)]):
+        p['TwrFASF'][i,:,0] = a*z**2 + b*z**3
+        p['TwrFASF'][i,:,1] = (2*a*z + 3*b*z**2)/80
+        p['TwrSSSF'][i,:,0] = 0.9*p['TwrFASF'][i,:,0]
+        p['TwrSSSF'][i,:,1] = 0.9*p['TwrFASF'][i,:,1]
+    p['AxRedTFA'] = np.random.uniform(0, 0.01, (2, 2, nNodes+2))
+    p['AxRedTSS'] = np.random.uniform(0, 0.01, (2, 2, nNodes+2))
+    p['HNodes']   = 80*z[1:-1]
+    p.update({'RefTwrHt':90, 'rZYzt':-5, 'PtfmCMxt':0.5, 'PtfmCMyt':-0.3, 'rZT0zt':10, 'PtfmRefzt':0,
+              'NacCMxn':1.9, 'NacCMzn':1.75, 'NacCMyn':0.1})
+    return p
+
+class TestElastoDyn(unittest.TestCase):
+
+    def test_smallRot(self):
+        # Orthonormal, identity for zero angles, and consistent for arrays
+        th = np.array([[0.1, -0.05, 0.2], [0, 0, 0]])
+        R = smallRot_OF(th[:,0], th[:,1], th[:,2])
+        self.assertEqual(R.shape, (2,3,3))
+        np.testing.assert_allclose(R[0] @ R[0].T, np.eye(3), atol=1e-14)
+        np.testing.assert_equal(R[1], np.eye(3))
+        np.testing.assert_allclose(smallRot_OF(*th[0]), R[0], rtol=1e-14)
+
+    def test_batch(self):
+        p  = towerParams()
+        nt = 7
+        t  = np.linspace(0, 1, nt)
+        qDict  = {'Sg':2*np.sin(t), 'Sw':0.5*t, 'Hv':-0.3*t, 'R':0.02*np.cos(t), 'P':0.05*t, 'Y':0.01*t,
+                  'TFA1':0.4*np.sin(3*t), 'TSS1':-0.2*t, 'TFA2':0.05*t, 'TSS2':0.02*t**2, 'Yaw':0.3*t}
+        qdDict = {k:np.cos(2*t+i) for i, k in enumerate(qDict.keys())}
+        q  = ED_qDict2q(qDict)
+        qd = ED_qDict2q(qdDict)
+        self.assertEqual(q.shape, (nt, ED_MaxDOFs))
+        CS, dat, IEC = ED_CalcOutputsBatch({'q':q[:,:11], 'qd':qd}, p)
+        self.assertEqual(CS['t1'].shape, (nt, 6, 3))
+        self.assertEqual(CS['R_g2Ts'].shape, (nt, 6, 3, 3))
+        self.assertEqual(IEC['r_Ts'].shape, (nt, 6, 3))
+        self.assertEqual(IEC['v_Ts'].shape, (nt, 7, 3))
+        # Compare with the scalar functions, time step by time step
+        for it in range(nt):
+            CS1 = ED_CoordSys(q[it], TwrFASF=p['TwrFASF'], TwrSSSF=p['TwrSSSF'])
+            d1, I1 = ED_Positions(q[it], CoordSys=CS1, p=p)
+            d1, I1 = ED_AngPosVelPAcc(q[it], qd[it], CoordSys=CS1, p=p, dat=d1, IEC=I1)
+            d1, I1 = ED_LinVelPAcc   (q[it], qd[it], CoordSys=CS1, p=p, dat=d1, IEC=I1)
+            for k in ['a1', 'a3', 't1', 't2', 'd1', 'd3', 'R_g2t', 'R_g2Ts', 'R_g2n']:
+                np.testing.assert_allclose(CS[k][it], CS1[k], rtol=1e-12, atol=1e-14, err_msg=k)
+            for k in ['rZO', 'rOU', 'rT', 'rZT', 'AngVelEN', 'AngPosEF', 'AngVelEF', 'LinVelEO', 'LinAccEOt', 'LinVelEU', 'LinAccEUt', 'LinVelET', 'LinAccETt']:
+                np.testing.assert_allclose(dat[k][it], d1[k], rtol=1e-12, atol=1e-13, err_msg=k)
+            np.testing.assert_allclose(dat['PAngVelEN'][it], d1['PAngVelEN'], rtol=1e-12, atol=1e-14)
+            for k in I1.keys():
+                if k!='r_F0':
+                    np.testing.assert_allclose(IEC[k][it], I1[k], rtol=1e-12, atol=1e-13, err_msg=k)
+
+
+if __name__ == '__main__':
+    unittest.main()
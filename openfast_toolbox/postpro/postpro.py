@@ -3,6 +3,8 @@ import os
 import pandas as pd
 import numpy as np
 import re
+import warnings
+from functools import lru_cache
 try:
     from scipy.integrate import cumulative_trapezoid 
 except:
@@ -378,12 +380,88 @@ def insert_spanwise_columns(df, vr=None, R=None, IR=None, sspan='r', sspan_bar='
             df[k] = v
     return df
 
+# Patterns of the form '^[A]*B1N(\d*)Alpha_\[deg\]' are matched using a dictionary lookup
+_RE_NODAL_PATTERN = re.compile(r'^\^(\[A\]\*)?(B\d)N\(\\d\*\)(.*)$')
+_RE_NODAL_COLUMN  = re.compile(r'^(A*)(B\d)N(\d*)(.*)$')
+
+def _nodalPatternKey(pattern):
+    """ Returns (allowA, blade, literal suffix) for nodal patterns, None otherwise"""
+    m = _RE_NODAL_PATTERN.match(pattern)
+    if m is None:
+        return None
+    allowA, blade, suffix = m.group(1) is not None, m.group(2), m.group(3)
+    # The suffix should only contain plain characters or escaped symbols (e.g. `\[`)
+    if re.search(r'\\[A-Za-z0-9]', suffix) or re.search(r'[.^$*+?{}\[\]|()\\]', re.sub(r'\\.', '', suffix)):
+        return None
+    literal = re.sub(r'\\(.)', r'\1', suffix)
+    if literal[:1].isdigit():
+        return None
+    return allowA, blade, literal
+
+@lru_cache(maxsize=64)
+def _matchingColumnsIndex(Cols, Patterns):
+    """ 
+    Returns, for each pattern, the list of matching columns and the first matched group.
+    Memoised, the index is built once for a given set of columns and patterns.
+    Equivalent to calling `find_matching_pattern` for each pattern.
+    INPUTS:
+     - Cols: tuple of column names
+     - Patterns: tuple of regex patterns
+    """
+    Matches = [([],[]) for _ in Patterns]
+    # --- Nodal patterns: dictionary (allowA, blade) -> literal -> list of pattern indices
+    nodal   = {}
+    lengths = set()
+    others  = []
+    for ip, pattern in enumerate(Patterns):
+        key = _nodalPatternKey(pattern)
+        if key is None:
+            others.append(ip)
+        else:
+            allowA, blade, literal = key
+            nodal.setdefault((allowA, blade), {}).setdefault(literal, []).append(ip)
+            lengths.add(len(literal))
+    lengths = sorted(lengths)
+    if len(nodal)>0:
+        for c in Cols:
+            m = _RE_NODAL_COLUMN.match(c) if isinstance(c, str) else None
+            if m is None:
+                continue
+            As, blade, node, rest = m.groups()
+            IP = []
+            for allowA in ([True] if len(As)>0 else [True, False]):
+                lits = nodal.get((allowA, blade), None)
+                if lits is None:
+                    continue
+                for n in lengths:
+                    IP += lits.get(rest[:n], []) if n<=len(rest) else []
+            for ip in sorted(IP):
+                Matches[ip][0].append(c)
+                Matches[ip][1].append(node)
+    # --- Other patterns: regex search
+    for ip in others:
+        reg_pattern = re.compile(Patterns[ip])
+        for c in Cols:
+            match = reg_pattern.search(c)
+            if match:
+                Matches[ip][0].append(c)
+                Matches[ip][1].append(match.groups(1)[0] if len(match.groups(1))>0 else '')
+    return Matches
+
 def find_matching_columns(Cols, PatternMap):
+    r""" 
+    Returns the columns matching the patterns of PatternMap, and their indices
+    INPUTS:
+     - Cols: list of columns
+     - PatternMap: dictionary pattern -> name, where the pattern has one group for the index, e.g. r'^AB1N(\d*)Alpha_\[deg\]'
+    OUTPUTS:
+     - ColsInfo: list of dictionaries with keys 'name', 'Idx' (sorted indices) and 'cols' (columns)
+     - nrMax: maximum index
+    """
+    Matches = _matchingColumnsIndex(tuple(Cols), tuple(PatternMap.keys()))
     ColsInfo=[]
     nrMax=0
-    for colpattern,colmap in PatternMap.items():
-        # Extracting columns matching pattern
-        cols, sIdx = find_matching_pattern(Cols, colpattern)
+    for (cols, sIdx), colmap in zip(Matches, PatternMap.values()):
         if len(cols)>0:
             # Sorting by ID
             cols  = np.asarray(cols)
@@ -396,6 +474,24 @@ def find_matching_columns(Cols, PatternMap):
             ColsInfo.append(col)
     return ColsInfo,nrMax
 
+def _spanwiseGather(ColsInfo, nrMax, df):
+    """ 
+    Returns an array (n x nCols x nrMax) with the spanwise data of the dataframe (n x mColumns)
+    The data is extracted with one indexing operation. Missing nodes are set to NaN.
+    """
+    iCol = {}
+    for i, c in enumerate(df.columns):
+        iCol.setdefault(c, i)
+    I = np.full((len(ColsInfo), nrMax), -1, dtype=int)
+    for ic, c in enumerate(ColsInfo):
+        I[ic, c['Idx']-1] = [iCol[col] for col in c['cols']]
+    b = I>=0
+    iUsed, iInv = np.unique(I[b], return_inverse=True)
+    data = df.iloc[:, iUsed].to_numpy(dtype=float)
+    Values = np.full((len(df), len(ColsInfo), nrMax), np.nan)
+    Values[:, b] = data[:, iInv]
+    return Values
+
 def extract_spanwise_data(ColsInfo, nrMax, df=None, ts=None):
     """ 
     Extract spanwise data based on some column info
@@ -449,12 +545,11 @@ def extract_spanwise_data_timeSeries(ColsInfo, nrMax, df, vr=None, R=None, IR=No
     ir = np.arange(0, len(spanColumns[k0]))
     ds = xr.Dataset(coords={si1: i1, sir: ir})
     ColNames = [c['name'] for c in ColsInfo]
+    Values = _spanwiseGather(ColsInfo, nrMax, df) # n1 x nCols x nrMax
     for ic, c in enumerate(ColsInfo):
         Idx, cols, colname = c['Idx'], c['cols'], c['name']
-        Values           = np.full((n1, nrMax), np.nan)
-        Values[:, Idx-1] = df[cols].values
         # Store in Dataset
-        ds[colname] = ([si1, sir], Values[:, :])
+        ds[colname] = ([si1, sir], Values[:, ic, :])
         if len(cols) < nrMax:
             print('[WARN] Not all values found for {}, found {}/{}'.format(colname, len(cols), nrMax))
         if len(cols) > nrMax:
@@ -464,6 +559,7 @@ def extract_spanwise_data_timeSeries(ColsInfo, nrMax, df, vr=None, R=None, IR=No
         ds[c] = ([sir], v)
     return ds
 
+@lru_cache(maxsize=None)
 def _BDSpanMap():
     BDSpanMap=dict()
     for sB in ['B1','B2','B3']:
@@ -609,11 +705,10 @@ def _BDSpanMap():
 
 def spanwiseColBD(Cols):
     """ Return column info, available columns and indices that contain BD spanwise data"""
-    BDSpanMap = _BDSpanMap()
-    return find_matching_columns(Cols, BDSpanMap)
+    return find_matching_columns(Cols, _BDSpanMap())
 
-def spanwiseColED(Cols):
-    """ Return column info, available columns and indices that contain ED spanwise data"""
+@lru_cache(maxsize=None)
+def _EDSpanMap():
     EDSpanMap=dict()
     # All Outs
     for sB in ['B1','B2','B3']:
@@ -655,10 +750,14 @@ def spanwiseColED(Cols):
         EDSpanMap[r'^Spn(\d)MLy'+sB+r'_\[kN-m\]' ]=SB+'MLx_[kN-m]'
         EDSpanMap[r'^Spn(\d)MLx'+sB+r'_\[kN-m\]' ]=SB+'MLy_[kN-m]'  
         EDSpanMap[r'^Spn(\d)MLz'+sB+r'_\[kN-m\]' ]=SB+'MLz_[kN-m]'
-    return find_matching_columns(Cols, EDSpanMap)
+    return EDSpanMap
 
-def spanwiseColEDTwr(Cols):
+def spanwiseColED(Cols):
     """ Return column info, available columns and indices that contain ED spanwise data"""
+    return find_matching_columns(Cols, _EDSpanMap())
+
+@lru_cache(maxsize=None)
+def _EDTwrSpanMap():
     EDSpanMap=dict()
     # All Outs
     EDSpanMap[r'^TwHt(\d*)ALxt_\[m/s^2\]'] = 'ALxt_[m/s^2]'
@@ -682,12 +781,16 @@ def spanwiseColEDTwr(Cols):
     EDSpanMap[r'^TwHt(\d*)MLxt_\[kN-m\]' ] = 'MLxt_[kN-m]'
     EDSpanMap[r'^TwHt(\d*)MLyt_\[kN-m\]' ] = 'MLyt_[kN-m]'
     EDSpanMap[r'^TwHt(\d*)MLzt_\[kN-m\]' ] = 'MLzt_[kN-m]'
-    return find_matching_columns(Cols, EDSpanMap)
+    return EDSpanMap
+
+def spanwiseColEDTwr(Cols):
+    """ Return column info, available columns and indices that contain ED spanwise data"""
+    return find_matching_columns(Cols, _EDTwrSpanMap())
 
 
 
-def spanwiseColAD(Cols):
-    """ Return column info, available columns and indices that contain AD spanwise data"""
+@lru_cache(maxsize=None)
+def _ADSpanMap():
     ADSpanMap=dict()
 # From AeroDyn_AllBldNd: TODO Use it directly..
 #                                "ALPHA    ","AXIND    ","AXIND_QS ","BEM_CT_QS","BEM_F_QS ","BEM_KP_QS","BEM_K_QS ","CD       ", &
@@ -857,7 +960,11 @@ def spanwiseColAD(Cols):
     ADSpanMap[r'^ReNum(\d*)_\[x10^6\]']='ReNum_[x10^6]'
     ADSpanMap[r'^Gamma(\d*)_\[m^2/s\]']='Gamma_[m^2/s]'
 
-    return find_matching_columns(Cols, ADSpanMap)
+    return ADSpanMap
+
+def spanwiseColAD(Cols):
+    """ Return column info, available columns and indices that contain AD spanwise data"""
+    return find_matching_columns(Cols, _ADSpanMap())
 
 def insert_extra_columns_AD(dfRad, tsAvg, vr=None, rho=None, R=None, nB=None, chord=None):
     # --- Compute additional values (AD15 only)
@@ -1245,22 +1352,11 @@ def spanwiseConcat(df):
     nt = len(time)
     # We add two channels one for time, one for ispan
     data = np.zeros((nt*nrMaxAD, nChan+2))*np.nan 
-    # Loop on Channels and radial positions..
-    for ic in range(nChan):
-        for ir in range(nrMaxAD):
-            data[ir*nt:(ir+1)*nt, 0] = time
-            data[ir*nt:(ir+1)*nt, 1] = ir+1
-            IdxAvailableForThisChannel = ColsInfoAD[ic]['Idx']
-            chanName                   = ColsInfoAD[ic]['name']
-            colName                    = ColsInfoAD[ic]['cols'][ir]
-            #print('Channel {}: colName {}'.format(chanName, colName))
-            try:
-                if ir+1 in IdxAvailableForThisChannel:
-                    data[ir*nt:(ir+1)*nt, ic+2] = df[colName].values
-            except:
-                pass
-            #else:
-            #    raise Exception('Channel {}: Index missing {}'.format(chanName, ic+1))
+    data[:, 0] = np.tile(time, nrMaxAD)
+    data[:, 1] = np.repeat(np.arange(1, nrMaxAD+1), nt)
+    # Spanwise data (nt x nChan x nr), concatenated along the radial positions
+    Values = _spanwiseGather(ColsInfoAD, nrMaxAD, df)
+    data[:, 2:] = Values.transpose(2, 0, 1).reshape(nt*nrMaxAD, nChan)
     columns = ['Time_[s]'] + ['i_[-]'] + [ColsInfoAD[i]['name'] for i in range(nChan)]
     dfCat = pd.DataFrame(data=data, columns=columns)
 
@@ -1445,17 +1541,7 @@ def find_matching_pattern(List, pattern, sort=False, integers=True, n=1):
         find_matching_pattern(['Misc','TxN1_[m]', 'TxN20_[m]'], 'TxN(\d+)_\[m\]')
         returns: Matches = 1,20
     """
-    reg_pattern=re.compile(pattern)
-    MatchedElements=[]
-    Matches=[]
-    for l in List:
-        match=reg_pattern.search(l)
-        if match:
-            MatchedElements.append(l)
-            if len(match.groups(1))>0:
-                Matches.append(match.groups(1)[0])
-            else:
-                Matches.append('')
+    MatchedElements, Matches = _matchingColumnsIndex(tuple(List), (pattern,))[0]
 
     MatchedElements = np.asarray(MatchedElements)
     Matches         = np.asarray(Matches)
@@ -1707,9 +1793,177 @@ def findPeriodTimeRange(df, nPeriods=3, filename='', colPsi=None, colTime=None):
             tStart=time[iBef[-1-nPeriods]]
     return tStart, tEnd
 
+def _parseStat(stat):
+    """ Returns (kind, parameter) for a statistic name, see `signalStats` """
+    st = stat.lower()
+    if st in ['mean', 'std', 'min', 'max', 'absmax', 'range', 'skew']:
+        return st, None
+    elif st in ['kurt', 'kurtosis']:
+        return 'kurt', None
+    elif st=='median':
+        return 'percentile', 50.
+    elif re.match(r'^p\d+(\.\d*)?$', st):
+        return 'percentile', float(st[1:])
+    elif re.match(r'^del_m\d+(\.\d*)?$', st):
+        return 'del', float(st[5:])
+    raise WELIBException('Unknown statistic `{}`, allowed: mean, std, min, max, absmax, range, skew, kurt, median, pXX (percentile XX), DEL_mXX (DEL with Wohler exponent XX)'.format(stat))
+
+def _chunkMoments(X, order):
+    """ 
+    Number of values, mean, central moments (of order 2 to `order`), min and max of the columns of a chunk.
+    NaN are ignored. Returns a list [n, mean, M2, ..., min, max]
+    """
+    nc = X.shape[1]
+    vmin = X.min(axis=0)
+    vmax = X.max(axis=0)
+    hasNaN = np.isnan(vmin).any()
+    if hasNaN:
+        b = ~np.isnan(X)
+        n = b.sum(axis=0).astype(float)
+        vmin = np.where(b, X, np.inf).min(axis=0)
+        vmax = np.where(b, X, -np.inf).max(axis=0)
+        vmin[n==0] = np.nan
+        vmax[n==0] = np.nan
+    else:
+        n = np.full(nc, float(X.shape[0]))
+    out = [n]
+    if order>=1:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if hasNaN:
+                mean = np.where(b, X, 0).sum(axis=0)/n
+                D = np.where(b, X-mean, 0)
+            else:
+                mean = X.mean(axis=0)
+                D = X-mean
+        out.append(mean)
+        if order>=2:
+            D2 = D*D
+            out.append(D2.sum(axis=0))
+            if order>=3:
+                out.append((D2*D).sum(axis=0))
+            if order>=4:
+                out.append((D2*D2).sum(axis=0))
+    return out + [vmin, vmax]
+
+def _mergeMoments(a, b, order):
+    """ Merge the moments of two chunks (pairwise update of Chan et al. / Pebay) """
+    na, nb = a[0], b[0]
+    n = na+nb
+    out = [n]
+    if order>=1:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ma = np.where(na>0, a[1], 0)
+            d  = np.where(nb>0, b[1], 0) - ma
+            fb = np.where(n>0, nb/n, 0)
+            out.append(ma + d*fb)
+            if order>=2:
+                dn = d*na*fb # d*na*nb/n
+                out.append(a[2]+b[2] + d*dn)
+            if order>=3:
+                out.append(a[3]+b[3] + d*d*dn*(na-nb)/n + 3*d*(na*b[2]-nb*a[2])/n)
+            if order>=4:
+                out.append(a[4]+b[4] + d**3*dn*(na*na-na*nb+nb*nb)/n**2 + 6*d*d*(na*na*b[2]+nb*nb*a[2])/n**2 + 4*d*(na*b[3]-nb*a[3])/n)
+            out[1] = np.where(n>0, out[1], np.nan)
+    out.append(np.fmin(a[-2], b[-2]))
+    out.append(np.fmax(a[-1], b[-1]))
+    return out
+
+def signalStats(X, stats=['mean'], time=None, chunkSize=None, Teq=1, bins=100, method='rainflow_astm_fast'):
+    """ 
+    Compute several statistics of the columns of a 2D array in one pass over the data.
+
+    The array is processed by chunks of rows (fitting in cache). For each chunk, the count, mean,
+    central moments, min and max are computed, and merged with the previous chunks using 
+    numerically stable pairwise updates. No copy of the full array is made, apart for the 
+    percentiles (which require sorting) and the DELs (rainflow counting). NaN values are ignored.
+
+    INPUTS:
+     - X: array (nt x nc), e.g. the values of a dataframe within a time window
+     - stats: list of statistics, among:
+         'mean', 'std' (with ddof=1 as pandas), 'min', 'max', 'absmax', 'range' (max-min),
+         'skew', 'kurt' (unbiased estimates, as pandas), 'median', 'pXX' (percentile XX, e.g. 'p95'),
+         'DEL_mXX' (damage equivalent load for the Wohler exponent XX, e.g. 'DEL_m10')
+     - time: array (nt), required for DELs
+     - chunkSize: number of rows per chunk. Default: about 2**16 values per chunk
+     - Teq, bins, method: options for the DELs, see `tools.fatigue.equivalent_load`
+    OUTPUTS:
+     - S: array (nc x len(stats))
+    """
+    X = np.asarray(X)
+    if X.ndim==1:
+        X = X[:,None]
+    nt, nc = X.shape
+    kinds = [_parseStat(st) for st in stats]
+    order = 0
+    for kind, _ in kinds:
+        order = max(order, {'mean':1, 'std':2, 'skew':3, 'kurt':4}.get(kind, 0))
+    S = np.full((nc, len(stats)), np.nan)
+    if nt==0 or nc==0:
+        return S
+    # --- Moments, single pass by chunks
+    if chunkSize is None:
+        chunkSize = max(64, 2**16//nc)
+    M = None
+    for i0 in range(0, nt, chunkSize):
+        Xc = np.asarray(X[i0:i0+chunkSize], dtype=np.float64)
+        m = _chunkMoments(Xc, order)
+        M = m if M is None else _mergeMoments(M, m, order)
+    n, vmin, vmax = M[0], M[-2], M[-1]
+    hasNaN = np.any(n<nt)
+    # --- Statistics
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for j, (kind, param) in enumerate(kinds):
+            if kind=='mean':
+                S[:,j] = M[1]
+            elif kind=='std':
+                S[:,j] = np.where(n>1, np.sqrt(M[2]/(n-1)), np.nan)
+            elif kind=='min':
+                S[:,j] = vmin
+            elif kind=='max':
+                S[:,j] = vmax
+            elif kind=='absmax':
+                S[:,j] = np.fmax(np.abs(vmin), np.abs(vmax))
+            elif kind=='range':
+                S[:,j] = vmax-vmin
+            elif kind=='skew':
+                g1 = np.sqrt(n)*M[3]/M[2]**1.5
+                S[:,j] = np.where(n>2, g1*np.sqrt(n*(n-1))/(n-2), np.nan)
+                S[(M[2]==0) & (n>2),j] = 0
+            elif kind=='kurt':
+                G2 = (n+1)*n*(n-1)*M[4]/((n-2)*(n-3)*M[2]**2) - 3*(n-1)**2/((n-2)*(n-3))
+                S[:,j] = np.where(n>3, G2, np.nan)
+                S[(M[2]==0) & (n>3),j] = 0
+    # Percentiles, all at once
+    IP = [j for j,(kind,_) in enumerate(kinds) if kind=='percentile']
+    if len(IP)>0:
+        q = [kinds[j][1] for j in IP]
+        if hasNaN:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', category=RuntimeWarning) # All-NaN channels
+                P = np.nanpercentile(X, q, axis=0)
+        else:
+            P = np.percentile(X, q, axis=0)
+        S[:,IP] = np.asarray(P).reshape(len(q), nc).T
+    # DEL, one rainflow count per channel for all exponents
+    ID = [j for j,(kind,_) in enumerate(kinds) if kind=='del']
+    if len(ID)>0:
+        from openfast_toolbox.tools.fatigue import _signalEquivalentLoads
+        if time is None:
+            raise WELIBException('`time` is required to compute DELs')
+        time = np.asarray(time)
+        T = time[-1]-time[0]
+        m = [kinds[j][1] for j in ID]
+        for ic in range(nc):
+            out = _signalEquivalentLoads(X[:,ic], T, m, bins, method, True, False, Teq, None, 1, None, 0)
+            S[ic, ID] = out[0]
+    return S
+
 def averageDF(df,avgMethod='periods',avgParam=None,ColMap=None,ColKeep=None,ColSort=None,stats=['mean'], filename=''):
     """
     See average PostPro for documentation, same interface, just does it for one dataframe
+    OUTPUTS:
+      - if stats is ['mean']: dataframe with one row, and one column per channel
+      - otherwise: dataframe with one row per channel, and one column per statistic (see `signalStats`)
     """
     def renameCol(x):
         for k,v in ColMap.items():
@@ -1770,22 +2024,17 @@ def averageDF(df,avgMethod='periods',avgParam=None,ColMap=None,ColKeep=None,ColS
     IWindow    = np.where((time>=tStart) & (time<=tEnd) & (~np.isnan(time)))[0]
     iEnd   = IWindow[-1]
     iStart = IWindow[0]
-    ## Absolute and relative differences at window extremities
-    DeltaValuesAbs=(df.iloc[iEnd]-df.iloc[iStart]).abs()
-#         DeltaValuesRel=(df.iloc[iEnd]-df.iloc[iStart]).abs()/df.iloc[iEnd]
-    DeltaValuesRel=(df.iloc[IWindow].max()-df.iloc[IWindow].min())/df.iloc[IWindow].mean()
-    #EndValues=df.iloc[iEnd]
-    #if avgMethod.lower()=='periods_omega':
-    #    if DeltaValuesRel['RotSpeed_[rpm]']*100>5:
-    #        print('[WARN] Rotational speed vary more than 5% in averaging window ({}%) for simulation: {}'.format(DeltaValuesRel['RotSpeed_[rpm]']*100,f))
-    ## Stats values during window
-    # MeanValues = df[IWindow].mean()
-    # StdValues  = df[IWindow].std()
-    if 'mean' in stats:
-        MeanValues = pd.DataFrame(df.iloc[IWindow].mean()).transpose()
+    ## Stats values during window, computed on a view of the data when the window is contiguous
+    A = df.to_numpy()
+    if len(IWindow)==iEnd-iStart+1:
+        X = A[iStart:iEnd+1]
     else:
-        raise NotImplementedError()
-    return MeanValues
+        X = A[IWindow]
+    S = signalStats(X, stats, time=time[IWindow])
+    if len(stats)==1 and stats[0]=='mean':
+        MeanValues = pd.DataFrame(S.T, columns=df.columns)
+        return MeanValues
+    return pd.DataFrame(S, index=df.columns, columns=stats)
 
 def FAIL(msg):
     HEADER = '\033[95m'
@@ -1813,6 +2062,8 @@ class FileErrorLogger():
     def __init__(self):
         self.firstWarn=True
         self.firstErr=True
+        self.warnings = [] # list of (filename, msg)
+        self.failures = [] # list of (filename, msg)
 
     def WARN(self, filename, msg):
         if self.firstWarn:
@@ -1821,6 +2072,7 @@ class FileErrorLogger():
             self.firstWarn = False
         basename = os.path.basename(filename)
         WARN('File {} {}'.format(basename, msg))
+        self.warnings.append((filename, msg))
 
     def FAIL(self, filename, msg):
         if self.firstErr:
@@ -1829,13 +2081,61 @@ class FileErrorLogger():
             self.firstErr = False
         basename = os.path.basename(filename)
         FAIL('File {} {}'.format(basename, msg))
+        self.failures.append((filename, msg))
+
+def _averageCheckpointKey(filename, avgKwargs):
+    """ Key of the checkpoint of an output file, based on its path, size, modification time and the averaging options"""
+    import hashlib
+    import json
+    st = os.stat(filename)
+    s = '{}|{}|{}|{}'.format(os.path.abspath(filename), st.st_size, st.st_mtime_ns, json.dumps(avgKwargs, sort_keys=True, default=str))
+    return hashlib.sha1(s.encode('utf-8')).hexdigest()
+
+def _averageFile(args):
+    """ 
+    Read a file (or use a dataframe) and average it, see averagePostPro
+    Returns (i, df_avg, status, msg), with status: 'ok', 'invalid' (cannot be read), 'fail' (cannot be averaged)
+    """
+    i, f, avgKwargs, checkpoint = args
+    isDF = isinstance(f, pd.DataFrame)
+    filename = '' if isDF else f
+    # Checkpoint
+    chkFile = None
+    if checkpoint is not None and not isDF:
+        try:
+            chkFile = os.path.join(checkpoint, _averageCheckpointKey(f, avgKwargs)+'.pkl')
+        except OSError:
+            chkFile = None # File is missing, will be invalid
+        if chkFile is not None and os.path.isfile(chkFile):
+            try:
+                return i, pd.read_pickle(chkFile), 'ok', 'checkpoint'
+            except Exception:
+                pass # Corrupted checkpoint, recomputing
+    # Read
+    if isDF:
+        df = f
+    else:
+        try:
+            df=weio.read(f).toDataFrame()
+            #df=FASTOutputFile(f).toDataFrame()A # For pyFAST
+        except:
+            return i, None, 'invalid', ''
+    # Average
+    try:
+        df_avg = averageDF(df, filename=filename, **avgKwargs)
+    except Exception as e:
+        return i, None, 'fail', 'failed to be averaged: {}'.format(e)
+    if chkFile is not None:
+        tmpFile = chkFile + '.tmp{}'.format(os.getpid())
+        df_avg.to_pickle(tmpFile)
+        os.replace(tmpFile, chkFile)
+    return i, df_avg, 'ok', ''
 
 def averagePostPro(outFiles_or_DFs,avgMethod='periods',avgParam=None,
         ColMap=None,ColKeep=None,ColSort=None,stats=['mean'],
-        skipIfWrongCol=False):
+        skipIfWrongCol=False, nCores=1, checkpoint=None, log=None, verbose=False):
     """ Opens a list of FAST output files, perform average of its signals and return a panda dataframe
-    For now, the scripts only computes the mean within a time window which may be a constant or a time that is a function of the rotational speed (see `avgMethod`).
-    The script only computes the mean for now. Other stats will be added
+    The statistics are computed within a time window which may be a constant or a time that is a function of the rotational speed (see `avgMethod`).
     INPUTS:
 
      outFiles_or_DFs: list of fst filenames or dataframes
@@ -1857,26 +2157,60 @@ def averagePostPro(outFiles_or_DFs,avgMethod='periods',avgParam=None,
                    Default: None, as many period as possible are used
                 - for 'constantwindow': the number of seconds for the window
                    Default: None, full simulation length is used
+    `stats`:    list of statistics computed for each signal, see `signalStats` for the list
+                (e.g. 'mean', 'std', 'max', 'absmax', 'p99', 'DEL_m10'). Default: ['mean']
+                With several statistics, the columns of the output are (stat, signal), 
+                e.g. result['std'] is the table of standard deviations.
+    `nCores`:   number of processes used to read and average the files. Default: 1 (sequential)
+    `checkpoint`: directory where the average of each file is stored (created if needed). 
+                When the function is run again (e.g. after an interruption), files that are 
+                unchanged are read from this directory instead of being processed again.
+                Default: None, no checkpoint
+    `log`:      FileErrorLogger instance, collecting the warnings and failures (`log.failures`).
+                Files that fail to be averaged are skipped and reported there.
     """
     result=None
     if len(outFiles_or_DFs)==0:
         raise Exception('No outFiles or DFs provided')
 
     invalidFiles =[]
-    log = FileErrorLogger()
-    # Loop trough files and populate result
-    for i,f in enumerate(outFiles_or_DFs):
-        if isinstance(f, pd.DataFrame):
-            df = f
+    if log is None:
+        log = FileErrorLogger()
+    if checkpoint is not None:
+        os.makedirs(checkpoint, exist_ok=True)
+    avgKwargs = dict(avgMethod=avgMethod, avgParam=avgParam, ColMap=ColMap, ColKeep=ColKeep, ColSort=ColSort, stats=stats)
+    tasks = [(i, f, avgKwargs, checkpoint) for i,f in enumerate(outFiles_or_DFs)]
+
+    # --- Read and average files, in parallel if requested
+    averages = [None]*len(tasks)
+    def processed(res):
+        i, df_avg, status, msg = res
+        f = outFiles_or_DFs[i]
+        if status=='invalid':
+            invalidFiles.append(f)
+        elif status=='fail':
+            log.FAIL(f if not isinstance(f, pd.DataFrame) else 'DataFrame{}'.format(i), msg)
         else:
-            try:
-                df=weio.read(f).toDataFrame()
-                #df=FASTOutputFile(f).toDataFrame()A # For pyFAST
-            except:
-                invalidFiles.append(f)
-                continue
-        df_avg = averageDF(df, avgMethod=avgMethod, avgParam=avgParam, ColMap=ColMap, ColKeep=ColKeep,ColSort=ColSort,stats=stats, filename=f)
-        MeanValues= df_avg.copy() # todo
+            averages[i] = df_avg
+        if verbose:
+            print('[INFO] {:5d}/{:d} {} {}'.format(i+1, len(tasks), status, msg))
+    if nCores>1 and len(tasks)>1:
+        from multiprocessing import Pool
+        with Pool(min(nCores, len(tasks))) as pool:
+            for res in pool.imap_unordered(_averageFile, tasks):
+                processed(res)
+    else:
+        for task in tasks:
+            processed(_averageFile(task))
+
+    # --- Populate result
+    for i,f in enumerate(outFiles_or_DFs):
+        if averages[i] is None:
+            continue
+        MeanValues= averages[i]
+        if not (len(stats)==1 and stats[0]=='mean'):
+            # One row with columns (stat, signal)
+            MeanValues = pd.DataFrame(MeanValues.unstack()).transpose()
         if result is None:
             # We create a dataframe here, now that we know the colums
             columns = MeanValues.columns
@@ -1895,23 +2229,27 @@ def averagePostPro(outFiles_or_DFs,avgMethod='periods',avgParam=None,
                     log.FAIL(f, 'has no columns in common with first file. Skipping.')
                     continue
                 try:
-                    result.iloc[i][columns_com] = MeanValues[columns_com].iloc[0]
-                    log.WARN(f, 'has {} columns, first file has {} columns, with {} in common. Truncating.'.format(n_loc, n_loc, n_com))
+                    result.loc[i, columns_com] = MeanValues[columns_com].iloc[0]
+                    log.WARN(f, 'has {} columns, first file has {} columns, with {} in common. Truncating.'.format(n_loc, n_ref, n_com))
                 except:
-                    log.FAIL(f, 'has {} columns, first file has {} columns, with {} in common. Failed to assign common columns.'.format(n_loc, n_loc, n_com))
+                    log.FAIL(f, 'has {} columns, first file has {} columns, with {} in common. Failed to assign common columns.'.format(n_loc, n_ref, n_com))
         else:
             try:
                 result.iloc[i] = MeanValues.iloc[0]
-            except:
-                import pdb; pdb.set_trace()
+            except Exception as e:
+                log.FAIL(f, 'failed to be assigned to the results: {}'.format(e))
 
 
     if len(invalidFiles)==len(outFiles_or_DFs):
         raise Exception('None of the files can be read (or exist)!. For instance, cannot find: {}'.format(invalidFiles[0]))
     elif len(invalidFiles)>0:
         print('[WARN] There were {} missing/invalid files: \n {}'.format(len(invalidFiles),'\n'.join(invalidFiles)))
+    if result is None:
+        raise Exception('None of the files could be averaged (see failures above)')
 
     if ColSort is not None:
+        if isinstance(result.columns, pd.MultiIndex) and not isinstance(ColSort, tuple):
+            ColSort = ('mean' if 'mean' in stats else stats[0], ColSort)
         if not ColSort in result.keys():
             print('[INFO] Columns present: ', result.keys())
             raise Exception('[FAIL] Cannot sort results with column `{}`, column not present in dataframe (see above)'.format(ColSort)) 
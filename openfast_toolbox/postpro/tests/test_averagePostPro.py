@@ -0,0 +1,71 @@
+import unittest
+import numpy as np
+import pandas as pd
+import os
+import shutil
+import tempfile
+from openfast_toolbox.postpro import averagePostPro, FileErrorLogger
+from openfast_toolbox.postpro.postpro import averageDF, signalStats
+
+MyDir=os.path.dirname(__file__)
+ExampleDir=os.path.join(MyDir, '../../io/tests/example_files/')
+
+class TestAveragePostPro(unittest.TestCase):
+
+    def test_average_checkpoint(self):
+        files = [os.path.join(ExampleDir, 'FASTOutBin.outb'), os.path.join(ExampleDir, 'FASTOut.out'),
+                 os.path.join(ExampleDir, 'DoesNotExist.outb')]
+        chk = os.path.join(tempfile.mkdtemp(), 'chk')
+        try:
+            # Reference, sequential without checkpoint
+            ref = averagePostPro(files, avgMethod='constantwindow', avgParam=None)
+            self.assertEqual(ref.shape[0], 3)
+            self.assertTrue(np.all(np.isnan(ref.iloc[2])))
+            # With checkpoint: first run stores the averages, second run reads them
+            res1 = averagePostPro(files, avgMethod='constantwindow', avgParam=None, checkpoint=chk)
+            self.assertEqual(len([f for f in os.listdir(chk) if f.endswith('.pkl')]), 2)
+            res2 = averagePostPro(files, avgMethod='constantwindow', avgParam=None, checkpoint=chk, nCores=2)
+            pd.testing.assert_frame_equal(ref, res1)
+            pd.testing.assert_frame_equal(ref, res2)
+        finally:
+            shutil.rmtree(os.path.dirname(chk), ignore_errors=True)
+
+    def test_average_failures(self):
+        # A dataframe that cannot be averaged is reported, and the batch continues
+        t = np.linspace(0, 10, 11)
+        df1 = pd.DataFrame({'Time_[s]':t, 'A':t**2})
+        df2 = pd.DataFrame({'NoTime':t, 'A':t**2})
+        log = FileErrorLogger()
+        res = averagePostPro([df1, df2], avgMethod='constantwindow', avgParam=5, log=log)
+        self.assertEqual(len(log.failures), 1)
+        np.testing.assert_almost_equal(res['A'].values[0], np.mean(t[5:]**2))
+        self.assertTrue(np.isnan(res['A'].values[1]))
+
+    def test_average_stats(self):
+        # Statistics computed in one pass by chunks, compared to pandas
+        np.random.seed(0)
+        t = np.linspace(0, 100, 1001)
+        df = pd.DataFrame({'Time_[s]':t, 'A':1e5+np.random.normal(0, 2, len(t)), 'B':np.random.exponential(2, len(t))})
+        df.loc[10:20, 'B'] = np.nan
+        stats = ['mean', 'std', 'min', 'max', 'absmax', 'skew', 'kurt', 'median', 'p95']
+        res = averageDF(df.copy(), avgMethod='constantwindow', avgParam=50, stats=stats)
+        self.assertEqual(list(res.index), ['Time_[s]', 'A', 'B'])
+        self.assertEqual(list(res.columns), stats)
+        w = df[t>=50]
+        ref = pd.concat([w.mean(), w.std(), w.min(), w.max(), w.abs().max(), w.skew(), w.kurt(), w.median(), w.quantile(0.95)], axis=1)
+        np.testing.assert_allclose(res.values, ref.values, rtol=1e-9, atol=1e-12)
+        S = signalStats(df.values, stats, chunkSize=7)
+        ref = pd.concat([df.mean(), df.std(), df.min(), df.max(), df.abs().max(), df.skew(), df.kurt(), df.median(), df.quantile(0.95)], axis=1)
+        np.testing.assert_allclose(S, ref.values, rtol=1e-9, atol=1e-12)
+        # Mean only: one row, as before
+        res = averageDF(df.copy(), avgMethod='constantwindow', avgParam=50)
+        np.testing.assert_allclose(res.values[0], w.mean().values, rtol=1e-12)
+        # Several dataframes: columns (stat, signal)
+        res = averagePostPro([df, df], avgMethod='constantwindow', avgParam=50, stats=['mean', 'DEL_m3'])
+        self.assertEqual(res.shape, (2, 6))
+        np.testing.assert_allclose(res['mean']['A'].values, [w['A'].mean()]*2, rtol=1e-12)
+        self.assertTrue(np.all(res['DEL_m3'][['A', 'B']].values>0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+import numpy as np
+import pandas as pd
+from openfast_toolbox.postpro.postpro import spanwiseColAD, spanwiseColED, extract_spanwise_data_timeSeries, spanwiseConcat, find_matching_pattern
+
+class TestSpanwise(unittest.TestCase):
+
+    def test_spanwise_columns(self):
+        cols = ['Time_[s]', 'AB1N002Alpha_[deg]', 'AB1N001Alpha_[deg]', 'AB1N003Alpha_[deg]', 'AB2N001Cl_[-]', 'B1N1_FFizr_[N]',
+                'Spn1ALxb1_[m/s^2]', 'AB1N001ALx_[m/s^2]', 'AB1N002FlyNT_[kN]', 'Alpha01_[deg]']
+        ColsInfo, nrMax = spanwiseColAD(cols)
+        self.assertEqual(nrMax, 3)
+        self.assertEqual([c['name'] for c in ColsInfo], ['B1Alpha_[deg]', 'B2Cl_[-]', 'Alpha_[deg]'])
+        np.testing.assert_equal(ColsInfo[0]['Idx'], [1, 2, 3])
+        np.testing.assert_equal(ColsInfo[0]['cols'], ['AB1N001Alpha_[deg]', 'AB1N002Alpha_[deg]', 'AB1N003Alpha_[deg]'])
+        # Same result when called again (memoised)
+        ColsInfo2, _ = spanwiseColAD(cols)
+        np.testing.assert_equal(ColsInfo2[0]['cols'], ColsInfo[0]['cols'])
+        # ED
+        ColsInfo, nrMax = spanwiseColED(cols)
+        self.assertEqual(ColsInfo[0]['name'], 'B1FLyNT_[kN]')
+        np.testing.assert_equal(ColsInfo[0]['Idx'], [2])
+        # Generic patterns
+        cols, idx = find_matching_pattern(['Misc', 'TxN20_[m]', 'TxN1_[m]'], r'TxN(\d+)_\[m\]', sort=True)
+        np.testing.assert_equal(cols, ['TxN1_[m]', 'TxN20_[m]'])
+        np.testing.assert_equal(idx, [1, 20])
+
+    def test_spanwise_extract(self):
+        t = np.linspace(0, 1, 5)
+        df = pd.DataFrame({'Time_[s]': t, 'AB1N001Cl_[-]': t, 'AB1N003Cl_[-]': 3*t, 'AB1N002Alpha_[deg]': 2*t})
+        ColsInfo, nrMax = spanwiseColAD(df.columns.values)
+        ds = extract_spanwise_data_timeSeries(ColsInfo, nrMax, df)
+        np.testing.assert_equal(ds['B1Cl_[-]'].values[:, 0], t)
+        np.testing.assert_equal(ds['B1Cl_[-]'].values[:, 2], 3*t)
+        self.assertTrue(np.all(np.isnan(ds['B1Cl_[-]'].values[:, 1])))
+        np.testing.assert_equal(ds['B1Alpha_[deg]'].values[:, 1], 2*t)
+        # Time concatenation
+        dfCat = spanwiseConcat(df)
+        np.testing.assert_equal(dfCat['i_[-]'].values, np.repeat([1, 2, 3], len(t)))
+        np.testing.assert_equal(dfCat['B1Cl_[-]'].values[2*len(t):], 3*t)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,7 @@ Tools for fatigue analysis
 Main functions:
 - equivalent_load: calculate damage equivalent load for a given signal
 - find_range_count: returns range and number of cycles for a given signal
+- equivalent_load_batch: equivalent loads and damage of several channels (DataFrame or xarray) and Wohler exponents
 
 Subfunctions:
 - eq_load: calculate equivalent loads using one of the two rain flow counting methods
@@ -16,6 +17,8 @@ Main aglorithms for rain flow counting:
 - rainflow_windap: taken from [2], based on [3]
 - rainflow_astm: taken from [2], based [4]
 - fatpack: using [5]
+- rainflow_windap_fast, rainflow_astm_fast: same results as the above, using a vectorized extraction 
+  of the turning points and loops compiled with numba (if installed)
 
 
 References:
@@ -35,6 +38,8 @@ import numpy as np
 
 __all__  = ['equivalent_load', 'find_range_count']
 __all__  += ['rainflow_astm', 'rainflow_windap','eq_load','eq_load_and_cycles','cycle_matrix','cycle_matrix2']
+__all__  += ['rainflow_astm_fast', 'rainflow_windap_fast', 'benchmark_rainflow']
+__all__  += ['equivalent_load_batch', 'rainflow_cycles']
 
 
 class SignalConstantError(Exception):
@@ -54,7 +59,8 @@ def equivalent_load(time, signal, m=3, Teq=1, bins=100, method='rainflow_windap'
      - m :    Wohler exponent (default is 3)
      - Teq : The equivalent period (Default 1, for 1Hz)
      - bins : Number of bins in rainflow count histogram
-     - method: rain flow counting algorithm: 'rainflow_windap', 'rainflow_astm' or 'fatpack'
+     - method: rain flow counting algorithm: 'rainflow_windap', 'rainflow_astm', 'fatpack'
+               or the fast versions 'rainflow_windap_fast', 'rainflow_astm_fast'
      - meanBin: if True, use the mean of the ranges within a bin (recommended)
               otherwise use the middle of the bin (not recommended).
      - binStartAt0: if True bins start at zero. Otherwise, start a lowest range
@@ -125,6 +131,7 @@ def find_range_count(signal, bins, method='rainflow_windap', meanBin=True, binSt
      - bins : 1d-array, int
          If bins is a sequence, left edges (and the rightmost edge) of the bins.
          If bins is an int, a sequence is created dividing the range `min`--`max` of signal into `bins` number of equally sized bins.
+     - method: see `equivalent_load`
     OUTPUTS:
       - N: number of cycles for each bin
       - S: Ranges for each bin
@@ -229,6 +236,207 @@ def bin_count(x, bins, meanBin=True):
  
 
 
+# --------------------------------------------------------------------------------}
+# --- Batched equivalent loads
+# --------------------------------------------------------------------------------{
+def rainflow_cycles(signal, method='rainflow_astm_fast'):
+    """
+    Returns the ranges, means and counts of the cycles of a signal
+    INPUTS:
+     - signal: array
+     - method: key of `rainflow_func_dict` (half cycles, count 0.5) or 'fatpack' (count 1)
+    OUTPUTS:
+     - ranges, means, counts: arrays of same length
+    """
+    if method=='fatpack':
+        import fatpack
+        ranges, means = fatpack.find_rainflow_ranges(signal, return_means=True)
+        return ranges, means, np.ones_like(ranges)
+    if method not in rainflow_func_dict.keys():
+        raise NotImplementedError('Rain flow algorithm {}'.format(method))
+    ranges, means = rainflow_func_dict[method](signal)
+    return ranges, means, np.full(len(ranges), 0.5)
+
+
+def _rangeHistogram(ranges, counts, bins, meanBin=True, binStartAt0=False):
+    """ Returns the number of cycles `N` and range `S` per bin, see `find_range_count`.
+    If bins is None, the cycles are returned without binning."""
+    if bins is None:
+        return counts, ranges
+    edges = create_bins(ranges, bins, binStartAt0=binStartAt0)
+    N, edges = np.histogram(ranges, bins=edges, weights=counts)
+    if meanBin:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            S = np.histogram(ranges, bins=edges, weights=counts*ranges)[0] / N
+        S[N==0] = 0
+    else:
+        S = (edges[:-1] + edges[1:]) / 2
+    return N, S
+
+
+def _signalEquivalentLoads(signal, T, m, bins, method, meanBin, binStartAt0, Teq, Sult, load2stress, Sc, lifetime):
+    """ 
+    Equivalent loads and damage of one signal for all Wohler exponents `m`, see `equivalent_load_batch`.
+    Returns an array of shape (4, len(m)): DEL, DEL with Goodman correction, damage, damage with Goodman correction.
+    """
+    m   = np.asarray(m, dtype=float)
+    out = np.full((4, len(m)), np.nan)
+    signal = np.asarray(signal, dtype=float)
+    signal = signal[~np.isnan(signal)]
+    if len(signal)<=1 or not T>0:
+        return out
+    try:
+        ranges, means, counts = rainflow_cycles(signal, method=method)
+    except (SignalConstantError, IndexError):
+        return out # No cycles, e.g. constant signal
+    except Exception as e:
+        # NOTE: a failure on one signal should not stop the batch
+        print('[WARN] equivalent_load_batch: rainflow counting failed ({}: {}), results set to NaN'.format(type(e).__name__, e))
+        return out
+    if len(ranges)==0:
+        return out
+    neq = T/Teq
+    # Load ranges with and without Goodman correction (in load units)
+    variants = [ranges]
+    if Sult is not None:
+        Lult = Sult/np.abs(load2stress)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variants.append(ranges/(1 - means/Lult))
+    for iv, F in enumerate(variants):
+        # One histogram for all exponents, and for the damage (stress ranges are scaled load ranges)
+        N, S = _rangeHistogram(F, counts, bins, meanBin=meanBin, binStartAt0=binStartAt0)
+        for im, mi in enumerate(m):
+            out[iv, im] = (np.sum(S**mi * N) / neq) ** (1/mi)
+            if Sc is not None and Sc>0:
+                D = np.sum(N * (S*np.abs(load2stress)/Sc)**mi)
+                if lifetime>0:
+                    D *= lifetime*365.0*24.0*60.0*60.0 / T
+                out[2+iv, im] = D
+    return out
+
+
+def _batchWorker(tasks):
+    return [_signalEquivalentLoads(*task) for task in tasks]
+
+
+def equivalent_load_batch(data, m=[3, 4, 6, 8, 10, 12], Teq=1, bins=100, method='rainflow_astm_fast', 
+        channels=None, time=None, dim='time', meanBin=True, binStartAt0=False,
+        Sult=None, load2stress=1, Sc=None, lifetime=0, nCores=1, chunkSize=50, verbose=False):
+    """
+    Damage equivalent loads (and damage) of several channels and Wohler exponents.
+
+    Each signal is rainflow counted once, the histogram of cycles is reused for all the 
+    Wohler exponents `m` and for the damage. The signals are processed in parallel with a 
+    process pool if nCores>1.
+
+    INPUTS:
+     - data: pandas DataFrame, or xarray Dataset/DataArray.
+             For a Dataset, every variable with the dimension `dim` is processed, for all 
+             combinations of its other dimensions (e.g. seed, turbine, wdir).
+     - m : Wohler exponent(s)
+     - Teq : The equivalent period (Default 1, for 1Hz)
+     - bins : Number of bins in rainflow count histogram, or None (no binning)
+     - method: rain flow counting algorithm, see `equivalent_load`
+     - channels: list of channels (columns or variables) to process. Default: all
+     - time: for a DataFrame, name of the time column. Default: first column if it starts with 'time',
+             otherwise, the index is used.
+     - dim: for xarray, name of the time dimension
+     - meanBin, binStartAt0: see `equivalent_load`
+     - Sult: ultimate stress, used for the Goodman correction. None: no Goodman correction
+     - load2stress: linear scaling coefficient to convert a load to a stress S = load2stress * L
+     - Sc: stress-axis intercept of the S-N curve, used for the damage. Default: Sult. None: no damage
+     - lifetime: design lifetime in years, used to scale the damage. 0: damage of the signal duration
+     Sult, load2stress and Sc can also be dictionaries with channels as keys.
+     - nCores: number of processes
+     - chunkSize: number of signals sent to a process at once
+    OUTPUTS:
+     - for a DataFrame: DataFrame with channels as index and columns (quantity, m)
+     - for xarray: Dataset with variables `<quantity>_<channel>` and dimensions (..., 'm')
+     where quantity is 'DEL', 'DEL_goodman', 'damage', 'damage_goodman' (when available)
+     The quantities are NaN for signals that cannot be rainflow counted (constant or too short signals,
+     or a failure of the rainflow counting, reported with a warning). The other signals are processed.
+    """
+    import pandas as pd
+    m = np.atleast_1d(m).astype(float)
+    # Invalid methods are reported before processing the signals
+    if method=='fatpack':
+        import fatpack
+    elif method not in rainflow_func_dict.keys():
+        raise NotImplementedError('Rain flow algorithm {}'.format(method))
+    quantities = ['DEL', 'DEL_goodman', 'damage', 'damage_goodman']
+
+    def param(p, c):
+        return p.get(c, None) if isinstance(p, dict) else p
+
+    # --- Gather 2D arrays of signals (nCases x nTime) for each channel
+    isDataFrame = isinstance(data, pd.DataFrame)
+    signals = {} # channel -> (2D array, T, extra dims, extra coords)
+    if isDataFrame:
+        if time is None:
+            if str(data.columns[0]).lower().startswith('time'):
+                time = data.columns[0]
+        t = data.index.values if time is None else data[time].values
+        if channels is None:
+            channels = [c for c in data.columns if c!=time and np.issubdtype(data[c].dtype, np.number)]
+        for c in channels:
+            signals[c] = (data[c].values[None,:], t, [], {})
+    else:
+        if not hasattr(data, 'data_vars'): # DataArray
+            data = data.to_dataset(name=data.name if data.name is not None else 'signal')
+        if channels is None:
+            channels = [v for v in data.data_vars if dim in data[v].dims]
+        t = data[dim].values
+        for c in channels:
+            da = data[c].transpose(..., dim)
+            extraDims = list(da.dims[:-1])
+            coords = {d: data[d].values for d in extraDims if d in data.coords}
+            signals[c] = (da.values.reshape(-1, da.shape[-1]), t, extraDims, coords)
+    if np.issubdtype(np.asarray(t).dtype, np.datetime64) or np.issubdtype(np.asarray(t).dtype, np.timedelta64):
+        T = (t[-1]-t[0])/np.timedelta64(1,'s')
+    else:
+        T = float(t[-1]-t[0]) if len(t)>1 else 0
+
+    # --- Tasks
+    tasks = []
+    iQ = {} # Quantities that are computed, per channel
+    for c, (Y, _, _, _) in signals.items():
+        Sult_c = param(Sult, c)
+        l2s    = param(load2stress, c)
+        l2s    = 1 if l2s is None else l2s
+        Sc_c   = param(Sc, c)
+        Sc_c   = Sult_c if Sc_c is None else Sc_c
+        iQ[c]  = [0] + [1]*(Sult_c is not None) + [2]*(Sc_c is not None) + [3]*(Sult_c is not None and Sc_c is not None)
+        for y in Y:
+            tasks.append((y, T, m, bins, method, meanBin, binStartAt0, Teq, Sult_c, l2s, Sc_c, lifetime))
+    chunks = [tasks[i:i+chunkSize] for i in range(0, len(tasks), chunkSize)]
+    if verbose:
+        print('Equivalent loads: {} channels, {} signals, {} process(es)'.format(len(signals), len(tasks), nCores))
+    if nCores>1 and len(chunks)>1:
+        from multiprocessing import Pool
+        with Pool(min(nCores, len(chunks))) as pool:
+            results = pool.map(_batchWorker, chunks)
+    else:
+        results = [_batchWorker(chunk) for chunk in chunks]
+    results = np.array([r for chunk in results for r in chunk]).reshape(len(tasks), 4, len(m))
+
+    # --- Labelled outputs
+    if isDataFrame:
+        iQall = sorted(set([i for c in iQ for i in iQ[c]]))
+        cols = pd.MultiIndex.from_tuples([(quantities[i], mi) for i in iQall for mi in m], names=['quantity', 'm'])
+        return pd.DataFrame(results[:, iQall, :].reshape(len(tasks), -1), index=list(signals.keys()), columns=cols)
+    import xarray as xr
+    ds = xr.Dataset(coords={'m': m})
+    i0 = 0
+    for c, (Y, _, extraDims, coords) in signals.items():
+        shape = data[c].transpose(..., dim).shape[:-1]
+        R = results[i0:i0+len(Y)]
+        i0 += len(Y)
+        for i in iQ[c]:
+            ds['{}_{}'.format(quantities[i], c)] = xr.DataArray(R[:, i, :].reshape(shape + (len(m),)), 
+                    dims=extraDims+['m'], coords=dict(coords, m=m))
+    return ds
+
+
 def check_signal(signal):
     # check input data validity
     if not type(signal).__name__ == 'ndarray':
@@ -941,7 +1149,273 @@ def pair_range_amplitude_mean(x):  # cpdef pair_range(np.ndarray[long,ndim=1]  x
     return ampl_mean
 
 
-rainflow_func_dict = {'rainflow_windap':rainflow_windap, 'rainflow_astm':rainflow_astm}
+# --------------------------------------------------------------------------------}
+# --- Fast rainflow counting
+# --------------------------------------------------------------------------------{
+# The stack-based loops below are compiled with numba when it is available.
+# Otherwise the same functions are run by the python interpreter, on lists, which is
+# faster than indexing numpy arrays element by element.
+try:
+    from numba import njit as _njit
+    _jit = _njit(cache=True, nogil=True)
+    HAS_NUMBA = True
+except ImportError:
+    _jit = lambda f: f
+    HAS_NUMBA = False
+
+
+def find_extremes_fast(signal):
+    """Vectorized version of `find_extremes`: 
+    return local minima and maxima plus first and last element of signal"""
+    sign_grad = np.sign(np.diff(signal)).astype(np.int8)
+    nonZero = sign_grad != 0
+    if not np.any(nonZero):
+        # All values are equal to crossing level!
+        return np.array([0])
+    # Remove plateaus: a plateau takes the sign of the previous slope (or of the first slope)
+    idx = np.where(nonZero, np.arange(len(sign_grad)), 0)
+    np.maximum.accumulate(idx, out=idx)
+    idx[:np.argmax(nonZero)] = np.argmax(nonZero)
+    sign_grad = sign_grad[idx]
+    extremes = np.flatnonzero(np.r_[True, sign_grad[1:] * sign_grad[:-1] < 0, True])
+    return signal[extremes]
+
+
+def _buffer(n, dtype=np.float64):
+    """ Work array for the loops below: numpy array for numba, list otherwise (faster in pure python)"""
+    if HAS_NUMBA:
+        return np.zeros(n, dtype=dtype)
+    return [dtype(0)] * n
+
+
+def _loopInput(x):
+    """ Input of the loops below: numpy array for numba, list otherwise (faster in pure python)"""
+    if HAS_NUMBA:
+        return np.ascontiguousarray(x)
+    return x.tolist()
+
+
+@_jit
+def _peak_trough_loop(x, R, S):
+    """ Same as `peak_trough`, written as a single loop over the signal.
+    S: work array of length len(x)+1, on exit, contains the peaks and troughs in S[1:n+1]
+    Returns n
+    """
+    L = len(x)
+    trough = x[0]
+    peak = x[0]
+    p = 1
+    state = 0 # 0: BEGIN, -1: MINZO, 1: MAXZO
+    for i in range(1, L):
+        xi = x[i]
+        if state == 0:
+            if xi > peak:
+                peak = xi
+                if peak - trough >= R:
+                    S[p] = trough
+                    state = 1
+            elif xi < trough:
+                trough = xi
+                if peak - trough >= R:
+                    S[p] = peak
+                    state = -1
+        elif state == -1:
+            if xi < trough:
+                trough = xi
+            elif xi - trough >= R:
+                p += 1
+                S[p] = trough
+                peak = xi
+                state = 1
+        else:
+            if xi > peak:
+                peak = xi
+            elif peak - xi >= R:
+                p += 1
+                S[p] = peak
+                trough = xi
+                state = -1
+    # ENDZO
+    n = p + 1
+    if state == 1:
+        S[n] = peak
+    elif state == -1:
+        S[n] = trough
+    else:
+        S[n] = int((trough + peak) / 2)
+    return n
+
+
+@_jit
+def _pair_range_amplitude_mean_loop(x, S, ampl, mean):
+    """ Same as `pair_range_amplitude_mean`, with x starting at 0.
+    S: work array of length len(x)+1
+    ampl, mean: arrays of length len(x), on exit contain the k half cycles
+    Returns k
+    """
+    n = len(x)
+    k = 0
+    S[1] = x[0]
+    p = 1
+    # phase 1
+    for ptr in range(1, n):
+        p += 1
+        S[p] = x[ptr]
+        while p >= 4:
+            if (S[p - 2] > S[p - 3] and S[p - 1] >= S[p - 3] and S[p] >= S[p - 2]) or \
+               (S[p - 2] < S[p - 3] and S[p - 1] <= S[p - 3] and S[p] <= S[p - 2]):
+                # Extract two intermediate half cycles
+                a = abs(S[p - 2] - S[p - 1])
+                m = (S[p - 2] + S[p - 1]) / 2
+                ampl[k] = a; mean[k] = m; k += 1
+                ampl[k] = a; mean[k] = m; k += 1
+                S[p - 2] = S[p]
+                p -= 2
+            else:
+                break
+    # phase 2
+    for q in range(1, p):
+        ampl[k] = abs(S[q + 1] - S[q])
+        mean[k] = (S[q + 1] + S[q]) / 2
+        k += 1
+    return k
+
+
+@_jit
+def _rainflowcount_loop(sig, a, ampl, mean):
+    """ Same as `rainflowcount`, using a preallocated stack.
+    a: work array (stack) of length len(sig)
+    ampl, mean: arrays of length len(sig), on exit contain the k half cycles
+    Returns k
+    """
+    na = 0
+    k = 0
+    for i in range(len(sig)):
+        a[na] = sig[i]
+        na += 1
+        while na > 2 and abs(a[na - 3] - a[na - 2]) <= abs(a[na - 2] - a[na - 1]):
+            r = abs(a[na - 3] - a[na - 2])
+            m = (a[na - 3] + a[na - 2]) / 2
+            if na == 3:
+                # Half cycle, the first point is removed
+                a[0] = a[1]
+                a[1] = a[2]
+                na = 2
+                if r > 0:
+                    ampl[k] = r; mean[k] = m; k += 1
+            else:
+                # Full cycle, the two points are removed
+                a[na - 3] = a[na - 1]
+                na -= 2
+                if r > 0:
+                    ampl[k] = r; mean[k] = m; k += 1
+                    ampl[k] = r; mean[k] = m; k += 1
+    for j in range(na - 1):
+        r = abs(a[j] - a[j + 1])
+        if r > 0:
+            ampl[k] = r
+            mean[k] = (a[j] + a[j + 1]) / 2
+            k += 1
+    return k
+
+
+def rainflow_windap_fast(signal, levels=255., thresshold=(255 / 50)):
+    """Fast version of `rainflow_windap`, with identical results.
+
+    The signal is reduced to its turning points (vectorized) before the peak-trough
+    and pair-range loops, which are compiled with numba if it is installed.
+    See `rainflow_windap` for the inputs and outputs.
+    """
+    check_signal(signal)
+    signal = signal.astype(np.double).flatten()
+    if np.all(np.isnan(signal)):
+        return None
+    offset = np.nanmin(signal)
+    signal -= offset
+    if np.nanmax(signal) > 0:
+        gain = np.nanmax(signal) / levels
+        signal = signal / gain
+        signal = np.round(signal).astype(np.int64)
+
+        # Only turning points can change the state of the peak-trough filter (for a positive thresshold)
+        if thresshold > 0:
+            signal = find_extremes_fast(signal)
+
+        # Convert to list of local minima/maxima where difference > thresshold
+        S = _buffer(len(signal) + 1, np.int64)
+        n = _peak_trough_loop(_loopInput(signal), thresshold, S)
+        sig_ext = np.asarray(S[1:n + 1], dtype=np.int64)
+
+        # rainflow count
+        sig_ext = sig_ext - np.min(sig_ext)
+        S, ampl, mean = _buffer(n + 1), _buffer(n), _buffer(n)
+        k = _pair_range_amplitude_mean_loop(_loopInput(sig_ext), S, ampl, mean)
+        ampl_mean = np.column_stack((np.asarray(ampl[:k], dtype=np.float64), np.asarray(mean[:k], dtype=np.float64)))
+
+        ampl_mean = np.round(ampl_mean / thresshold) * gain * thresshold
+        ampl_mean[:, 1] += offset
+        return ampl_mean.T
+
+
+def rainflow_astm_fast(signal):
+    """Fast version of `rainflow_astm`, with identical results.
+
+    Uses a vectorized extraction of the turning points and a stack-based cycle counter,
+    compiled with numba if it is installed.
+    See `rainflow_astm` for the inputs and outputs.
+    """
+    check_signal(signal)
+    signal = signal.astype(np.double).flatten()
+
+    # Remove points which is not local minimum/maximum
+    sig_ext = find_extremes_fast(signal)
+
+    # rainflow count
+    n = len(sig_ext)
+    a, ampl, mean = _buffer(n), _buffer(n), _buffer(n)
+    k = _rainflowcount_loop(_loopInput(sig_ext), a, ampl, mean)
+    return np.array([ampl[:k], mean[:k]], dtype=np.float64)
+
+
+def benchmark_rainflow(nSamples=[10**5, 10**6, 10**7], methods=None, nRepeat=1, seed=0, verbose=True):
+    """ 
+    Compare the computational time of the rainflow counting methods on random signals 
+    (sum of sines and noise) of different lengths.
+
+    INPUTS:
+      - nSamples: list of signal lengths
+      - methods: list of methods (keys of `rainflow_func_dict`). Default: all.
+      - nRepeat: number of times each method is run (the minimum time is reported)
+    OUTPUTS:
+      - df: dataframe with the time (in seconds) for each method (columns) and signal length (rows)
+    """
+    import time
+    import pandas as pd
+    if methods is None:
+        methods = list(rainflow_func_dict.keys())
+    rng = np.random.default_rng(seed)
+    results = np.full((len(nSamples), len(methods)), np.nan)
+    for i, n in enumerate(nSamples):
+        n = int(n)
+        t = np.linspace(0, n/100, n)
+        signal = np.sin(2*np.pi*0.1*t) + 0.3*np.sin(2*np.pi*1.3*t) + 0.1*rng.standard_normal(n)
+        for j, method in enumerate(methods):
+            func = rainflow_func_dict[method]
+            if HAS_NUMBA and method.endswith('_fast'):
+                func(signal[:100]) # compilation
+            times = []
+            for _ in range(nRepeat):
+                t0 = time.perf_counter()
+                func(signal)
+                times.append(time.perf_counter() - t0)
+            results[i, j] = np.min(times)
+            if verbose:
+                print('{:25s} n={:9d}  {:8.3f}s'.format(method, n, results[i, j]))
+    return pd.DataFrame(data=results, index=[int(n) for n in nSamples], columns=methods)
+
+
+rainflow_func_dict = {'rainflow_windap':rainflow_windap, 'rainflow_astm':rainflow_astm,
+                      'rainflow_windap_fast':rainflow_windap_fast, 'rainflow_astm_fast':rainflow_astm_fast}
 
 
 # --------------------------------------------------------------------------------}
@@ -1024,6 +1498,55 @@ class TestFatigue(unittest.TestCase):
                                                                                        [ 0., 0., 0., 0.],
                                                                                        [ 0., 0., 2., 1.]]))
 
+    def test_rainflow_fast(self):
+        # The fast methods should give identical results
+        signal = np.array([-2.0, 0.0, 1.0, 0.0, -3.0, 0.0, 5.0, 0.0, -1.0, 0.0, 3.0, 0.0, -4.0, 0.0, 4.0, 0.0, -2.0])
+        np.testing.assert_array_equal(rainflow_windap_fast(signal, 18, 2), rainflow_windap(signal, 18, 2))
+        np.testing.assert_array_equal(rainflow_astm_fast(signal), rainflow_astm(signal))
+        rng = np.random.default_rng(0)
+        for signal in [rng.standard_normal(2000), np.round(2*rng.standard_normal(2000)), np.cumsum(rng.standard_normal(2000)),
+                       np.sin(np.linspace(0,50,2000))+0.01*rng.standard_normal(2000)]:
+            np.testing.assert_array_equal(find_extremes_fast(signal), find_extremes(signal))
+            np.testing.assert_array_equal(rainflow_windap_fast(signal), rainflow_windap(signal))
+            np.testing.assert_array_equal(rainflow_astm_fast(signal), rainflow_astm(signal))
+        t = np.linspace(0, 100, 2000)
+        for method in ['rainflow_windap', 'rainflow_astm']:
+            Leq1 = equivalent_load(t, signal, m=4, bins=10, method=method)
+            Leq2 = equivalent_load(t, signal, m=4, bins=10, method=method+'_fast')
+            np.testing.assert_equal(Leq1, Leq2)
+
+    def test_equivalent_load_batch(self):
+        # Batched version should give the same results as equivalent_load
+        import pandas as pd
+        rng = np.random.default_rng(0)
+        t = np.linspace(0, 100, 1001)
+        df = pd.DataFrame({'Time_[s]':t, 'A':np.sin(t)+0.1*rng.standard_normal(len(t)), 'B':np.cumsum(rng.standard_normal(len(t)))})
+        res1 = equivalent_load_batch(df, m=[3, 10], bins=50, method='rainflow_windap', nCores=1)
+        self.assertEqual(list(res1.index), ['A','B'])
+        for c in ['A','B']:
+            for m in [3, 10]:
+                Leq = equivalent_load(t, df[c], m=m, bins=50, method='rainflow_windap')
+                np.testing.assert_almost_equal(res1.loc[c, ('DEL', m)], Leq, 10)
+        # Goodman and damage
+        res = equivalent_load_batch(df, m=4, bins=None, Sult=100, load2stress=2)
+        np.testing.assert_equal(list(res.columns.get_level_values(0)), ['DEL', 'DEL_goodman', 'damage', 'damage_goodman'])
+        np.testing.assert_almost_equal(res['damage'][4.].values, res['DEL'][4.].values**4 * (t[-1]-t[0]) * (2/100)**4)
+        # A failed rainflow count gives NaN for this signal only, constant signals too
+        from unittest import mock
+        def failing(signal):
+            if signal[0]>5:
+                raise ValueError('failing method')
+            return rainflow_windap(signal)
+        df['C'] = df['A'] + 10
+        df['D'] = 1.0
+        with mock.patch.dict(rainflow_func_dict, {'failing':failing}):
+            res2 = equivalent_load_batch(df, m=[3, 10], bins=50, method='failing', nCores=1)
+        self.assertEqual(list(res2.index), ['A','B','C','D'])
+        self.assertTrue(np.all(np.isnan(res2.loc[['C','D']].values)))
+        np.testing.assert_equal(res2.loc[['A','B']].values, res1.loc[['A','B']].values)
+        with self.assertRaises(NotImplementedError):
+            equivalent_load_batch(df, m=3, method='unknown')
+
     def test_eq_load_basic(self):
         import numpy.testing
         signal1 = np.array([-2.0, 0.0, 1.0, 0.0, -3.0, 0.0, 5.0, 0.0, -1.0, 0.0, 3.0, 0.0, -4.0, 0.0, 4.0, 0.0, -2.0])
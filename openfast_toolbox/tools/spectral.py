@@ -31,16 +31,23 @@ __all__ += ['TestSpectral']
 # --------------------------------------------------------------------------------}
 # --- FFT wrap
 # --------------------------------------------------------------------------------{
-def fft_wrap(t,y,dt=None, output_type='amplitude',averaging='None',averaging_window='hamming',detrend=False,nExp=None, nPerDecade=None, verbose=False):
+def fft_wrap(t,y,dt=None, output_type='amplitude',averaging='None',averaging_window='hamming',detrend=False,nExp=None, nPerDecade=None, dtype=None, workers=None, verbose=False):
     """ 
     Wrapper to compute FFT amplitude or power spectra, with averaging.
     INPUTS:
+       t: time vector (nt)
+       y: signal (nt), or array of signals (nChannels x nt, or any shape with time as last axis), 
+          or DataFrame with one column per channel (nt rows).
+          For several signals, the time steps where one of the signals is NaN are removed.
        output_type      : amplitude, PSD, f x PSD
        averaging : None, Welch, Binning
        averaging_window : Hamming, Hann, Rectangular
+       dtype: data type used for the computation, e.g. 'float32'. Default: dtype of y
+       workers: number of threads used for the FFTs (scipy.fft). Default: None (numpy.fft)
     OUTPUTS:
        frq: vector of frequencies
-       Y  : Amplitude spectrum, PSD, or f * PSD
+       Y  : Amplitude spectrum, PSD, or f * PSD, same shape as y with frequency as last axis
+            (for a DataFrame: DataFrame with the frequencies as index)
        Info: a dictionary of info values
     """
 
@@ -48,14 +55,25 @@ def fft_wrap(t,y,dt=None, output_type='amplitude',averaging='None',averaging_win
     output_type      = output_type.lower()
     averaging        = averaging.lower()
     averaging_window = averaging_window.lower()
+    columns = None
+    if isinstance(y, pd.DataFrame):
+        columns = y.columns
+        y = y.values.T
     t = np.asarray(t)
     y = np.asarray(y)
-    n0 = len(y) 
+    if dtype is not None:
+        y = y.astype(dtype, copy=False)
+    n0 = y.shape[-1]
     nt = len(t) 
-    if len(t)!=len(y):
+    if nt!=n0:
         raise Exception('t and y should have the same length')
-    y = y[~np.isnan(y)]
-    n = len(y) 
+    if y.ndim==1:
+        y = y[~np.isnan(y)]
+    else:
+        bValid = ~np.isnan(y.reshape(-1, n0)).any(axis=0)
+        if not np.all(bValid):
+            y = y[..., bValid]
+    n = y.shape[-1]
 
     if dt is None:
         dtDelta0 = t[1]-t[0]
@@ -69,9 +87,9 @@ def fft_wrap(t,y,dt=None, output_type='amplitude',averaging='None',averaging_win
                 print('[WARN] dt from tmax-tmin different from dt from t2-t1 {} {}'.format(dt, dtDelta0) )
     Fs = 1/dt
     if averaging =='none':
-        frq, PSD, Info = psd(y, fs=Fs, detrend=detrend, return_onesided=True)
+        frq, PSD, Info = psd(y, fs=Fs, detrend=detrend, return_onesided=True, workers=workers)
     elif averaging =='binning':
-        frq, PSD, Info = psd_binned(y, fs=Fs, detrend=detrend, return_onesided=True, nPerDecade=nPerDecade)
+        frq, PSD, Info = psd_binned(y, fs=Fs, detrend=detrend, return_onesided=True, nPerDecade=nPerDecade, workers=workers)
     elif averaging=='welch':
         # --- Welch - PSD
         #overlap_frac=0.5
@@ -93,7 +111,7 @@ def fft_wrap(t,y,dt=None, output_type='amplitude',averaging='None',averaging_win
            window = boxcar(nPerSeg)
         else:
             raise Exception('Averaging window unknown {}'.format(averaging_window))
-        frq, PSD, Info = pwelch(y, fs=Fs, window=window, detrend=detrend)
+        frq, PSD, Info = pwelch(y, fs=Fs, window=window, detrend=detrend, workers=workers)
         Info.nExp = nExp
     else:
         raise Exception('Averaging method unknown {}'.format(averaging))
@@ -111,7 +129,11 @@ def fft_wrap(t,y,dt=None, output_type='amplitude',averaging='None',averaging_win
         raise NotImplementedError('Contact developer')
     if detrend:
         frq= frq[1:]
-        Y  = Y[1:]
+        Y  = Y[...,1:]
+    if dtype is not None:
+        Y = Y.astype(dtype, copy=False)
+    if columns is not None:
+        Y = pd.DataFrame(Y.T, index=frq, columns=columns)
     return frq, Y, Info
 
 
@@ -119,50 +141,52 @@ def fft_wrap(t,y,dt=None, output_type='amplitude',averaging='None',averaging_win
 # --------------------------------------------------------------------------------}
 # --- Spectral simple (averaging below) 
 # --------------------------------------------------------------------------------{
-def fft_amplitude(y, fs=1.0, detrend ='constant', return_onesided=True):
-    """ Returns FFT amplitude of signal """
-    frq, PSD, Info = psd(y, fs=fs, detrend=detrend, return_onesided=return_onesided)
+def fft_amplitude(y, fs=1.0, detrend ='constant', return_onesided=True, workers=None):
+    """ Returns FFT amplitude of signal (or signals, time as last axis) """
+    frq, PSD, Info = psd(y, fs=fs, detrend=detrend, return_onesided=return_onesided, workers=workers)
     deltaf = frq[1]-frq[0]
     Y = np.sqrt(PSD*2*deltaf)
     return frq, Y, Info
 
 
-def psd_binned(y, fs=1.0, nPerDecade=10, detrend ='constant', return_onesided=True):
+def psd_binned(y, fs=1.0, nPerDecade=10, detrend ='constant', return_onesided=True, workers=None):
     """ 
     Return PSD binned with nPoints per decade
+    y: signal, or signals (time as last axis)
     """
     # --- First  return regular PSD
-    frq, PSD, Info = psd(y, fs=fs, detrend=detrend, return_onesided=return_onesided)
+    frq, PSD, Info = psd(y, fs=fs, detrend=detrend, return_onesided=return_onesided, workers=workers)
 
     add0=False
     if frq[0]==0:
         add0=True
         f0   = 0
-        PSD0 = PSD[0]
+        PSD0 = PSD[...,0:1]
         frq=frq[1:]
-        PSD=PSD[1:]
+        PSD=PSD[...,1:]
 
     # -- Then bin per decase
     log_f = np.log10(frq)
     ndecades = np.ceil(log_f[-1] -log_f[0])
     xbins = np.linspace(log_f[0], log_f[-1], int(ndecades*nPerDecade))
 
-    # Using Pandas to bin..
-    df = pd.DataFrame(data=np.column_stack((log_f,PSD)), columns=['x','y'])
-    xmid  = (xbins[:-1]+xbins[1:])/2
-    df['Bin'] = pd.cut(df['x'], bins=xbins, labels=xmid ) # Adding a column that has bin attribute
-    df2  = df.groupby('Bin', observed=False).mean()                     # Average by bin
-    df2  = df2.reindex(xmid)
-    log_f_bin = df2['x'].values
-    PSD_bin = df2['y'].values
+    # Bin of each frequency, intervals (xbins[k-1], xbins[k]] (as pandas.cut)
+    # The frequencies are sorted, so the bins are contiguous slices of the frequency axis
+    ib     = np.searchsorted(xbins, log_f, side='left')
+    bValid = (ib>=1) & (ib<len(xbins))
+    ib     = ib[bValid]-1
+    log_f  = log_f[bValid]
+    PSD    = PSD[...,bValid]
+    counts = np.bincount(ib, minlength=len(xbins)-1)
+    counts = counts[counts>0]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    log_f_bin = np.add.reduceat(log_f, starts)/counts
+    PSD_bin   = np.add.reduceat(PSD, starts, axis=-1)/counts
     frq2= 10**log_f_bin
     PSD2= PSD_bin
     if add0:
         frq2=np.concatenate(  ([f0  ], frq2)  )
-        PSD2=np.concatenate(  ([PSD0], PSD2)  )
-    b = ~np.isnan(frq2)
-    frq2 = frq2[b]
-    PSD2 = PSD2[b]
+        PSD2=np.concatenate(  (PSD0, PSD2), axis=-1 )
 
     #import matplotlib.pyplot as plt
     #fig,ax = plt.subplots(1, 1, sharey=False, figsize=(6.4,4.8)) # (6.4,4.8)
@@ -190,39 +214,42 @@ def psd_binned(y, fs=1.0, nPerDecade=10, detrend ='constant', return_onesided=Tr
     return frq2, PSD2, Info
 
 
-def psd(y, fs=1.0, detrend ='constant', return_onesided=True):
-    """ Perform PSD without averaging """
+def psd(y, fs=1.0, detrend ='constant', return_onesided=True, workers=None):
+    """ Perform PSD without averaging 
+    y: signal, or signals (time as last axis)
+    """
     if not return_onesided:
         raise NotImplementedError('Double sided todo')
 
     if detrend is None:
         detrend=False
 
+    y = np.asarray(y)
     if detrend=='constant' or detrend==True:
-        m=np.mean(y);
+        m=np.mean(y, axis=-1, keepdims=True)
     else:
         m=0;
 
-    n = len(y) 
+    n = y.shape[-1]
     if n%2==0:
         nhalf = int(n/2+1)
     else:
         nhalf = int((n+1)/2)
 
     frq = np.arange(nhalf)*fs/n;
-    Y   = np.fft.rfft(y-m) #Y = np.fft.fft(y) 
-    PSD = abs(Y[range(nhalf)])**2 /(n*fs) # PSD
-    PSD[1:-1] = PSD[1:-1]*2;
+    Y   = _rfft(y-m, workers=workers) #Y = np.fft.fft(y) 
+    PSD = np.abs(Y[...,:nhalf])**2 /(n*fs) # PSD
+    PSD[...,1:-1] = PSD[...,1:-1]*2;
     class InfoClass():
         pass
     Info = InfoClass();
     Info.df    = frq[1]-frq[0]
     Info.fMax  = frq[-1]
     Info.LFreq = len(frq)
-    Info.LSeg  = len(Y)
-    Info.LWin  = len(Y)
+    Info.LSeg  = Y.shape[-1]
+    Info.LWin  = Y.shape[-1]
     Info.LOvlp = 0
-    Info.nFFT  = len(Y)
+    Info.nFFT  = Y.shape[-1]
     Info.nseg  = 1
     return frq, PSD, Info
 
@@ -556,7 +583,7 @@ def welch(x, fs=1.0, window='hann', nperseg=None, noverlap=None, nfft=None,
 #>>>>
 def pwelch(x, window='hamming', noverlap=None, nfft=None, fs=1.0, nperseg=None, 
           detrend=False, return_onesided=True, scaling='density',
-          axis=-1):
+          axis=-1, workers=None):
     r"""
     NOTE: interface and default options modified to match matlab's implementation
        >> detrend: default to False
@@ -613,6 +640,9 @@ def pwelch(x, window='hamming', noverlap=None, nfft=None, fs=1.0, nperseg=None,
     axis : int, optional
         Axis along which the periodogram is computed; the default is
         over the last axis (i.e. ``axis=-1``).
+        The segments of all the signals are transformed in one batched FFT.
+    workers : int, optional
+        Number of threads used for the FFTs (scipy.fft). Defaults to None (numpy.fft)
 
     Returns
     -------
@@ -674,14 +704,14 @@ def pwelch(x, window='hamming', noverlap=None, nfft=None, fs=1.0, nperseg=None,
         detrend='constant'
 
     freqs, Pxx, Info = csd(x, x, fs, window, nperseg, noverlap, nfft, detrend,
-                     return_onesided, scaling, axis, returnInfo=True)
+                     return_onesided, scaling, axis, returnInfo=True, workers=workers)
 
     return freqs, Pxx.real, Info
 
 
 def csd(x, y, fs=1.0, window='hann', nperseg=None, noverlap=None, nfft=None,
         detrend='constant', return_onesided=True, scaling='density', axis=-1,
-        returnInfo=False
+        returnInfo=False, workers=None
         ):
     r"""
     Estimate the cross power spectral density, Pxy, using Welch's
@@ -690,7 +720,7 @@ def csd(x, y, fs=1.0, window='hann', nperseg=None, noverlap=None, nfft=None,
 
     freqs, _, Pxy, Info = _spectral_helper(x, y, fs, window, nperseg, noverlap, nfft,
                                      detrend, return_onesided, scaling, axis,
-                                     mode='psd')
+                                     mode='psd', workers=workers)
 
     # Average over windows.
     if len(Pxy.shape) >= 2 and Pxy.size > 0:
@@ -729,7 +759,7 @@ def coherence(x, y, fs=1.0, window='hann', nperseg=None, noverlap=None,
 def _spectral_helper(x, y, fs=1.0, window='hann', nperseg=None, noverlap=None,
                      nfft=None, detrend='constant', return_onesided=True,
                      scaling='spectrum', axis=-1, mode='psd', boundary=None,
-                     padded=False):
+                     padded=False, workers=None):
     """ Calculate various forms of windowed FFTs for PSD, CSD, etc.  """
     if mode not in ['psd', 'stft']:
         raise ValueError("Unknown value for mode %s, must be one of: "
@@ -898,12 +928,12 @@ def _spectral_helper(x, y, fs=1.0, window='hann', nperseg=None, noverlap=None,
         freqs = np.fft.rfftfreq(nfft, 1/fs)
 
     # Perform the windowed FFTs
-    result = _fft_helper(x, win, detrend_func, nperseg, noverlap, nfft, sides)
+    result = _fft_helper(x, win, detrend_func, nperseg, noverlap, nfft, sides, workers=workers)
 
     if not same_data:
         # All the same operations on the y data
         result_y = _fft_helper(y, win, detrend_func, nperseg, noverlap, nfft,
-                               sides)
+                               sides, workers=workers)
         result = np.conjugate(result) * result_y
     elif mode == 'psd':
         result = np.conjugate(result) * result
@@ -951,7 +981,7 @@ def _spectral_helper(x, y, fs=1.0, window='hann', nperseg=None, noverlap=None,
     return freqs, time, result, Info
 
 
-def _fft_helper(x, win, detrend_func, nperseg, noverlap, nfft, sides):
+def _fft_helper(x, win, detrend_func, nperseg, noverlap, nfft, sides, workers=None):
     """ Calculate windowed FFT """
     # Created strided array of data segments
     if nperseg == 1 and noverlap == 0:
@@ -976,8 +1006,7 @@ def _fft_helper(x, win, detrend_func, nperseg, noverlap, nfft, sides):
         #func = fftpack.fft
     else:
         result = result.real
-        func = np.fft.rfft
-    result = func(result, n=nfft)
+    result = _rfft(result, n=nfft, workers=workers)
 
     return result
 
@@ -1322,6 +1351,16 @@ def double_sided_DFT_real(X1, N=None):
 # --------------------------------------------------------------------------------}
 # --- Helper functions
 # --------------------------------------------------------------------------------{
+def _rfft(x, n=None, workers=None):
+    """ Real FFT along the last axis. If `workers` is provided, scipy.fft is used with a pool of threads """
+    if workers is not None:
+        try:
+            import scipy.fft
+            return scipy.fft.rfft(x, n=n, axis=-1, workers=workers)
+        except ImportError:
+            pass
+    return np.fft.rfft(x, n=n, axis=-1)
+
 def is_power_of_two(n):
     """ Uses bit manipulation to figure out if an integer is a power of two"""
     return (n != 0) and (n & (n-1) == 0)
@@ -1434,6 +1473,25 @@ class TestSpectral(unittest.TestCase):
         #ax.set_ylabel('')
         #ax.legend()
         #plt.show()
+
+    def test_fft_wrap_batched(self):
+        # Spectra of several channels at once are the same as one channel at a time
+        np.random.seed(0)
+        t = np.linspace(0, 100, 1001)
+        Y = np.cumsum(np.random.normal(0, 1, (3, len(t))), axis=1) + sinesum(t, [3,1], [1,4])
+        for averaging in ['None', 'Binning', 'Welch']:
+            f, Y2, _ = fft_wrap(t, Y, averaging=averaging, detrend=True, nPerDecade=10)
+            for i in range(3):
+                f1, Y1, _ = fft_wrap(t, Y[i], averaging=averaging, detrend=True, nPerDecade=10)
+                np.testing.assert_allclose(f, f1)
+                np.testing.assert_allclose(Y2[i], Y1, rtol=1e-10)
+        # DataFrame input, float32 outputs
+        df = pd.DataFrame(Y.T, columns=['a','b','c'])
+        f, D, _ = fft_wrap(t, df, averaging='Welch', output_type='psd', dtype='float32', workers=2)
+        self.assertEqual(list(D.columns), ['a','b','c'])
+        self.assertEqual(D.values.dtype, np.float32)
+        f1, P1, _ = pwelch(Y[1], fs=1/(t[1]-t[0]), window=hamming(len(f)*2-2, True))
+        np.testing.assert_allclose(D['b'].values, P1, rtol=1e-4)
     
 if __name__ == '__main__':
     #TestSpectral().test_fft_binning()
@@ -0,0 +1,6 @@
+import unittest
+import numpy as np
+from openfast_toolbox.tools.spectral import TestSpectral
+ 
+if __name__ == '__main__':
+    unittest.main()